@@ -147,13 +147,15 @@ ENDSSH
 deploy_scraper() {
     print_status "🕷️ Deploying Scraper to ${VPS_SCRAPER_DOMAIN}..."
     
-    # Create scraper package
+    # Create scraper package (server-python imports table_sink, run_journal,
+    # table_extract and replay from server-node's scrapers folder)
     tar -czf /tmp/scraper-deploy.tar.gz \
         --exclude='__pycache__' \
         --exclude='.git' \
         --exclude='venv' \
         --exclude='*.pyc' \
         server-python/ \
+        server-node/backend/python/scrapers/ \
         scripts/generate_full_player_index.py \
         data/core/AFL_Fantasy_Player_URLs.xlsx
     
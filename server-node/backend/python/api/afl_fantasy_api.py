@@ -8,6 +8,7 @@ from flask import Flask, jsonify, request
 import subprocess
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 
 app = Flask(__name__)
@@ -23,6 +24,28 @@ cache = {
     'cache_duration': 300  # 5 minutes cache
 }
 
+# Logged-in sessions for the configured AFL Fantasy accounts (created on first use)
+session_pool = None
+session_pool_lock = threading.Lock()
+
+def get_session_pool():
+    """Get the shared session pool, or None when no accounts are configured"""
+    global session_pool
+    if session_pool is None:
+        # Concurrent first requests must not create two pools (and two refresh threads)
+        with session_pool_lock:
+            if session_pool is None:
+                import sys
+                sys.path.append('../scrapers')
+                from session_pool import SessionPool
+
+                pool = SessionPool()
+                if pool.team_ids:
+                    # Refresh tokens in the background so requests never wait on a browser login
+                    pool.start()
+                session_pool = pool
+    return session_pool if session_pool.team_ids else None
+
 def is_cache_valid():
     """Check if cached data is still valid"""
     if not cache['data'] or not cache['timestamp']:
@@ -49,10 +72,18 @@ def fetch_fresh_afl_data():
     from afl_fantasy_data_service import AFLFantasyDataService
     from afl_fantasy_authenticated_scraper import AFLFantasyAuthenticatedScraper
 
-    # Try data service first (more reliable)
+    # Try data service first (more reliable), over a pooled login when accounts are configured
     print("Trying AFL Fantasy data service...")
     try:
-        service = AFLFantasyDataService()
+        pool = get_session_pool()
+        service = None
+        if pool:
+            try:
+                team_id = pool.team_ids[0]
+                service = AFLFantasyDataService(team_id=team_id, session=pool.session(team_id))
+            except Exception as e:
+                print(f"Session pool unavailable, using manual tokens: {e}")
+        service = service or AFLFantasyDataService()
         data = service.get_all_dashboard_data()
         
         if data:
@@ -155,6 +186,31 @@ def get_dashboard_data():
             'message': str(e)
         }), 500
 
+@app.route('/api/afl-fantasy/teams/dashboard-data', methods=['GET'])
+def get_teams_dashboard_data():
+    """Get dashboard data for several tracked teams (?team_id=...&team_id=..., default all)"""
+    try:
+        pool = get_session_pool()
+        if not pool:
+            return jsonify({
+                'error': 'No AFL Fantasy accounts configured',
+                'message': 'Add accounts to afl_fantasy_accounts.json'
+            }), 404
+        
+        team_ids = request.args.getlist('team_id') or None
+        unknown = [team_id for team_id in team_ids or [] if team_id not in pool.accounts]
+        if unknown:
+            return jsonify({'error': f"Unknown team ids: {', '.join(unknown)}"}), 404
+        
+        return jsonify({
+            'teams': pool.dashboard_data(team_ids),
+            'last_updated': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        print(f"Error in teams dashboard data endpoint: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/afl-fantasy/team-value', methods=['GET'])
 def get_team_value():
     """Get team value data specifically"""
@@ -271,6 +327,7 @@ def health_check():
         from afl_fantasy_authenticated_scraper import AFLFantasyAuthenticatedScraper
         
         service = AFLFantasyDataService()
+        pool = get_session_pool()
         
         return jsonify({
             'status': 'ok',
@@ -285,7 +342,8 @@ def health_check():
                 'has_data': bool(cache['data']),
                 'last_updated': cache.get('timestamp')
             },
-            'tokens_configured': service.team_id is not None and service.session_cookie is not None
+            'tokens_configured': service.team_id is not None and service.session_cookie is not None,
+            'sessions': pool.status() if pool else {}
         })
     except Exception as e:
         print(f"Health check error: {e}")
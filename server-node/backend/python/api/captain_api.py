@@ -5,11 +5,12 @@ This module provides a Flask API for the captain tools,
 allowing them to be called from the NodeJS server.
 """
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from captain_tools import (
     captain_score_predictor,
     vice_captain_optimizer,
     loophole_detector,
+    loophole_planner,
     form_based_captain_analyzer,
     matchup_based_captain_advisor
 )
@@ -43,6 +44,17 @@ def api_loophole_detector():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
+@app.route('/api/captain/loophole-planner', methods=['GET'])
+def api_loophole_planner():
+    """API endpoint for Loophole Planner (?rounds=10,11)"""
+    try:
+        rounds = request.args.get('rounds')
+        rounds = [int(r) for r in rounds.split(',')] if rounds else None
+        results = loophole_planner(rounds)
+        return jsonify({"status": results.get("status", "ok"), "data": results})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)})
+
 @app.route('/api/captain/form-based-analyzer', methods=['GET'])
 def api_form_based_captain_analyzer():
     """API endpoint for Form-based Captain Analyzer"""
@@ -2,7 +2,10 @@
 Risk Tools API
 
 This module provides a Flask API for the risk evaluation tools,
-allowing them to be called from the NodeJS server.
+allowing them to be called from the NodeJS server. Every endpoint is
+served from the risk table cached by risk_engine, which is rebuilt only
+when the player data changes. Pass ?limit=N to change how many players
+are returned.
 """
 
 from flask import Flask, jsonify, request
@@ -12,13 +15,18 @@ import risk_tools
 app = Flask(__name__)
 app.json.sort_keys = False  # Preserve the order of keys in JSON responses
 
+def _tool_args():
+    """Optional ?limit= query parameter passed through to a risk tool"""
+    limit = request.args.get('limit', type=int)
+    return {'limit': limit} if limit and limit > 0 else {}
+
 # API endpoints for risk tools
 
 @app.route('/api/tag_watch_monitor', methods=['GET'])
 def api_tag_watch_monitor():
     """API endpoint for Tag Watch Monitor"""
     try:
-        data = risk_tools.tag_watch_monitor()
+        data = risk_tools.tag_watch_monitor(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -27,7 +35,7 @@ def api_tag_watch_monitor():
 def api_tag_history_impact_tracker():
     """API endpoint for Tag History Impact Tracker"""
     try:
-        data = risk_tools.tag_history_impact_tracker()
+        data = risk_tools.tag_history_impact_tracker(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -36,7 +44,7 @@ def api_tag_history_impact_tracker():
 def api_tag_target_priority_ranker():
     """API endpoint for Tag Target Priority Ranker"""
     try:
-        data = risk_tools.tag_target_priority_ranker()
+        data = risk_tools.tag_target_priority_ranker(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -45,7 +53,7 @@ def api_tag_target_priority_ranker():
 def api_tag_breaker_score_estimator():
     """API endpoint for Tag Breaker Score Estimator"""
     try:
-        data = risk_tools.tag_breaker_score_estimator()
+        data = risk_tools.tag_breaker_score_estimator(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -54,7 +62,7 @@ def api_tag_breaker_score_estimator():
 def api_injury_risk_model():
     """API endpoint for Injury Risk Model"""
     try:
-        data = risk_tools.injury_risk_model()
+        data = risk_tools.injury_risk_model(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -63,7 +71,7 @@ def api_injury_risk_model():
 def api_volatility_index_calculator():
     """API endpoint for Volatility Index Calculator"""
     try:
-        data = risk_tools.volatility_index_calculator()
+        data = risk_tools.volatility_index_calculator(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -72,7 +80,7 @@ def api_volatility_index_calculator():
 def api_consistency_score_generator():
     """API endpoint for Consistency Score Generator"""
     try:
-        data = risk_tools.consistency_score_generator()
+        data = risk_tools.consistency_score_generator(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -81,7 +89,7 @@ def api_consistency_score_generator():
 def api_scoring_range_predictor():
     """API endpoint for Scoring Range Predictor"""
     try:
-        data = risk_tools.scoring_range_predictor()
+        data = risk_tools.scoring_range_predictor(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -90,7 +98,7 @@ def api_scoring_range_predictor():
 def api_late_out_risk_estimator():
     """API endpoint for Late Out Risk Estimator"""
     try:
-        data = risk_tools.late_out_risk_estimator()
+        data = risk_tools.late_out_risk_estimator(**_tool_args())
         return jsonify({'status': 'ok', 'data': data})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -0,0 +1,56 @@
+"""
+Test the rolling breakeven engine behind /api/breakevens
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import breakeven_engine
+from price_simulator import PRICE_WINDOW, magic_number_for
+
+
+@pytest.fixture
+def roster(tmp_path, monkeypatch):
+    players = [
+        {'id': '1', 'name': 'Steady Mid', 'price': 800000, 'recentForm': [100, 90, 110, 95, 105]},
+        {'id': '2', 'name': 'Cheap Rookie', 'price': 250000, 'recentForm': [40, 70]}
+    ]
+    (tmp_path / 'player_data.json').write_text(json.dumps(players))
+    monkeypatch.chdir(tmp_path)
+    breakeven_engine._state.clear()
+    return players
+
+
+def test_next_breakeven_follows_the_price_formula(roster):
+    by_id = {row['player_id']: row for row in breakeven_engine.next_round_breakevens()}
+
+    expected = PRICE_WINDOW * 800000 / magic_number_for(800000) - (95 + 105)
+    assert by_id['1']['breakeven'] == round(expected)
+    assert by_id['1']['last_scores'] == [95, 105]
+
+
+def test_history_limited_to_recent_rounds(roster):
+    full = breakeven_engine.breakeven_history('1')
+    recent = breakeven_engine.breakeven_history('steady mid', rounds=2)
+
+    assert full['scores'] == [100, 90, 110, 95, 105]
+    assert recent['scores'] == [95, 105]
+    assert recent['breakevens'] == full['breakevens'][-2:]
+    assert breakeven_engine.breakeven_history('nobody') is None
+
+
+@pytest.mark.parametrize('rounds', [0, -2, 1.5, True])
+def test_history_rejects_invalid_rounds(roster, rounds):
+    with pytest.raises(ValueError):
+        breakeven_engine.breakeven_history('1', rounds=rounds)
+
+
+def test_trends_reject_invalid_rounds(roster):
+    with pytest.raises(ValueError):
+        breakeven_engine.breakeven_trends(rounds=0)
+    assert len(breakeven_engine.breakeven_trends(rounds=3)) == 2
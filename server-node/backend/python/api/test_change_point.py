@@ -0,0 +1,97 @@
+"""
+Test the online CUSUM change-point detector behind the role change tools
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import change_point
+from change_point import METRICS, ChangePointDetector
+
+
+def test_detects_a_shift_in_level():
+    cba = [50, 52, 48, 51, 49, 50, 51, 49, 80, 82, 79, 81, 80, 78]
+    series = np.full((1, len(METRICS), len(cba)), np.nan)
+    series[0, METRICS.index('cba')] = cba
+    detector = ChangePointDetector(1).run(series)
+
+    m = METRICS.index('cba')
+    assert detector.change_index[0, m] == 8
+    assert detector.change_before[0, m] == pytest.approx(50, abs=1)
+    assert detector.change_after[0, m] == pytest.approx(80, abs=2)
+    assert detector.change_confidence[0, m] > 0.99
+    # Metrics without values never change
+    assert detector.change_index[0, METRICS.index('tog')] == -1
+
+
+def test_steady_series_has_no_change_point():
+    rng = np.random.default_rng(7)
+    series = 70 + rng.normal(0, 3, size=(20, len(METRICS), 16))
+    detector = ChangePointDetector(20).run(series)
+
+    assert (detector.change_index == -1).all()
+
+
+def write_players(path, games, version):
+    rng = np.random.default_rng(3)
+    cba = np.concatenate([rng.normal(40, 3, 12), rng.normal(75, 3, 12)])
+    tog = rng.normal(80, 2, 24)
+    fp = np.concatenate([rng.normal(85, 8, 12), rng.normal(110, 8, 12)])
+    players = [
+        {
+            'id': str(i), 'name': f'Player {i}', 'price': 500000,
+            'recentForm': [round(float(v), 1) for v in fp[:games] + i],
+            'cbaHistory': [round(float(v), 1) for v in cba[:games] - i],
+            'togHistory': [round(float(v), 1) for v in tog[:games]]
+        }
+        for i in range(3)
+    ]
+    path.write_text(json.dumps(players))
+    os.utime(path, ns=(version, version))
+
+
+def fitted_state(detector):
+    return {name: value.copy() for name, value in vars(detector).items() if isinstance(value, np.ndarray)}
+
+
+def test_appended_games_advance_the_cached_state_like_a_full_replay(tmp_path, monkeypatch):
+    monkeypatch.setattr(change_point, '_state', {})
+    path = tmp_path / 'player_data.json'
+    logs_path = str(tmp_path / 'logs.json')
+
+    write_players(path, 10, 1)
+    first = change_point.get_role_changes(str(path), logs_path)
+    write_players(path, 24, 2)
+    second = change_point.get_role_changes(str(path), logs_path)
+
+    # Advanced in place from the previous state rather than rebuilt
+    assert second['detector'] is first['detector']
+    replayed = ChangePointDetector(len(second['players'])).run(second['series'])
+    incremental, full = fitted_state(second['detector']), fitted_state(replayed)
+    assert incremental.keys() == full.keys()
+    for name in full:
+        np.testing.assert_allclose(incremental[name], full[name], err_msg=name, equal_nan=True)
+    assert (full['change_index'][:, METRICS.index('cba')] >= 0).all()
+
+
+def test_rewritten_history_replays_the_season(tmp_path, monkeypatch):
+    monkeypatch.setattr(change_point, '_state', {})
+    path = tmp_path / 'player_data.json'
+    logs_path = str(tmp_path / 'logs.json')
+
+    write_players(path, 12, 1)
+    first = change_point.get_role_changes(str(path), logs_path)
+    players = json.loads(path.read_text())
+    players[0]['recentForm'][0] += 20
+    path.write_text(json.dumps(players))
+    os.utime(path, ns=(2, 2))
+    second = change_point.get_role_changes(str(path), logs_path)
+
+    assert second['detector'] is not first['detector']
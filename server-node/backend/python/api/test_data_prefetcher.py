@@ -0,0 +1,108 @@
+"""
+Test the background prefetcher that keeps scraped fixture and DVP data fresh
+"""
+
+import json
+import runpy
+import sys
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).parent.parent / 'tools'
+sys.path.append(str(TOOLS_DIR))
+
+import data_prefetcher
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_prefetcher, '_datasets', {})
+    monkeypatch.setattr(data_prefetcher, '_cache', {})
+    path = str(tmp_path / 'teams.json')
+    data_prefetcher.register_dataset('teams', path, 'https://example.com/teams',
+                                     lambda text: text.split(',') if text else None)
+    return path
+
+
+def test_fetch_then_conditional_not_modified(dataset):
+    session = FakeSession(FakeResponse(text='Carlton,Geelong', headers={'ETag': '"v1"'}),
+                          FakeResponse(status_code=304))
+
+    first = data_prefetcher.refresh_dataset('teams', session=session)
+    second = data_prefetcher.refresh_dataset('teams', session=session)
+    data, status = data_prefetcher.read_cached('teams')
+
+    assert first['version'] == second['version'] == 1
+    assert session.requests[1]['If-None-Match'] == '"v1"'
+    assert data == ['Carlton', 'Geelong']
+    assert status['available'] and not status['stale']
+
+
+def test_not_modified_counts_as_a_fresh_fetch(dataset):
+    session = FakeSession(FakeResponse(text='Carlton', headers={'ETag': '"v1"'}), FakeResponse(status_code=304))
+    data_prefetcher.refresh_dataset('teams', session=session)
+    meta_path = Path(f"{dataset}.meta.json")
+    meta = json.loads(meta_path.read_text())
+    meta_path.write_text(json.dumps(dict(meta, fetched_at='2020-01-01T00:00:00')))
+    assert data_prefetcher.dataset_status('teams')['stale']
+
+    meta = data_prefetcher.refresh_dataset('teams', session=session)
+
+    assert meta['fetched_at'] == meta['checked_at']
+    assert not data_prefetcher.dataset_status('teams')['stale']
+
+
+def test_failed_fetch_keeps_the_cached_copy(dataset):
+    data_prefetcher.refresh_dataset('teams', session=FakeSession(FakeResponse(text='Carlton')))
+    meta = data_prefetcher.refresh_dataset('teams', session=FakeSession(FakeResponse(text='')))
+
+    assert meta['last_error'] == 'Page could not be parsed'
+    assert data_prefetcher.read_cached('teams')[0] == ['Carlton']
+
+
+def test_run_once_skips_datasets_that_are_not_due(dataset, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(data_prefetcher, 'refresh_dataset', lambda name, session=None: refreshed.append(name))
+    data_prefetcher.run_once()
+    assert refreshed == ['teams']
+
+    Path(f"{dataset}.meta.json").write_text(json.dumps({'checked_at': '2999-01-01T00:00:00'}))
+    Path(dataset).write_text('[]')
+    data_prefetcher.run_once()
+    assert refreshed == ['teams']
+
+
+def test_once_refreshes_the_datasets_registered_by_fixture_tools(tmp_path, monkeypatch, capsys):
+    import fixture_tools  # noqa: F401
+
+    refreshed = []
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_prefetcher, 'refresh_dataset', lambda name, session=None: refreshed.append(name))
+    monkeypatch.setattr(sys, 'argv', ['data_prefetcher.py', '--once'])
+
+    runpy.run_path(str(TOOLS_DIR / 'data_prefetcher.py'), run_name='__main__')
+
+    assert set(refreshed) == {'fixture', 'dvp'}
+    assert set(json.loads(capsys.readouterr().out)) == {'fixture', 'dvp'}
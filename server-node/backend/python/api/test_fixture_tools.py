@@ -0,0 +1,79 @@
+"""
+Test the cached fixture index: current round per call and rebuilds on data changes
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import fixture_tools
+
+MATCHES = [
+    (1, 'Carlton', 'Richmond', 'MCG', '2025-03-13', datetime(2025, 3, 13, 19, 30)),
+    (1, 'Geelong', 'Sydney', 'GMHBA Stadium', '2025-03-15', datetime(2025, 3, 15, 16, 15)),
+    (2, 'Richmond', 'Geelong', 'MCG', '2025-03-20', datetime(2025, 3, 20, 19, 30)),
+    (3, 'Sydney', 'Carlton', 'SCG', '2025-03-27', datetime(2025, 3, 27, 19, 30))
+]
+
+
+@pytest.fixture
+def fixture(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fixture_tools, '_index_cache', {})
+    monkeypatch.setattr(fixture_tools, '_fixture_matches', lambda: list(MATCHES))
+    monkeypatch.setattr(fixture_tools, 'get_team_strength_ratings', lambda: {})
+    return tmp_path
+
+
+def test_current_round_moves_on_without_a_rebuild(fixture, monkeypatch):
+    index = fixture_tools.get_fixture_index()
+    monkeypatch.setattr(fixture_tools, '_build_fixture_index', lambda: pytest.fail('rebuilt'))
+
+    assert fixture_tools.get_fixture_index() is index
+    assert fixture_tools.fixture_current_round(index, datetime(2025, 3, 1)) == 1
+    # Round 1 is current until its last game finishes
+    assert fixture_tools.fixture_current_round(index, datetime(2025, 3, 15, 17)) == 1
+    assert fixture_tools.fixture_current_round(index, datetime(2025, 3, 16)) == 2
+    assert fixture_tools.fixture_current_round(index, datetime(2025, 9, 1)) == 3
+    assert fixture_tools.upcoming_rounds(index, 2, now=datetime(2025, 3, 16)) == slice(1, 3)
+
+
+def test_data_saved_during_a_build_triggers_another_build(fixture, monkeypatch):
+    build = fixture_tools._build_fixture_index
+    builds = []
+
+    def build_while_the_fixture_is_saved():
+        builds.append(1)
+        if len(builds) == 1:
+            (fixture / 'fixture_data.json').write_text('{"fixtures": []}')
+        return build()
+
+    monkeypatch.setattr(fixture_tools, '_build_fixture_index', build_while_the_fixture_is_saved)
+    fixture_tools.get_fixture_index()
+    fixture_tools.get_fixture_index()
+    fixture_tools.get_fixture_index()
+
+    assert len(builds) == 2
+
+
+def test_dvp_saved_during_a_build_triggers_another_build(fixture, monkeypatch):
+    monkeypatch.setattr(fixture_tools, '_dvp_cache', {})
+    builds = []
+
+    def dvp_while_the_matrix_is_saved():
+        builds.append(1)
+        if len(builds) == 1:
+            (fixture / fixture_tools.DVP_MATRIX_PATH).write_text('{}')
+        return {'Carlton': {'MID': 8.0}}
+
+    monkeypatch.setattr(fixture_tools, 'get_team_position_dvp', dvp_while_the_matrix_is_saved)
+    first = fixture_tools.get_dvp_matrix()
+    second = fixture_tools.get_dvp_matrix()
+
+    assert len(builds) == 2
+    assert fixture_tools.get_dvp_matrix() is second is not first
+    assert second['values'][second['team_pos']['Carlton'], second['position_pos']['MID']] == 8.0
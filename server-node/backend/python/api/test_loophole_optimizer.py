@@ -0,0 +1,76 @@
+"""
+Test the vice-captain loophole planner behind /api/captain/loophole-planner
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import loophole_optimizer
+
+
+def match(round_number, home, away, kickoff):
+    return {'round': round_number, 'home': home, 'away': away, 'venue': '', 'kickoff': kickoff}
+
+
+THURSDAY = datetime(2025, 3, 13, 19, 30)
+SATURDAY = datetime(2025, 3, 15, 19, 30)
+
+SQUAD = [
+    {'name': 'Early Gun', 'team': 'Carlton', 'position': 'MID'},
+    {'name': 'Late Captain', 'team': 'Collingwood', 'position': 'MID'},
+    {'name': 'Late Emergency', 'team': 'Collingwood', 'position': 'MID', 'bench': True}
+]
+
+
+def plan(tmp_path, schedule, squad=SQUAD, rounds=(1,)):
+    players = [
+        {'id': '1', 'name': 'Early Gun', 'team': 'Carlton', 'games': 5, 'recentForm': [60, 150, 70, 140, 65]},
+        {'id': '2', 'name': 'Late Captain', 'team': 'Collingwood', 'games': 5, 'recentForm': [100, 100, 100, 100, 100]},
+        {'id': '3', 'name': 'Late Emergency', 'team': 'Collingwood', 'games': 5, 'recentForm': [50, 60, 55]}
+    ]
+    (tmp_path / 'player_data.json').write_text(json.dumps(players))
+    return loophole_optimizer.best_loophole_plans(
+        rounds=list(rounds), squad=squad, schedule=schedule,
+        player_path=str(tmp_path / 'player_data.json'), logs_path=str(tmp_path / 'logs.json')
+    )
+
+
+def test_early_volatile_vc_is_looped_onto_a_late_emergency(tmp_path):
+    schedule = [match(1, 'Carlton', 'Richmond', THURSDAY), match(1, 'Collingwood', 'Essendon', SATURDAY)]
+    result = plan(tmp_path, schedule)
+    round_plan = result['rounds'][0]
+
+    assert result['status'] == 'ok'
+    assert round_plan['has_loophole']
+    assert round_plan['plan']['vice_captain']['name'] == 'Early Gun'
+    assert round_plan['plan']['captain']['name'] == 'Late Captain'
+    assert round_plan['plan']['emergency']['name'] == 'Late Emergency'
+    # Doubling 150/140 beats keeping a 100 average captain in two of five games
+    assert round_plan['plan']['loophole_probability'] == 0.4
+    assert round_plan['plan']['expected_captain_points'] > round_plan['baseline']['expected_captain_points']
+
+
+def test_no_loophole_when_everyone_plays_at_once(tmp_path):
+    schedule = [match(1, 'Carlton', 'Collingwood', SATURDAY)]
+    round_plan = plan(tmp_path, schedule)['rounds'][0]
+
+    assert not round_plan['has_loophole']
+    assert round_plan['baseline']['captain']['name'] == 'Late Captain'
+
+
+def test_round_with_no_squad_fixtures(tmp_path):
+    schedule = [match(1, 'Carlton', 'Collingwood', SATURDAY), match(2, 'Richmond', 'Essendon', SATURDAY)]
+    round_plan = plan(tmp_path, schedule, rounds=(2,))['rounds'][0]
+
+    assert not round_plan['has_loophole']
+    assert 'No squad players' in round_plan['message']
+
+
+def test_missing_schedule_or_squad(tmp_path):
+    assert plan(tmp_path, [])['status'] == 'error'
+    schedule = [match(1, 'Carlton', 'Collingwood', SATURDAY)]
+    assert plan(tmp_path, schedule, squad=[{'name': 'Nobody'}])['status'] == 'error'
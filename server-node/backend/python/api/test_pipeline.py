@@ -0,0 +1,137 @@
+"""
+Test the cached data pipeline behind the scheduler's player data updates
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pipeline import Pipeline, Stage
+
+SCRIPTS = Path(__file__).parent.parent / 'scripts'
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'a.json').write_text('[1, 2]')
+    (tmp_path / 'b.json').write_text('[10]')
+    return tmp_path
+
+
+def build(calls, fail=()):
+    """load_a, load_b -> total -> publish (writes out.json)"""
+    def load(name):
+        def run(inputs, files):
+            calls.append(name)
+            if name in fail:
+                raise RuntimeError(f"{name} broke")
+            return json.loads(Path(files['path']).read_text())
+        return run
+
+    def total(inputs, files):
+        calls.append('total')
+        return sum(inputs['load_a']) + sum(inputs['load_b'])
+
+    def publish(inputs, files):
+        calls.append('publish')
+        Path('out.json').write_text(json.dumps(inputs['total']))
+        return inputs['total']
+
+    return Pipeline([
+        Stage('load_a', load('load_a'), files={'path': 'a.json'}),
+        Stage('load_b', load('load_b'), files={'path': 'b.json'}),
+        Stage('total', total, deps=('load_a', 'load_b')),
+        Stage('publish', publish, deps=('total',), outputs=('out.json',))
+    ], workers=2)
+
+
+def statuses(results):
+    return {name: result['status'] for name, result in results.items()}
+
+
+def test_unchanged_inputs_are_served_from_the_cache(workdir):
+    calls = []
+    first = build(calls).run()
+    assert statuses(first) == dict.fromkeys(first, 'ran')
+    assert json.loads((workdir / 'out.json').read_text()) == 13
+
+    calls.clear()
+    second = build(calls).run()
+    assert statuses(second) == dict.fromkeys(second, 'cached')
+    assert second['publish']['output'] == 13
+    assert calls == []
+
+
+def test_changed_file_reruns_its_stage_and_dependents(workdir):
+    build([]).run()
+    (workdir / 'b.json').write_text('[20]')
+
+    calls = []
+    results = build(calls).run()
+    assert statuses(results) == {'load_a': 'cached', 'load_b': 'ran', 'total': 'ran', 'publish': 'ran'}
+    assert json.loads((workdir / 'out.json').read_text()) == 23
+
+    # Same output from a rerun stage: its dependents stay cached
+    (workdir / 'b.json').write_text('[20] ')
+    results = build([]).run()
+    assert statuses(results) == {'load_a': 'cached', 'load_b': 'ran', 'total': 'cached', 'publish': 'cached'}
+
+
+def test_output_file_drift_reruns_the_stage(workdir):
+    build([]).run()
+    (workdir / 'out.json').write_text('"edited by hand"')
+
+    calls = []
+    results = build(calls).run()
+    assert calls == ['publish']
+    assert results['publish']['status'] == 'ran'
+    assert json.loads((workdir / 'out.json').read_text()) == 13
+
+    assert statuses(build([]).run(force=['total'])) == {
+        'load_a': 'cached', 'load_b': 'cached', 'total': 'ran', 'publish': 'cached'
+    }
+
+
+def test_failed_stage_skips_its_dependents_only(workdir):
+    calls = []
+    results = build(calls, fail={'load_b'}).run()
+
+    assert statuses(results) == {'load_a': 'ran', 'load_b': 'failed', 'total': 'skipped', 'publish': 'skipped'}
+    assert results['load_b']['error'] == 'load_b broke'
+    assert results['total']['error'] == 'upstream failed: load_b'
+    assert 'total' not in calls and not (workdir / 'out.json').exists()
+
+    history = [json.loads(line) for line in (workdir / 'pipeline_runs.jsonl').read_text().splitlines()]
+    assert history[-1]['stages']['publish']['status'] == 'skipped'
+    assert 'output' not in history[-1]['stages']['load_a']
+
+
+def test_bad_graphs_are_rejected():
+    noop = lambda inputs, files: None  # noqa: E731
+    with pytest.raises(ValueError, match='unknown stages'):
+        Pipeline([Stage('a', noop, deps=('missing',))])
+    with pytest.raises(ValueError, match='cycle'):
+        Pipeline([Stage('a', noop, deps=('b',)), Stage('b', noop, deps=('a',))])
+    with pytest.raises(ValueError, match='Unknown stages'):
+        Pipeline([Stage('a', noop)]).run(force=['b'])
+
+
+def test_enriched_ids_and_breakevens_are_the_same_in_every_process():
+    code = (
+        "import json, enhance_player_data as e, process_draftstars_data as d;"
+        "players = e.calculate_projected_scores([{'name': 'Marcus Bontempelli', 'avg': 110}]);"
+        "print(json.dumps([players[0]['id'], d.estimate_breakeven(110.4)]))"
+    )
+    runs = {
+        subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS, capture_output=True, text=True, check=True,
+                       env=dict(os.environ, PYTHONHASHSEED=seed)).stdout
+        for seed in ('1', '2', '3')
+    }
+    assert len(runs) == 1
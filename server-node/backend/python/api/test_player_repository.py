@@ -0,0 +1,63 @@
+"""
+Test the shared player_data.json repository used by the tool modules
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+from player_repository import PlayerRepository
+
+
+def write(path, players, mtime):
+    path.write_text(players if isinstance(players, str) else json.dumps(players))
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / 'player_data.json'
+    write(path, [
+        {'id': 1, 'name': 'Swing Player', 'team': 'Carlton', 'position': 'MID/FWD', 'price': '$650,000'},
+        {'id': 2, 'name': 'Key Back', 'team': 'Geelong', 'position': 'DEF', 'price': 500000}
+    ], 1)
+    return path
+
+
+def test_lookups_and_dual_positions(data_file):
+    repository = PlayerRepository(str(data_file))
+
+    assert repository.get('1').price == 650000
+    assert repository.get('key back').team == 'Geelong'
+    assert [r.name for r in repository.by_position('fwd')] == ['Swing Player']
+    assert [r.name for r in repository.by_team('Carlton')] == ['Swing Player']
+
+
+def test_reload_swaps_the_whole_snapshot(data_file):
+    repository = PlayerRepository(str(data_file))
+    before = repository.snapshot()
+    write(data_file, [{'id': 3, 'name': 'New Ruck', 'position': 'RUC'}], 2)
+    after = repository.snapshot()
+
+    assert [r.name for r in before.records] == ['Swing Player', 'Key Back']
+    assert [r.name for r in after.records] == ['New Ruck']
+    assert repository.get('1') is None
+
+
+def test_unreadable_file_is_logged_and_keeps_last_good_data(data_file, caplog):
+    repository = PlayerRepository(str(data_file))
+    repository.refresh()
+    write(data_file, '[{"id": 1, "na', 2)
+
+    assert len(repository.players()) == 2
+    assert repository.error
+    assert 'Error loading player data' in caplog.text
+
+    write(data_file, {'players': []}, 3)
+    assert len(repository.players()) == 2
+    assert 'expected a list' in repository.error
@@ -0,0 +1,94 @@
+"""
+Test the Monte Carlo price simulator behind /api/price-projections
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import price_simulator
+
+
+def write_players(tmp_path):
+    players = [
+        {'id': '1', 'name': 'Rising Rookie', 'price': 250000, 'avg': 90, 'recentForm': [80, 95, 100]},
+        {'id': '2', 'name': 'Falling Premium', 'price': 1000000, 'avg': 80, 'recentForm': [70, 60, 75]},
+        {'id': '3', 'name': 'No Price', 'avg': 70}
+    ]
+    path = tmp_path / 'player_data.json'
+    path.write_text(json.dumps(players))
+    return str(path)
+
+
+def simulate(tmp_path, ids, **kwargs):
+    return price_simulator.simulate_price_projections(
+        ids, player_path=write_players(tmp_path), logs_path=str(tmp_path / 'logs.json'), **kwargs
+    )
+
+
+def test_projections_and_missing(tmp_path):
+    result = simulate(tmp_path, ['1', '2', '3', 'nobody'], rounds=3, simulations=500)
+    projections = {p['player_id']: p for p in result['projections']}
+
+    assert set(projections) == {'1', '2'}
+    assert result['missing'] == ['3', 'nobody']
+    assert len(projections['1']['projected_prices']) == 3
+    # Scoring well above a cheap price's breakeven rises; below a premium's falls
+    assert projections['1']['total_change'] > 0
+    assert projections['2']['total_change'] < 0
+    bands = projections['1']['bands']['price']
+    assert all(bands['p10'][r] <= bands['p50'][r] <= bands['p90'][r] for r in range(3))
+
+
+def test_rounds_and_simulations_are_clamped(tmp_path):
+    result = simulate(tmp_path, ['1'], rounds=10 ** 6, simulations=10 ** 9)
+
+    assert result['rounds'] == price_simulator.MAX_ROUNDS
+    assert result['simulations'] == price_simulator.MAX_SIMULATIONS
+    assert len(result['projections'][0]['price_changes']) == price_simulator.MAX_ROUNDS
+
+
+def test_large_requests_are_simulated_in_bounded_chunks(tmp_path, monkeypatch):
+    batches = []
+    simulate_batch = price_simulator._simulate_batch
+
+    def record(profiles, rounds, simulations, seed):
+        batches.append(len(profiles) * rounds * simulations)
+        return simulate_batch(profiles, rounds, simulations, seed)
+
+    monkeypatch.setattr(price_simulator, '_simulate_batch', record)
+    monkeypatch.setattr(price_simulator, 'MAX_BATCH_VALUES', 4 * 500)
+    result = simulate(tmp_path, ['1', '2'], rounds=4, simulations=500)
+
+    assert batches == [2000, 2000]
+    assert [p['player_id'] for p in result['projections']] == ['1', '2']
+
+
+def test_repeat_request_is_served_from_cache(tmp_path, monkeypatch):
+    first = simulate(tmp_path, ['1'], rounds=2, simulations=200)
+    monkeypatch.setattr(price_simulator, '_simulate_batch', lambda *args: pytest.fail('re-simulated'))
+    second = price_simulator.simulate_price_projections(
+        ['1'], rounds=2, simulations=200,
+        player_path=str(tmp_path / 'player_data.json'), logs_path=str(tmp_path / 'logs.json')
+    )
+
+    assert second['projections'] == first['projections']
+
+
+def test_simulation_runs_outside_the_cache_lock(tmp_path, monkeypatch):
+    simulate_batch = price_simulator._simulate_batch
+    lock_held = []
+
+    def checking_batch(*args):
+        lock_held.append(price_simulator._cache_lock.locked())
+        return simulate_batch(*args)
+
+    monkeypatch.setattr(price_simulator, '_simulate_batch', checking_batch)
+    simulate(tmp_path, ['2'], rounds=2, simulations=300)
+
+    assert lock_held == [False]
+
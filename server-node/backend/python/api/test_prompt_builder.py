@@ -0,0 +1,73 @@
+"""
+Test the prompt builder's cached player fragments and token budget
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import prompt_builder
+
+PLAYERS = [
+    {'id': '1', 'name': 'Marcus Bontempelli', 'team': 'Western Bulldogs', 'position': 'MID',
+     'price': 1100000, 'breakeven': 95, 'recentForm': [110, 120, 98, 130]},
+    {'id': '2', 'name': 'Nick Daicos', 'team': 'Collingwood', 'position': 'MID/DEF',
+     'price': 1050000, 'recentForm': [105, 99, 118]}
+]
+
+
+@pytest.fixture
+def player_path(tmp_path, monkeypatch):
+    path = tmp_path / 'player_data.json'
+    path.write_text(json.dumps(PLAYERS))
+    monkeypatch.setattr(prompt_builder, '_cache', {})
+    monkeypatch.setattr(prompt_builder, '_metrics', dict.fromkeys(prompt_builder._metrics, 0))
+    return str(path)
+
+
+def fragments():
+    metrics = prompt_builder.prompt_metrics()
+    return metrics['fragment_hits'], metrics['fragment_misses']
+
+
+def test_equal_caller_dicts_share_the_cached_fragment(player_path, monkeypatch):
+    first = prompt_builder.player_context(dict(PLAYERS[0]), player_path)
+    assert first.startswith('Marcus Bontempelli|Western Bulldogs|MID|$1.1M|')
+
+    monkeypatch.setattr(prompt_builder, 'render_player', lambda player: pytest.fail('re-rendered'))
+    # A distinct dict with the same content, as callers build per request
+    assert prompt_builder.player_context(json.loads(json.dumps(PLAYERS[0])), player_path) == first
+    assert fragments() == (1, 1)
+
+
+def test_changed_or_unknown_players_are_rendered_fresh(player_path):
+    cached = prompt_builder.player_context(dict(PLAYERS[0]), player_path)
+    live = prompt_builder.player_context(dict(PLAYERS[0], breakeven=60), player_path)
+    unknown = prompt_builder.player_context({'name': 'Debutant', 'price': 230000}, player_path)
+
+    assert live != cached and '|60|' in live
+    assert unknown.startswith('Debutant|-|-|$0.23M|')
+    assert fragments() == (0, 3)
+
+
+def test_new_player_data_invalidates_the_fragments(player_path):
+    prompt_builder.player_context(dict(PLAYERS[0]), player_path)
+    updated = [dict(PLAYERS[0], price=1200000), PLAYERS[1]]
+    Path(player_path).write_text(json.dumps(updated))
+    os.utime(player_path, ns=(1, 1))
+
+    assert '|$1.2M|' in prompt_builder.player_context(dict(updated[0]), player_path)
+    assert fragments() == (0, 2)
+
+
+def test_players_past_the_budget_are_dropped(player_path, monkeypatch):
+    monkeypatch.chdir(Path(player_path).parent)
+    prompt, stats = prompt_builder.build_prompt('Pick a captain.', players=['1', 'Nick Daicos'], budget=60)
+
+    assert stats['players_included'] == 1 and stats['players_dropped'] == 1
+    assert 'Marcus Bontempelli' in prompt and 'Nick Daicos' not in prompt
@@ -0,0 +1,57 @@
+"""
+Test the roster risk table behind the risk tools
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import risk_engine
+import risk_tools
+
+
+def risk_table(tmp_path, players):
+    path = tmp_path / 'player_data.json'
+    path.write_text(json.dumps(players))
+    return risk_engine.get_risk_table(str(path), str(tmp_path / 'logs.json'))
+
+
+ROSTER = [
+    {'id': '1', 'name': 'Steady Mid', 'position': 'MID', 'games': 6, 'recentForm': [100, 102, 98, 101, 99, 100]},
+    {'id': '2', 'name': 'Tagged Mid', 'position': 'MID', 'games': 6, 'recentForm': [120, 60, 125, 30, 118, 122]},
+    {'id': '3', 'name': 'Short History', 'position': 'FWD', 'recentForm': [80, 90]},
+    {'id': '4', 'name': 'No Scores', 'position': 'DEF'}
+]
+
+
+def test_metrics(tmp_path):
+    table = risk_table(tmp_path, ROSTER)
+
+    assert table['keys'] == ['1', '2']
+    steady, tagged = table['lookup']['steady mid'], table['lookup']['2']
+    assert table['games'].tolist() == [6, 6]
+    assert table['std'][tagged] > table['std'][steady]
+    assert table['floor'][steady] <= table['median'][steady] <= table['ceiling'][steady]
+    assert table['hit_rate'][steady] == pytest.approx(4 / 6)
+    assert table['partial'][tagged].sum() == 1
+    assert table['suppressed'][tagged].sum() == 1
+    assert risk_engine.recent_count(table['partial'], 3).tolist() == [0, 1]
+
+
+@pytest.mark.parametrize('players', [[], ROSTER[2:]], ids=['empty', 'no-scores'])
+def test_roster_without_scores_gives_an_empty_table(tmp_path, monkeypatch, players):
+    table = risk_table(tmp_path, players)
+
+    assert table['scores'].shape == (0, 0)
+    for metric in ('games', 'mean', 'std', 'latest_std', 'cv', 'floor', 'median', 'ceiling', 'hit_rate', 'missed'):
+        assert np.asarray(table[metric]).shape == (0,), metric
+
+    monkeypatch.setattr(risk_tools, 'get_risk_table', lambda: table)
+    assert risk_tools.volatility_index_calculator() == {'players': []}
+    assert risk_tools.scoring_range_predictor() == {'players': []}
+    assert risk_tools.injury_risk_model() == {'players': []}
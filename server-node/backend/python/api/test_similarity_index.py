@@ -0,0 +1,83 @@
+"""
+Test the player similarity index behind the downgrade and replacement searches
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import similarity_index
+
+
+@pytest.fixture
+def roster(tmp_path, monkeypatch):
+    players = [
+        {'id': '1', 'name': 'Target Mid', 'position': 'MID', 'price': 800000, 'recentForm': [110, 112, 108, 111]},
+        {'id': '2', 'name': 'Close Mid', 'position': 'MID', 'price': 760000, 'recentForm': [106, 108, 104, 107]},
+        {'id': '3', 'name': 'Rookie Mid', 'position': 'MID', 'price': 250000, 'recentForm': [45, 60, 50, 55]},
+        {'id': '4', 'name': 'Pricier Mid', 'position': 'MID', 'price': 900000, 'recentForm': [112, 110, 111, 113]},
+        {'id': '5', 'name': 'Swing Forward', 'position': 'MID/FWD', 'price': 700000, 'recentForm': [100, 98, 102, 99]},
+        {'id': '6', 'name': 'Key Defender', 'position': 'DEF', 'price': 780000, 'recentForm': [108, 106, 110, 105]}
+    ]
+    (tmp_path / 'player_data.json').write_text(json.dumps(players))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(similarity_index, '_state', {})
+    return players
+
+
+def names(result):
+    return [p['player'] for p in result['similar']]
+
+
+def test_cheaper_players_in_position_ranked_by_distance(roster):
+    result = similarity_index.similar_players('1', k=3)
+
+    assert names(result) == ['Close Mid', 'Swing Forward', 'Rookie Mid']
+    assert all(p['price'] < 800000 for p in result['similar'])
+    distances = [p['distance'] for p in result['similar']]
+    assert distances == sorted(distances)
+    assert result['similar'][0]['price_saving'] == 40000
+
+
+def test_matches_brute_force_distances(roster):
+    index = similarity_index.get_similarity_index()
+    result = similarity_index.similar_players('target mid', k=10, cheaper=False)
+
+    target = index['vectors'][index['lookup']['1']]
+    for player in result['similar']:
+        row = index['lookup'][player['player_id']]
+        assert player['distance'] == pytest.approx(np.linalg.norm(index['vectors'][row] - target), abs=1e-3)
+    assert 'Pricier Mid' in names(result)
+    assert 'Target Mid' not in names(result)
+
+
+def test_position_and_price_cap(roster):
+    assert names(similarity_index.similar_players('1', position='FWD')) == ['Swing Forward']
+    assert names(similarity_index.similar_players('1', max_price=300000)) == ['Rookie Mid']
+    assert names(similarity_index.similar_players('3')) == []
+
+
+def test_unknown_player_and_position(roster):
+    assert similarity_index.similar_players('nobody') is None
+    with pytest.raises(ValueError):
+        similarity_index.similar_players('1', position='GK')
+
+
+@pytest.mark.parametrize('risk', [None, {'lookup': {}, 'latest_std': np.empty(0)}, ValueError('no scores')],
+                         ids=['missing', 'empty', 'failing'])
+def test_index_builds_without_a_risk_table(roster, monkeypatch, risk):
+    def get_risk_table(*args):
+        if isinstance(risk, Exception):
+            raise risk
+        return risk
+
+    monkeypatch.setattr(similarity_index, 'get_risk_table', get_risk_table)
+    index = similarity_index.get_similarity_index()
+
+    assert np.isnan(index['raw'][:, similarity_index.FEATURES.index('volatility')]).all()
+    assert names(similarity_index.similar_players('1', k=1)) == ['Close Mid']
@@ -0,0 +1,105 @@
+"""
+Test the salary-cap squad optimizer behind /api/squad/optimize
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
+
+import squad_optimizer
+
+pytest.importorskip('scipy')
+
+STRUCTURE = {
+    'DEF': {'field': 2, 'bench': 1},
+    'MID': {'field': 2, 'bench': 0},
+    'RUC': {'field': 1, 'bench': 0},
+    'FWD': {'field': 1, 'bench': 1}
+}
+
+
+def make_pool():
+    pool = []
+    for position, count in (('DEF', 5), ('MID', 4), ('RUC', 2), ('FWD', 4)):
+        for i in range(count):
+            pool.append({
+                'key': f'{position}{i}',
+                'name': f'{position} Player {i}',
+                'team': 'Test',
+                'positions': [position],
+                'price': 200000 + 150000 * i,
+                'points': 50 + 20 * i
+            })
+    pool.append({'key': 'SWING', 'name': 'Swing Man', 'team': 'Test', 'positions': ['DEF', 'MID'],
+                 'price': 300000, 'points': 60})
+    return pool
+
+
+def optimize(**kwargs):
+    options = dict(structure=STRUCTURE, utility_slots=1, pool=make_pool())
+    options.update(kwargs)
+    return squad_optimizer.optimize_squad(**options)
+
+
+def selected(result):
+    return {p['player_id'] for line in result['squad'].values() for p in line}
+
+
+def test_fills_every_slot_under_the_cap():
+    result = optimize(salary_cap=5000000)
+
+    assert result['status'] == 'ok' and result['optimal']
+    assert result['squad_size'] == 9
+    assert len(selected(result)) == 9
+    assert result['total_price'] <= 5000000
+    assert all(len(result['squad'][name]) == spots['field'] for name, spots in STRUCTURE.items())
+
+
+def test_cap_binds_and_more_cap_scores_more():
+    tight = optimize(salary_cap=3500000)
+    loose = optimize(salary_cap=8000000)
+
+    assert tight['total_price'] <= 3500000
+    assert loose['projected_points'] > tight['projected_points']
+
+
+def test_locked_and_excluded_players():
+    result = optimize(salary_cap=5000000, locked=['DEF0'], excluded=['mid player 3'])
+
+    assert 'DEF0' in selected(result)
+    assert 'MID3' not in selected(result)
+
+
+def test_unknown_locked_players_are_rejected():
+    result = optimize(locked=['DEF0', 'Nobody'])
+
+    assert result['status'] == 'error'
+    assert result['unknown_locked'] == ['Nobody']
+
+
+def test_locked_and_excluded_conflict():
+    assert optimize(locked=['DEF0'], excluded=['DEF0'])['status'] == 'error'
+
+
+def test_empty_pool_returns_an_error():
+    result = optimize(pool=[])
+
+    assert result['status'] == 'error'
+    assert result['pool_size'] == 0
+
+
+def test_trade_limit_keeps_most_of_the_current_team():
+    current = selected(optimize(salary_cap=3500000))
+    result = optimize(salary_cap=8000000, current_team=sorted(current), max_trades=2)
+
+    assert len(current - selected(result)) <= 2
+
+
+def test_infeasible_cap_reports_no_squad():
+    result = optimize(salary_cap=100000)
+
+    assert result['status'] == 'error'
+    assert 'No legal squad' in result['message']
@@ -10,8 +10,9 @@ from datetime import datetime, timedelta
 import sys
 from pathlib import Path
 
-# Add scrapers directory to path
+# Add scrapers and tools directories to path
 sys.path.append(str(Path(__file__).parent.parent / 'scrapers'))
+sys.path.append(str(Path(__file__).parent.parent / 'tools'))
 
 # Import the player scraper (conditional to avoid breaking if not available)
 try:
@@ -21,6 +22,13 @@ except ImportError:
     SCRAPER_AVAILABLE = False
     logging.warning("Player scraper not available - some endpoints will return mock data")
 
+from price_simulator import simulate_price_projections, DEFAULT_ROUNDS, DEFAULT_SIMULATIONS
+from breakeven_engine import next_round_breakevens, breakeven_history
+from squad_optimizer import optimize_squad, SALARY_CAP
+from similarity_index import similar_players, DEFAULT_NEIGHBOURS
+from fixture_tools import fixture_data_status
+from data_prefetcher import start_prefetcher
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -1163,9 +1171,21 @@ def get_ai_insights():
 
 @app.route('/api/price-projections', methods=['POST'])
 def get_price_projections():
-    """Get price projections for specific players - iOS app endpoint"""
+    """
+    Get simulated price projections for specific players - iOS app endpoint
+
+    Expected JSON input:
+    {
+        "player_ids": [string, ...],
+        "rounds": int (optional, default 5, at most 24),
+        "simulations": int (optional, default 5000)
+    }
+
+    Each projection carries the median projected price per round plus
+    percentile bands of price and breakeven from the Monte Carlo simulator.
+    """
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
         player_ids = data.get('player_ids', [])
         
         if not player_ids:
@@ -1174,34 +1194,19 @@ def get_price_projections():
                 'message': 'No player IDs provided'
             }), 400
         
-        # Mock price projections
-        projections = []
-        for player_id in player_ids:
-            projection = {
-                'player_id': player_id,
-                'current_price': 650000,
-                'projected_prices': {
-                    'week_1': 665000,
-                    'week_2': 672000, 
-                    'week_3': 681000,
-                    'week_4': 695000,
-                    'week_5': 708000
-                },
-                'price_changes': [15000, 7000, 9000, 14000, 13000],
-                'total_change': 58000,
-                'confidence': 0.79,
-                'factors': [
-                    'Recent form trending up',
-                    'Favorable fixture run',
-                    'Low breakeven relative to average'
-                ]
-            }
-            projections.append(projection)
+        result = simulate_price_projections(
+            player_ids,
+            rounds=data.get('rounds', DEFAULT_ROUNDS),
+            simulations=data.get('simulations', DEFAULT_SIMULATIONS)
+        )
         
         return jsonify({
             'status': 'ok',
-            'projections': projections,
-            'count': len(projections)
+            'projections': result['projections'],
+            'count': len(result['projections']),
+            'missing': result['missing'],
+            'rounds': result['rounds'],
+            'simulations': result['simulations']
         })
         
     except Exception as e:
@@ -1211,6 +1216,159 @@ def get_price_projections():
             'message': str(e)
         }), 500
 
+@app.route('/api/breakevens', methods=['GET'])
+def get_breakevens():
+    """Get next round breakevens for the whole roster - iOS app endpoint"""
+    try:
+        min_price = request.args.get('min_price', 0, type=int)
+        breakevens = next_round_breakevens(min_price=min_price)
+        
+        return jsonify({
+            'status': 'ok',
+            'players': breakevens,
+            'count': len(breakevens)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in get_breakevens: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/breakevens/<player_id>', methods=['GET'])
+def get_breakeven_history(player_id):
+    """Get per-round price and breakeven history for a player - iOS app endpoint"""
+    try:
+        rounds = request.args.get('rounds', None, type=int)
+        if 'rounds' in request.args and (rounds is None or rounds < 1):
+            return jsonify({
+                'status': 'error',
+                'message': 'rounds must be a positive integer'
+            }), 400
+        history = breakeven_history(player_id, rounds=rounds)
+        
+        if history is None:
+            return jsonify({
+                'status': 'error',
+                'message': f'Player {player_id} not found'
+            }), 404
+        
+        return jsonify({
+            'status': 'ok',
+            'history': history
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in get_breakeven_history: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/squad/optimize', methods=['POST'])
+def optimize_squad_endpoint():
+    """
+    Build the best legal 30-man squad under the salary cap - iOS app endpoint
+
+    Expected JSON input:
+    {
+        "salary_cap": int (optional, default 13000000),
+        "locked": [string, ...] (optional),
+        "excluded": [string, ...] (optional),
+        "objective": "points" | "blend" (optional, default "points"),
+        "value_weight": float (optional, default 0.5),
+        "current_team": [string, ...] (optional),
+        "max_trades": int (optional),
+        "structure": {"DEF": {"field": 6, "bench": 2}, ...} (optional)
+    }
+    """
+    try:
+        data = request.get_json() or {}
+        max_trades = data.get('max_trades')
+        
+        result = optimize_squad(
+            salary_cap=int(data.get('salary_cap', SALARY_CAP)),
+            locked=data.get('locked', []),
+            excluded=data.get('excluded', []),
+            objective=data.get('objective', 'points'),
+            value_weight=float(data.get('value_weight', 0.5)),
+            current_team=data.get('current_team'),
+            max_trades=int(max_trades) if max_trades is not None else None,
+            structure=data.get('structure')
+        )
+        
+        if result['status'] != 'ok':
+            return jsonify(result), 400
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Error in optimize_squad_endpoint: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/data-status', methods=['GET'])
+def get_data_status():
+    """Report how stale the prefetched fixture and DVP data are"""
+    try:
+        return jsonify({
+            'status': 'ok',
+            'datasets': fixture_data_status()
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in get_data_status: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/players/<player_id>/similar', methods=['GET'])
+def get_similar_players(player_id):
+    """
+    Find the players most similar to a player - iOS app endpoint
+
+    Query parameters:
+        k: number of players (default 10)
+        position: DEF, MID, RUC or FWD (default the player's first position)
+        max_price: price cap (default just under the player's price)
+        cheaper: "false" to include players priced above the player
+    """
+    try:
+        result = similar_players(
+            player_id,
+            k=request.args.get('k', DEFAULT_NEIGHBOURS, type=int),
+            max_price=request.args.get('max_price', None, type=int),
+            position=request.args.get('position'),
+            cheaper=request.args.get('cheaper', 'true').lower() != 'false'
+        )
+        
+        if result is None:
+            return jsonify({
+                'status': 'error',
+                'message': f'Player {player_id} not found'
+            }), 404
+        
+        return jsonify({
+            'status': 'ok',
+            **result
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Error in get_similar_players: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
 # ===== END NEW ENDPOINTS =====
 
 if __name__ == '__main__':
@@ -1225,7 +1383,14 @@ if __name__ == '__main__':
     print("• GET  /api/captain-recommendations - Captain suggestions")
     print("• GET  /api/ai-insights - AI insights for dashboard")
     print("• POST /api/price-projections - Price projections")
+    print("• GET  /api/breakevens - Next round breakevens")
+    print("• GET  /api/breakevens/<id> - Breakeven history")
+    print("• POST /api/squad/optimize - Salary-cap squad optimizer")
+    print("• GET  /api/data-status - Fixture/DVP cache freshness")
+    print("• GET  /api/players/<id>/similar - Similar cheaper players")
     print("• GET  /api/afl-fantasy/dashboard-data - Dashboard data")
     print("• POST /api/afl-fantasy/validate-credentials - Credential validation")
     print("\n🚀 Starting server on http://127.0.0.1:9001...\n")
+    # Keep fixture and DVP data fresh in the background; requests only read the cache
+    start_prefetcher()
     app.run(host='127.0.0.1', port=9001, debug=False, threaded=True)
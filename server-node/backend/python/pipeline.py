@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+AFL Fantasy Data Pipeline
+
+Runs a DAG of data stages (e.g. scrape -> normalise -> merge -> enrich ->
+publish). Each stage's output is cached under a hash of its inputs: the
+outputs of the stages it depends on plus the contents of the files it
+reads. A stage whose inputs are unchanged since its last run is served
+from the cache instead of rerun, and stages whose dependencies are done
+run in parallel. Every run records each stage's status and duration in a
+JSON-lines history file.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+logger = logging.getLogger("fantasy-pipeline")
+
+CACHE_DIR = '.pipeline_cache'
+HISTORY_FILE = 'pipeline_runs.jsonl'
+WORKERS = 4
+
+
+def _hash(value):
+    """Stable hash of a JSON-serialisable value"""
+    encoded = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_hash(path):
+    """Hash of a file's contents, or None if it does not exist"""
+    if not path or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Stage:
+    """One step of a pipeline"""
+
+    def __init__(self, name, func, deps=(), files=None, outputs=(), version=1):
+        """
+        Args:
+            name (str): Unique stage name
+            func (callable): Called as func(inputs, files) where inputs maps each
+                             dependency's name to its output and files maps each
+                             input file name to its path; returns a
+                             JSON-serialisable output
+            deps (tuple): Names of the stages whose outputs this one needs
+            files (dict or callable, optional): Input file name -> path (or a
+                                                callable returning that dict,
+                                                resolved at run time, e.g. for
+                                                the newest CSV in a folder)
+            outputs (tuple): Files the stage writes; it reruns if they no longer
+                             match what it last wrote, even if its inputs did not change
+            version (int): Bump when the stage's code changes, to invalidate its cache
+        """
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.files = files or {}
+        self.outputs = tuple(outputs)
+        self.version = version
+
+    def resolve_files(self):
+        return self.files() if callable(self.files) else dict(self.files)
+
+
+class Pipeline:
+    """A DAG of stages with per-stage output caching"""
+
+    def __init__(self, stages, cache_dir=CACHE_DIR, history_file=HISTORY_FILE, workers=WORKERS):
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self.cache_dir = cache_dir
+        self.history_file = history_file
+        self.workers = workers
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        """Stage names with every stage after its dependencies; rejects unknown deps and cycles"""
+        for stage in self.stages.values():
+            unknown = [dep for dep in stage.deps if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {', '.join(unknown)}")
+
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Pipeline has a cycle: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dep in self.stages[name].deps:
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def _cache_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _load_cached(self, name):
+        try:
+            with open(self._cache_path(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cached(self, name, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def _run_stage(self, stage, dep_results, force):
+        """Run one stage, or serve it from the cache; returns its result record"""
+        started = time.perf_counter()
+        files = stage.resolve_files()
+        key = _hash({
+            'stage': stage.name,
+            'version': stage.version,
+            'deps': {dep: dep_results[dep]['output_hash'] for dep in stage.deps},
+            'files': {name: [path, file_hash(path)] for name, path in files.items()}
+        })
+
+        cached = None if force else self._load_cached(stage.name)
+        if cached and cached.get('key') == key and all(
+            file_hash(path) == digest for path, digest in cached.get('outputs', {}).items()
+        ):
+            return {
+                'status': 'cached', 'key': key, 'output_hash': cached['output_hash'],
+                'output': cached['output'], 'seconds': time.perf_counter() - started
+            }
+
+        # Stages get copies, so one that edits its inputs in place can't change another's
+        inputs = {dep: copy.deepcopy(dep_results[dep]['output']) for dep in stage.deps}
+        output = stage.func(inputs, files)
+        output_hash = _hash(output)
+        self._save_cached(stage.name, {
+            'key': key,
+            'output_hash': output_hash,
+            'output': output,
+            'outputs': {path: file_hash(path) for path in stage.outputs},
+            'finished_at': datetime.now().isoformat()
+        })
+        return {
+            'status': 'ran', 'key': key, 'output_hash': output_hash,
+            'output': output, 'seconds': time.perf_counter() - started
+        }
+
+    def run(self, force=()):
+        """
+        Run the pipeline
+
+        Args:
+            force (iterable): Stage names to rerun even if their inputs are
+                              unchanged ('all' for every stage)
+
+        Returns:
+            dict: Stage name -> result (status ran/cached/failed/skipped,
+                  seconds, and output or error)
+        """
+        force = set(self.stages) if 'all' in force else set(force)
+        unknown = force - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        run_started = time.perf_counter()
+        started_at = datetime.now().isoformat()
+        results = {}
+        running = {}
+        waiting = list(self.order)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='stage') as executor:
+            while waiting or running:
+                # Start every stage whose dependencies have all finished
+                for name in list(waiting):
+                    stage = self.stages[name]
+                    if any(dep not in results for dep in stage.deps):
+                        continue
+                    waiting.remove(name)
+                    failed = [dep for dep in stage.deps if results[dep]['status'] in ('failed', 'skipped')]
+                    if failed:
+                        results[name] = {'status': 'skipped', 'seconds': 0.0,
+                                         'error': f"upstream failed: {', '.join(failed)}"}
+                        logger.warning(f"⏭️ {name} skipped (upstream failed: {', '.join(failed)})")
+                        continue
+                    logger.info(f"▶️ {name}")
+                    running[executor.submit(self._run_stage, stage, results, name in force)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        logger.info(f"{'♻️' if results[name]['status'] == 'cached' else '✅'} {name} "
+                                    f"{results[name]['status']} in {results[name]['seconds']:.2f}s")
+                    except Exception as e:
+                        results[name] = {'status': 'failed', 'seconds': 0.0, 'error': str(e) or type(e).__name__}
+                        logger.error(f"❌ {name} failed: {results[name]['error']}")
+
+        total = time.perf_counter() - run_started
+        self._record(started_at, total, results)
+        logger.info(f"Pipeline finished in {total:.2f}s: {self.summary(results)}")
+        return {name: results[name] for name in self.order}
+
+    def _record(self, started_at, total, results):
+        """Append the run's stage statuses and durations to the history file"""
+        entry = {
+            'started_at': started_at,
+            'seconds': round(total, 3),
+            'stages': {
+                name: {key: (round(value, 3) if key == 'seconds' else value)
+                       for key, value in results[name].items() if key != 'output'}
+                for name in self.order
+            }
+        }
+        try:
+            with open(self.history_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        except OSError as e:
+            logger.error(f"Failed to record pipeline run: {e}")
+
+    @staticmethod
+    def summary(results):
+        """One-line summary of a run's results"""
+        counts = {}
+        for result in results.values():
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        return ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
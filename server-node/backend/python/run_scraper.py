@@ -4,17 +4,25 @@ Run this to scrape player data and make it available to the iOS app via the API
 """
 
 import os
+import sys
 import time
 import pandas as pd
-from io import StringIO
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 
-def run_original_scraper():
-    """Run your original scraping logic"""
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrapers'))
+from table_extract import DFS_TABLE_IDS, extract_tables_by_id
+from table_sink import TableSink
+
+def run_original_scraper(write_excel=False):
+    """Run your original scraping logic
+    
+    Args:
+        write_excel (bool): Also write one Excel workbook per player next to the
+                            columnar datasets in dfs_player_summary/tables
+    """
     
     # Load player list
     excel_file = "AFL_Fantasy_Player_URLs.xlsx"
@@ -47,13 +55,10 @@ def run_original_scraper():
     output_folder = "dfs_player_summary"
     os.makedirs(output_folder, exist_ok=True)
     print(f"📁 Output folder: {output_folder}")
+    sink = TableSink(os.path.join(output_folder, "tables"), excel_folder=output_folder if write_excel else None)
 
     # Table IDs to extract
-    TABLE_IDS = {
-        "Career Averages": "fantasyPlayerCareer",
-        "Opponent Splits": "vsOpponentCareer",
-        "Game Logs": "playerGames"
-    }
+    TABLE_IDS = DFS_TABLE_IDS
 
     successful_scrapes = 0
     failed_scrapes = []
@@ -64,42 +69,21 @@ def run_original_scraper():
         url = row["url"]
         print(f"🔄 Scraping {player_id} ({index + 1}/{len(df)})...")
 
-        output_path = os.path.join(output_folder, f"{player_id}.xlsx")
-
-        # Delete existing file
-        if os.path.exists(output_path):
-            try:
-                os.remove(output_path)
-            except PermissionError:
-                print(f"❌ File in use or locked: {output_path}")
-                failed_scrapes.append(player_id)
-                continue
-
         try:
             driver.get(url)
             time.sleep(3)  # Let page fully load
 
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            writer = pd.ExcelWriter(output_path, engine="openpyxl")
-            found_any = False
+            tables = extract_tables_by_id(driver.page_source, TABLE_IDS)
 
-            for sheet_name, table_id in TABLE_IDS.items():
-                table = soup.select_one(f"table#{table_id}")
-                if table:
-                    try:
-                        df_table = pd.read_html(StringIO(str(table)))[0]
-                        df_table.to_excel(writer, sheet_name=sheet_name, index=False)
-                        found_any = True
-                        print(f"  ✅ Found {sheet_name}")
-                    except Exception as e:
-                        print(f"  ⚠️ Error parsing {sheet_name}: {e}")
+            for sheet_name in TABLE_IDS:
+                if sheet_name in tables:
+                    print(f"  ✅ Found {sheet_name}")
                 else:
                     print(f"  ⚠️ Table '{sheet_name}' not found")
 
-            writer.close()
-            
-            if found_any:
-                print(f"✅ Saved {player_id}.xlsx")
+            if tables:
+                sink.add(player_id, tables)
+                print(f"✅ Saved tables for {player_id}")
                 successful_scrapes += 1
             else:
                 print(f"⚠️ No tables found for {player_id}")
@@ -113,6 +97,7 @@ def run_original_scraper():
         time.sleep(1)
 
     driver.quit()
+    sink.close()
     
     # Summary
     print(f"\n📈 Scraping complete!")
@@ -127,6 +112,7 @@ def run_original_scraper():
         'successful_scrapes': successful_scrapes,
         'failed_scrapes': len(failed_scrapes),
         'output_folder': output_folder,
+        'dataset': os.path.join(output_folder, "tables"),
         'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')
     }
     
@@ -152,7 +138,7 @@ if __name__ == "__main__":
         print("⚠️  Flask API not running - start with: python api/trade_api.py")
     
     print()
-    run_original_scraper()
+    run_original_scraper(write_excel="--xlsx" in sys.argv)
     
     print("\n🚀 Scraper complete! Data is now available via the API endpoints:")
     print("   http://127.0.0.1:9001/api/players")
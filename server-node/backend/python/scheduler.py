@@ -3,17 +3,37 @@
 AFL Fantasy Data Scheduler
 
 This script sets up a background scheduler to update the player data automatically
-every 12 hours using data from DFS Australia.
+every 12 hours. Each update runs the player data pipeline:
+
+    scrape_afl_fantasy --+
+    scrape_draftstars ---+-- normalise -- merge -- enrich -- publish
+    scrape_afl_stats -----------------------------+
+
+The scrape stages read the source exports in attached_assets/ in parallel.
+Every stage is cached by a hash of its inputs, so an update where no source
+changed reruns nothing, and one where only the AFL stats changed reruns just
+enrich and publish. Stage durations are logged to pipeline_runs.jsonl.
 """
 
-from apscheduler.schedulers.background import BackgroundScheduler
-from scraper import get_player_data, update_player_data_from_dfs
-import json
-import time
-import os
+import argparse
 import datetime
+import glob
+import json
 import logging
-import subprocess
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, 'scrapers'))
+sys.path.append(os.path.join(BASE_DIR, 'scripts'))
+
+from pipeline import Pipeline, Stage
+from scraper import map_afl_fantasy_player
+from process_draftstars_data import merge_player_data, process_draftstars_data
+from enhance_player_data import (
+    calculate_projected_scores, enhance_with_afl_stats, enhance_with_draftstars_data, read_csv_file
+)
 
 # Configure logging
 logging.basicConfig(
@@ -26,76 +46,164 @@ logging.basicConfig(
 )
 logger = logging.getLogger("fantasy-scheduler")
 
-def update_player_data():
+PLAYER_DATA_FILE = "player_data.json"
+AFL_FANTASY_FILE = "attached_assets/player_data.json"
+DRAFTSTARS_GLOB = "attached_assets/draftstars-slate-data-*.csv"
+AFL_STATS_GLOB = "attached_assets/afl-stats-*.csv"
+BACKUPS_KEPT = 5
+
+def newest(pattern):
+    """Path of the most recently modified file matching pattern, or None"""
+    paths = glob.glob(pattern)
+    return max(paths, key=os.path.getmtime) if paths else None
+
+# ===== Stages =====
+
+def scrape_afl_fantasy(inputs, files):
+    """Players from the AFL Fantasy export"""
+    path = files['afl_fantasy']
+    if not os.path.exists(path):
+        logger.warning(f"AFL Fantasy export {path} not found")
+        return []
+    with open(path, "r") as f:
+        return [map_afl_fantasy_player(player) for player in json.load(f)]
+
+def scrape_draftstars(inputs, files):
+    """Players and raw rows from the newest DraftStars slate"""
+    path = files['draftstars']
+    if not path:
+        logger.warning("No DraftStars slate found")
+        return {'players': [], 'rows': []}
+    return {'players': process_draftstars_data(path), 'rows': read_csv_file(path)}
+
+def scrape_afl_stats(inputs, files):
+    """Game rows from the newest AFL stats export"""
+    path = files['afl_stats']
+    if not path:
+        logger.warning("No AFL stats export found")
+        return []
+    return read_csv_file(path)
+
+def normalise(inputs, files):
+    """Bring both player sources to the same field names and types"""
+    def standard(player, source):
+        avg = float(player.get("avg", player.get("average_score", 0)) or 0)
+        return dict(
+            player,
+            name=player["name"].strip(),
+            team=player.get("team", "Unknown"),
+            position=player.get("position", "UNK"),
+            price=int(player.get("price", 0) or 0),
+            breakeven=float(player.get("breakeven", 0) or 0),
+            avg=avg,
+            l3_avg=float(player.get("l3_avg", avg) or 0),
+            games=int(player.get("games", player.get("rounds_played", 0)) or 0),
+            source=source
+        )
+
+    return {
+        'afl_fantasy': [standard(p, 'afl_fantasy') for p in inputs['scrape_afl_fantasy'] if p.get("name")],
+        'draftstars': [standard(p, 'draftstars') for p in inputs['scrape_draftstars']['players'] if p.get("name")]
+    }
+
+def merge(inputs, files):
+    """One list of players, AFL Fantasy first, DraftStars filling in anyone missing"""
+    sources = inputs['normalise']
+    return merge_player_data(sources['draftstars'], sources['afl_fantasy'])
+
+def enrich(inputs, files):
+    """Add recent scores and game stats, then projected scores"""
+    players = inputs['merge']
+    if inputs['scrape_draftstars']['rows']:
+        players = enhance_with_draftstars_data(players, inputs['scrape_draftstars']['rows'])
+    if inputs['scrape_afl_stats']:
+        players = enhance_with_afl_stats(players, inputs['scrape_afl_stats'])
+    return calculate_projected_scores(players)
+
+def publish(inputs, files):
+    """Write player_data.json, keeping a backup of the previous file"""
+    players = inputs['enrich']
+    if not players:
+        # Keep the current data rather than replace it with nothing
+        raise ValueError("No players to publish")
+
+    if os.path.exists(PLAYER_DATA_FILE):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_filename = f"player_data_backup_{timestamp}.json"
+        with open(PLAYER_DATA_FILE, "r") as src, open(backup_filename, "w") as dst:
+            dst.write(src.read())
+        logger.info(f"Created backup: {backup_filename}")
+
+        # Clean up old backups (keep only the most recent)
+        backups = sorted(f for f in os.listdir(".") if f.startswith("player_data_backup_"))
+        for old_backup in backups[:-BACKUPS_KEPT]:
+            try:
+                os.remove(old_backup)
+                logger.info(f"Removed old backup: {old_backup}")
+            except Exception as e:
+                logger.error(f"Failed to remove old backup {old_backup}: {e}")
+
+    timestamp = int(datetime.datetime.now().timestamp())
+    for player in players:
+        player['timestamp'] = timestamp
+
+    tmp_path = f"{PLAYER_DATA_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(players, f, indent=2)
+    os.replace(tmp_path, PLAYER_DATA_FILE)
+    logger.info(f"Published {len(players)} players to {PLAYER_DATA_FILE}")
+    return {'path': PLAYER_DATA_FILE, 'players': len(players)}
+
+def build_pipeline():
+    """The player data pipeline"""
+    return Pipeline([
+        Stage('scrape_afl_fantasy', scrape_afl_fantasy, files={'afl_fantasy': AFL_FANTASY_FILE}),
+        Stage('scrape_draftstars', scrape_draftstars, files=lambda: {'draftstars': newest(DRAFTSTARS_GLOB)}),
+        Stage('scrape_afl_stats', scrape_afl_stats, files=lambda: {'afl_stats': newest(AFL_STATS_GLOB)}),
+        Stage('normalise', normalise, deps=('scrape_afl_fantasy', 'scrape_draftstars')),
+        Stage('merge', merge, deps=('normalise',)),
+        Stage('enrich', enrich, deps=('merge', 'scrape_draftstars', 'scrape_afl_stats')),
+        Stage('publish', publish, deps=('enrich',), outputs=(PLAYER_DATA_FILE,))
+    ])
+
+def update_player_data(force=()):
     """
-    Fetch new player data and update the player_data.json file
-    Also keep a backup of the data with a timestamp
+    Run the player data pipeline, rerunning only the stages whose inputs changed
+
+    Args:
+        force (iterable): Stage names to rerun regardless ('all' for every stage)
+
+    Returns:
+        bool: True if player_data.json is up to date
     """
-    logger.info("Fetching new player data from sources...")
-    
-    # Make backup of current file if it exists
-    if os.path.exists("player_data.json"):
-        try:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"player_data_backup_{timestamp}.json"
-            
-            with open("player_data.json", "r") as src, open(backup_filename, "w") as dst:
-                dst.write(src.read())
-            
-            logger.info(f"Created backup: {backup_filename}")
-            
-            # Clean up old backups (keep only 5 most recent)
-            backups = sorted([f for f in os.listdir(".") if f.startswith("player_data_backup_")])
-            if len(backups) > 5:
-                for old_backup in backups[:-5]:
-                    try:
-                        os.remove(old_backup)
-                        logger.info(f"Removed old backup: {old_backup}")
-                    except Exception as e:
-                        logger.error(f"Failed to remove old backup {old_backup}: {e}")
-        except Exception as e:
-            logger.error(f"Error creating backup: {e}")
-    
-    # Try to update player data from DFS Australia
+    logger.info("Updating player data...")
     try:
-        success = update_player_data_from_dfs()
-        if success:
-            logger.info("Player data updated successfully from DFS Australia.")
-        else:
-            # Fallback: Try using process_draftstars_data.py if available
-            logger.warning("Failed to update from DFS Australia directly, trying process_draftstars_data.py")
-            try:
-                result = subprocess.run(['python', 'process_draftstars_data.py'], 
-                                       capture_output=True, text=True, check=True)
-                logger.info(f"Process DraftStars data result: {result.stdout}")
-                logger.info("Player data updated via process_draftstars_data.py")
-            except Exception as e:
-                logger.error(f"Failed to run process_draftstars_data.py: {e}")
-                
-                # Last resort: try to enhance existing data
-                try:
-                    logger.warning("Trying to enhance existing player data...")
-                    subprocess.run(['python', 'enhance_player_data.py'], 
-                                  capture_output=True, text=True, check=True)
-                    logger.info("Enhanced existing player data")
-                except Exception as e:
-                    logger.error(f"Failed to enhance player data: {e}")
+        results = build_pipeline().run(force=force)
     except Exception as e:
         logger.error(f"Error updating player data: {e}")
+        return False
 
-def start_scheduler():
+    for name, result in results.items():
+        logger.info(f"  {name:<20} {result['status']:<8} {result['seconds']:.2f}s"
+                    + (f"  ({result['error']})" if 'error' in result else ""))
+    return results['publish']['status'] in ('ran', 'cached')
+
+def start_scheduler(interval_hours=12, force=()):
     """
-    Start the background scheduler to run the update job every 12 hours
+    Start the background scheduler to run the update job every interval_hours
+    (force applies to the first run only)
     """
+    from apscheduler.schedulers.background import BackgroundScheduler
+
     logger.info("Starting scheduler...")
-    
+
     # Run once at startup to ensure we have fresh data
-    update_player_data()
-    
+    update_player_data(force=force)
+
     scheduler = BackgroundScheduler()
-    scheduler.add_job(update_player_data, 'interval', hours=12)
+    scheduler.add_job(update_player_data, 'interval', hours=interval_hours)
     scheduler.start()
-    logger.info("Scheduler running - will update player data every 12 hours")
+    logger.info(f"Scheduler running - will update player data every {interval_hours:g} hours")
 
     # Prevent script from exiting
     try:
@@ -106,5 +214,15 @@ def start_scheduler():
         logger.info("Scheduler shutdown")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AFL Fantasy data scheduler")
+    parser.add_argument('--once', action='store_true', help="Run the pipeline once and exit")
+    parser.add_argument('--force', action='append', default=[], metavar='STAGE',
+                        help="Rerun a stage even if its inputs are unchanged (repeatable, or 'all')")
+    parser.add_argument('--interval-hours', type=float, default=12, help="Hours between updates")
+    args = parser.parse_args()
+
+    if args.once:
+        sys.exit(0 if update_player_data(force=args.force) else 1)
+
     logger.info("AFL Fantasy Data Scheduler starting")
-    start_scheduler()
\ No newline at end of file
+    start_scheduler(args.interval_hours, args.force)
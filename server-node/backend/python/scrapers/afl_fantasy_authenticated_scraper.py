@@ -12,7 +12,6 @@ authentic user team data for the dashboard cards:
 import requests
 import os
 import json
-import time
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -21,12 +20,18 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+import replay
+from scatter_gather import gather
+
+# Seconds each dashboard extractor may spend in the browser
+EXTRACT_TIMEOUT = 90
+
 class AFLFantasyAuthenticatedScraper:
-    def __init__(self):
+    def __init__(self, username=None, password=None):
         self.session = requests.Session()
         self.driver = None
-        self.username = os.getenv('AFL_FANTASY_USERNAME')
-        self.password = os.getenv('AFL_FANTASY_PASSWORD')
+        self.username = username or os.getenv('AFL_FANTASY_USERNAME')
+        self.password = password or os.getenv('AFL_FANTASY_PASSWORD')
         self.base_url = "https://fantasy.afl.com.au"
         self.login_url = f"{self.base_url}/login"
         self.team_data = {}
@@ -42,7 +47,7 @@ class AFLFantasyAuthenticatedScraper:
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
         
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = replay.driver(lambda: webdriver.Chrome(options=chrome_options))
             return True
         except Exception as e:
             print(f"Failed to setup Chrome driver: {e}")
@@ -114,6 +119,33 @@ class AFLFantasyAuthenticatedScraper:
             print(f"Login error: {e}")
             return False
 
+    def capture_session(self):
+        """
+        Log in and capture the session tokens, so requests can be made without the browser
+        
+        Returns:
+            dict: cookies (list of name/value/domain/expiry dicts) and api_token
+                  (None if the site keeps none in local storage), or None if login failed
+        """
+        if not self.login():
+            return None
+        
+        cookies = [
+            {key: cookie.get(key) for key in ('name', 'value', 'domain', 'path', 'expiry')}
+            for cookie in self.driver.get_cookies() or []
+        ]
+        api_token = None
+        try:
+            api_token = self.driver.execute_script(
+                "return window.localStorage.getItem('access_token')"
+                " || window.localStorage.getItem('token');"
+            )
+        except Exception as e:
+            print(f"Could not read API token from local storage: {e}")
+        
+        print(f"Captured {len(cookies)} cookies{' and an API token' if api_token else ''}")
+        return {'cookies': cookies, 'api_token': api_token}
+
     def get_team_value_data(self):
         """Extract team value data (sum of all player prices + remaining salary)"""
         try:
@@ -130,7 +162,7 @@ class AFLFantasyAuthenticatedScraper:
             for url in team_urls:
                 try:
                     self.driver.get(url)
-                    time.sleep(3)
+                    replay.pause(3)
                     
                     # Look for team value indicators
                     value_indicators = [
@@ -217,7 +249,7 @@ class AFLFantasyAuthenticatedScraper:
             for url in score_urls:
                 try:
                     self.driver.get(url)
-                    time.sleep(3)
+                    replay.pause(3)
                     
                     # Look for team score indicators
                     score_selectors = [
@@ -311,7 +343,7 @@ class AFLFantasyAuthenticatedScraper:
             for url in rank_urls:
                 try:
                     self.driver.get(url)
-                    time.sleep(3)
+                    replay.pause(3)
                     
                     rank_selectors = [
                         ".overall-rank",
@@ -363,7 +395,7 @@ class AFLFantasyAuthenticatedScraper:
             for url in captain_urls:
                 try:
                     self.driver.get(url)
-                    time.sleep(3)
+                    replay.pause(3)
                     
                     # Look for captain indicators
                     captain_selectors = [
@@ -478,11 +510,15 @@ class AFLFantasyAuthenticatedScraper:
         
         print("Successfully logged in, extracting team data...")
         
-        # Extract all required data
-        team_value = self.get_team_value_data()
-        team_score = self.get_team_score_data()
-        overall_rank = self.get_rank_data()
-        captain_data = self.get_captain_data()
+        # Extract all required data. The extractors share one browser, so they
+        # run one at a time; one that fails or hangs doesn't lose the others.
+        results = gather({
+            'team_value': self.get_team_value_data,
+            'team_score': self.get_team_score_data,
+            'overall_rank': self.get_rank_data,
+            'captain': self.get_captain_data
+        }, timeout=EXTRACT_TIMEOUT, workers=1)
+        print(f"Dashboard extraction: {results.summary()}")
         
         # Save data
         self.save_team_data()
@@ -511,4 +547,7 @@ def main():
         scraper.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
@@ -5,15 +5,24 @@ Service to fetch authentic AFL Fantasy data using manual tokens.
 Provides all dashboard card data as specified by user requirements.
 """
 
-import requests
 import json
 import os
 from datetime import datetime
 
+import replay
+from scatter_gather import CALL_TIMEOUT, PooledSession, gather
+
 class AFLFantasyDataService:
-    def __init__(self):
+    def __init__(self, team_id=None, session=None):
+        """
+        Args:
+            team_id (str, optional): Team to fetch; with session, skips the manual tokens
+            session (requests.Session, optional): Already logged-in session,
+                                                  e.g. from SessionPool.session()
+        """
         self.base_url = "https://fantasy.afl.com.au"
-        self.session = requests.Session()
+        # One pooled session shared by the concurrent dashboard calls
+        self.session = session or PooledSession()
         
         # Set headers for API requests
         self.session.headers.update({
@@ -25,7 +34,12 @@ class AFLFantasyDataService:
         })
         
         # Load tokens if available
-        self.load_tokens()
+        if session is not None:
+            self.team_id = str(team_id)
+            self.session_cookie = None
+            self.api_token = None
+        else:
+            self.load_tokens()
 
     def load_tokens(self):
         """Load authentication tokens from environment or file"""
@@ -310,34 +324,34 @@ class AFLFantasyDataService:
             print(f"Error extracting captain data: {e}")
             return None
 
-    def get_all_dashboard_data(self):
-        """Get all dashboard data as specified by user requirements"""
+    def get_all_dashboard_data(self, timeout=CALL_TIMEOUT):
+        """Get all dashboard data as specified by user requirements
+        
+        The four cards are fetched at the same time, so this takes as long
+        as the slowest one. A card that fails or takes longer than timeout
+        seconds, or returns nothing, is left out and listed under
+        'unavailable'.
+        """
         try:
-            dashboard_data = {}
-            
-            print("Fetching team value data...")
-            team_value = self.get_team_value_data()
-            if team_value:
-                dashboard_data['team_value'] = team_value
-            
-            print("Fetching team score data...")
-            team_score = self.get_team_score_data()
-            if team_score:
-                dashboard_data['team_score'] = team_score
-            
-            print("Fetching rank data...")
-            rank_data = self.get_overall_rank_data()
-            if rank_data:
-                dashboard_data['overall_rank'] = rank_data
+            print("Fetching team value, team score, rank and captain data...")
+            cards = {
+                'team_value': self.get_team_value_data,
+                'team_score': self.get_team_score_data,
+                'overall_rank': self.get_overall_rank_data,
+                'captain': self.get_captain_data
+            }
+            results = gather(cards, timeout=timeout)
+            print(f"Dashboard calls: {results.summary()}")
             
-            print("Fetching captain data...")
-            captain_data = self.get_captain_data()
-            if captain_data:
-                dashboard_data['captain'] = captain_data
+            dashboard_data = {card: data for card, data in results.values.items() if data}
             
             # Add metadata
             dashboard_data['last_updated'] = datetime.now().isoformat()
-            dashboard_data['tokens_configured'] = bool(self.team_id and self.session_cookie)
+            dashboard_data['tokens_configured'] = bool(self.team_id and (self.session_cookie or self.session.cookies))
+            # Cards whose getter failed, timed out or found no data
+            unavailable = sorted(card for card in cards if card not in dashboard_data)
+            if unavailable:
+                dashboard_data['unavailable'] = unavailable
             
             return dashboard_data
             
@@ -379,4 +393,7 @@ def main():
     return None
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
@@ -8,7 +8,6 @@ from the JavaScript-rendered pages.
 
 import os
 import json
-import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -17,6 +16,8 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+import replay
+
 class AFLFantasySeleniumScraper:
     def __init__(self):
         self.username = os.getenv('AFL_FANTASY_USERNAME')
@@ -33,8 +34,9 @@ class AFLFantasySeleniumScraper:
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.driver = replay.driver(
+            lambda: webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+        )
         
     def login(self):
         """Login to AFL Fantasy"""
@@ -108,7 +110,7 @@ class AFLFantasySeleniumScraper:
                 if login_buttons:
                     print(f"Found {len(login_buttons)} login buttons, clicking first one...")
                     login_buttons[0].click()
-                    time.sleep(3)
+                    replay.pause(3)
                     
                     # Try finding inputs again after clicking
                     for selector in email_selectors:
@@ -162,7 +164,7 @@ class AFLFantasySeleniumScraper:
                     submit_button.click()
                     
                     # Wait for redirect
-                    time.sleep(5)
+                    replay.pause(5)
                     
                     current_url = self.driver.current_url
                     print(f"Current URL after login attempt: {current_url}")
@@ -198,7 +200,7 @@ class AFLFantasySeleniumScraper:
             for url in team_urls:
                 print(f"Trying team URL: {url}")
                 self.driver.get(url)
-                time.sleep(5)
+                replay.pause(5)
                 
                 # Save screenshot
                 self.driver.save_screenshot(f"team_page_{url.split('/')[-1]}.png")
@@ -274,4 +276,7 @@ def main():
         scraper.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
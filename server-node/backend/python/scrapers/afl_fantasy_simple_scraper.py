@@ -5,16 +5,18 @@ Uses requests to authenticate with AFL Fantasy and extract dashboard data
 without requiring Selenium WebDriver.
 """
 
-import requests
 import os
 import json
 import re
 from bs4 import BeautifulSoup
 import time
 
+import replay
+from scatter_gather import PooledSession, gather
+
 class AFLFantasyHTTPScraper:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = PooledSession()
         self.username = os.getenv('AFL_FANTASY_USERNAME')
         self.password = os.getenv('AFL_FANTASY_PASSWORD')
         self.base_url = "https://fantasy.afl.com.au"
@@ -104,10 +106,15 @@ class AFLFantasyHTTPScraper:
                 f"{self.base_url}/"
             ]
             
-            for url in team_urls:
+            # Fetch every candidate page at once, then use them in order of preference
+            print(f"Checking {len(team_urls)} URLs...")
+            pages = gather({url: (lambda url=url: self.session.get(url)) for url in team_urls})
+            for url, error in pages.errors.items():
+                print(f"Error processing URL {url}: {error}")
+            
+            for url, response in pages.values.items():
                 try:
                     print(f"Checking URL: {url}")
-                    response = self.session.get(url)
                     
                     if response.status_code == 200:
                         soup = BeautifulSoup(response.text, 'html.parser')
@@ -373,4 +380,7 @@ def main():
         return None
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
@@ -13,6 +13,8 @@ import re
 from bs4 import BeautifulSoup
 import time
 
+import replay
+
 class AFLFantasyTeamScraper:
     def __init__(self):
         self.session = requests.Session()
@@ -200,4 +202,7 @@ def main():
         print("Login failed. Please check credentials.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
@@ -8,38 +8,70 @@ import time
 import json
 import logging
 import pandas as pd
-from io import StringIO
-from bs4 import BeautifulSoup
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
+from browser_pool import REQUEST_INTERVAL, RateLimiter, scrape_with_pool
+from page_cache import extract_tables, get_page_cache, table_digest
+from table_extract import DFS_TABLE_IDS, extract_tables_by_id
+from table_sink import PYARROW_AVAILABLE, TableSink
+from run_journal import RunJournal, parse_shard
+import replay
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for the stats tables to render
+PAGE_LOAD_TIMEOUT = 15
+# Players between checkpoints (tables and API data written, journal updated)
+CHECKPOINT_EVERY = 25
+
 class AFLPlayerScraper:
-    def __init__(self, output_folder="dfs_player_summary", headless=True):
+    def __init__(self, output_folder="dfs_player_summary", headless=True, start_driver=True, write_excel=False,
+                 write_tables=True):
         self.output_folder = Path(output_folder)
         self.output_folder.mkdir(exist_ok=True)
         self.headless = headless
         
+        # Tables go to columnar datasets under output_folder/tables; per-player
+        # workbooks are an optional side output (and the fallback without pyarrow).
+        # Pool workers (write_tables=False) write neither, the parent does
+        self.write_excel = write_excel or (write_tables and not PYARROW_AVAILABLE)
+        self.sink = TableSink(
+            str(self.output_folder / "tables"),
+            excel_folder=str(self.output_folder) if self.write_excel else None,
+            parquet=write_tables
+        )
+        
         # Table IDs to extract
-        self.TABLE_IDS = {
-            "Career Averages": "fantasyPlayerCareer",
-            "Opponent Splits": "vsOpponentCareer", 
-            "Game Logs": "playerGames"
-        }
+        self.TABLE_IDS = DFS_TABLE_IDS
         
-        # Initialize driver
+        # Initialize driver (the pooled run starts browsers in its workers instead)
         self.driver = None
-        self._setup_driver()
+        if start_driver:
+            self._setup_driver()
         
         # Cache for processed data
         self.processed_data = {}
+        
+        # Table hashes per page, and last run's data for pages that have not changed
+        self.page_cache = get_page_cache(str(self.output_folder / "scrape_cache.json"))
+        self.previous_data = self._load_api_data()
     
     def _setup_driver(self):
         """Setup headless Chrome driver"""
@@ -56,12 +88,31 @@ class AFLPlayerScraper:
         
         service = Service()
         try:
-            self.driver = webdriver.Chrome(service=service, options=options)
+            self.driver = replay.driver(lambda: webdriver.Chrome(service=service, options=options))
             logger.info("✅ Chrome driver initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize Chrome driver: {e}")
             raise
     
+    def driver_alive(self):
+        """Check the browser still responds (it may have crashed mid-run)"""
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def _wait_for_tables(self):
+        """Wait until any of the stats tables is in the page"""
+        selector = ", ".join(f"table#{table_id}" for table_id in self.TABLE_IDS.values())
+        try:
+            WebDriverWait(self.driver, PAGE_LOAD_TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+            )
+            return True
+        except TimeoutException:
+            return False
+    
     def load_player_list(self, excel_path="AFL_Fantasy_Player_URLs.xlsx"):
         """Load player URLs from Excel file"""
         try:
@@ -86,51 +137,51 @@ class AFLPlayerScraper:
         
         output_path = self.output_folder / f"{player_id}.xlsx"
         
-        # Remove existing file if it exists
-        if output_path.exists():
-            try:
-                output_path.unlink()
-            except PermissionError:
-                logger.error(f"❌ File in use or locked: {output_path}")
-                return None
-        
         try:
+            if self.driver is None:
+                self._setup_driver()
             self.driver.get(url)
-            time.sleep(3)  # Let page fully load
+            if not self._wait_for_tables():
+                logger.warning(f"⚠️ Timed out waiting for tables for {player_id}")
             
-            soup = BeautifulSoup(self.driver.page_source, "html.parser")
-            writer = pd.ExcelWriter(output_path, engine="openpyxl")
-            found_any = False
+            # Skip parsing and writing when the stats tables are the same as last run
+            page_source = self.driver.page_source
+            digest = table_digest(*extract_tables(page_source, self.TABLE_IDS.values()))
+            previous = self.previous_data.get(str(player_id))
+            workbook_ok = output_path.exists() or not self.write_excel
+            # Replays always parse, so they measure the full scrape
+            if previous and workbook_ok and not replay.replaying() and self.page_cache.unchanged(url, digest):
+                self.page_cache.record(url, digest)
+                self.processed_data[player_id] = previous
+                logger.info(f"⏭️ {player_id} unchanged since {previous.get('scraped_at')}, skipping")
+                return previous.get('data')
+            
+            tables = extract_tables_by_id(page_source, self.TABLE_IDS)
+            found_any = bool(tables)
             scraped_data = {}
             
-            for sheet_name, table_id in self.TABLE_IDS.items():
-                table = soup.select_one(f"table#{table_id}")
-                if table:
-                    try:
-                        df_table = pd.read_html(StringIO(str(table)))[0]
-                        df_table.to_excel(writer, sheet_name=sheet_name, index=False)
-                        
-                        # Store data for API integration
-                        scraped_data[sheet_name.lower().replace(' ', '_')] = df_table.to_dict('records')
-                        found_any = True
-                        logger.info(f"✅ Found {sheet_name} table for {player_id}")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error parsing {sheet_name} table for {player_id}: {e}")
+            for sheet_name in self.TABLE_IDS:
+                if sheet_name in tables:
+                    # Store data for API integration
+                    scraped_data[sheet_name.lower().replace(' ', '_')] = tables[sheet_name].to_dict('records')
+                    logger.info(f"✅ Found {sheet_name} table for {player_id}")
                 else:
                     logger.warning(f"⚠️ Table '{sheet_name}' not found for {player_id}")
             
-            writer.close()
-            
             if found_any:
-                logger.info(f"✅ Saved {player_id}.xlsx")
+                scraped_at = datetime.now().isoformat()
+                self.sink.add(player_id, tables, scraped_at)
+                logger.info(f"✅ Saved tables for {player_id}")
                 
                 # Cache processed data for API
                 self.processed_data[player_id] = {
                     'player_id': player_id,
                     'url': url,
-                    'scraped_at': datetime.now().isoformat(),
+                    'scraped_at': scraped_at,
+                    'table_hash': digest,
                     'data': scraped_data
                 }
+                self.page_cache.record(url, digest)
                 
                 return scraped_data
             else:
@@ -141,47 +192,148 @@ class AFLPlayerScraper:
             logger.error(f"❌ Error scraping {player_id}: {e}")
             return None
     
-    def scrape_all_players(self, excel_path="AFL_Fantasy_Player_URLs.xlsx"):
-        """Scrape all players from the Excel file"""
+    def scrape_all_players(self, excel_path="AFL_Fantasy_Player_URLs.xlsx", workers=1, interval=REQUEST_INTERVAL,
+                           resume=False, only_failed=False, shard=None):
+        """
+        Scrape all players from the Excel file
+        
+        Progress is journaled per player, and players are only marked done
+        once their tables and API data are on disk (every CHECKPOINT_EVERY
+        players), so an interrupted run can be resumed without losing output.
+        
+        Args:
+            excel_path (str): Excel file with playerId and url columns
+            workers (int): Browser worker processes (1 scrapes in this process)
+            interval (float): Minimum seconds between page loads across all workers
+            resume (bool): Continue the last run for this player list and shard
+            only_failed (bool): Retry the last run's failed players
+            shard (tuple, optional): (shard_index, shard_count) share of the player list
+        """
         df = self.load_player_list(excel_path)
-        total_players = len(df)
-        successful_scrapes = 0
+        players = [(str(row["playerId"]), row["url"]) for _, row in df.iterrows()]
+        journal = RunJournal(str(self.output_folder / "scrape_journal.sqlite"))
+        players = journal.start(players, resume=resume, only_failed=only_failed, shard=shard,
+                                source=str(Path(excel_path).resolve()))
+        total_players = len(players)
+        completed = []
         
-        logger.info(f"🚀 Starting scrape of {total_players} players...")
+        logger.info(f"🚀 Starting scrape of {total_players} players with {workers} worker(s) "
+                    f"(run {journal.run_id})...")
         
-        for index, row in df.iterrows():
-            player_id = row["playerId"]
-            url = row["url"]
-            
-            result = self.scrape_player(player_id, url)
-            if result:
-                successful_scrapes += 1
-            
-            # Progress update
-            progress = ((index + 1) / total_players) * 100
-            logger.info(f"📈 Progress: {progress:.1f}% ({index + 1}/{total_players})")
-            
-            # Small delay between requests
-            time.sleep(1)
+        def finish(player_id, entry):
+            if entry is None:
+                journal.mark_failed(player_id)
+                return
+            completed.append((player_id, entry.get('table_hash')))
+            if len(completed) >= CHECKPOINT_EVERY:
+                self._checkpoint(journal, completed)
         
-        logger.info(f"✅ Scraping complete. {successful_scrapes}/{total_players} successful")
+        if workers > 1:
+            def on_result(player_id, entry):
+                if entry:
+                    # Workers only scrape; tables, page cache and API data are written here
+                    self.processed_data[player_id] = entry
+                    changed = self.page_cache.record(entry['url'], entry['table_hash'])
+                    workbook_missing = self.write_excel and not (self.output_folder / f"{player_id}.xlsx").exists()
+                    if changed or workbook_missing:
+                        self.sink.add(player_id, self._entry_tables(entry), entry['scraped_at'])
+                finish(player_id, entry)
+            
+            # Workers write nothing themselves, so each workbook is written once (by on_result)
+            factory = partial(AFLPlayerScraper, str(self.output_folder), headless=self.headless,
+                              write_excel=False, write_tables=False)
+            processed, failed = scrape_with_pool(players, factory, workers=workers, interval=interval,
+                                                 on_start=journal.mark_running, on_result=on_result)
+            successful_scrapes = len(processed)
+        else:
+            successful_scrapes = 0
+            limiter = RateLimiter(interval)
+            started_at = time.time()
+            for done, (player_id, url) in enumerate(players, 1):
+                limiter.wait()
+                journal.mark_running(player_id)
+                result = self.scrape_player(player_id, url)
+                if result:
+                    successful_scrapes += 1
+                elif not self.driver_alive():
+                    logger.warning("⚠️ Browser stopped responding, restarting it")
+                    self.cleanup()
+                    self.driver = None
+                finish(player_id, self.processed_data.get(player_id) if result else None)
+                
+                # Progress update
+                elapsed = time.time() - started_at
+                eta = elapsed / done * (total_players - done)
+                progress = (done / total_players) * 100
+                logger.info(f"📈 Progress: {progress:.1f}% ({done}/{total_players}) - ETA {int(eta)}s")
         
         # Save aggregated data for API consumption
-        self.save_api_data()
+        self._checkpoint(journal, completed)
+        summary = journal.finish()
+        journal.close()
+        
+        logger.info(f"✅ Scraping complete. {successful_scrapes}/{total_players} successful")
+        logger.info(f"⏭️ {self.page_cache.report()}")
+        logger.info(f"📒 Run {summary['run_id']}: {summary['done']} done, {summary['failed']} failed, "
+                    f"{summary['pending'] + summary['running']} not reached")
         
         return self.processed_data
     
+    def _entry_tables(self, entry):
+        """Rebuild a processed entry's tables as DataFrames, keyed by sheet name"""
+        data = entry.get('data', {})
+        return {sheet_name: pd.DataFrame(data[key]) for sheet_name in self.TABLE_IDS
+                if (key := sheet_name.lower().replace(' ', '_')) in data}
+    
+    def _checkpoint(self, journal, completed):
+        """Write tables, API data and page cache, then mark the players done"""
+        self.sink.commit()
+        self.save_api_data()
+        self.page_cache.save()
+        journal.mark_done(completed)
+        completed.clear()
+    
+    def _load_api_data(self):
+        """Load the previous run's API data (used for pages that have not changed)"""
+        api_data_path = self.output_folder / "afl_players_api_data.json"
+        try:
+            with open(api_data_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
     def save_api_data(self):
-        """Save processed data in format suitable for API consumption"""
+        """Save processed data in format suitable for API consumption
+        
+        The file on disk is re-read and updated rather than replaced, so
+        resumed runs and other shards keep the players they wrote.
+        """
         api_data_path = self.output_folder / "afl_players_api_data.json"
         
         try:
-            with open(api_data_path, 'w') as f:
-                json.dump(self.processed_data, f, indent=2, default=str)
+            with self._api_data_lock():
+                data = self._load_api_data()
+                data.update({str(player_id): entry for player_id, entry in self.processed_data.items()})
+                tmp_path = api_data_path.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=2, default=str)
+                os.replace(tmp_path, api_data_path)
             logger.info(f"💾 Saved API data to {api_data_path}")
         except Exception as e:
             logger.error(f"❌ Error saving API data: {e}")
     
+    @contextmanager
+    def _api_data_lock(self):
+        """Exclusive lock on the API data file across processes (where fcntl exists)"""
+        with open(self.output_folder / "afl_players_api_data.lock", 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
     def get_player_data(self, player_id):
         """Get processed data for a specific player (for API integration)"""
         return self.processed_data.get(player_id)
@@ -206,8 +358,13 @@ class AFLPlayerScraper:
     
     def cleanup(self):
         """Clean up resources"""
+        self.sink.close()
         if self.driver:
-            self.driver.quit()
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning(f"⚠️ Error closing driver: {e}")
+            self.driver = None
             logger.info("🧹 Driver cleaned up")
 
 # Integration with existing trade_api.py
@@ -243,15 +400,29 @@ if __name__ == "__main__":
     parser.add_argument("--excel", default="AFL_Fantasy_Player_URLs.xlsx", help="Excel file with player URLs")
     parser.add_argument("--output", default="dfs_player_summary", help="Output folder")
     parser.add_argument("--no-headless", action="store_true", help="Run Chrome in visible mode")
+    parser.add_argument("--workers", type=int, default=1, help="Browser worker processes")
+    parser.add_argument("--interval", type=float, default=REQUEST_INTERVAL,
+                        help="Minimum seconds between page loads across all workers")
+    parser.add_argument("--xlsx", action="store_true", help="Also write one Excel workbook per player")
+    parser.add_argument("--resume", action="store_true", help="Continue the last run where it stopped")
+    parser.add_argument("--only-failed", action="store_true", help="Retry the last run's failed players")
+    parser.add_argument("--shard", type=parse_shard, help="Scrape one share of the list, e.g. 0/4")
+    replay.add_arguments(parser)
     
     args = parser.parse_args()
+    replay.configure(args)
     
     scraper = AFLPlayerScraper(
         output_folder=args.output,
-        headless=not args.no_headless
+        headless=not args.no_headless,
+        start_driver=args.workers <= 1,
+        write_excel=args.xlsx
     )
     
     try:
-        scraper.scrape_all_players(args.excel)
+        scraper.scrape_all_players(args.excel, workers=args.workers, interval=args.interval,
+                                   resume=args.resume, only_failed=args.only_failed, shard=args.shard)
     finally:
         scraper.cleanup()
+        if replay.mode():
+            logger.info(replay.report())
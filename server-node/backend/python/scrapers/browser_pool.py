@@ -0,0 +1,198 @@
+"""
+AFL Fantasy Browser Worker Pool
+
+Runs player page scrapes across several worker processes, each owning its
+own headless browser. Workers pull players from one shared task queue and
+share a global rate limiter, so adding workers overlaps page rendering
+without increasing the request rate against the site. A worker whose
+process dies is restarted and its in-progress player is retried; a worker
+whose browser crashes starts a fresh browser for the next player. Progress
+and ETA are logged as results come in.
+"""
+
+import logging
+import multiprocessing as mp
+import queue
+import time
+from datetime import timedelta
+
+import replay
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between page loads across all workers
+REQUEST_INTERVAL = 1.0
+# Times a player is retried after its worker process died
+MAX_RETRIES = 2
+# Pages a browser loads before it is recycled (keeps Chrome memory in check)
+PAGES_PER_BROWSER = 200
+
+
+class RateLimiter:
+    """Spaces requests at least `interval` seconds apart across processes"""
+
+    def __init__(self, interval, ctx=mp):
+        self.interval = interval
+        self._next = ctx.Value('d', 0.0)
+
+    def wait(self):
+        if replay.replaying():
+            return
+        with self._next.get_lock():
+            start = max(time.time(), self._next.value)
+            self._next.value = start + self.interval
+        delay = start - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _browser_alive(scraper):
+    alive = getattr(scraper, 'driver_alive', None)
+    return alive() if alive else True
+
+
+def _worker(worker_id, factory, tasks, results, limiter, pages_per_browser):
+    """Worker process: scrape players from the task queue until a None sentinel"""
+    logging.basicConfig(level=logging.INFO)
+    scraper = None
+    pages = 0
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            player_id, url = task
+            results.put(('started', worker_id, player_id, None))
+
+            if scraper is None:
+                scraper = factory()
+                pages = 0
+            limiter.wait()
+            data = scraper.scrape_player(player_id, url)
+            entry = scraper.processed_data.pop(player_id, None) if data else None
+            results.put(('done', worker_id, player_id, entry))
+            pages += 1
+
+            # Start a fresh browser after a crash or after many pages
+            if (not data and not _browser_alive(scraper)) or pages >= pages_per_browser:
+                scraper.cleanup()
+                scraper = None
+    finally:
+        if scraper is not None:
+            scraper.cleanup()
+
+
+def _format_eta(seconds):
+    return str(timedelta(seconds=int(seconds)))
+
+
+def scrape_with_pool(players, factory, workers=4, interval=REQUEST_INTERVAL,
+                     max_retries=MAX_RETRIES, pages_per_browser=PAGES_PER_BROWSER,
+                     on_start=None, on_result=None):
+    """
+    Scrape players with a pool of browser worker processes
+
+    Args:
+        players (list): (player_id, url) pairs
+        factory (callable): Picklable callable returning a scraper with
+                            scrape_player, processed_data and cleanup
+        workers (int): Number of worker processes (one browser each)
+        interval (float): Minimum seconds between page loads across all workers
+        max_retries (int): Retries for a player whose worker process died
+        pages_per_browser (int): Pages before a worker restarts its browser
+        on_start (callable, optional): Called with player_id when a worker starts a player
+        on_result (callable, optional): Called with (player_id, entry or None) once per player
+
+    Returns:
+        tuple: (processed data keyed by player id, list of failed player ids)
+    """
+    ctx = mp.get_context('spawn')
+    tasks = ctx.Queue()
+    results = ctx.Queue()
+    limiter = RateLimiter(interval, ctx)
+    players = [(str(player_id), url) for player_id, url in players]
+    urls = dict(players)
+    for task in players:
+        tasks.put(task)
+
+    def start(worker_id):
+        process = ctx.Process(
+            target=_worker,
+            args=(worker_id, factory, tasks, results, limiter, pages_per_browser),
+            name=f"scraper-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    workers = max(1, min(workers, len(players) or 1))
+    processes = {i: start(i) for i in range(workers)}
+    in_progress = {}
+    attempts = {}
+    processed = {}
+    failed = []
+    finished = set()
+    total = len(players)
+    started_at = time.time()
+
+    def handle(message):
+        kind, worker_id, player_id, entry = message
+        if kind == 'started':
+            in_progress[worker_id] = player_id
+            if on_start:
+                on_start(player_id)
+            return
+        in_progress.pop(worker_id, None)
+        if player_id in finished:
+            return
+        finished.add(player_id)
+        if entry:
+            processed[player_id] = entry
+        else:
+            failed.append(player_id)
+        if on_result:
+            on_result(player_id, entry)
+
+        elapsed = time.time() - started_at
+        rate = len(finished) / elapsed if elapsed > 0 else 0
+        eta = (total - len(finished)) / rate if rate else 0
+        logger.info(f"📈 Progress: {len(finished) / total * 100:.1f}% ({len(finished)}/{total}) - "
+                    f"{rate * 60:.1f} players/min, ETA {_format_eta(eta)}")
+
+    try:
+        while len(finished) < total:
+            try:
+                handle(results.get(timeout=1))
+            except queue.Empty:
+                pass
+
+            for worker_id, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                # Read anything the worker reported before it died
+                while True:
+                    try:
+                        handle(results.get_nowait())
+                    except queue.Empty:
+                        break
+                player_id = in_progress.pop(worker_id, None)
+                logger.warning(f"⚠️ Worker {worker_id} exited ({process.exitcode}), restarting")
+                if player_id is not None and player_id not in finished:
+                    attempts[player_id] = attempts.get(player_id, 0) + 1
+                    if attempts[player_id] <= max_retries:
+                        tasks.put((player_id, urls[player_id]))
+                    else:
+                        handle(('done', worker_id, player_id, None))
+                processes[worker_id] = start(worker_id)
+    finally:
+        for _ in processes:
+            tasks.put(None)
+        for process in processes.values():
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+
+    elapsed = time.time() - started_at
+    logger.info(f"✅ Pool finished {total} players in {_format_eta(elapsed)} "
+                f"({len(processed)} ok, {len(failed)} failed, {workers} workers)")
+    return processed, failed
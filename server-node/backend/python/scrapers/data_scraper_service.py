@@ -16,6 +16,9 @@ from typing import Dict, List, Optional
 # Add the current directory to Python path for imports
 sys.path.append('/app')
 
+# --record/--replay are exported to the environment, so the scraper subprocesses follow them
+import replay
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -251,4 +254,5 @@ def main():
             time.sleep(300)  # Wait 5 minutes before retrying
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
@@ -12,6 +12,8 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 import re
 
+import replay
+
 def scrape_fantasy_bigboard():
     """Fetch AFL Fantasy player data from DFS Australia API endpoint"""
     api_url = "https://dfsaustralia.com/wp-admin/admin-ajax.php"
@@ -201,4 +203,7 @@ def main():
         process_afl_data.main()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
@@ -1,13 +1,17 @@
 import os
-import time
 import pandas as pd
-from io import StringIO
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 
+from table_extract import DFS_TABLE_IDS, extract_tables_by_id
+from table_sink import TableSink
+import replay
+
+# --record / --replay [--fixtures DIR]
+replay.configure_from_argv()
+
 # Load player list
 df = pd.read_excel("AFL_Fantasy_Player_URLs.xlsx")
 
@@ -18,18 +22,17 @@ options.add_argument("--disable-gpu")
 options.add_argument("--no-sandbox")
 options.add_argument("--disable-dev-shm-usage")
 service = Service()
-driver = webdriver.Chrome(service=service, options=options)
+driver = replay.driver(lambda: webdriver.Chrome(service=service, options=options))
 
-# Output folder
+# Output folder: tables go to columnar datasets under output_folder/tables,
+# per-player workbooks only when WRITE_EXCEL=1
 output_folder = "dfs_player_summary"
 os.makedirs(output_folder, exist_ok=True)
+write_excel = os.getenv("WRITE_EXCEL") == "1"
+sink = TableSink(os.path.join(output_folder, "tables"), excel_folder=output_folder if write_excel else None)
 
 # Table IDs to extract
-TABLE_IDS = {
-    "Career Averages": "fantasyPlayerCareer",
-    "Opponent Splits": "vsOpponentCareer",
-    "Game Logs": "playerGames"
-}
+TABLE_IDS = DFS_TABLE_IDS
 
 # Scrape loop
 for index, row in df.iterrows():
@@ -37,36 +40,19 @@ for index, row in df.iterrows():
     url = row["url"]
     print(f"🔄 Scraping {player_id}...")
 
-    output_path = os.path.join(output_folder, f"{player_id}.xlsx")
-
-    # Delete existing file
-    if os.path.exists(output_path):
-        try:
-            os.remove(output_path)
-        except PermissionError:
-            print(f"❌ File in use or locked: {output_path}")
-            continue
-
     try:
         driver.get(url)
-        time.sleep(3)  # Let page fully load
+        replay.pause(3)  # Let page fully load
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        writer = pd.ExcelWriter(output_path, engine="openpyxl")
-        found_any = False
+        tables = extract_tables_by_id(driver.page_source, TABLE_IDS)
 
-        for sheet_name, table_id in TABLE_IDS.items():
-            table = soup.select_one(f"table#{table_id}")
-            if table:
-                df_table = pd.read_html(StringIO(str(table)))[0]
-                df_table.to_excel(writer, sheet_name=sheet_name, index=False)
-                found_any = True
-            else:
+        for sheet_name in TABLE_IDS:
+            if sheet_name not in tables:
                 print(f"⚠️ Table '{sheet_name}' not found for {player_id}")
 
-        writer.close()
-        if found_any:
-            print(f"✅ Saved {player_id}.xlsx")
+        if tables:
+            sink.add(player_id, tables)
+            print(f"✅ Saved tables for {player_id}")
         else:
             print(f"⚠️ No tables found for {player_id}")
 
@@ -74,4 +60,7 @@ for index, row in df.iterrows():
         print(f"❌ Error scraping {player_id}: {e}")
 
 driver.quit()
-print("✅ Scraping complete.")
\ No newline at end of file
+sink.close()
+print("✅ Scraping complete.")
+if replay.mode():
+    print(replay.report())
\ No newline at end of file
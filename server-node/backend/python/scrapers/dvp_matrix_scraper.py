@@ -5,21 +5,31 @@ This script scrapes the DFS Australia website for Defense vs Position (DVP) data
 and provides a structured matrix of how teams perform against each position.
 """
 
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 import json
+import os
 
-def get_dvp_matrix():
+from fetch_engine import fetch
+from page_cache import get_page_cache
+import replay
+
+def get_dvp_matrix(cache=None):
     """
     Scrape and parse the Defense vs Position (DVP) matrix from DFS Australia
     
+    Args:
+        cache (PageCache, optional): Make the request conditional on the last response
+    
     Returns:
         dict: A dictionary with position keys (DEF, MID, RUC, FWD) mapping to 
-              team DVP data records
+              team DVP data records, or None if the page has not changed since
+              the last request
     """
     url = "https://dfsaustralia.com/afl-dvp/"
-    response = requests.get(url)
+    response = fetch(url, cache=cache)
+    if response.not_modified:
+        return None
     soup = BeautifulSoup(response.text, "html.parser")
     
     tables = pd.read_html(response.text)
@@ -45,15 +55,26 @@ def save_dvp_data(filename="dvp_matrix.json"):
     Args:
         filename (str, optional): Output filename. Defaults to "dvp_matrix.json".
     """
-    data = get_dvp_matrix()
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=2)
-    print(f"DVP matrix data saved to {filename}")
+    # Only ask for changes when there is a previous file to keep
+    cache = get_page_cache()
+    data = get_dvp_matrix(cache if os.path.exists(filename) else None)
+    if data is None:
+        print(f"DVP page not modified, {filename} is up to date")
+    else:
+        with open(filename, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"DVP matrix data saved to {filename}")
+    cache.save()
 
 if __name__ == "__main__":
+    # --record / --replay [--fixtures DIR]
+    replay.configure_from_argv()
+
     # When run directly, print the DVP matrix data to console
     data = get_dvp_matrix()
     print(json.dumps(data, indent=2))
     
     # Optionally save the data to a file
-    save_dvp_data()
\ No newline at end of file
+    save_dvp_data()
+    if replay.mode():
+        print(replay.report())
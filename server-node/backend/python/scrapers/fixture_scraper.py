@@ -5,23 +5,31 @@ This script scrapes the FootyWire website for AFL fixture data
 to provide accurate, up-to-date match schedules.
 """
 
-import requests
 from bs4 import BeautifulSoup
 import json
+import os
 from datetime import datetime
 
-def get_fixture_matrix(year=2025):
+from fetch_engine import fetch
+from page_cache import get_page_cache
+import replay
+
+def get_fixture_matrix(year=2025, cache=None):
     """
     Scrape the fixture/schedule data from FootyWire
     
     Args:
         year (int, optional): The year to scrape fixtures for. Defaults to 2025.
+        cache (PageCache, optional): Make the request conditional on the last response
         
     Returns:
-        list: A list of fixture dictionaries containing round, date, teams, and venue info
+        list: A list of fixture dictionaries containing round, date, teams, and venue info,
+              or None if the page has not changed since the last request
     """
     base_url = f"https://www.footywire.com/afl/footy/ft_match_list?year={year}"
-    response = requests.get(base_url)
+    response = fetch(base_url, cache=cache)
+    if response.not_modified:
+        return None
     soup = BeautifulSoup(response.text, "html.parser")
 
     table = soup.find("table", {"class": "data"})  # main fixture table
@@ -83,7 +91,13 @@ def save_fixture_data(filename="fixture_data.json", year=2025):
         filename (str, optional): Output filename. Defaults to "fixture_data.json".
         year (int, optional): The year to scrape fixtures for. Defaults to 2025.
     """
-    fixtures = get_fixture_matrix(year)
+    # Only ask for changes when there is a previous file to keep
+    cache = get_page_cache()
+    fixtures = get_fixture_matrix(year, cache if os.path.exists(filename) else None)
+    if fixtures is None:
+        print(f"Fixture page not modified, {filename} is up to date")
+        cache.save()
+        return
     
     # Add current round information
     data = {
@@ -95,9 +109,13 @@ def save_fixture_data(filename="fixture_data.json", year=2025):
     
     with open(filename, "w") as f:
         json.dump(data, f, indent=2)
+    cache.save()
     print(f"Fixture data saved to {filename}")
 
 if __name__ == "__main__":
+    # --record / --replay [--fixtures DIR]
+    replay.configure_from_argv()
+
     # When run directly, print the fixture data to console
     from pprint import pprint
     fixtures = get_fixture_matrix()
@@ -107,4 +125,6 @@ if __name__ == "__main__":
     pprint(fixtures[:10])
     
     # Optionally save the data to a file
-    save_fixture_data()
\ No newline at end of file
+    save_fixture_data()
+    if replay.mode():
+        print(replay.report())
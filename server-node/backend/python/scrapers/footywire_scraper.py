@@ -7,12 +7,23 @@ and stores the data in a clean JSON format for use in the frontend.
 """
 
 import json
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import re
 import os
-import time
+
+from fetch_engine import FetchError, fetch, fetch_many
+from page_cache import get_page_cache
+from table_extract import data_table_rows
+import replay
+
+RANKINGS_URL = "https://www.footywire.com/afl/footy/dream_team_round"
+BREAKEVENS_URL = "https://www.footywire.com/afl/footy/dream_team_breakevens"
+
+# Browser-like headers to avoid being blocked
+HEADERS = {
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0'
+}
 
 # Constants for position mapping
 POSITION_MAPPING = {
@@ -95,56 +106,26 @@ def parse_price(price_str):
     except ValueError:
         return 0
 
-def scrape_footywire_rankings():
-    """Scrape AFL Fantasy player rankings from FootyWire"""
+def scrape_footywire_rankings(html=None):
+    """Scrape AFL Fantasy player rankings from FootyWire (parses html if already fetched)"""
     # Using the original dream_team endpoints which are accessible
-    url = "https://www.footywire.com/afl/footy/dream_team_round"
+    url = RANKINGS_URL
     print(f"Scraping AFL Fantasy player data from {url} for 2025 season...")
     
-    # We need to provide proper headers to avoid being blocked
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Cache-Control': 'max-age=0'
-    }
-    
     player_data = []
     
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if html is None:
+            html = fetch(url, headers=HEADERS).text
         
-        # Find the main stats table
-        tables = soup.find_all('table', class_='data')
-        if not tables:
+        # Main player stats table: the first data table with a Player header
+        headers, rows = data_table_rows(html, 'Player')
+        if headers is None:
             print("No data tables found on the page.")
             return []
         
-        # Get the main player stats table (typically the first one with player data)
-        main_table = None
-        for table in tables:
-            headers = table.find_all('th')
-            if headers and any('Player' in th.text for th in headers):
-                main_table = table
-                break
-                
-        if not main_table:
-            print("Could not find player stats table.")
-            return []
-            
-        # Extract table headers for column positions
-        headers = []
-        header_row = main_table.find('tr')
-        if header_row:
-            headers = [header.text.strip() for header in header_row.find_all('th')]
-        
         if not headers:
-            print("Could not find table headers.")
+            print("Could not find player stats table headers.")
             return []
             
         print(f"Found headers: {headers}")
@@ -176,47 +157,40 @@ def scrape_footywire_rankings():
             print(f"Could not find required columns. Name index: {name_idx}, Team index: {team_idx}")
             return []
             
-        # Process rows in the table (skip header row)
-        rows = main_table.find_all('tr')[1:]  # Skip header row
-        
-        for row in rows:
-            cells = row.find_all(['td', 'th'])
-            
+        # Process rows in the table (cells are text; linked cells give the link text)
+        for cells in rows:
             # Skip rows with insufficient cells - calculate max safely
             req_idx_max = max(name_idx or 0, team_idx or 0)
             if len(cells) <= req_idx_max:
                 continue
                 
             try:
-                # Extract player name - handle case where it might be in an anchor tag
-                name_cell = cells[name_idx]
-                name_link = name_cell.find('a')
-                name = name_link.text.strip() if name_link else name_cell.text.strip()
+                name = cells[name_idx]
                 
                 # Skip empty rows or header rows
                 if not name or name.lower() == 'player':
                     continue
                     
                 # Extract other data
-                team = cells[team_idx].text.strip()
+                team = cells[team_idx]
                 team = normalize_team_name(team)
                 
                 # Extract position if available
                 position = "MID"  # Default position
                 if position_idx is not None and position_idx < len(cells):
-                    pos_text = cells[position_idx].text.strip()
+                    pos_text = cells[position_idx]
                     position = normalize_position(pos_text)
                     
                 # Extract price if available
                 price = 0
                 if price_idx is not None and price_idx < len(cells):
-                    price_text = cells[price_idx].text.strip()
+                    price_text = cells[price_idx]
                     price = parse_price(price_text)
                     
                 # Extract average points if available
                 avg_points = 0
                 if avg_idx is not None and avg_idx < len(cells):
-                    avg_text = cells[avg_idx].text.strip()
+                    avg_text = cells[avg_idx]
                     try:
                         avg_points = float(avg_text)
                     except ValueError:
@@ -225,7 +199,7 @@ def scrape_footywire_rankings():
                 # Extract breakeven if available
                 breakeven = None
                 if be_idx is not None and be_idx < len(cells):
-                    be_text = cells[be_idx].text.strip()
+                    be_text = cells[be_idx]
                     try:
                         breakeven = int(be_text)
                     except ValueError:
@@ -264,57 +238,28 @@ def scrape_footywire_rankings():
         print(f"Successfully scraped {len(player_data)} players from FootyWire rankings.")
         return player_data
         
-    except requests.exceptions.RequestException as e:
+    except FetchError as e:
         print(f"Error scraping FootyWire data: {e}")
         return []
 
-def scrape_footywire_breakevens():
-    """Scrape breakeven values from FootyWire"""
+def scrape_footywire_breakevens(html=None):
+    """Scrape breakeven values from FootyWire (parses html if already fetched)"""
     # Using the original dream_team breakeven endpoint
-    url = "https://www.footywire.com/afl/footy/dream_team_breakevens"
+    url = BREAKEVENS_URL
     print(f"Scraping AFL Fantasy breakeven data from {url} for 2025 season...")
     
     breakeven_data = {}
     
     try:
-        # Using same robust headers to avoid being blocked
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Cache-Control': 'max-age=0'
-        }
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if html is None:
+            html = fetch(url, headers=HEADERS).text
         
-        # Find the breakeven table
-        tables = soup.find_all('table', class_='data')
-        if not tables:
+        # Breakeven table: the first data table with a Break header
+        headers, rows = data_table_rows(html, 'Break')
+        if headers is None:
             print("No breakeven tables found on the page.")
             return {}
         
-        # Get the main breakeven table
-        breakeven_table = None
-        for table in tables:
-            headers = table.find_all('th')
-            if headers and any('Break' in th.text for th in headers):
-                breakeven_table = table
-                break
-                
-        if not breakeven_table:
-            print("Could not find breakeven table.")
-            return {}
-            
-        # Extract table headers for column positions
-        headers = []
-        header_row = breakeven_table.find('tr')
-        if header_row:
-            headers = [header.text.strip() for header in header_row.find_all('th')]
-        
         if not headers:
             print("Could not find breakeven table headers.")
             return {}
@@ -333,28 +278,22 @@ def scrape_footywire_breakevens():
             print(f"Could not find name or breakeven columns. Name index: {name_idx}, BE index: {be_idx}")
             return {}
             
-        # Process rows in the table (skip header row)
-        rows = breakeven_table.find_all('tr')[1:]  # Skip header row
-        
-        for row in rows:
+        # Process rows in the table (cells are text; linked cells give the link text)
+        for cells in rows:
             try:
-                cells = row.find_all(['td', 'th'])
-                
                 # Calculate safe max with null protection
                 req_idx_max = max(name_idx or 0, be_idx or 0)
                 if len(cells) <= req_idx_max:
                     continue
                     
                 # Extract player name
-                name_cell = cells[name_idx]
-                name_link = name_cell.find('a')
-                name = name_link.text.strip() if name_link else name_cell.text.strip()
+                name = cells[name_idx]
                 
                 if not name:
                     continue
                     
                 # Extract breakeven
-                be_text = cells[be_idx].text.strip()
+                be_text = cells[be_idx]
                 try:
                     breakeven = int(be_text)
                     breakeven_data[name] = breakeven
@@ -367,7 +306,7 @@ def scrape_footywire_breakevens():
         print(f"Successfully scraped {len(breakeven_data)} breakevens.")
         return breakeven_data
         
-    except requests.exceptions.RequestException as e:
+    except FetchError as e:
         print(f"Error scraping breakeven data: {e}")
         return {}
 
@@ -401,7 +340,21 @@ def main():
     try:
         # Try to fetch from FootyWire first
         print("Attempting to scrape data from FootyWire...")
-        players = scrape_footywire_rankings()
+        # Both pages are fetched together; the engine applies FootyWire's rate limit.
+        # With a previous player_data.json the requests are conditional.
+        cache = get_page_cache()
+        pages = fetch_many([RANKINGS_URL, BREAKEVENS_URL], headers=HEADERS,
+                           cache=cache if os.path.exists('player_data.json') else None)
+        if all(page.not_modified for page in pages):
+            print("FootyWire pages not modified, player_data.json is up to date.")
+            print(cache.report())
+            cache.save()
+            return
+        
+        # A page that failed, or came back 304 while the other changed, is fetched again in full
+        rankings_page, breakevens_page = [page.text if page.ok and not page.not_modified else None
+                                          for page in pages]
+        players = scrape_footywire_rankings(rankings_page)
         
         if players:
             print("Successfully scraped player rankings from FootyWire.")
@@ -409,8 +362,7 @@ def main():
             
             # Try to enrich with breakevens
             print("Fetching breakeven data...")
-            time.sleep(1)  # Small delay to avoid rate limiting
-            breakevens = scrape_footywire_breakevens()
+            breakevens = scrape_footywire_breakevens(breakevens_page)
             
             if breakevens:
                 print(f"Successfully scraped {len(breakevens)} breakevens.")
@@ -420,6 +372,7 @@ def main():
                 
             # Save to JSON
             save_to_json(players)
+            cache.save()
             print("FootyWire data saved successfully.")
             print(f"Total players processed: {len(players)}")
             return
@@ -438,4 +391,7 @@ def main():
     process_afl_data.main()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
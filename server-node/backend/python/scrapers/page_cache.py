@@ -0,0 +1,164 @@
+"""
+AFL Fantasy Scraper Page Cache
+
+Persistent per-URL record of what the scrapers last saw: the ETag and
+Last-Modified validators from the server, and a hash of the tables the
+scraper extracts from the page. Requests can be made conditional (a 304
+means nothing changed), and a page whose relevant tables hash the same as
+last time can skip parsing and writing. Each run reports how many pages
+were skipped.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+
+CACHE_PATH = os.getenv('SCRAPE_CACHE_PATH', 'scrape_cache.json')
+
+_TABLE_RE = re.compile(r'<table\b.*?</table>', re.S | re.I)
+
+
+def extract_tables(html, table_ids=None):
+    """
+    Raw HTML of the page's tables, found without parsing the page
+
+    Args:
+        html (str or bytes): Page source
+        table_ids (iterable, optional): Only tables with these ids, in this order
+
+    Returns:
+        list: Table HTML (None for an id that is not on the page)
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    tables = _TABLE_RE.findall(html)
+    if table_ids is None:
+        return tables
+    by_id = {}
+    for table in tables:
+        match = re.match(r'<table\b[^>]*\bid=["\']?([\w-]+)', table, re.I)
+        if match:
+            by_id.setdefault(match.group(1), table)
+    return [by_id.get(table_id) for table_id in table_ids]
+
+
+def table_digest(*tables):
+    """Hash of the extracted tables (BeautifulSoup tags or strings; missing tables count as empty)"""
+    digest = hashlib.sha256()
+    for table in tables:
+        digest.update(str(table if table is not None else '').encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class PageCache:
+    """Validators and table hashes per URL, stored as one JSON file"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        self.stats = {'pages': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0}
+        try:
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def headers(self, url):
+        """Conditional request headers for a URL (empty if nothing is known)"""
+        entry = self.entries.get(url, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def remember(self, url, response_headers):
+        """Store the validators from a full (200) response"""
+        headers = {k.lower(): v for k, v in (response_headers or {}).items()}
+        with self._lock:
+            entry = self.entries.setdefault(url, {})
+            entry['etag'] = headers.get('etag')
+            entry['last_modified'] = headers.get('last-modified')
+
+    def not_modified(self, url):
+        """Count a page the server answered with 304"""
+        with self._lock:
+            self.stats['pages'] += 1
+            self.stats['not_modified'] += 1
+            self.entries.setdefault(url, {})['checked_at'] = datetime.now().isoformat()
+
+    def unchanged(self, url, digest):
+        """Whether the page's tables hash the same as last time (does not record anything)"""
+        return self.entries.get(url, {}).get('table_hash') == digest
+
+    def record(self, url, digest):
+        """
+        Record the table hash seen for a page
+
+        Returns:
+            bool: True if the tables changed since the last run
+        """
+        with self._lock:
+            entry = self.entries.setdefault(url, {})
+            changed = entry.get('table_hash') != digest
+            entry['table_hash'] = digest
+            entry['checked_at'] = datetime.now().isoformat()
+            if changed:
+                entry['changed_at'] = entry['checked_at']
+            self.stats['pages'] += 1
+            self.stats['changed' if changed else 'unchanged'] += 1
+        return changed
+
+    def save(self):
+        """Write the cache atomically"""
+        with self._lock:
+            data = json.dumps(self.entries, indent=2)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def summary(self):
+        """
+        Skip statistics for this run
+
+        Returns:
+            dict: pages, not_modified, unchanged, changed and skip_rate
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        skipped = stats['not_modified'] + stats['unchanged']
+        stats['skipped'] = skipped
+        stats['skip_rate'] = round(skipped / stats['pages'], 3) if stats['pages'] else 0.0
+        return stats
+
+    def report(self):
+        """One-line skip summary for logs"""
+        s = self.summary()
+        return (f"{s['skipped']}/{s['pages']} pages skipped ({s['skip_rate'] * 100:.1f}%): "
+                f"{s['not_modified']} not modified, {s['unchanged']} unchanged, {s['changed']} changed")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_page_cache(path=CACHE_PATH):
+    """Shared cache per file, so scrapers in one process share stats and writes"""
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = PageCache(path)
+        return _caches[path]
@@ -1,8 +1,9 @@
-import requests
 import json
 import pandas as pd
 from bs4 import BeautifulSoup
-import time
+
+from fetch_engine import fetch
+import replay
 
 def scrape_dfs_australia_players():
     """Scrape current player data from DFS Australia to get accurate team assignments"""
@@ -12,12 +13,7 @@ def scrape_dfs_australia_players():
         # DFS Australia AFL Fantasy Big Board URL
         url = "https://dfsaustralia.com/afl-fantasy-big-board/"
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        response = fetch(url)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -66,12 +62,7 @@ def scrape_footywire_players():
     try:
         url = "https://www.footywire.com/afl/footy/dream_team_breakevens"
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        response = fetch(url)
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
@@ -209,4 +200,7 @@ def main():
         print("Failed to scrape player data from any source")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
@@ -0,0 +1,479 @@
+"""
+AFL Fantasy Scraper Record/Replay
+
+Lets any scraper run against a recorded corpus instead of the live sites.
+In record mode every HTTP response (requests sessions and the fetch
+engine) and every Selenium page source is written to a gzip-compressed
+JSON fixture. In replay mode the same calls are answered from those
+fixtures without touching the network, browsers are replaced by a stub
+that serves the recorded page sources, and page-load waits are skipped,
+so a full-league scrape becomes a deterministic local benchmark.
+
+Fixtures are keyed by method, URL, query parameters and request body:
+    <fixtures>/<host>/<kind>-<sha1>.json.gz
+
+Scrapers enable it with --record / --replay (and --fixtures DIR); the mode
+is also read from SCRAPE_REPLAY_MODE and SCRAPE_FIXTURES, which is how
+worker processes inherit it.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+try:
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from cssselect import GenericTranslator
+    CSSSELECT_AVAILABLE = True
+except ImportError:
+    CSSSELECT_AVAILABLE = False
+
+try:
+    from selenium.common.exceptions import NoSuchElementException
+except ImportError:
+    class NoSuchElementException(LookupError):
+        pass
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = 'scrape_fixtures'
+MODES = ('record', 'replay')
+
+MODE_ENV = 'SCRAPE_REPLAY_MODE'
+FIXTURES_ENV = 'SCRAPE_FIXTURES'
+
+
+class FixtureMissing(LookupError):
+    """Replay mode was asked for a request or page that was never recorded"""
+
+
+def fixture_key(method, url, params=None, body=None):
+    """Stable key for a request: method, URL, sorted query parameters and body"""
+    if params:
+        items = sorted(params.items()) if isinstance(params, dict) else sorted(params)
+        url = f"{url}{'&' if '?' in url else '?'}{urlencode(items)}"
+    if isinstance(body, dict):
+        body = json.dumps(body, sort_keys=True)
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    digest = hashlib.sha1(f"{method.upper()} {url}".encode(), usedforsecurity=False)
+    if body:
+        digest.update(b'\x00' + body)
+    return digest.hexdigest()
+
+
+class FixtureStore:
+    """Compressed fixtures on disk, one file per request or page"""
+
+    def __init__(self, directory=FIXTURES_DIR):
+        self.directory = directory
+        self.stats = {'recorded': 0, 'replayed': 0, 'missing': 0}
+        self._lock = threading.Lock()
+
+    def path(self, kind, key, url):
+        host = urlsplit(url).netloc or 'local'
+        return os.path.join(self.directory, host.replace(':', '_'), f"{kind}-{key}.json.gz")
+
+    def save(self, kind, key, url, fixture):
+        """Write a fixture atomically (a rerun of the recording overwrites it)"""
+        path = self.path(kind, key, url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fixture = dict(fixture, url=url, kind=kind, recorded_at=datetime.now().isoformat())
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(fixture, f)
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats['recorded'] += 1
+
+    def load(self, kind, key, url):
+        """
+        Read a fixture
+
+        Raises:
+            FixtureMissing: If nothing was recorded for this request
+        """
+        path = self.path(kind, key, url)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self.stats['missing'] += 1
+            raise FixtureMissing(f"No recorded {kind} for {url} in {self.directory}") from None
+        with self._lock:
+            self.stats['replayed'] += 1
+        return fixture
+
+    def report(self):
+        s = self.stats
+        return f"{s['recorded']} recorded, {s['replayed']} replayed, {s['missing']} missing ({self.directory})"
+
+
+_mode = None
+_store = None
+_original_request = None
+
+
+def set_mode(mode, fixtures_dir=None):
+    """
+    Switch recording or replay on (mode 'record' or 'replay') or off (None)
+
+    The mode is exported to the environment so child processes follow it.
+    """
+    global _mode, _store
+    if mode not in MODES + (None,):
+        raise ValueError(f"Replay mode must be one of {MODES} or None, got {mode!r}")
+    _mode = mode
+    if mode is None:
+        os.environ.pop(MODE_ENV, None)
+        _uninstall_requests()
+        return
+    fixtures_dir = fixtures_dir or os.getenv(FIXTURES_ENV, FIXTURES_DIR)
+    _store = FixtureStore(fixtures_dir)
+    os.environ[MODE_ENV] = mode
+    os.environ[FIXTURES_ENV] = fixtures_dir
+    _install_requests()
+    logger.info(f"📼 Scraper {mode} mode, fixtures in {fixtures_dir}")
+
+
+def mode():
+    return _mode
+
+
+def recording():
+    return _mode == 'record'
+
+
+def replaying():
+    return _mode == 'replay'
+
+
+def store():
+    return _store
+
+
+def add_arguments(parser):
+    """Add --record, --replay and --fixtures to an argparse parser"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", action="store_true", help="Record responses and page sources as fixtures")
+    group.add_argument("--replay", action="store_true", help="Serve responses and pages from recorded fixtures")
+    parser.add_argument("--fixtures", default=None, help=f"Fixture folder (default {FIXTURES_DIR})")
+
+
+def configure(args):
+    """Apply parsed add_arguments() flags"""
+    if args.replay or args.record:
+        set_mode('replay' if args.replay else 'record', args.fixtures)
+
+
+def configure_from_argv(argv=None):
+    """
+    Apply --record / --replay / --fixtures DIR for scripts without argparse
+
+    The flags are removed from argv so the script's own argument handling
+    does not see them.
+    """
+    argv = sys.argv if argv is None else argv
+    selected, fixtures_dir = None, None
+    remaining = [argv[0]] if argv else []
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in ('--record', '--replay'):
+            selected = arg[2:]
+        elif arg == '--fixtures':
+            fixtures_dir = next(args, None)
+        elif arg.startswith('--fixtures='):
+            fixtures_dir = arg.split('=', 1)[1]
+        else:
+            remaining.append(arg)
+    argv[:] = remaining
+    if selected:
+        set_mode(selected, fixtures_dir)
+
+
+def _configure_from_env():
+    if os.getenv(MODE_ENV) in MODES:
+        set_mode(os.environ[MODE_ENV], os.getenv(FIXTURES_ENV))
+
+
+def pause(seconds):
+    """time.sleep for page loads and politeness delays (skipped when replaying)"""
+    if not replaying():
+        time.sleep(seconds)
+
+
+def report():
+    """One-line fixture summary for logs (empty when the layer is off)"""
+    return f"📼 {_mode}: {_store.report()}" if _mode else ''
+
+
+# ===== requests =====
+
+def _session_request(session, method, url, params=None, data=None, json=None, **kwargs):
+    key = fixture_key(method, url, params, data if data is not None else json)
+    if replaying():
+        try:
+            fixture = _store.load('http', key, url)
+        except FixtureMissing as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        return _response(fixture, method)
+
+    response = _original_request(session, method, url, params=params, data=data, json=json, **kwargs)
+    if recording():
+        _store.save('http', key, url, {
+            'method': method.upper(),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'encoding': response.encoding,
+            'body': response.content.decode('latin-1')
+        })
+    return response
+
+
+def _response(fixture, method):
+    response = requests.models.Response()
+    response.status_code = fixture['status']
+    response.reason = fixture.get('reason') or ''
+    # Bodies are stored decoded; drop transfer headers that no longer apply
+    headers = {k: v for k, v in fixture.get('headers', {}).items()
+               if k.lower() not in ('content-encoding', 'transfer-encoding')}
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = fixture.get('body', '').encode('latin-1')
+    response.encoding = fixture.get('encoding')
+    response.url = fixture['url']
+    response.request = requests.Request(method.upper(), fixture['url']).prepare()
+    return response
+
+
+def _install_requests():
+    global _original_request
+    if REQUESTS_AVAILABLE and _original_request is None:
+        _original_request = requests.Session.request
+        requests.Session.request = _session_request
+
+
+def _uninstall_requests():
+    global _original_request
+    if _original_request is not None:
+        requests.Session.request = _original_request
+        _original_request = None
+
+
+# ===== fetch engine =====
+
+def load_response(url, params=None):
+    """Recorded (status, content, headers, encoding) for a GET (raises FixtureMissing)"""
+    fixture = _store.load('http', fixture_key('GET', url, params), url)
+    headers = {k: v for k, v in fixture.get('headers', {}).items()
+               if k.lower() not in ('content-encoding', 'transfer-encoding')}
+    return fixture['status'], fixture.get('body', '').encode('latin-1'), headers, fixture.get('encoding')
+
+
+def save_response(url, params, status, content, headers, encoding):
+    """Record a GET made outside requests (the fetch engine's aiohttp path)"""
+    _store.save('http', fixture_key('GET', url, params), url, {
+        'method': 'GET',
+        'status': status,
+        'headers': dict(headers or {}),
+        'encoding': encoding,
+        'body': (content or b'').decode('latin-1')
+    })
+
+
+# ===== Selenium =====
+
+class RecordingDriver:
+    """Wraps a WebDriver and records the page source of every page it loads"""
+
+    def __init__(self, driver):
+        self._driver = driver
+        self._url = None
+
+    def get(self, url):
+        self._url = url
+        return self._driver.get(url)
+
+    @property
+    def page_source(self):
+        source = self._driver.page_source
+        if self._url:
+            # The last read after a get() wins, i.e. the fully loaded page
+            _store.save('page', fixture_key('GET', self._url), self._url, {'source': source})
+        return source
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+_SIMPLE_CSS_RE = re.compile(r'([\w-]+|\*)?((?:[#.][\w-]+|\[[\w-]+(?:=["\']?[^\]"\']*["\']?)?\])*)')
+
+
+def _css_to_xpath(selector):
+    """XPath for a CSS selector (cssselect if installed, else tag#id.class[attr=value] chains)"""
+    if CSSSELECT_AVAILABLE:
+        return GenericTranslator().css_to_xpath(selector)
+    paths = []
+    for part in selector.split(','):
+        steps = []
+        for compound in part.split():
+            match = _SIMPLE_CSS_RE.fullmatch(compound)
+            if not match:
+                raise ValueError(f"Selector not supported in replay without cssselect: {selector!r}")
+            conditions = []
+            for token in re.findall(r'[#.][\w-]+|\[[^\]]+\]', match.group(2)):
+                if token[0] == '#':
+                    conditions.append(f"@id='{token[1:]}'")
+                elif token[0] == '.':
+                    conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {token[1:]} ')")
+                else:
+                    name, _, value = token[1:-1].partition('=')
+                    conditions.append(f"@{name}='{value.strip(chr(34) + chr(39))}'" if value else f"@{name}")
+            steps.append((match.group(1) or '*') + ''.join(f'[{c}]' for c in conditions))
+        paths.append('descendant-or-self::' + '/descendant::'.join(steps))
+    return ' | '.join(paths)
+
+
+def _locate(root, by, value):
+    """Elements under an lxml root for a Selenium (By, value) locator"""
+    if root is None:
+        return []
+    if by == 'xpath':
+        xpath = value
+    elif by == 'css selector':
+        xpath = _css_to_xpath(value)
+    elif by in ('id', 'name'):
+        xpath = f".//*[@{by}='{value}']"
+    elif by == 'class name':
+        xpath = f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]"
+    elif by == 'tag name':
+        xpath = f".//{value}"
+    elif by in ('link text', 'partial link text'):
+        test = f"normalize-space(.)='{value}'" if by == 'link text' else f"contains(., '{value}')"
+        xpath = f".//a[{test}]"
+    else:
+        raise ValueError(f"Unsupported locator in replay: {by}")
+    return [element for element in root.xpath(xpath) if isinstance(element, lxml.html.HtmlElement)]
+
+
+class ReplayElement:
+    """An element of a recorded page: readable, and interactions do nothing"""
+
+    def __init__(self, element):
+        self._element = element
+
+    @property
+    def text(self):
+        return ' '.join(self._element.text_content().split())
+
+    @property
+    def tag_name(self):
+        return self._element.tag
+
+    def get_attribute(self, name):
+        if name in ('innerHTML', 'outerHTML'):
+            return lxml.html.tostring(self._element, encoding='unicode')
+        if name == 'textContent':
+            return self._element.text_content()
+        return self._element.get(name)
+
+    def is_displayed(self):
+        return True
+
+    def find_element(self, by='id', value=None):
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"No element for {by}={value!r} in recorded page")
+        return found[0]
+
+    def find_elements(self, by='id', value=None):
+        return [ReplayElement(element) for element in _locate(self._element, by, value)]
+
+    def __getattr__(self, name):
+        # click, send_keys, clear, submit, ...
+        return lambda *args, **kwargs: None
+
+
+class ReplayDriver:
+    """
+    Stand-in for a WebDriver that serves recorded page sources
+
+    find_element(s) query the recorded page (with lxml); navigation,
+    clicks, typing and scripts do nothing.
+    """
+
+    session_id = 'replay'
+
+    def __init__(self):
+        self.current_url = None
+        self.page_source = ''
+        self.title = ''
+        self._root = None
+
+    def get(self, url):
+        fixture = _store.load('page', fixture_key('GET', url), url)
+        self.current_url = url
+        self.page_source = fixture['source']
+        self._root = lxml.html.fromstring(self.page_source) if LXML_AVAILABLE and self.page_source.strip() else None
+        title = self._root.find('.//title') if self._root is not None else None
+        self.title = title.text_content().strip() if title is not None else ''
+
+    def find_element(self, by='id', value=None):
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"No element for {by}={value!r} in recorded page")
+        return found[0]
+
+    def find_elements(self, by='id', value=None):
+        return [ReplayElement(element) for element in _locate(self._root, by, value)]
+
+    def execute_script(self, *args, **kwargs):
+        return None
+
+    def get_cookies(self):
+        return []
+
+    def __getattr__(self, name):
+        # add_cookie, implicitly_wait, set_page_load_timeout, refresh, close, quit, ...
+        return lambda *args, **kwargs: None
+
+
+def driver(factory):
+    """
+    WebDriver for the current mode
+
+    Args:
+        factory (callable): Starts a real browser (not called when replaying)
+
+    Returns:
+        The real driver, a RecordingDriver around it, or a ReplayDriver
+    """
+    if replaying():
+        return ReplayDriver()
+    if recording():
+        return RecordingDriver(factory())
+    return factory()
+
+
+_configure_from_env()
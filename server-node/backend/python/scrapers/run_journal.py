@@ -0,0 +1,226 @@
+"""
+AFL Fantasy Scrape Run Journal
+
+Durable record of a scraping run in a SQLite file: every player in the
+run with its status (pending, running, done, failed, skipped), attempt
+count, output hash and last error. A run that dies part way can be
+resumed from where it stopped, or re-run for its failures only. Player
+lists can be split into shards by a stable hash of the player id, so
+several processes or machines each take a deterministic share of one
+list and keep their own run history.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+JOURNAL_PATH = os.path.join('dfs_player_summary', 'scrape_journal.sqlite')
+
+STATUSES = ('pending', 'running', 'done', 'failed', 'skipped')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    shard_index INTEGER NOT NULL,
+    shard_count INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS run_players (
+    run_id TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    url TEXT,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    output_hash TEXT,
+    error TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (run_id, player_id)
+);
+CREATE INDEX IF NOT EXISTS run_players_status ON run_players (run_id, status);
+"""
+
+
+def shard_of(player_id, shard_count):
+    """Shard a player belongs to: stable across processes, machines and Python versions"""
+    digest = hashlib.sha1(str(player_id).encode('utf-8'), usedforsecurity=False).hexdigest()
+    return int(digest[:8], 16) % shard_count
+
+
+def parse_shard(value):
+    """
+    Parse a shard spec such as "2/4" (the third of four shards)
+
+    Returns:
+        tuple: (shard_index, shard_count)
+
+    Raises:
+        ValueError: If the spec is malformed or out of range
+    """
+    try:
+        index, count = (int(part) for part in str(value).split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like INDEX/COUNT (e.g. 0/4), got {value!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in 0..{count - 1}, got {value!r}")
+    return index, count
+
+
+def frames_hash(tables):
+    """Hash of a player's scraped tables (name -> DataFrame), for the output_hash column"""
+    digest = hashlib.sha256()
+    for name in sorted(tables):
+        digest.update(str(name).encode('utf-8'))
+        digest.update(tables[name].to_csv(index=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+class RunJournal:
+    """SQLite journal of one scraping run (the current run is set by start())"""
+
+    def __init__(self, path=JOURNAL_PATH):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.run_id = None
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def start(self, players, resume=False, only_failed=False, shard=None, source=''):
+        """
+        Start a run, or pick up the last one
+
+        Args:
+            players (list): (player_id, url) pairs in scrape order
+            resume (bool): Continue the last run for this source and shard
+                           (its pending players and those it was scraping)
+            only_failed (bool): Retry the last run's failed players
+            shard (tuple, optional): (shard_index, shard_count); players are
+                                     filtered to this shard
+            source (str): Name of the player list, so runs of different lists
+                          are not resumed into each other
+
+        Returns:
+            list: (player_id, url) pairs to scrape, in order
+        """
+        shard_index, shard_count = shard or (0, 1)
+        players = [(str(player_id), url) for player_id, url in players
+                   if shard_of(player_id, shard_count) == shard_index]
+
+        with self._lock:
+            if resume or only_failed:
+                run = self._db.execute(
+                    "SELECT run_id FROM runs WHERE source = ? AND shard_index = ? AND shard_count = ? "
+                    "ORDER BY started_at DESC LIMIT 1",
+                    (source, shard_index, shard_count)
+                ).fetchone()
+                if run is not None:
+                    statuses = (['pending', 'running'] if resume else []) + (['failed'] if only_failed else [])
+                    self.run_id = run[0]
+                    self._db.execute("UPDATE runs SET status = 'running', finished_at = NULL WHERE run_id = ?",
+                                     (self.run_id,))
+                    # Only the placeholders are formatted into the query
+                    rows = self._db.execute(
+                        f"SELECT player_id, url FROM run_players WHERE run_id = ? "  # noqa: S608
+                        f"AND status IN ({','.join('?' * len(statuses))}) ORDER BY position",
+                        (self.run_id, *statuses)
+                    ).fetchall()
+                    self._db.commit()
+                    return [(player_id, url) for player_id, url in rows]
+
+            self.run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            self._db.execute(
+                "INSERT INTO runs (run_id, source, shard_index, shard_count, status, started_at) "
+                "VALUES (?, ?, ?, ?, 'running', ?)",
+                (self.run_id, source, shard_index, shard_count, _now())
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO run_players (run_id, player_id, url, position, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.run_id, player_id, url, position, _now())
+                 for position, (player_id, url) in enumerate(players)]
+            )
+            self._db.commit()
+        return players
+
+    def _set(self, player_ids, status, output_hash=None, error=None, attempt=False):
+        with self._lock:
+            self._db.executemany(
+                "UPDATE run_players SET status = ?, attempts = attempts + ?, "
+                "output_hash = COALESCE(?, output_hash), error = ?, updated_at = ? "
+                "WHERE run_id = ? AND player_id = ?",
+                [(status, int(attempt), output_hash, error, _now(), self.run_id, str(player_id))
+                 for player_id in player_ids]
+            )
+            self._db.commit()
+
+    def mark_running(self, player_id):
+        """A player is being scraped (counts an attempt)"""
+        self._set([player_id], 'running', attempt=True)
+
+    def mark_done(self, results):
+        """
+        Players whose output is safely written
+
+        Args:
+            results (list): (player_id, output_hash) pairs
+        """
+        with self._lock:
+            self._db.executemany(
+                "UPDATE run_players SET status = 'done', output_hash = ?, error = NULL, updated_at = ? "
+                "WHERE run_id = ? AND player_id = ?",
+                [(output_hash, _now(), self.run_id, str(player_id)) for player_id, output_hash in results]
+            )
+            self._db.commit()
+
+    def mark_failed(self, player_id, error=None):
+        self._set([player_id], 'failed', error=error or 'scrape failed')
+
+    def mark_skipped(self, player_id, reason=None):
+        self._set([player_id], 'skipped', error=reason)
+
+    def finish(self):
+        """Close the run: complete if nothing is left pending, running or failed"""
+        summary = self.summary()
+        open_count = summary['pending'] + summary['running'] + summary['failed']
+        with self._lock:
+            self._db.execute("UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                             ('complete' if not open_count else 'incomplete', _now(), self.run_id))
+            self._db.commit()
+        return summary
+
+    def summary(self):
+        """
+        Player counts by status for the current run
+
+        Returns:
+            dict: run_id, one count per status and total attempts
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*), SUM(attempts) FROM run_players WHERE run_id = ? GROUP BY status",
+                (self.run_id,)
+            ).fetchall()
+        summary = {'run_id': self.run_id, 'attempts': 0}
+        summary.update(dict.fromkeys(STATUSES, 0))
+        for status, count, attempts in rows:
+            summary[status] = count
+            summary['attempts'] += attempts or 0
+        return summary
+
+    def close(self):
+        with self._lock:
+            self._db.close()
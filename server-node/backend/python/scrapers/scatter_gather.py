@@ -0,0 +1,142 @@
+"""
+AFL Fantasy Scatter-Gather
+
+Runs independent calls (dashboard API requests, candidate page fetches)
+at the same time and collects whatever finishes. Each call has its own
+timeout; a call that fails or times out is reported instead of failing
+the rest, so callers get partial results. Also provides the pooled
+requests session those calls share, with a default per-request timeout.
+"""
+
+import logging
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single call may take before its result is given up on
+CALL_TIMEOUT = 15.0
+# Connections kept per host by pooled sessions
+POOL_SIZE = 10
+
+
+class PooledSession(requests.Session):
+    """requests session with a larger connection pool and a default timeout"""
+
+    def __init__(self, pool_size=POOL_SIZE, timeout=CALL_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class GatherResult:
+    """Outcome of gather(): values by name, plus what failed and how long each call took"""
+
+    def __init__(self):
+        self.values = {}
+        self.errors = {}
+        self.durations = {}
+
+    @property
+    def complete(self):
+        return not self.errors
+
+    def get(self, name, default=None):
+        value = self.values.get(name)
+        return default if value is None else value
+
+    def summary(self):
+        """One-line result summary for logs"""
+        timings = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in self.durations.items())
+        failed = f"; failed: {', '.join(f'{n} ({e})' for n, e in self.errors.items())}" if self.errors else ''
+        return f"{len(self.values)}/{len(self.values) + len(self.errors)} calls ok ({timings}){failed}"
+
+
+def gather(calls, timeout=CALL_TIMEOUT, workers=None):
+    """
+    Run calls concurrently and collect their results
+
+    Args:
+        calls (dict): Name -> zero-argument callable
+        timeout (float): Seconds each call may run (counted from when it starts)
+        workers (int, optional): Calls run at once (default: all of them);
+                                 use 1 for calls that share something that
+                                 cannot be used concurrently, such as a browser
+
+    Returns:
+        GatherResult: values has the calls that returned, errors the calls
+                      that raised or timed out (values are never both)
+    """
+    result = GatherResult()
+    if not calls:
+        return result
+    started = {}
+    lock = threading.Lock()
+
+    def run(name, call):
+        with lock:
+            started[name] = time.perf_counter()
+        return call()
+
+    workers = workers or len(calls)
+    # Calls queued behind one that hangs must not wait forever either
+    overall_deadline = time.perf_counter() + timeout * math.ceil(len(calls) / workers)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gather')
+    futures = {executor.submit(run, name, call): name for name, call in calls.items()}
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.perf_counter()
+            if now >= overall_deadline:
+                for future in pending:
+                    name = futures[future]
+                    if name in started:
+                        result.errors[name] = f"timed out after {timeout:g}s"
+                        result.durations[name] = now - started[name]
+                    else:
+                        result.errors[name] = 'not started before the deadline'
+                    logger.warning(f"⚠️ {name} {result.errors[name]}")
+                break
+            with lock:
+                deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            # Wake up for the next call to finish, or the next running call to time out
+            wait_for = max(0.0, min(deadlines + [overall_deadline]) - now)
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = futures[future]
+                result.durations[name] = time.perf_counter() - started.get(name, now)
+                try:
+                    result.values[name] = future.result()
+                except Exception as e:
+                    result.errors[name] = str(e) or type(e).__name__
+                    logger.warning(f"⚠️ {name} failed: {result.errors[name]}")
+
+            now = time.perf_counter()
+            with lock:
+                expired = {f for f in pending if futures[f] in started and now - started[futures[f]] >= timeout}
+            for future in expired:
+                # The thread cannot be stopped; its result is simply not waited for
+                name = futures[future]
+                result.errors[name] = f"timed out after {timeout:g}s"
+                result.durations[name] = now - started[name]
+                logger.warning(f"⚠️ {name} timed out after {timeout:g}s")
+            pending -= expired
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # Keep the caller's order
+    result.values = {name: result.values[name] for name in calls if name in result.values}
+    result.durations = {name: result.durations[name] for name in calls if name in result.durations}
+    return result
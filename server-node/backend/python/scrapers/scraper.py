@@ -9,12 +9,24 @@ import os
 import requests
 import pandas as pd
 
+try:
+    # Shared parsed copy of player_data.json when running alongside the tools
+    from player_repository import get_repository
+except ImportError:
+    get_repository = None
+
 def get_player_data(json_path="player_data.json"):
     if not os.path.exists(json_path):
         raise FileNotFoundError(f"{json_path} not found.")
     
-    with open(json_path, "r") as f:
-        data = json.load(f)
+    if get_repository is not None:
+        repository = get_repository(json_path)
+        data = repository.players()
+        if not data and repository.error:
+            raise ValueError(f"Could not read {json_path}: {repository.error}")
+    else:
+        with open(json_path, "r") as f:
+            data = json.load(f)
     
     # Standardize and filter
     players = []
@@ -90,6 +102,30 @@ def filter_rookies(max_price=500000, min_games=2, player_data=None):
     return [p for p in player_data if p.get("price", 0) < max_price and p.get("games", 0) >= min_games]
 
 
+def map_afl_fantasy_player(player):
+    """
+    Map a player from the AFL Fantasy JSON format to our expected format
+    
+    Parameters:
+        player (dict): Player as exported from AFL Fantasy
+        
+    Returns:
+        dict: Player with our field names
+    """
+    return {
+        "name": player.get("name", "Unknown"),
+        "team": player.get("team", "Unknown"),
+        "price": int(player.get("price", 0)),
+        "breakeven": float(player.get("breakeven", 0)),
+        "average_score": float(player.get("averageScore", player.get("l5Average", 0))),
+        "last_score": int(player.get("recentForm", [0])[-1] if player.get("recentForm") else 0),
+        "projected_score": int(player.get("projectedScore", player.get("averageScore", 0))),
+        "rounds_played": int(player.get("games", 1)),
+        "ownership_percentage": float(player.get("ownership", 5.0)),
+        "position": player.get("position", "UNK")
+    }
+
+
 def get_dfs_australia_player_data():
     """
     Get player data from AFL Fantasy JSON files or CSV files
@@ -110,22 +146,7 @@ def get_dfs_australia_player_data():
             with open(json_file, "r") as f:
                 raw_data = json.load(f)
             
-            players = []
-            for player in raw_data:
-                # Map AFL Fantasy data format to our expected format
-                mapped_player = {
-                    "name": player.get("name", "Unknown"),
-                    "team": player.get("team", "Unknown"),
-                    "price": int(player.get("price", 0)),
-                    "breakeven": float(player.get("breakeven", 0)),
-                    "average_score": float(player.get("averageScore", player.get("l5Average", 0))),
-                    "last_score": int(player.get("recentForm", [0])[-1] if player.get("recentForm") else 0),
-                    "projected_score": int(player.get("projectedScore", player.get("averageScore", 0))),
-                    "rounds_played": int(player.get("games", 1)),
-                    "ownership_percentage": float(player.get("ownership", 5.0)),
-                    "position": player.get("position", "UNK")
-                }
-                players.append(mapped_player)
+            players = [map_afl_fantasy_player(player) for player in raw_data]
             
             print(f"Loaded {len(players)} players from AFL Fantasy JSON file")
             return players
@@ -207,6 +228,11 @@ def update_player_data_from_dfs():
 if __name__ == "__main__":
     # Option to update from DFS Australia or show existing data
     import sys
+
+    import replay
+
+    # --record / --replay [--fixtures DIR], removed from sys.argv
+    replay.configure_from_argv()
     
     if len(sys.argv) > 1 and sys.argv[1] == "--update-from-dfs":
         print("Updating player data from DFS Australia...")
@@ -226,4 +252,6 @@ if __name__ == "__main__":
                 print("\nSample player data:")
                 print(json.dumps(players[0], indent=2))
         except FileNotFoundError:
-            print("Player data file not found. Run with --update-from-dfs to create it.")
\ No newline at end of file
+            print("Player data file not found. Run with --update-from-dfs to create it.")
+    if replay.mode():
+        print(replay.report())
\ No newline at end of file
@@ -0,0 +1,365 @@
+"""
+AFL Fantasy Session Pool
+
+Keeps logged-in sessions for many AFL Fantasy accounts (one per team id)
+so dashboard data can be fetched over plain HTTP without logging in on
+every run. A browser is only started to capture an account's tokens, the
+first time and again shortly before they expire. Captured tokens are
+saved to disk so a restart reuses them. Concurrent requests for the same
+account share its session, and only one of them captures new tokens.
+
+Accounts are read from afl_fantasy_accounts.json:
+
+    [{"team_id": "123456", "username": "me@example.com", "password_env": "AFL_FANTASY_PASSWORD_123456"}]
+
+("password" may be given directly instead of "password_env"). Without
+that file the single account in AFL_FANTASY_TEAM_ID / AFL_FANTASY_USERNAME
+/ AFL_FANTASY_PASSWORD is used, seeded with any manual cookie from
+afl_fantasy_tokens.json.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from scatter_gather import CALL_TIMEOUT, PooledSession, gather
+
+logger = logging.getLogger(__name__)
+
+ACCOUNTS_FILE = 'afl_fantasy_accounts.json'
+SESSIONS_FILE = 'afl_fantasy_sessions.json'
+TOKENS_FILE = 'afl_fantasy_tokens.json'
+COOKIE_DOMAIN = '.fantasy.afl.com.au'
+# Assumed lifetime of tokens whose cookies carry no expiry
+SESSION_TTL = 6 * 60 * 60
+# Tokens are captured again this many seconds before they expire
+REFRESH_MARGIN = 30 * 60
+# Browsers started at once when several accounts need new tokens
+CAPTURE_WORKERS = 2
+# Seconds a browser login may take
+CAPTURE_TIMEOUT = 180
+# Refused requests don't trigger another capture within this many seconds of the last one
+RECAPTURE_INTERVAL = 60
+# Cookies whose expiry is taken as the session's expiry
+AUTH_COOKIE_RE = re.compile(r'sess|token|auth|jwt', re.I)
+
+
+class SessionExpired(Exception):
+    """Raised when an account's tokens cannot be (re)captured"""
+    pass
+
+
+def load_accounts(path=ACCOUNTS_FILE):
+    """
+    Load the accounts to keep sessions for
+
+    Args:
+        path (str): Accounts JSON file
+
+    Returns:
+        list: Account dicts with team_id, username and password
+    """
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            entries = json.load(f)
+        accounts = []
+        for entry in entries:
+            password = entry.get('password') or os.getenv(entry.get('password_env', ''), '')
+            accounts.append({
+                'team_id': str(entry['team_id']),
+                'username': entry.get('username'),
+                'password': password
+            })
+        return accounts
+
+    team_id = os.getenv('AFL_FANTASY_TEAM_ID')
+    if not team_id and os.path.exists(TOKENS_FILE):
+        with open(TOKENS_FILE, 'r') as f:
+            team_id = json.load(f).get('team_id')
+    if not team_id:
+        return []
+    return [{
+        'team_id': str(team_id),
+        'username': os.getenv('AFL_FANTASY_USERNAME'),
+        'password': os.getenv('AFL_FANTASY_PASSWORD')
+    }]
+
+
+def capture_tokens(account):
+    """
+    Log in with a browser and capture the account's session tokens
+
+    Args:
+        account (dict): Account with username and password
+
+    Returns:
+        dict: cookies and api_token, or None if login failed
+    """
+    # Imported here so the pool itself does not need Selenium installed
+    from afl_fantasy_authenticated_scraper import AFLFantasyAuthenticatedScraper
+
+    scraper = AFLFantasyAuthenticatedScraper(account.get('username'), account.get('password'))
+    try:
+        return scraper.capture_session()
+    finally:
+        scraper.close()
+
+
+def _manual_tokens(team_id):
+    """Tokens pasted into afl_fantasy_tokens.json (or the environment) for team_id"""
+    tokens = {}
+    if os.path.exists(TOKENS_FILE):
+        with open(TOKENS_FILE, 'r') as f:
+            tokens = json.load(f)
+    cookie = os.getenv('AFL_FANTASY_SESSION_COOKIE') or tokens.get('session_cookie')
+    if str(tokens.get('team_id', team_id)) != team_id or not cookie or 'YOUR_' in cookie:
+        return None
+    cookies = []
+    for part in cookie.split(';'):
+        name, _, value = part.strip().partition('=')
+        if name and value:
+            cookies.append({'name': name, 'value': value})
+    return {'cookies': cookies, 'api_token': os.getenv('AFL_FANTASY_API_TOKEN') or tokens.get('api_token')}
+
+
+def _expires_at(tokens, captured_at):
+    """When captured tokens expire: the earliest auth cookie expiry, at most SESSION_TTL away"""
+    expiries = [
+        cookie['expiry'] for cookie in tokens.get('cookies', [])
+        if cookie.get('expiry') and AUTH_COOKIE_RE.search(cookie.get('name', ''))
+    ]
+    return min(expiries + [captured_at + SESSION_TTL])
+
+
+class AccountSession(PooledSession):
+    """Pooled session for one account; re-captures its tokens once if a request is refused"""
+
+    def __init__(self, pool, team_id):
+        super().__init__()
+        self.pool = pool
+        self.team_id = team_id
+        self.generation = 0
+
+    def apply_tokens(self, tokens, generation):
+        """Swap in newly captured tokens"""
+        self.cookies.clear()
+        for cookie in tokens.get('cookies', []):
+            self.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain') or COOKIE_DOMAIN, path=cookie.get('path') or '/'
+            )
+        if tokens.get('api_token'):
+            self.headers['Authorization'] = f"Bearer {tokens['api_token']}"
+        else:
+            self.headers.pop('Authorization', None)
+        self.generation = generation
+
+    def request(self, method, url, **kwargs):
+        generation = self.generation
+        response = super().request(method, url, **kwargs)
+        if response.status_code in (401, 403):
+            logger.info(f"🔑 Team {self.team_id} session refused ({response.status_code}), capturing new tokens")
+            try:
+                # Only the first caller to see the stale tokens captures new ones
+                self.pool.refresh(self.team_id, stale_generation=generation)
+            except SessionExpired as e:
+                logger.warning(f"⚠️ {e}")
+                return response
+            response = super().request(method, url, **kwargs)
+        return response
+
+
+class SessionPool:
+    """Logged-in sessions for many AFL Fantasy accounts, keyed by team id"""
+
+    def __init__(self, accounts=None, sessions_file=SESSIONS_FILE, capture=capture_tokens,
+                 refresh_margin=REFRESH_MARGIN):
+        """
+        Args:
+            accounts (list, optional): Account dicts (default: load_accounts())
+            sessions_file (str): Where captured tokens are kept between runs
+            capture (callable): account -> tokens dict; the only step that uses a browser
+            refresh_margin (float): Seconds before expiry that tokens are refreshed
+        """
+        self.accounts = {account['team_id']: account for account in (accounts if accounts is not None else load_accounts())}
+        self.sessions_file = sessions_file
+        self.capture = capture
+        self.refresh_margin = refresh_margin
+        self.captures = 0
+        self._tokens = self._load_tokens()
+        self._sessions = {}
+        self._locks = {team_id: threading.Lock() for team_id in self.accounts}
+        self._file_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher = None
+
+    @property
+    def team_ids(self):
+        return list(self.accounts)
+
+    def _load_tokens(self):
+        tokens = {}
+        if os.path.exists(self.sessions_file):
+            try:
+                with open(self.sessions_file, 'r') as f:
+                    tokens = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable sessions file {self.sessions_file}: {e}")
+        for team_id in self.accounts:
+            if team_id not in tokens:
+                manual = _manual_tokens(team_id)
+                if manual:
+                    now = time.time()
+                    tokens[team_id] = dict(manual, captured_at=now, expires_at=now + SESSION_TTL, generation=1)
+        return tokens
+
+    def _save_tokens(self):
+        with self._file_lock:
+            tmp_path = f"{self.sessions_file}.tmp"
+            # Session tokens are credentials; keep them private to this user
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._tokens, f, indent=2)
+            os.replace(tmp_path, self.sessions_file)
+
+    def needs_refresh(self, team_id):
+        tokens = self._tokens.get(team_id)
+        return not tokens or time.time() >= tokens['expires_at'] - self.refresh_margin
+
+    def refresh(self, team_id, stale_generation=None):
+        """
+        Capture new tokens for an account if they are due (or known to be stale)
+
+        Callers that arrive while another thread is capturing wait for it and
+        then use its tokens instead of starting a second browser.
+
+        Args:
+            team_id (str): Account to refresh
+            stale_generation (int, optional): Generation a request was refused
+                                              with; refreshed unless already replaced
+
+        Returns:
+            dict: The account's current tokens
+        """
+        if team_id not in self.accounts:
+            raise KeyError(f"No account configured for team {team_id}")
+        with self._locks[team_id]:
+            tokens = self._tokens.get(team_id)
+            stale = stale_generation is not None and tokens and tokens['generation'] == stale_generation
+            if stale and time.time() - tokens['captured_at'] < RECAPTURE_INTERVAL:
+                # Fresh tokens being refused means the account, not the session, is the problem
+                raise SessionExpired(f"Team {team_id} tokens refused right after capture")
+            if not stale and not self.needs_refresh(team_id):
+                return tokens
+
+            logger.info(f"🔑 Capturing tokens for team {team_id}")
+            started = time.perf_counter()
+            captured = self.capture(self.accounts[team_id])
+            if not captured or not captured.get('cookies'):
+                raise SessionExpired(f"Could not capture tokens for team {team_id}")
+            self.captures += 1
+            now = time.time()
+            generation = (tokens or {}).get('generation', 0) + 1
+            tokens = dict(captured, captured_at=now, expires_at=_expires_at(captured, now), generation=generation)
+            self._tokens[team_id] = tokens
+            self._save_tokens()
+            if team_id in self._sessions:
+                self._sessions[team_id].apply_tokens(tokens, generation)
+            logger.info(f"✅ Team {team_id} tokens captured in {time.perf_counter() - started:.1f}s")
+            return tokens
+
+    def session(self, team_id):
+        """
+        Logged-in session for a team, capturing tokens first if needed
+
+        Args:
+            team_id (str): Team id of a configured account
+
+        Returns:
+            AccountSession: Shared by every caller for this team
+        """
+        team_id = str(team_id)
+        tokens = self.refresh(team_id)
+        with self._locks[team_id]:
+            if team_id not in self._sessions:
+                session = AccountSession(self, team_id)
+                session.apply_tokens(tokens, tokens['generation'])
+                self._sessions[team_id] = session
+            return self._sessions[team_id]
+
+    def refresh_due(self, workers=CAPTURE_WORKERS):
+        """
+        Refresh every account whose tokens expire within the refresh margin
+
+        Returns:
+            GatherResult: Per-team outcome (errors for accounts that failed)
+        """
+        due = [team_id for team_id in self.accounts if self.needs_refresh(team_id)]
+        if not due:
+            return gather({})
+        logger.info(f"🔄 Refreshing sessions for {len(due)} teams")
+        # Each capture drives its own browser, which can take a while
+        results = gather({team_id: (lambda team_id=team_id: self.refresh(team_id)) for team_id in due},
+                         timeout=CAPTURE_TIMEOUT, workers=workers)
+        logger.info(f"🔄 Session refresh: {results.summary()}")
+        return results
+
+    def start(self, interval=300):
+        """Refresh sessions in a background thread every interval seconds"""
+        if self._refresher and self._refresher.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.refresh_due()
+                except Exception as e:
+                    logger.error(f"❌ Session refresh failed: {e}")
+                self._stop.wait(interval)
+
+        self._refresher = threading.Thread(target=run, name='session-refresh', daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def dashboard_data(self, team_ids=None, timeout=CALL_TIMEOUT):
+        """
+        Dashboard data for many teams at once, each over its own account's session
+
+        Args:
+            team_ids (list, optional): Teams to fetch (default: every account)
+            timeout (float): Seconds each dashboard call may take
+
+        Returns:
+            dict: Team id -> dashboard data (or {'error': ...} for a team that failed)
+        """
+        from afl_fantasy_data_service import AFLFantasyDataService
+
+        def fetch(team_id):
+            service = AFLFantasyDataService(team_id=team_id, session=self.session(team_id))
+            return service.get_all_dashboard_data(timeout=timeout)
+
+        team_ids = [str(team_id) for team_id in (team_ids or self.team_ids)]
+        # A team that needs a browser login first is allowed time for it
+        results = gather({team_id: (lambda team_id=team_id: fetch(team_id)) for team_id in team_ids},
+                         timeout=timeout + CAPTURE_TIMEOUT)
+        data = dict(results.values)
+        for team_id, error in results.errors.items():
+            data[team_id] = {'error': error}
+        return data
+
+    def status(self):
+        """Token state per team, for health checks"""
+        now = time.time()
+        return {
+            team_id: {
+                'has_tokens': team_id in self._tokens,
+                'expires_in': round(self._tokens[team_id]['expires_at'] - now) if team_id in self._tokens else None
+            }
+            for team_id in self.accounts
+        }
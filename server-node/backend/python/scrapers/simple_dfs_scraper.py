@@ -1,22 +1,20 @@
-import requests
 import pandas as pd
 import json
-import time
 from bs4 import BeautifulSoup
 
-def scrape_player_data(player_id, url):
-    """Scrape individual player data from DFS Australia"""
+from fetch_engine import fetch, fetch_many
+from page_cache import extract_tables, get_page_cache, table_digest
+import replay
+
+def scrape_player_data(player_id, url, content=None):
+    """Scrape individual player data from DFS Australia (parses content if already fetched)"""
     print(f"🔄 Scraping {player_id}...")
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        if content is None:
+            content = fetch(url).content
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(content, 'html.parser')
         
         # Extract player data
         player_data = {
@@ -90,22 +88,54 @@ def main():
     output_folder = "dfs_player_summary"
     os.makedirs(output_folder, exist_ok=True)
     
-    # Scrape each player
+    # Last run's players, reused for pages that have not changed
+    previous = {}
+    try:
+        with open('scraped_players.json', 'r') as f:
+            previous = {str(p['playerId']): p for p in json.load(f)}
+    except (OSError, ValueError, KeyError, TypeError):
+        previous = {}
+    
+    # Fetch every player page concurrently (the engine rate limits per host), then parse
+    cache = get_page_cache()
     all_player_data = []
+    pages = fetch_many(df["url"].tolist(), cache=cache)
     
-    for index, row in df.iterrows():
+    for (index, row), page in zip(df.iterrows(), pages):
         player_id = row["playerId"]
         url = row["url"]
+        last = previous.get(str(player_id))
         
-        player_data = scrape_player_data(player_id, url)
+        if not page.ok:
+            print(f"❌ Error scraping {player_id}: {page.error or f'HTTP {page.status}'}")
+            continue
+        
+        if page.not_modified:
+            if last:
+                all_player_data.append(last)
+                continue
+            content = None  # nothing kept from last run, fetch in full
+        else:
+            # Skip parsing when the stats tables hash the same as last run
+            content = page.content
+            digest = table_digest(*extract_tables(content))
+            changed = cache.record(url, digest)
+            if last and not changed and not replay.replaying():
+                all_player_data.append(last)
+                continue
+        
+        player_data = scrape_player_data(player_id, url, content)
         if player_data:
             all_player_data.append(player_data)
-        
-        # Add delay to be respectful to the server
-        time.sleep(2)
     
-    # Save consolidated data
-    if all_player_data:
+    cache.save()
+    print(f"⏭️ {cache.report()}")
+    
+    # Save consolidated data (nothing to write when every page was skipped)
+    stats = cache.summary()
+    if previous and stats['skipped'] == stats['pages'] == len(all_player_data) == len(previous):
+        print("No player pages changed, scraped_players.json is up to date")
+    elif all_player_data:
         # Save as JSON
         with open('scraped_players.json', 'w') as f:
             json.dump(all_player_data, f, indent=2)
@@ -125,4 +155,7 @@ def main():
         print("No player data was successfully scraped")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    replay.configure_from_argv()
+    main()
+    if replay.mode():
+        print(replay.report())
@@ -0,0 +1,403 @@
+"""
+AFL Fantasy Table Extraction
+
+Pulls the scraped stats tables out of page HTML with one lxml parse and
+XPath lookups, instead of building a BeautifulSoup tree for the whole page
+and handing each table's HTML back to pd.read_html (which parses it again).
+Tables come back as DataFrames with the same columns and types read_html
+produces: header rows become column names, colspan/rowspan cells are
+expanded, and columns whose values are all numbers become int or float.
+
+Covers the DFS Australia player tables (fantasyPlayerCareer,
+vsOpponentCareer, playerGames) and the FootyWire ranking and breakeven
+tables. Without lxml the old BeautifulSoup + read_html path is used.
+
+Benchmark (old vs new parse throughput over saved pages or recorded
+fixtures, see replay.py):
+    python table_extract.py --benchmark [--corpus DIR]
+"""
+
+import glob
+import gzip
+import json
+import os
+import re
+import time
+from io import StringIO
+
+import pandas as pd
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# DFS Australia player page tables, by sheet name
+DFS_TABLE_IDS = {
+    "Career Averages": "fantasyPlayerCareer",
+    "Opponent Splits": "vsOpponentCareer",
+    "Game Logs": "playerGames"
+}
+
+# Cell values read_html treats as missing
+NA_VALUES = {'', 'NA', 'N/A', 'n/a', 'NaN', 'nan', '-NaN', '-nan', 'NULL', 'null', 'None', '#N/A', '<NA>'}
+
+_WHITESPACE_RE = re.compile(r'[\s\xa0]+')
+_INT_RE = re.compile(r'[+-]?(\d+|\d{1,3}(,\d{3})+)')
+_FLOAT_RE = re.compile(r'[+-]?(\d+|\d{1,3}(,\d{3})+)?\.\d*([eE][+-]?\d+)?|[+-]?\d+[eE][+-]?\d+')
+
+
+def parse_html(html):
+    """Parse page source once; the result can be passed to the extract functions"""
+    if not isinstance(html, (str, bytes)):
+        return html
+    return lxml.html.fromstring(html)
+
+
+def _text(element):
+    return _WHITESPACE_RE.sub(' ', element.text_content()).strip()
+
+
+def _span(cell, name):
+    try:
+        return max(int(cell.get(name, 1)), 1)
+    except ValueError:
+        return 1
+
+
+def _expand(rows):
+    """Cell text per row with colspan and rowspan cells repeated, as read_html does"""
+    result = []
+    pending = []  # (column, text, rows left) carried down from rowspan cells
+    for row in rows:
+        texts = []
+        next_pending = []
+        column = 0
+        for cell in row.xpath('./td|./th'):
+            while pending and pending[0][0] <= column:
+                _, text, left = pending.pop(0)
+                texts.append(text)
+                if left > 1:
+                    next_pending.append((column, text, left - 1))
+                column += 1
+            text = _text(cell)
+            rowspan = _span(cell, 'rowspan')
+            for _ in range(_span(cell, 'colspan')):
+                texts.append(text)
+                if rowspan > 1:
+                    next_pending.append((column, text, rowspan - 1))
+                column += 1
+        for _, text, left in pending:
+            texts.append(text)
+            if left > 1:
+                next_pending.append((column, text, left - 1))
+            column += 1
+        result.append(texts)
+        pending = next_pending
+    while pending:
+        texts, next_pending = [], []
+        for column, text, left in pending:
+            texts.append(text)
+            if left > 1:
+                next_pending.append((column, text, left - 1))
+        result.append(texts)
+        pending = next_pending
+    return result
+
+
+def _typed(values):
+    """A column as read_html would type it: int, float, or strings with NaN for missing"""
+    cells = [None if value in NA_VALUES else value for value in values]
+    present = [value for value in cells if value is not None]
+    if present and all(_INT_RE.fullmatch(value) for value in present):
+        numbers = [None if value is None else int(value.replace(',', '')) for value in cells]
+        if len(present) == len(cells):
+            return pd.array(numbers, dtype='int64')
+        return pd.array([float('nan') if n is None else float(n) for n in numbers], dtype='float64')
+    if present and all(_INT_RE.fullmatch(value) or _FLOAT_RE.fullmatch(value) for value in present):
+        return pd.array([float('nan') if value is None else float(value.replace(',', '')) for value in cells],
+                        dtype='float64')
+    if not present:
+        return pd.array([float('nan')] * len(cells), dtype='float64')
+    return [float('nan') if value is None else value for value in cells]
+
+
+def _header_names(header_rows, width):
+    """Column names from the header rows: strings for one row, tuples for several"""
+    levels = []
+    for level, row in enumerate(header_rows):
+        row = row + [''] * (width - len(row))
+        names = []
+        for i, name in enumerate(row[:width]):
+            if name:
+                names.append(name)
+            else:
+                names.append(f"Unnamed: {i}_level_{level}" if len(header_rows) > 1 else f"Unnamed: {i}")
+        levels.append(names)
+    if len(levels) > 1:
+        return pd.MultiIndex.from_tuples(list(zip(*levels, strict=True)))
+
+    # Repeated names get .1, .2, ... suffixes
+    names, seen = [], {}
+    for name in levels[0]:
+        if name in seen:
+            seen[name] += 1
+            candidate = f"{name}.{seen[name]}"
+            while candidate in seen:
+                seen[name] += 1
+                candidate = f"{name}.{seen[name]}"
+            seen[candidate] = 0
+            names.append(candidate)
+        else:
+            seen[name] = 0
+            names.append(name)
+    return names
+
+
+def table_frame(table):
+    """
+    Convert an lxml <table> element to a DataFrame
+
+    Returns:
+        DataFrame: Typed columns, or None if the table has no rows
+    """
+    header_rows = table.xpath('./thead/tr')
+    body_rows = table.xpath('./tbody/tr|./tr')
+    footer_rows = table.xpath('./tfoot/tr')
+    if not header_rows:
+        # Leading rows made only of <th> cells are the header
+        while body_rows and body_rows[0].xpath('./th') and not body_rows[0].xpath('./td'):
+            header_rows.append(body_rows.pop(0))
+
+    rows = _expand(header_rows + body_rows + footer_rows)
+    header, body = rows[:len(header_rows)], rows[len(header_rows):]
+    body = [row for row in body if row]
+    if not header and not body:
+        return None
+
+    width = max(len(row) for row in header + body)
+    body = [row + [''] * (width - len(row)) for row in body]
+    columns = _header_names(header, width) if header else list(range(width))
+    data = [_typed([row[i] for row in body]) for i in range(width)]
+    frame = pd.DataFrame(dict(enumerate(data)))
+    frame.columns = columns
+    return frame
+
+
+def extract_tables_by_id(html, table_ids=None):
+    """
+    Extract tables by element id from one parse of the page
+
+    Args:
+        html (str, bytes or lxml element): Page source, or a parse_html() result
+        table_ids (dict, optional): Sheet name -> table id (defaults to DFS_TABLE_IDS)
+
+    Returns:
+        dict: Sheet name -> DataFrame, for the tables found on the page
+    """
+    table_ids = table_ids or DFS_TABLE_IDS
+    if not LXML_AVAILABLE:
+        return extract_tables_by_id_bs4(html, table_ids)
+
+    doc = parse_html(html)
+    tables = {}
+    for sheet_name, table_id in table_ids.items():
+        found = doc.xpath('//table[@id=$table_id]', table_id=table_id)
+        if found:
+            frame = table_frame(found[0])
+            if frame is not None:
+                tables[sheet_name] = frame
+    return tables
+
+
+def extract_tables_by_id_bs4(html, table_ids=None):
+    """The original extraction path: BeautifulSoup tree, then read_html per table"""
+    from bs4 import BeautifulSoup
+
+    table_ids = table_ids or DFS_TABLE_IDS
+    soup = BeautifulSoup(html, "html.parser")
+    tables = {}
+    for sheet_name, table_id in table_ids.items():
+        table = soup.select_one(f"table#{table_id}")
+        if table:
+            tables[sheet_name] = pd.read_html(StringIO(str(table)))[0]
+    return tables
+
+
+def data_table_rows(html, header_marker, table_class='data'):
+    """
+    Find a FootyWire data table by a header it contains and read its rows
+
+    The first table with the given class whose <th> cells mention
+    header_marker is used. A cell's value is its link text when it has a
+    link (player names), otherwise its text.
+
+    Args:
+        html (str, bytes or lxml element): Page source, or a parse_html() result
+        header_marker (str): Text one header must contain (e.g. 'Player', 'Break')
+        table_class (str): Class of the candidate tables
+
+    Returns:
+        tuple: (list of header names, list of rows as lists of cell strings);
+               (None, []) if no data tables are on the page, ([], []) if none matches
+    """
+    if not LXML_AVAILABLE:
+        return _data_table_rows_bs4(html, header_marker, table_class)
+
+    doc = parse_html(html)
+    candidates = doc.xpath('//table[contains(concat(" ", normalize-space(@class), " "), $cls)]',
+                           cls=f" {table_class} ")
+    if not candidates:
+        return None, []
+    for table in candidates:
+        if any(header_marker in th.text_content() for th in table.xpath('.//th')):
+            rows = table.xpath('.//tr')
+            if not rows:
+                return [], []
+            headers = [th.text_content().strip() for th in rows[0].xpath('./th')]
+            body = []
+            for row in rows[1:]:
+                cells = []
+                for cell in row.xpath('./td|./th'):
+                    link = cell.find('.//a')
+                    cells.append((link if link is not None else cell).text_content().strip())
+                body.append(cells)
+            return headers, body
+    return [], []
+
+
+def _data_table_rows_bs4(html, header_marker, table_class):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    candidates = soup.find_all('table', class_=table_class)
+    if not candidates:
+        return None, []
+    for table in candidates:
+        if any(header_marker in th.text for th in table.find_all('th')):
+            rows = table.find_all('tr')
+            if not rows:
+                return [], []
+            headers = [th.text.strip() for th in rows[0].find_all('th')]
+            body = []
+            for row in rows[1:]:
+                cells = []
+                for cell in row.find_all(['td', 'th']):
+                    link = cell.find('a')
+                    cells.append((link or cell).text.strip())
+                body.append(cells)
+            return headers, body
+    return [], []
+
+
+def data_table_frame(html, header_marker, table_class='data'):
+    """A FootyWire data table as a typed DataFrame (None if not found)"""
+    headers, rows = data_table_rows(html, header_marker, table_class)
+    if not headers:
+        return None
+    width = max([len(headers)] + [len(row) for row in rows])
+    rows = [row + [''] * (width - len(row)) for row in rows if any(row)]
+    columns = _header_names([headers], width)
+    frame = pd.DataFrame({i: _typed([row[i] for row in rows]) for i in range(width)})
+    frame.columns = columns
+    return frame
+
+
+def _sample_page(seed, rows=40):
+    """A synthetic DFS Australia player page (about the size of a real one)"""
+    def table(table_id, header, count):
+        head = ''.join(f'<th>{name}</th>' for name in header)
+        body = ''.join(
+            '<tr>' + ''.join(f'<td>{(seed * 7 + r * 13 + c * 3) % 140}</td>' if c else f'<td><a href="#">Row {r}</a></td>'
+                             for c in range(len(header))) + '</tr>'
+            for r in range(count)
+        )
+        return f'<table id="{table_id}" class="table"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+    stats = ['Season', 'Team', 'Games', 'Avg', 'Min', 'Max', 'TOG', 'K', 'HB', 'M', 'T', 'HO', 'FF', 'FA']
+    filler = ''.join(f'<div class="nav"><a href="/p/{i}">Link {i}</a><script>var x{i} = {i};</script></div>'
+                     for i in range(300))
+    return (f'<html><head><title>Player {seed}</title></head><body>{filler}'
+            f'{table("fantasyPlayerCareer", stats, 8)}'
+            f'{table("vsOpponentCareer", ["Opponent"] + stats[2:], 18)}'
+            f'{table("playerGames", ["Round"] + stats[1:] + ["Price", "BE"], rows)}'
+            f'</body></html>')
+
+
+def benchmark(corpus=None, pages=50, repeat=3):
+    """
+    Compare parse throughput of the old (BeautifulSoup + read_html) and new (lxml) paths
+
+    Args:
+        corpus (str, optional): Folder of saved .html pages or recorded .json.gz
+                                fixtures (synthetic pages if not given)
+        pages (int): Synthetic pages to generate when there is no corpus
+        repeat (int): Passes over the corpus per path (best pass is reported)
+
+    Returns:
+        dict: Pages, per-path pages/sec, speedup and whether both paths agree
+    """
+    if corpus:
+        documents = []
+        for path in sorted(glob.glob(os.path.join(corpus, '*.html'))):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                documents.append(f.read())
+        for path in sorted(glob.glob(os.path.join(corpus, '**', '*.json.gz'), recursive=True)):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                fixture = json.load(f)
+            documents.append(fixture.get('source') or fixture.get('body', ''))
+    else:
+        documents = [_sample_page(seed) for seed in range(pages)]
+    if not documents:
+        raise ValueError(f"No .html pages or fixtures in {corpus}")
+
+    def run(extract):
+        best, results = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = [extract(document, DFS_TABLE_IDS) for document in documents]
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, results
+
+    old_time, old_results = run(extract_tables_by_id_bs4)
+    new_time, new_results = run(extract_tables_by_id)
+
+    matches = True
+    for old, new in zip(old_results, new_results, strict=True):
+        if old.keys() != new.keys():
+            matches = False
+            continue
+        for name in old:
+            try:
+                pd.testing.assert_frame_equal(old[name], new[name], check_dtype=False)
+            except AssertionError:
+                matches = False
+
+    return {
+        'pages': len(documents),
+        'bs4_pages_per_sec': round(len(documents) / old_time, 1),
+        'lxml_pages_per_sec': round(len(documents) / new_time, 1),
+        'speedup': round(old_time / new_time, 1),
+        'results_match': matches
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AFL Fantasy table extraction")
+    parser.add_argument("--benchmark", action="store_true", help="Compare old and new parse throughput")
+    parser.add_argument("--corpus", help="Folder of saved .html pages or recorded fixtures to benchmark with")
+    parser.add_argument("--pages", type=int, default=50, help="Synthetic pages when there is no corpus")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = benchmark(args.corpus, pages=args.pages)
+        print(f"📄 {result['pages']} pages")
+        print(f"🐢 BeautifulSoup + read_html: {result['bs4_pages_per_sec']} pages/s")
+        print(f"⚡ lxml/XPath: {result['lxml_pages_per_sec']} pages/s ({result['speedup']}x)")
+        print(f"{'✅' if result['results_match'] else '❌'} Results match: {result['results_match']}")
+    else:
+        parser.print_help()
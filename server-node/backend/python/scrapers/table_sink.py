@@ -0,0 +1,353 @@
+"""
+AFL Fantasy Scraper Table Sink
+
+Collects the tables scraped for each player and writes them as columnar
+datasets: one Parquet dataset per table (Career Averages, Opponent Splits,
+Game Logs, ...) in which every row carries the player_id and scraped_at it
+came from. Rows are buffered and written a batch of players at a time;
+a batch becomes visible to readers only when its manifest is written, so
+a crash mid-batch never leaves part of a batch in the dataset. Per-player
+Excel workbooks can still be written as a side output.
+
+Layout:
+    <root>/<table>/scraped_date=<YYYY-MM-DD>/part-<batch>.parquet
+    <root>/_manifests/<batch>.json
+"""
+
+import contextlib
+import functools
+import json
+import logging
+import os
+import re
+import tempfile
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DATASET_ROOT = os.path.join('dfs_player_summary', 'tables')
+MANIFEST_DIR = '_manifests'
+
+# Players buffered before a batch is committed
+BATCH_SIZE = 50
+
+# Cell values the sites use for "no value"; stored as nulls
+PLACEHOLDERS = {'', '-', '\u2013', '\u2014', 'N/A', 'n/a', 'NA'}
+
+
+def table_slug(name):
+    """Dataset name for a table: 'Career Averages' -> 'career_averages'"""
+    return re.sub(r'[^a-z0-9]+', '_', str(name).lower()).strip('_')
+
+
+def _column_name(column):
+    if isinstance(column, tuple):
+        parts = [str(p) for p in column if str(p) and not str(p).startswith('Unnamed')]
+        return ' '.join(dict.fromkeys(parts)) or 'column'
+    return str(column)
+
+
+def _normalise(df):
+    """
+    Type one player's scraped table
+
+    Column names are flattened to unique strings, placeholders such as '-'
+    become nulls, and each column is integer or float if every remaining
+    value parses as a number, otherwise string.
+    """
+    df = df.copy()
+    names, seen = [], {}
+    for column in df.columns:
+        name = _column_name(column)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    df.columns = names
+
+    for name in df.columns:
+        if name in ('player_id', 'scraped_at'):
+            continue
+        column = df[name].mask(df[name].map(lambda v: isinstance(v, str) and v.strip() in PLACEHOLDERS))
+        numeric = pd.to_numeric(column, errors='coerce')
+        if numeric.notna().sum() == column.notna().sum():
+            whole = numeric.dropna()
+            df[name] = numeric.astype('Int64' if (whole == whole.round()).all() else 'float64')
+        else:
+            df[name] = column.astype('string')
+    return df
+
+
+def _combine(frames):
+    """
+    Stack the players' tables into one frame with one type per column
+
+    Each player's table is typed on its own, so a placeholder in one
+    player's table does not turn everyone's numbers into strings; only a
+    column that holds text for some players and numbers for others is
+    stored as string.
+    """
+    df = pd.concat([_normalise(frame) for frame in frames], ignore_index=True, sort=False)
+    for name in df.columns:
+        if df[name].dtype == object:
+            df[name] = df[name].astype('string')
+    return df
+
+
+def _atomic_write(path, write):
+    """Write a file through a temporary file in the same directory"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Keep the extension, some writers pick their format from it
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp' + os.path.splitext(path)[1])
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+class TableSink:
+    """
+    Buffered, batch-atomic writer of scraped player tables
+
+    Use as a context manager (or call close()) so the last batch is committed.
+    """
+
+    def __init__(self, root=DATASET_ROOT, batch_size=BATCH_SIZE, excel_folder=None, parquet=True):
+        """
+        Args:
+            root (str): Dataset root folder
+            batch_size (int): Players per committed batch
+            excel_folder (str, optional): Also write <player_id>.xlsx workbooks here
+                                          (the only output when pyarrow is missing)
+            parquet (bool): Write the datasets (off for processes that hand
+                            their tables to another writer)
+        """
+        self.parquet = parquet and PYARROW_AVAILABLE
+        if parquet and not PYARROW_AVAILABLE:
+            if not excel_folder:
+                raise ImportError("pyarrow is required for the table sink (pip install pyarrow)")
+            logger.warning("⚠️ pyarrow not installed, writing Excel workbooks only")
+        self.root = root
+        self.batch_size = batch_size
+        self.excel_folder = excel_folder
+        self._frames = {}
+        self._players = []
+        self.stats = {'batches': 0, 'players': 0, 'rows': 0}
+
+    def add(self, player_id, tables, scraped_at=None):
+        """
+        Buffer one player's tables
+
+        Args:
+            player_id (str): Player identifier
+            tables (dict): Table name -> DataFrame
+            scraped_at (str, optional): ISO timestamp (defaults to now)
+
+        Returns:
+            str: Batch id if this player completed a batch and it was committed, else None
+        """
+        scraped_at = scraped_at or datetime.now().isoformat()
+        for name, df in tables.items():
+            if not self.parquet or df is None or df.empty:
+                continue
+            frame = df.copy()
+            frame.insert(0, 'scraped_at', scraped_at)
+            frame.insert(0, 'player_id', str(player_id))
+            self._frames.setdefault(name, []).append(frame)
+        self._players.append(str(player_id))
+
+        if self.excel_folder:
+            self._write_excel(player_id, tables)
+        if len(self._players) >= self.batch_size:
+            return self.commit()
+        return None
+
+    def _write_excel(self, player_id, tables):
+        os.makedirs(self.excel_folder, exist_ok=True)
+        path = os.path.join(self.excel_folder, f"{player_id}.xlsx")
+
+        def write(tmp):
+            with pd.ExcelWriter(tmp, engine='openpyxl') as writer:
+                for name, df in tables.items():
+                    # Excel sheet names: no / or :, at most 31 characters
+                    df.to_excel(writer, sheet_name=str(name).replace('/', '-').replace(':', '')[:31], index=False)
+
+        try:
+            _atomic_write(path, write)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write {path}: {e}")
+
+    def commit(self):
+        """
+        Write the buffered batch, then its manifest
+
+        Returns:
+            str: Batch id, or None if nothing was buffered
+        """
+        if not self._players:
+            return None
+        if not self.parquet:
+            self._players = []
+            return None
+        now = datetime.now()
+        batch_id = f"{now.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        written, files, rows = [], {}, 0
+        try:
+            for name, frames in self._frames.items():
+                slug = table_slug(name)
+                df = _combine(frames)
+                df = df.sort_values('player_id', kind='stable')
+                relative = os.path.join(slug, f"scraped_date={now.strftime('%Y-%m-%d')}", f"part-{batch_id}.parquet")
+                path = os.path.join(self.root, relative)
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                _atomic_write(path, functools.partial(pq.write_table, table, compression='zstd'))
+                written.append(path)
+                files[slug] = {'path': relative, 'rows': len(df), 'name': str(name)}
+                rows += len(df)
+
+            manifest = {
+                'batch_id': batch_id,
+                'committed_at': now.isoformat(),
+                'players': self._players,
+                'tables': files
+            }
+            _atomic_write(os.path.join(self.root, MANIFEST_DIR, f"{batch_id}.json"),
+                          lambda tmp: _write_json(tmp, manifest))
+        except Exception:
+            # Without a manifest the parts are invisible; remove them anyway
+            for path in written:
+                with contextlib.suppress(OSError):
+                    os.unlink(path)
+            raise
+
+        self.stats['batches'] += 1
+        self.stats['players'] += len(self._players)
+        self.stats['rows'] += rows
+        logger.info(f"💾 Committed batch {batch_id}: {len(self._players)} players, {rows} rows")
+        self._frames = {}
+        self._players = []
+        return batch_id
+
+    def close(self):
+        """Commit whatever is still buffered"""
+        return self.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_manifests(root=DATASET_ROOT):
+    """Committed batch manifests, oldest first"""
+    directory = os.path.join(root, MANIFEST_DIR)
+    manifests = []
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                manifests.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    # Batch ids only have second resolution; batches committed within a second sort by time
+    manifests.sort(key=lambda m: m.get('committed_at', ''))
+    return manifests
+
+
+def latest_scrapes(root=DATASET_ROOT):
+    """
+    When each player was last committed
+
+    Returns:
+        dict: player_id -> committed_at (ISO timestamp)
+    """
+    latest = {}
+    for manifest in load_manifests(root):
+        for player_id in manifest.get('players', []):
+            latest[player_id] = manifest['committed_at']
+    return latest
+
+
+def read_table(name, root=DATASET_ROOT, player_ids=None, latest=True):
+    """
+    Read one table's committed rows
+
+    Args:
+        name (str): Table name or slug ('Game Logs' or 'game_logs')
+        root (str): Dataset root folder
+        player_ids (iterable, optional): Only these players
+        latest (bool): Keep only each player's most recent scrape
+
+    Returns:
+        DataFrame: Rows with player_id and scraped_at columns (empty if none)
+    """
+    slug = table_slug(name)
+    paths = [os.path.join(root, m['tables'][slug]['path'])
+             for m in load_manifests(root) if slug in m.get('tables', {})]
+    filters = [('player_id', 'in', [str(p) for p in player_ids])] if player_ids is not None else None
+    frames = []
+    for path in paths:
+        try:
+            frames.append(pq.read_table(path, filters=filters).to_pandas())
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"⚠️ Could not read {path}: {e}")
+    if not frames:
+        return pd.DataFrame(columns=['player_id', 'scraped_at'])
+
+    df = pd.concat(frames, ignore_index=True, sort=False)
+    if latest and not df.empty:
+        newest = df.groupby('player_id')['scraped_at'].transform('max')
+        df = df[df['scraped_at'] == newest].reset_index(drop=True)
+    return df
+
+
+def load_player_tables(root=DATASET_ROOT, player_ids=None):
+    """
+    Every player's most recent tables, grouped by player
+
+    Returns:
+        dict: player_id -> {table slug: list of row dicts}
+    """
+    tables = {}
+    for manifest in load_manifests(root):
+        tables.update({slug: info.get('name', slug) for slug, info in manifest.get('tables', {}).items()})
+
+    players = {}
+    for slug in tables:
+        df = read_table(slug, root, player_ids)
+        if df.empty:
+            continue
+        for player_id, rows in df.groupby('player_id', sort=False):
+            # Drop columns only other players' tables have
+            rows = rows.drop(columns=['player_id', 'scraped_at']).dropna(axis=1, how='all')
+            rows = rows.astype(object).where(rows.notna(), None)
+            players.setdefault(player_id, {})[slug] = rows.to_dict('records')
+    return players
@@ -0,0 +1,68 @@
+"""
+Test the scraper page cache: conditional headers, table hashes and skip stats
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from page_cache import PageCache, extract_tables, table_digest
+
+PAGE = """
+<html><body>
+<table id="stats"><tr><td>Bont</td><td>120</td></tr></table>
+<div><TABLE class="x" id='games'><tr><td>R1</td></tr></TABLE></div>
+</body></html>
+"""
+
+
+def test_extract_tables_by_id_without_parsing():
+    assert len(extract_tables(PAGE)) == 2
+    stats, games, missing = extract_tables(PAGE.encode('utf-8'), ['stats', 'games', 'nope'])
+
+    assert 'Bont' in stats
+    assert games.startswith('<TABLE')
+    assert missing is None
+    # Missing tables hash like empty ones, and order matters
+    assert table_digest(stats, None) == table_digest(stats, '')
+    assert table_digest(stats, games) != table_digest(games, stats)
+
+
+def test_validators_and_table_hashes_survive_a_save(tmp_path):
+    path = str(tmp_path / 'scrape_cache.json')
+    cache = PageCache(path)
+    url = 'https://example.com/player/1'
+    digest = table_digest(*extract_tables(PAGE, ['stats']))
+
+    assert cache.headers(url) == {}
+    cache.remember(url, {'ETag': '"abc"', 'Last-Modified': 'Mon, 10 Mar 2025 00:00:00 GMT'})
+    assert cache.record(url, digest)
+    cache.save()
+
+    reloaded = PageCache(path)
+    assert reloaded.headers(url) == {'If-None-Match': '"abc"',
+                                     'If-Modified-Since': 'Mon, 10 Mar 2025 00:00:00 GMT'}
+    assert reloaded.unchanged(url, digest)
+    assert not reloaded.record(url, digest)
+    assert json.loads(Path(path).read_text())[url]['table_hash'] == digest
+
+
+def test_skip_summary(tmp_path):
+    cache = PageCache(str(tmp_path / 'scrape_cache.json'))
+    cache.not_modified('a')
+    cache.record('b', 'h1')
+    cache.record('b', 'h1')
+    cache.record('c', 'h2')
+
+    summary = cache.summary()
+    assert summary == {'pages': 4, 'not_modified': 1, 'unchanged': 1, 'changed': 2,
+                       'skipped': 2, 'skip_rate': 0.5}
+    assert cache.report().startswith('2/4 pages skipped (50.0%)')
+
+
+def test_unreadable_cache_file_starts_empty(tmp_path):
+    path = tmp_path / 'scrape_cache.json'
+    path.write_text('{not json')
+    assert PageCache(str(path)).entries == {}
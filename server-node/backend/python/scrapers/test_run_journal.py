@@ -0,0 +1,84 @@
+"""
+Test the scrape run journal: resume, retrying failures and sharding
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from run_journal import RunJournal, parse_shard, shard_of
+
+PLAYERS = [(f"CD_{i}", f"https://example.com/{i}") for i in range(8)]
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = RunJournal(str(tmp_path / 'journal.sqlite'))
+    yield journal
+    journal.close()
+
+
+def scrape(journal, players, fail=(), stop_after=None):
+    """Scrape players in order, failing some and dying after stop_after of them"""
+    for n, (player_id, _) in enumerate(players):
+        if stop_after is not None and n == stop_after:
+            journal.mark_running(player_id)
+            return
+        journal.mark_running(player_id)
+        if player_id in fail:
+            journal.mark_failed(player_id, 'timeout')
+        else:
+            journal.mark_done([(player_id, f"hash-{player_id}")])
+
+
+def test_resume_picks_up_where_the_run_stopped(journal):
+    scrape(journal, journal.start(PLAYERS, source='dfs'), fail={'CD_1'}, stop_after=4)
+    run_id = journal.run_id
+
+    remaining = journal.start(PLAYERS, resume=True, source='dfs')
+
+    assert journal.run_id == run_id
+    # The player being scraped when the run died comes first, failures are not retried
+    assert [player_id for player_id, _ in remaining] == ['CD_4', 'CD_5', 'CD_6', 'CD_7']
+    scrape(journal, remaining)
+    summary = journal.finish()
+    assert summary['done'] == 7 and summary['failed'] == 1
+    assert summary['attempts'] == 9
+
+
+def test_only_failed_retries_the_last_runs_failures(journal):
+    scrape(journal, journal.start(PLAYERS, source='dfs'), fail={'CD_2', 'CD_5'})
+    assert journal.finish()['failed'] == 2
+
+    retry = journal.start(PLAYERS, only_failed=True, source='dfs')
+    assert [player_id for player_id, _ in retry] == ['CD_2', 'CD_5']
+    scrape(journal, retry)
+    assert journal.finish() == {'run_id': journal.run_id, 'attempts': 10, 'pending': 0,
+                                'running': 0, 'done': 8, 'failed': 0, 'skipped': 0}
+
+
+def test_resume_without_a_previous_run_starts_a_new_one(journal):
+    journal.start(PLAYERS[:2], source='other')
+    assert len(journal.start(PLAYERS, resume=True, source='dfs')) == len(PLAYERS)
+
+
+def test_shards_split_the_list_deterministically(journal):
+    shards = [journal.start(PLAYERS, shard=(i, 3), source='dfs') for i in range(3)]
+
+    assert sorted(p for shard in shards for p in shard) == sorted(PLAYERS)
+    assert all(shard_of(player_id, 3) == i for i, shard in enumerate(shards) for player_id, _ in shard)
+    # Each shard resumes its own run
+    assert journal.start(PLAYERS, resume=True, shard=(1, 3), source='dfs') == shards[1]
+
+
+@pytest.mark.parametrize('value', ['4', '1/x', '3/3', '-1/2', '0/0', '1/2/3'])
+def test_parse_shard_rejects_bad_specs(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_parse_shard():
+    assert parse_shard('2/4') == (2, 4)
@@ -0,0 +1,65 @@
+"""
+Test scatter-gather: per-call timeouts, failures and partial dashboard results
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).parent))
+
+from afl_fantasy_data_service import AFLFantasyDataService
+from scatter_gather import gather
+
+
+def test_values_keep_the_callers_order():
+    result = gather({'slow': lambda: time.sleep(0.05) or 'a', 'fast': lambda: 'b'}, timeout=1)
+
+    assert list(result.values) == ['slow', 'fast']
+    assert result.complete
+    assert result.get('missing', 'default') == 'default'
+
+
+def test_failures_and_timeouts_do_not_fail_the_rest():
+    release = threading.Event()
+    started = time.perf_counter()
+    result = gather({
+        'ok': lambda: 1,
+        'raises': lambda: 1 / 0,
+        'hangs': lambda: release.wait(5),
+    }, timeout=0.2)
+    elapsed = time.perf_counter() - started
+    release.set()
+
+    assert result.values == {'ok': 1}
+    assert result.errors['raises'] == 'division by zero'
+    assert result.errors['hangs'] == 'timed out after 0.2s'
+    assert elapsed < 1
+    assert '1/3 calls ok' in result.summary()
+
+
+def test_calls_queued_behind_a_hung_call_are_given_up_on():
+    release = threading.Event()
+    result = gather({'hangs': lambda: release.wait(5), 'queued': lambda: 1}, timeout=0.2, workers=1)
+    release.set()
+
+    assert result.errors == {'hangs': 'timed out after 0.2s', 'queued': 'not started before the deadline'}
+
+
+def test_dashboard_lists_failed_slow_and_empty_cards_as_unavailable():
+    service = AFLFantasyDataService(team_id='123', session=requests.Session())
+    release = threading.Event()
+    service.get_team_value_data = lambda: {'team_value': 15_200_000}
+    service.get_team_score_data = lambda: None
+    service.get_overall_rank_data = lambda: release.wait(5)
+    service.get_captain_data = lambda: 1 / 0
+
+    data = service.get_all_dashboard_data(timeout=0.2)
+    release.set()
+
+    assert data['team_value'] == {'team_value': 15_200_000}
+    assert data['unavailable'] == ['captain', 'overall_rank', 'team_score']
+    assert data['tokens_configured'] is False
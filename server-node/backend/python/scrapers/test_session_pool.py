@@ -0,0 +1,88 @@
+"""
+Test the session pool: one token capture however many requests are refused at once
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+sys.path.append(str(Path(__file__).parent))
+
+from session_pool import SessionPool
+
+URL = 'https://fantasy.afl.com.au/api/en/fantasy/teams/123'
+
+
+class FakeSite(BaseAdapter):
+    """Answers 200 to requests carrying an accepted session cookie, 401 otherwise"""
+
+    def __init__(self, accepted):
+        super().__init__()
+        self.accepted = accepted
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        cookie = request.headers.get('Cookie', '')
+        response.status_code = 200 if any(f"session={token}" == cookie for token in self.accepted) else 401
+        response._content = b'{}'
+        response.request, response.url = request, request.url
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('AFL_FANTASY_SESSION_COOKIE', raising=False)
+    now = time.time()
+    # Tokens captured an hour ago that the site no longer accepts
+    (tmp_path / 'sessions.json').write_text(json.dumps({'123': {
+        'cookies': [{'name': 'session', 'value': 'old'}],
+        'captured_at': now - 3600, 'expires_at': now + 3600, 'generation': 1
+    }}))
+
+    def capture(account):
+        time.sleep(0.1)
+        return {'cookies': [{'name': 'session', 'value': f"new{pool.captures + 1}"}]}
+
+    pool = SessionPool([{'team_id': '123'}], sessions_file=str(tmp_path / 'sessions.json'), capture=capture)
+    return pool
+
+
+def test_concurrent_refused_requests_capture_once(pool):
+    session = pool.session('123')
+    session.mount('https://', FakeSite({'new1'}))
+    start = threading.Barrier(8)
+    statuses = []
+
+    def get():
+        start.wait()
+        statuses.append(session.get(URL).status_code)
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 8
+    assert pool.captures == 1
+    assert session.generation == 2
+    assert json.loads(Path(pool.sessions_file).read_text())['123']['cookies'][0]['value'] == 'new1'
+
+
+def test_tokens_refused_right_after_capture_are_not_captured_again(pool):
+    session = pool.session('123')
+    session.mount('https://', FakeSite(set()))
+
+    assert session.get(URL).status_code == 401
+    assert session.get(URL).status_code == 401
+    assert pool.captures == 1
@@ -0,0 +1,74 @@
+"""
+Test the lxml table extraction against pandas.read_html and the BeautifulSoup path
+"""
+
+import sys
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+pytest.importorskip('lxml')
+
+from table_extract import (DFS_TABLE_IDS, _data_table_rows_bs4, _sample_page, data_table_rows,
+                           extract_tables_by_id)
+
+PAGE = """
+<html><body>
+<table id="fantasyPlayerCareer">
+  <thead><tr><th>Season</th><th>Avg</th><th>Avg</th><th></th></tr></thead>
+  <tbody>
+    <tr><td>2024</td><td>98.5</td><td>1,204</td><td>x</td></tr>
+    <tr><td>2025</td><td>-</td><td>990</td><td></td></tr>
+  </tbody>
+</table>
+<table id="vsOpponentCareer">
+  <tr><th colspan="2">Opponent</th><th rowspan="2">Games</th></tr>
+  <tr><th>Team</th><th>Venue</th></tr>
+  <tr><td>Carlton</td><td>MCG</td><td>4</td></tr>
+  <tr><td colspan="2">Geelong</td><td>2</td></tr>
+</table>
+<table id="playerGames"><tr><td>R1</td><td>110</td></tr><tr><td>R2</td><td>N/A</td></tr></table>
+</body></html>
+"""
+
+FOOTYWIRE = """
+<html><body>
+<table class="data"><tr><th>Round</th><th>Opponent</th></tr><tr><td>1</td><td>Geelong</td></tr></table>
+<table class="data sortable">
+  <tr><th>Player</th><th>Team</th><th>Price</th></tr>
+  <tr><td><a href="/p/1">Marcus Bontempelli</a> (WB)</td><td>WB</td><td>$1,100,000</td></tr>
+  <tr><td><a href="/p/2">Nick Daicos</a></td><td>COLL</td><td>$1,050,000</td></tr>
+</table>
+</body></html>
+"""
+
+
+def read_html(html, table_id):
+    return pd.read_html(StringIO(html), attrs={'id': table_id})[0]
+
+
+@pytest.mark.parametrize('html', [PAGE, _sample_page(3)], ids=['edge-cases', 'sample-page'])
+def test_tables_match_read_html(html):
+    tables = extract_tables_by_id(html, DFS_TABLE_IDS)
+
+    assert set(tables) == set(DFS_TABLE_IDS)
+    for name, table_id in DFS_TABLE_IDS.items():
+        pd.testing.assert_frame_equal(tables[name], read_html(html, table_id), check_dtype=False)
+
+
+def test_missing_tables_are_left_out():
+    assert extract_tables_by_id('<html><body><p>Not found</p></body></html>') == {}
+
+
+def test_data_table_rows_match_the_bs4_path():
+    assert data_table_rows(FOOTYWIRE, 'Player') == _data_table_rows_bs4(FOOTYWIRE, 'Player', 'data')
+    headers, rows = data_table_rows(FOOTYWIRE, 'Player')
+    assert headers == ['Player', 'Team', 'Price']
+    assert rows[0] == ['Marcus Bontempelli', 'WB', '$1,100,000']
+
+    assert data_table_rows(FOOTYWIRE, 'Breakevens') == ([], [])
+    assert data_table_rows('<table class="other"></table>', 'Player') == (None, [])
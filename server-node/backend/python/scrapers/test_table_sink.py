@@ -0,0 +1,81 @@
+"""
+Test the Parquet table sink: batch commits, reads and per-player column types
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+pytest.importorskip('pyarrow')
+
+import table_sink
+from table_sink import TableSink, latest_scrapes, load_manifests, load_player_tables, read_table
+
+
+def career(avg, games):
+    return pd.DataFrame({'Season': ['2024', '2025'], 'Fant Avg': avg, 'Games': games})
+
+
+def test_commit_and_read_round_trip(tmp_path):
+    root = str(tmp_path)
+    with TableSink(root, batch_size=2) as sink:
+        assert sink.add('CD_1', {'Career Averages': career(['98.5', '101.2'], ['22', '20'])}, '2025-03-01T10:00:00') is None
+        assert sink.add('CD_2', {'Career Averages': career(['80.0', '-'], ['21', '3'])}, '2025-03-01T10:00:00')
+        sink.add('CD_3', {'Career Averages': career(['75.5', '77.1'], ['18', '19'])}, '2025-03-01T10:05:00')
+
+    assert [m['players'] for m in load_manifests(root)] == [['CD_1', 'CD_2'], ['CD_3']]
+    assert set(latest_scrapes(root)) == {'CD_1', 'CD_2', 'CD_3'}
+
+    df = read_table('Career Averages', root)
+    assert len(df) == 6
+    # The '-' is a null; it does not turn everyone's averages into strings
+    assert pd.api.types.is_float_dtype(df['Fant Avg'])
+    assert pd.api.types.is_integer_dtype(df['Games'])
+    assert df.loc[df['player_id'] == 'CD_2', 'Fant Avg'].isna().sum() == 1
+
+    assert set(read_table('career_averages', root, player_ids=['CD_3'])['player_id']) == {'CD_3'}
+    tables = load_player_tables(root, player_ids=['CD_1'])
+    assert tables['CD_1']['career_averages'][1] == {'Season': 2025, 'Fant Avg': 101.2, 'Games': 20}
+
+
+def test_latest_scrape_per_player(tmp_path):
+    root = str(tmp_path)
+    with TableSink(root) as sink:
+        sink.add('CD_1', {'Career Averages': career(['90', '91'], ['1', '2'])}, '2025-03-01T10:00:00')
+    with TableSink(root) as sink:
+        sink.add('CD_1', {'Career Averages': career(['95', '96'], ['3', '4'])}, '2025-03-08T10:00:00')
+
+    assert read_table('Career Averages', root)['Fant Avg'].tolist() == [95, 96]
+    assert len(read_table('Career Averages', root, latest=False)) == 4
+
+
+def test_text_in_one_players_column_is_stored_as_string(tmp_path):
+    root = str(tmp_path)
+    with TableSink(root) as sink:
+        sink.add('CD_1', {'Career Averages': career(['98.5', '101.2'], ['22', '20'])})
+        sink.add('CD_2', {'Career Averages': career(['80.0', 'DNP'], ['21', '3'])})
+
+    df = read_table('Career Averages', root)
+    assert df['Fant Avg'].tolist() == ['98.5', '101.2', '80.0', 'DNP']
+    assert pd.api.types.is_integer_dtype(df['Games'])
+
+
+def test_failed_batch_leaves_nothing_visible(tmp_path, monkeypatch):
+    root = tmp_path / 'tables'
+
+    def fail(path, data):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(table_sink, '_write_json', fail)
+    sink = TableSink(str(root))
+    sink.add('CD_1', {'Career Averages': career(['90', '91'], ['1', '2'])})
+    with pytest.raises(OSError):
+        sink.commit()
+
+    assert load_manifests(str(root)) == []
+    assert list(root.rglob('*.parquet')) == []
+    assert read_table('Career Averages', str(root)).empty
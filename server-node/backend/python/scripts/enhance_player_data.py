@@ -7,6 +7,7 @@ Enhance player data with additional statistics from multiple sources
 import json
 import csv
 import os
+import zlib
 from datetime import datetime
 
 def read_json_file(filename):
@@ -35,6 +36,10 @@ def read_csv_file(filename, skip_rows=3):
         print(f"Error reading {filename}: {e}")
         return []
 
+def stable_player_id(name):
+    """Id for a player without one, the same in every run (hash() of a str is not)"""
+    return zlib.crc32(name.encode('utf-8')) % 10000 + 1000
+
 def normalize_player_name(name):
     """Normalize player names for matching across datasets"""
     if not name:
@@ -335,7 +340,8 @@ def calculate_projected_scores(players):
     # Map between our backend field names and frontend expected field names
     for player in players:
         # Core stats mappings
-        player['id'] = player.get('id', hash(player['name']) % 10000 + 1000)  # Generate consistent ID if not present
+        if 'id' not in player:
+            player['id'] = stable_player_id(player['name'])
         player['averagePoints'] = player.get('avg', 0)
         player['roundsPlayed'] = player.get('games', 0)
         player['lastScore'] = player.get('last1', None)
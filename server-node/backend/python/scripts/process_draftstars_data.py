@@ -58,10 +58,8 @@ def determine_position(position_str: str) -> str:
 
 def estimate_breakeven(avg_points: float) -> int:
     """Estimate a breakeven score based on the player's average"""
-    # Simple estimation: breakeven is similar to average +/- some variation
-    import random
-    variation = random.uniform(-10, 10)
-    return max(0, int(avg_points + variation))
+    # Simple estimation: breakeven is similar to average (the same every run)
+    return max(0, int(avg_points))
 
 
 def process_draftstars_data(csv_path: str) -> List[Dict[str, Any]]:
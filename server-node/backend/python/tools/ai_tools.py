@@ -6,17 +6,9 @@ These tools use machine learning and statistical analysis to provide
 intelligent recommendations for trades, captaincy, and team structure.
 """
 
-import json
 import random
 from datetime import datetime
-
-def get_player_data():
-    """Get player data from the JSON file"""
-    try:
-        with open('player_data.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
+from player_repository import get_player_data
 
 def get_sample_players(count=10):
     """Get a sample of players from the player data"""
@@ -0,0 +1,257 @@
+"""
+AFL Fantasy Breakeven Engine
+
+This module derives each player's breakeven from their real rolling
+score window and current price. The whole roster is computed at once as
+NumPy arrays, and a per-round history of price and breakeven is rebuilt
+from the score history so trend tools can serve real series straight
+from memory. The table is rebuilt only when the player data changes.
+"""
+
+import threading
+
+import numpy as np
+
+from price_simulator import (
+    PLAYER_DATA_PATH,
+    GAME_LOGS_PATH,
+    PRICE_WINDOW,
+    MIN_PRICE,
+    breakeven_from_window,
+    data_generation,
+    extract_score_history,
+    load_player_index,
+    magic_number_for,
+    player_key,
+    _to_float
+)
+
+_state = {}
+_state_lock = threading.Lock()
+
+
+def _build_table(player_path, logs_path):
+    """
+    Build roster-wide score, price and breakeven matrices
+
+    Rows are players, columns are completed rounds aligned to the right so
+    the last column is every player's most recent game. Rounds before a
+    player's first game are NaN.
+
+    Returns:
+        dict: Breakeven table arrays and lookup maps
+    """
+    index = load_player_index(player_path, logs_path)
+
+    players, histories = [], []
+    for key, (player, game_logs) in index.items():
+        if key != player_key(player):
+            continue  # name alias of a player already listed
+        price = _to_float(player.get('price'))
+        scores = extract_score_history(player, game_logs)
+        if not price or not scores:
+            continue
+        players.append(player)
+        histories.append(scores)
+
+    n = len(players)
+    rounds = max((len(h) for h in histories), default=0)
+    scores = np.full((n, rounds), np.nan)
+    for i, history in enumerate(histories):
+        scores[i, rounds - len(history):] = history
+
+    current_price = np.array([_to_float(p.get('price')) for p in players], dtype=np.float64)
+
+    # Where the window reaches back before a player's first game, fill it
+    # with their average so early-season breakevens stay finite
+    averages = np.nanmean(scores, axis=1) if n else np.zeros(0)
+    lookback = PRICE_WINDOW - 1
+    padded = np.concatenate([np.repeat(averages[:, None], lookback, axis=1), scores], axis=1)
+    played = ~np.isnan(padded)
+    filled = np.where(played, padded, averages[:, None])
+
+    # Walk prices back from today: P[t-1] = (P[t] - window_sum * MN / 100) / (1 - window / 100)
+    prices = np.full((n, rounds + 1), np.nan)
+    prices[:, rounds] = current_price
+    for t in range(rounds, 0, -1):
+        window_sum = filled[:, t - 1:t - 1 + PRICE_WINDOW].sum(axis=1)
+        after = prices[:, t]
+        before = (after - window_sum * magic_number_for(after) / 100) / (1 - PRICE_WINDOW / 100)
+        prices[:, t - 1] = np.where(played[:, t - 1 + lookback], np.maximum(before, MIN_PRICE), np.nan)
+
+    # Breakeven faced in each completed round, then the one for next round
+    breakevens = np.full((n, rounds), np.nan)
+    for t in range(rounds):
+        breakevens[:, t] = breakeven_from_window(prices[:, t], filled[:, t:t + lookback])
+    breakevens[np.isnan(scores)] = np.nan
+    next_breakeven = breakeven_from_window(current_price, filled[:, -lookback:])
+
+    keys = [player_key(p) for p in players]
+    lookup = {key: i for i, key in enumerate(keys)}
+    for i, player in enumerate(players):
+        if player.get('name'):
+            lookup.setdefault(str(player['name']).lower(), i)
+
+    return {
+        'players': players,
+        'keys': keys,
+        'lookup': lookup,
+        'scores': scores,
+        'prices': prices[:, 1:],
+        'breakevens': breakevens,
+        'current_price': current_price,
+        'next_breakeven': next_breakeven
+    }
+
+
+def get_breakeven_table(player_path=PLAYER_DATA_PATH, logs_path=GAME_LOGS_PATH):
+    """
+    Get the roster breakeven table, rebuilding it when the data changes
+
+    Returns:
+        dict: Breakeven table arrays and lookup maps
+    """
+    generation = data_generation(player_path, logs_path)
+    with _state_lock:
+        if _state.get('generation') != generation:
+            _state.clear()
+            _state['table'] = _build_table(player_path, logs_path)
+            _state['generation'] = generation
+        return _state['table']
+
+
+def _check_rounds(rounds, optional=True):
+    """Reject round counts that would slice the history unexpectedly (0, negatives, non-integers)"""
+    if rounds is None and optional:
+        return
+    if isinstance(rounds, bool) or not isinstance(rounds, (int, np.integer)) or rounds < 1:
+        raise ValueError(f"rounds must be a positive integer, got {rounds!r}")
+
+
+def _series(values):
+    """Convert a NaN padded row into a list of rounded values"""
+    return [int(round(v)) for v in values if not np.isnan(v)]
+
+
+def next_round_breakevens(min_price=0):
+    """
+    Breakeven for next round for every player, computed in one pass
+
+    Args:
+        min_price (int): Only include players priced at or above this
+
+    Returns:
+        list: Players with price, last scores and next round breakeven
+    """
+    table = get_breakeven_table()
+    selected = np.flatnonzero(table['current_price'] >= min_price)
+
+    result = []
+    for i in selected[np.argsort(table['next_breakeven'][selected])]:
+        player = table['players'][i]
+        result.append({
+            'player_id': table['keys'][i],
+            'player': player.get('name', 'Unknown'),
+            'team': player.get('team', 'Unknown'),
+            'position': player.get('position', 'Unknown'),
+            'price': int(table['current_price'][i]),
+            'last_scores': _series(table['scores'][i, -(PRICE_WINDOW - 1):]),
+            'breakeven': int(round(table['next_breakeven'][i]))
+        })
+    return result
+
+
+def breakeven_history(player_id, rounds=None):
+    """
+    Per-round price and breakeven history for a single player
+
+    Args:
+        player_id (str): Player id or name
+        rounds (int, optional): Limit to the most recent N rounds (at least 1)
+
+    Returns:
+        dict: History series, or None if the player is unknown
+
+    Raises:
+        ValueError: If rounds is given but is not a positive integer
+    """
+    _check_rounds(rounds)
+    table = get_breakeven_table()
+    i = table['lookup'].get(str(player_id), table['lookup'].get(str(player_id).lower()))
+    if i is None:
+        return None
+
+    columns = slice(None) if rounds is None else slice(-rounds, None)
+    player = table['players'][i]
+    return {
+        'player_id': table['keys'][i],
+        'player': player.get('name', 'Unknown'),
+        'scores': _series(table['scores'][i, columns]),
+        'prices': _series(table['prices'][i, columns]),
+        'breakevens': _series(table['breakevens'][i, columns]),
+        'current_price': int(table['current_price'][i]),
+        'next_breakeven': int(round(table['next_breakeven'][i]))
+    }
+
+
+def breakeven_trends(min_price=0, rounds=4):
+    """
+    Breakeven trend over recent rounds for the whole roster
+
+    The slope of each player's breakeven series (including next round) is
+    fitted in one vectorized least-squares pass.
+
+    Args:
+        min_price (int): Only include players priced at or above this
+        rounds (int): Number of completed rounds to include (at least 1)
+
+    Returns:
+        list: Players with their breakeven series, slope and direction
+
+    Raises:
+        ValueError: If rounds is not a positive integer
+    """
+    _check_rounds(rounds, optional=False)
+    table = get_breakeven_table()
+    selected = np.flatnonzero(table['current_price'] >= min_price)
+    series = np.concatenate([
+        table['breakevens'][selected, -rounds:],
+        table['next_breakeven'][selected, None]
+    ], axis=1)
+
+    # Least squares slope per row, ignoring rounds before a player's debut
+    mask = ~np.isnan(series)
+    x = np.broadcast_to(np.arange(series.shape[1], dtype=np.float64), series.shape)
+    count = mask.sum(axis=1)
+    x_mean = np.where(mask, x, 0).sum(axis=1) / np.maximum(count, 1)
+    y_mean = np.where(mask, series, 0).sum(axis=1) / np.maximum(count, 1)
+    dx = np.where(mask, x - x_mean[:, None], 0)
+    dy = np.where(mask, series - y_mean[:, None], 0)
+    denominator = (dx * dx).sum(axis=1)
+    slope = np.divide((dx * dy).sum(axis=1), denominator, out=np.zeros_like(denominator), where=denominator > 0)
+
+    trends = []
+    for row, i in enumerate(selected):
+        player = table['players'][i]
+        be_trend = _series(series[row])
+        trends.append({
+            'player_id': table['keys'][i],
+            'player': player.get('name', 'Unknown'),
+            'team': player.get('team', 'Unknown'),
+            'position': player.get('position', 'Unknown'),
+            'current_be': be_trend[-1],
+            'BE_trend': be_trend,
+            'slope': round(float(slope[row]), 2),
+            'direction': "Rising" if len(be_trend) > 1 and be_trend[-1] > be_trend[-2] else "Falling"
+        })
+    return trends
+
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    start = time.perf_counter()
+    get_breakeven_table()
+    print(f"Built breakeven table in {time.perf_counter() - start:.3f}s")
+    print(json.dumps(next_round_breakevens()[:5], indent=2))
@@ -5,19 +5,13 @@ This module provides captain selection tools to help Fantasy coaches
 optimize their captain choices for maximum point returns.
 """
 
-import json
 import os
 import random
 from datetime import datetime
 
-def get_player_data():
-    """Get player data from the JSON file"""
-    try:
-        with open('player_data.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        # Return sample data if file not found
-        return []
+from fixture_schedule import load_fixture_schedule, current_round
+from loophole_optimizer import best_loophole_plans
+from player_repository import get_player_data
 
 def captain_score_predictor():
     """
@@ -149,8 +143,19 @@ def loophole_detector():
     Returns:
         dict: Information about loophole opportunities and strategies
     """
-    # Fixture data (mock)
-    fixtures = [
+    # Use the real fixture schedule for the current round when available
+    schedule = load_fixture_schedule()
+    if schedule:
+        round_number = current_round(schedule)
+        fixtures = [
+            {"round": m["round"], "home": m["home"], "away": m["away"], "start_time": m["kickoff"].isoformat()}
+            for m in schedule if m["round"] == round_number
+        ]
+    else:
+        fixtures = []
+    
+    # Fall back to sample fixture data (mock)
+    fixtures = fixtures or [
         {"round": 10, "match_id": 1, "home": "Adelaide", "away": "Essendon", "start_time": "2025-05-03T19:30:00+10:00"},
         {"round": 10, "match_id": 2, "home": "Brisbane", "away": "Geelong", "start_time": "2025-05-04T13:10:00+10:00"},
         {"round": 10, "match_id": 3, "home": "Carlton", "away": "Sydney", "start_time": "2025-05-04T15:20:00+10:00"},
@@ -219,6 +224,19 @@ def loophole_detector():
     
     return loophole_info
 
+def loophole_planner(rounds=None):
+    """
+    Plans the best Vice-Captain / Captain / Emergency loophole for the saved
+    team using the fixture schedule and each player's score distribution
+    
+    Args:
+        rounds (list, optional): Round numbers to plan (defaults to the current round)
+    
+    Returns:
+        dict: Best loophole plan per round with expected captain points
+    """
+    return best_loophole_plans(rounds=rounds)
+
 def form_based_captain_analyzer():
     """
     Analyzes player form over various timeframes to recommend captains
@@ -0,0 +1,314 @@
+"""
+AFL Fantasy Change-Point Detector
+
+This module flags role shifts in per-player, per-game series (centre
+bounce attendance share, time on ground and fantasy points) with a
+two-sided CUSUM test run over the whole league at once. Detector state is
+a set of [player, metric] arrays updated one round at a time, so a new
+round costs one vectorized step instead of a rescan of the season. When
+the player data changes only by new games being appended, the cached
+state is advanced by the new rounds alone.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from price_simulator import (
+    PLAYER_DATA_PATH,
+    GAME_LOGS_PATH,
+    data_generation,
+    extract_score_history,
+    load_player_index,
+    player_key,
+    _to_float
+)
+
+# Series tracked for every player, and the game log / player record keys they come from
+METRICS = ('cba', 'tog', 'fp')
+METRIC_KEYS = {
+    'cba': ('CBA%', 'CBA', 'cba_pct', 'cba'),
+    'tog': ('TOG%', 'TOG', 'tog_pct', 'tog')
+}
+METRIC_HISTORY_KEYS = {
+    'cba': ('cbaHistory', 'cba_history'),
+    'tog': ('togHistory', 'tog_history')
+}
+
+# Smallest standard deviation assumed per metric, so flat series do not
+# turn every small wobble into a change point
+SIGMA_FLOOR = np.array([5.0, 4.0, 8.0])
+
+# CUSUM allowance (in standard deviations) and decision threshold
+CUSUM_DRIFT = 0.5
+CUSUM_THRESHOLD = 5.0
+
+# Games needed in a regime before it is tested for a change
+MIN_REGIME = 4
+
+
+def _series_value(row, keys):
+    for key in keys:
+        if key in row:
+            return _to_float(row.get(key))
+    return None
+
+
+def extract_metric_series(player, game_logs=None):
+    """
+    Per-game CBA share, TOG and fantasy points for a player, oldest first
+
+    CBA and TOG come from game log columns (or history lists on the player
+    record) and are None for games without them.
+
+    Returns:
+        dict: Metric name -> list of values
+    """
+    fp = extract_score_history(player, game_logs)
+    series = {'fp': fp}
+    rows = [row for row in game_logs or [] if isinstance(row, dict)]
+    for metric in ('cba', 'tog'):
+        values = []
+        if rows:
+            values = [_series_value(row, METRIC_KEYS[metric]) for row in rows[::-1]]
+        else:
+            for key in METRIC_HISTORY_KEYS[metric]:
+                if isinstance(player.get(key), list):
+                    values = [_to_float(v) for v in player[key]]
+                    break
+        series[metric] = values if any(v is not None for v in values) else []
+    return series
+
+
+class ChangePointDetector:
+    """
+    Online two-sided CUSUM detector over a [player, metric] grid
+
+    Each regime keeps a running mean and variance (Welford). Values are
+    standardised against the current regime and accumulated into upper and
+    lower CUSUM statistics; when one crosses the threshold a change point
+    is recorded and a new regime starts from the values that triggered it.
+    """
+
+    def __init__(self, players, metrics=len(METRICS), sigma_floor=SIGMA_FLOOR,
+                 drift=CUSUM_DRIFT, threshold=CUSUM_THRESHOLD, min_regime=MIN_REGIME):
+        shape = (players, metrics)
+        self.sigma_floor = np.broadcast_to(np.asarray(sigma_floor, dtype=np.float64), shape)
+        self.drift = drift
+        self.threshold = threshold
+        self.min_regime = min_regime
+
+        # Values observed so far per cell; change points are reported as
+        # the index of the observation where the new regime began
+        self.seen = np.zeros(shape, dtype=np.int64)
+
+        self.count = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.regime_start = np.zeros(shape, dtype=np.int64)
+
+        # CUSUM statistics and the values accumulated since each last reset
+        self.upper = np.zeros(shape)
+        self.lower = np.zeros(shape)
+        self.upper_sum = np.zeros(shape)
+        self.upper_n = np.zeros(shape)
+        self.upper_start = np.zeros(shape, dtype=np.int64)
+        self.lower_sum = np.zeros(shape)
+        self.lower_n = np.zeros(shape)
+        self.lower_start = np.zeros(shape, dtype=np.int64)
+
+        # Most recent change point per cell (-1 means none)
+        self.change_index = np.full(shape, -1, dtype=np.int64)
+        self.change_before = np.full(shape, np.nan)
+        self.change_after = np.full(shape, np.nan)
+        self.change_confidence = np.zeros(shape)
+
+    def sigma(self):
+        """Regime standard deviation, floored per metric"""
+        variance = np.divide(self.m2, self.count - 1, out=np.zeros_like(self.m2), where=self.count > 1)
+        return np.maximum(np.sqrt(variance), self.sigma_floor)
+
+    def update(self, values):
+        """
+        Advance every series by one value
+
+        Args:
+            values (ndarray): [player, metric] next values (NaN = nothing new)
+
+        Returns:
+            ndarray: Boolean [player, metric] mask of change points found by this step
+        """
+        values = np.asarray(values, dtype=np.float64)
+        t = self.seen
+        present = ~np.isnan(values)
+        x = np.where(present, values, 0.0)
+        testing = present & (self.count >= self.min_regime)
+
+        # CUSUM step for series with an established regime
+        z = np.where(testing, (x - self.mean) / self.sigma(), 0.0)
+        upper = np.maximum(0.0, self.upper + z - self.drift)
+        lower = np.maximum(0.0, self.lower - z - self.drift)
+
+        # Track the values since each statistic last left zero; they
+        # estimate the new level if a change is declared
+        restart_upper = testing & (self.upper == 0)
+        restart_lower = testing & (self.lower == 0)
+        self.upper_sum = np.where(restart_upper, 0.0, self.upper_sum) + np.where(testing, x, 0.0)
+        self.upper_n = np.where(restart_upper, 0.0, self.upper_n) + testing
+        self.upper_start = np.where(restart_upper, t, self.upper_start)
+        self.lower_sum = np.where(restart_lower, 0.0, self.lower_sum) + np.where(testing, x, 0.0)
+        self.lower_n = np.where(restart_lower, 0.0, self.lower_n) + testing
+        self.lower_start = np.where(restart_lower, t, self.lower_start)
+        self.upper = np.where(testing, upper, self.upper)
+        self.lower = np.where(testing, lower, self.lower)
+        self.upper_sum = np.where(self.upper > 0, self.upper_sum, 0.0)
+        self.upper_n = np.where(self.upper > 0, self.upper_n, 0.0)
+        self.lower_sum = np.where(self.lower > 0, self.lower_sum, 0.0)
+        self.lower_n = np.where(self.lower > 0, self.lower_n, 0.0)
+
+        up = testing & (self.upper > self.threshold)
+        down = testing & (self.lower > self.threshold) & ~up
+        changed = up | down
+
+        if changed.any():
+            run_sum = np.where(up, self.upper_sum, self.lower_sum)
+            run_n = np.maximum(np.where(up, self.upper_n, self.lower_n), 1)
+            run_start = np.where(up, self.upper_start, self.lower_start)
+            after = run_sum / run_n
+
+            # Confidence: two-sided significance of the shift in level
+            shift = np.abs(after - self.mean) / (self.sigma() / np.sqrt(run_n))
+            confidence = np.array([math.erf(s / math.sqrt(2)) for s in shift[changed]])
+
+            self.change_index[changed] = run_start[changed]
+            self.change_before[changed] = self.mean[changed]
+            self.change_after[changed] = after[changed]
+            self.change_confidence[changed] = confidence
+
+            # New regime seeded with the run that triggered the change
+            sigma = self.sigma()
+            self.count = np.where(changed, run_n, self.count)
+            self.mean = np.where(changed, after, self.mean)
+            self.m2 = np.where(changed, (run_n - 1) * sigma ** 2, self.m2)
+            self.regime_start = np.where(changed, run_start, self.regime_start)
+            for name in ('upper', 'lower', 'upper_sum', 'upper_n', 'lower_sum', 'lower_n'):
+                setattr(self, name, np.where(changed, 0.0, getattr(self, name)))
+
+        # Welford update of the regime with this round's value
+        update = present & ~changed
+        count = self.count + update
+        delta = np.where(update, x - self.mean, 0.0)
+        mean = self.mean + np.divide(delta, count, out=np.zeros_like(delta), where=count > 0)
+        self.m2 = self.m2 + np.where(update, delta * (x - mean), 0.0)
+        self.mean = mean
+        self.count = count
+
+        self.seen = self.seen + present
+        return changed
+
+    def run(self, series):
+        """
+        Feed several values per series in order
+
+        Args:
+            series (ndarray): [player, metric, step] values (NaN = skipped)
+        """
+        for t in range(series.shape[2]):
+            self.update(series[:, :, t])
+        return self
+
+
+_state = {}
+_state_lock = threading.Lock()
+
+
+def _load_series(player_path, logs_path):
+    """
+    Load every player's metric series into one left-aligned array
+
+    Returns:
+        tuple: (players, keys, series [player, metric, game], lengths [player, metric])
+    """
+    index = load_player_index(player_path, logs_path)
+    players, histories = [], []
+    for key, (player, game_logs) in index.items():
+        if key != player_key(player):
+            continue  # name alias of a player already listed
+        history = extract_metric_series(player, game_logs)
+        if not any(history.values()):
+            continue
+        players.append(player)
+        histories.append(history)
+
+    games = max((len(v) for h in histories for v in h.values()), default=0)
+    series = np.full((len(players), len(METRICS), games), np.nan)
+    lengths = np.zeros((len(players), len(METRICS)), dtype=np.int64)
+    for i, history in enumerate(histories):
+        for m, metric in enumerate(METRICS):
+            values = [np.nan if v is None else v for v in history[metric]]
+            series[i, m, :len(values)] = values
+            lengths[i, m] = len(values)
+    return players, [player_key(p) for p in players], series, lengths
+
+
+def _appended(previous, series, lengths):
+    """
+    New values per series if the data only grew by appended games
+
+    Returns:
+        ndarray: [player, metric, step] left-aligned new values, or None if
+                 earlier values changed and the season must be replayed
+    """
+    old_lengths = previous['lengths']
+    if old_lengths.shape != lengths.shape or (lengths < old_lengths).any():
+        return None
+    width = previous['series'].shape[2]
+    old = np.arange(width) < old_lengths[:, :, None]
+    if series.shape[2] < width or not np.array_equal(
+            np.where(old, series[:, :, :width], np.nan), previous['series'], equal_nan=True):
+        return None
+
+    added = lengths - old_lengths
+    delta = np.full(lengths.shape + (int(added.max(initial=0)),), np.nan)
+    for i, m in zip(*np.nonzero(added)):
+        delta[i, m, :added[i, m]] = series[i, m, old_lengths[i, m]:lengths[i, m]]
+    return delta
+
+
+def get_role_changes(player_path=PLAYER_DATA_PATH, logs_path=GAME_LOGS_PATH):
+    """
+    Detector state for the whole league, advanced to the latest data
+
+    If the only change since the last call is new games appended to the
+    same players' series, only those games are fed to the detector;
+    otherwise the season is replayed.
+
+    Returns:
+        dict: players, keys, series, lengths and the fitted ChangePointDetector
+    """
+    generation = data_generation(player_path, logs_path)
+    with _state_lock:
+        if _state.get('generation') == generation:
+            return _state['result']
+
+        players, keys, series, lengths = _load_series(player_path, logs_path)
+        previous = _state.get('result')
+        detector = None
+        if previous is not None and previous['keys'] == keys:
+            delta = _appended(previous, series, lengths)
+            if delta is not None:
+                detector = previous['detector'].run(delta)
+        if detector is None:
+            detector = ChangePointDetector(len(players)).run(series)
+
+        result = {
+            'players': players,
+            'keys': keys,
+            'series': series,
+            'lengths': lengths,
+            'detector': detector
+        }
+        _state['generation'] = generation
+        _state['result'] = result
+        return result
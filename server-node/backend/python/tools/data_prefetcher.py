@@ -0,0 +1,266 @@
+"""
+AFL Fantasy Data Prefetcher
+
+This module keeps scraped reference data (fixture, DVP matrix) fresh in
+the background so API requests never scrape. Each dataset is fetched with
+timeouts and conditional requests (ETag / Last-Modified), parsed, and
+written atomically next to a metadata file recording its version, fetch
+time and validators. Request handlers only read the cached copy together
+with how stale it is.
+
+Run this module directly to keep the cache warm from a separate process
+(the Node tools run short-lived Python processes), or call
+start_prefetcher() from a long-running API server.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts for every fetch
+REQUEST_TIMEOUT = (5, 30)
+USER_AGENT = 'Mozilla/5.0 (compatible; AFLFantasyPrefetcher/1.0)'
+
+# How often the background loop wakes up to look for due datasets
+POLL_SECONDS = 60
+# Retry delay while a dataset has never been fetched successfully
+RETRY_SECONDS = 300
+
+_datasets = {}
+_cache = {}
+_cache_lock = threading.Lock()
+_thread = None
+_stop = threading.Event()
+
+
+def register_dataset(name, path, url, parser, interval=6 * 3600, max_age=24 * 3600):
+    """
+    Register a dataset to be prefetched
+
+    Args:
+        name (str): Dataset name
+        path (str): JSON file the parsed data is cached in
+        url (str): Source URL
+        parser (callable): Takes response text, returns JSON-serialisable data
+                           or None if the page could not be parsed
+        interval (int): Seconds between refresh attempts
+        max_age (int): Age in seconds after which cached data is reported stale
+    """
+    _datasets[name] = {
+        'name': name,
+        'path': path,
+        'url': url,
+        'parser': parser,
+        'interval': interval,
+        'max_age': max_age
+    }
+
+
+def _meta_path(path):
+    return f"{path}.meta.json"
+
+
+def _read_json(path, default=None):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temporary file in the same directory, then rename it into place"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _content_hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def refresh_dataset(name, session=None):
+    """
+    Fetch a dataset once, using conditional request headers
+
+    Returns:
+        dict: Updated metadata (version, fetched_at, checked_at, last_error, ...)
+    """
+    dataset = _datasets[name]
+    meta_path = _meta_path(dataset['path'])
+    meta = _read_json(meta_path, {}) or {}
+    if not os.path.exists(dataset['path']):
+        # Validators are meaningless without the cached body
+        meta.pop('etag', None)
+        meta.pop('last_modified', None)
+
+    headers = {'User-Agent': USER_AGENT}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    now = datetime.now().isoformat(timespec='seconds')
+    meta['checked_at'] = now
+    try:
+        response = (session or requests).get(dataset['url'], headers=headers, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            # The cached copy is confirmed current, so it is as fresh as a new fetch
+            meta['fetched_at'] = now
+            meta['last_error'] = None
+        else:
+            response.raise_for_status()
+            data = dataset['parser'](response.text)
+            if not data:
+                raise ValueError('Page could not be parsed')
+
+            content_hash = _content_hash(data)
+            if content_hash != meta.get('hash') or not os.path.exists(dataset['path']):
+                atomic_write_json(dataset['path'], data)
+                meta['version'] = meta.get('version', 0) + 1
+                meta['hash'] = content_hash
+                logger.info(f"Prefetched {name} version {meta['version']}")
+            meta['fetched_at'] = now
+            meta['etag'] = response.headers.get('ETag')
+            meta['last_modified'] = response.headers.get('Last-Modified')
+            meta['last_error'] = None
+    except Exception as e:
+        logger.warning(f"Prefetch of {name} failed: {e}")
+        meta['last_error'] = str(e)
+
+    meta['url'] = dataset['url']
+    atomic_write_json(meta_path, meta)
+    return meta
+
+
+def _status(dataset, meta):
+    exists = os.path.exists(dataset['path'])
+    fetched_at = meta.get('fetched_at')
+    age = None
+    if fetched_at:
+        age = (datetime.now() - datetime.fromisoformat(fetched_at)).total_seconds()
+    elif exists:
+        age = time.time() - os.path.getmtime(dataset['path'])
+    return {
+        'dataset': dataset['name'],
+        'available': exists,
+        'version': meta.get('version'),
+        'fetched_at': fetched_at,
+        'checked_at': meta.get('checked_at'),
+        'age_seconds': round(age) if age is not None else None,
+        'stale': not exists or age is None or age > dataset['max_age'],
+        'last_error': meta.get('last_error')
+    }
+
+
+def dataset_status(name):
+    """How fresh the cached copy of a dataset is, without reading its body"""
+    dataset = _datasets[name]
+    return _status(dataset, _read_json(_meta_path(dataset['path']), {}) or {})
+
+
+def read_cached(name):
+    """
+    Latest cached copy of a dataset; never touches the network
+
+    Returns:
+        tuple: (data or None, status dict)
+    """
+    dataset = _datasets[name]
+    path = dataset['path']
+    try:
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        version = None
+
+    with _cache_lock:
+        cached = _cache.get(name)
+        if cached is None or cached[0] != version:
+            data = _read_json(path) if version else None
+            cached = (version, data)
+            _cache[name] = cached
+    return cached[1], dataset_status(name)
+
+
+def _due(dataset):
+    meta = _read_json(_meta_path(dataset['path']), {}) or {}
+    if not meta.get('checked_at'):
+        return True
+    since = (datetime.now() - datetime.fromisoformat(meta['checked_at'])).total_seconds()
+    interval = dataset['interval'] if os.path.exists(dataset['path']) else RETRY_SECONDS
+    return since >= interval
+
+
+def run_once(names=None):
+    """Refresh every registered dataset that is due"""
+    with requests.Session() as session:
+        for name in names or list(_datasets):
+            if _due(_datasets[name]):
+                refresh_dataset(name, session=session)
+
+
+def _loop(names):
+    while not _stop.is_set():
+        try:
+            run_once(names)
+        except Exception as e:
+            logger.error(f"Prefetch loop error: {e}")
+        _stop.wait(POLL_SECONDS)
+
+
+def start_prefetcher(names=None):
+    """Start the background prefetch thread (once per process)"""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return _thread
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, args=(names,), name='data-prefetcher', daemon=True)
+    _thread.start()
+    return _thread
+
+
+def stop_prefetcher():
+    """Ask the background prefetch thread to stop"""
+    _stop.set()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # Run as a script this file is __main__, a different module object from
+    # the data_prefetcher that fixture_tools registers its datasets on
+    import data_prefetcher
+    # Registers the fixture and DVP datasets
+    import fixture_tools  # noqa: F401
+
+    parser = argparse.ArgumentParser(description='Keep scraped reference data fresh')
+    parser.add_argument('--once', action='store_true', help='Refresh due datasets once and exit')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.once:
+        data_prefetcher.run_once()
+        print(json.dumps({name: data_prefetcher.dataset_status(name) for name in data_prefetcher._datasets}, indent=2))
+    else:
+        data_prefetcher._loop(None)
@@ -0,0 +1,191 @@
+"""
+AFL Fantasy Fixture Schedule
+
+This module loads the season fixture with kickoff times and normalises it
+into one match list shared by the fixture and captain tools. It accepts
+the fixture export used by the Node fixture processor (round, "RIC vs CAR",
+dd/mm/yyyy date and time) as well as the FootyWire scrape saved by
+fixture_scraper.py. The parsed schedule is cached per file version.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from price_simulator import data_generation
+
+FIXTURE_SCHEDULE_PATHS = ('fixture_data.json', 'afl_fixture_2025.json')
+
+# A game is over (and scores are final) roughly this long after kickoff
+GAME_LENGTH = timedelta(hours=3)
+
+TEAM_ALIASES = {
+    'ADE': 'Adelaide', 'ADELAIDE CROWS': 'Adelaide',
+    'BRI': 'Brisbane', 'BRL': 'Brisbane', 'BRISBANE LIONS': 'Brisbane',
+    'CAR': 'Carlton',
+    'COL': 'Collingwood',
+    'ESS': 'Essendon',
+    'FRE': 'Fremantle',
+    'GCS': 'Gold Coast', 'GC': 'Gold Coast', 'GOLD COAST SUNS': 'Gold Coast',
+    'GEE': 'Geelong', 'GEELONG CATS': 'Geelong',
+    'GWS': 'GWS', 'GREATER WESTERN SYDNEY': 'GWS', 'GWS GIANTS': 'GWS',
+    'HAW': 'Hawthorn',
+    'MEL': 'Melbourne',
+    'NTH': 'North Melbourne', 'NM': 'North Melbourne', 'KANGAROOS': 'North Melbourne',
+    'PTA': 'Port Adelaide', 'PA': 'Port Adelaide', 'PORT': 'Port Adelaide',
+    'RIC': 'Richmond',
+    'STK': 'St Kilda', 'ST. KILDA': 'St Kilda',
+    'SYD': 'Sydney', 'SYDNEY SWANS': 'Sydney',
+    'WBD': 'Western Bulldogs', 'WB': 'Western Bulldogs', 'BULLDOGS': 'Western Bulldogs',
+    'WCE': 'West Coast', 'WEST COAST EAGLES': 'West Coast'
+}
+
+_DATE_FORMATS = (
+    '%d/%m/%Y %H:%M', '%d/%m/%Y',
+    '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d',
+    '%a %d %b %I:%M%p %Y', '%a %d %b %Y %I:%M%p', '%d-%b-%Y %H:%M', '%d-%b-%Y'
+)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def normalize_team(name):
+    """Canonical team name for an abbreviation or club name variant"""
+    name = str(name or '').strip()
+    canonical = TEAM_ALIASES.get(name.upper())
+    if canonical:
+        return canonical
+    for full in set(TEAM_ALIASES.values()):
+        if full.upper() == name.upper():
+            return full
+    return name
+
+
+def parse_kickoff(date, time=None, year=None):
+    """
+    Parse a fixture date and optional time into a naive local datetime
+
+    Times without am/pm before 10:00 are afternoon games ('2:00' is 2pm).
+    """
+    if time:
+        hour, _, minute = str(time).partition(':')
+        if hour.isdigit() and int(hour) < 10:
+            time = f"{int(hour) + 12}:{minute or '00'}"
+    text = f"{date} {time}".strip() if time else str(date).strip()
+    if year and str(year) not in text:
+        text = f"{text} {year}"
+
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _parse_round(value):
+    digits = ''.join(ch for ch in str(value) if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def _normalize_match(match, year=None):
+    """Convert one raw fixture record into the shared match format"""
+    if 'teams' in match:
+        home, _, away = str(match['teams']).partition(' vs ')
+    else:
+        home = match.get('home', match.get('home_team'))
+        away = match.get('away', match.get('away_team'))
+    kickoff = parse_kickoff(match.get('start_time') or match.get('date', ''), match.get('time'), year)
+    round_number = _parse_round(match.get('round'))
+    if not home or not away or kickoff is None or round_number is None:
+        return None
+    return {
+        'round': round_number,
+        'home': normalize_team(home),
+        'away': normalize_team(away),
+        'venue': match.get('venue', ''),
+        'kickoff': kickoff
+    }
+
+
+def _read_schedule(path):
+    with open(path, 'r') as f:
+        raw = json.load(f)
+    year = raw.get('year') if isinstance(raw, dict) else None
+    matches = raw.get('fixtures', []) if isinstance(raw, dict) else raw
+
+    schedule = []
+    for match in matches if isinstance(matches, list) else []:
+        if isinstance(match, dict):
+            normalized = _normalize_match(match, year)
+            if normalized:
+                schedule.append(normalized)
+    schedule.sort(key=lambda m: (m['round'], m['kickoff']))
+    return schedule
+
+
+def load_fixture_schedule(paths=FIXTURE_SCHEDULE_PATHS):
+    """
+    Load the fixture schedule from the first available fixture file
+
+    Args:
+        paths (tuple or str): Candidate fixture file paths, in order of preference
+
+    Returns:
+        list: Matches with round, home, away, venue and kickoff (datetime)
+    """
+    if isinstance(paths, str):
+        paths = (paths,)
+    generation = data_generation(*paths)
+    with _cache_lock:
+        if _cache.get('generation') == generation:
+            return _cache['schedule']
+
+    schedule = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        try:
+            schedule = _read_schedule(path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading fixture schedule {path}: {e}")
+        if schedule:
+            break
+
+    with _cache_lock:
+        _cache['generation'] = generation
+        _cache['schedule'] = schedule
+    return schedule
+
+
+def round_kickoffs(round_number, schedule=None):
+    """
+    Kickoff time for each team in a round
+
+    Returns:
+        dict: Team name -> match dict (teams on a bye are absent)
+    """
+    schedule = load_fixture_schedule() if schedule is None else schedule
+    kickoffs = {}
+    for match in schedule:
+        if match['round'] == round_number:
+            kickoffs[match['home']] = match
+            kickoffs[match['away']] = match
+    return kickoffs
+
+
+def current_round(schedule=None, now=None):
+    """First round that has not finished yet, or the last round of the season"""
+    schedule = load_fixture_schedule() if schedule is None else schedule
+    if not schedule:
+        return None
+    now = now or datetime.now()
+    for match in schedule:
+        if match['kickoff'] + GAME_LENGTH > now:
+            return match['round']
+    return schedule[-1]['round']
@@ -11,52 +11,109 @@ import os
 import random
 from datetime import datetime, timedelta
 import copy
+import threading
+import numpy as np
 import requests
 from bs4 import BeautifulSoup
+from player_repository import get_repository
+from price_simulator import data_generation, projected_points
+from fixture_schedule import (
+    FIXTURE_SCHEDULE_PATHS, GAME_LENGTH, load_fixture_schedule, normalize_team, parse_kickoff
+)
+from data_prefetcher import REQUEST_TIMEOUT, dataset_status, read_cached, register_dataset
+from venues import VENUES_PATH, get_venue_data, home_distance_matrix, venue_index
+from weather_provider import get_weather
 
-def get_player_data():
-    """Get player data from the JSON file"""
-    try:
-        with open('player_data.json', 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading player data: {e}")
-        return []
+TEAMS = [
+    "Adelaide", "Brisbane", "Carlton", "Collingwood",
+    "Essendon", "Fremantle", "Geelong", "Gold Coast",
+    "GWS", "Hawthorn", "Melbourne", "North Melbourne",
+    "Port Adelaide", "Richmond", "St Kilda", "Sydney",
+    "West Coast", "Western Bulldogs"
+]
+
+TEAM_RATINGS_PATH = 'team_ratings.json'
+FIXTURE_DATA_PATH = 'fixture_data.json'
+DVP_MATRIX_PATH = 'dvp_matrix.json'
+
+FIXTURE_YEAR = 2025
+FIXTURE_URL = f"https://www.footywire.com/afl/footy/ft_match_list?year={FIXTURE_YEAR}"
+DVP_URL = "https://dfsaustralia.com/afl-dvp/"
+
+POSITIONS = ["DEF", "MID", "RUC", "FWD"]
+
+# DVP is on a 1-5 scale with 3 neutral; each point moves projections 5%
+DVP_NEUTRAL = 3.0
+DVP_FAVORABLE = 3.5
+DVP_PROJECTION_STEP = 0.05
+
+# Number of rounds from the current round covered by the fixture tools
+UPCOMING_ROUNDS = 5
+
+# Rolling window (rounds) for cumulative travel load, the one-way distance
+# counted as travel, and the distance that maps to the maximum impact of 1.0
+TRAVEL_LOAD_WINDOW = 3
+TRAVEL_MIN_KM = 150
+TRAVEL_MAX_IMPACT_KM = 3300
+
+_index_cache = {}
+_index_lock = threading.Lock()
+_dvp_cache = {}
+_dvp_lock = threading.Lock()
 
 def get_fixture_data():
     """
-    Get fixture data for the upcoming rounds from scraped data if available,
-    or use default data as fallback
+    Get fixture data for the upcoming rounds from the prefetched cache if
+    available, or use default data as fallback
+    
+    Never scrapes: data_prefetcher keeps fixture_data.json up to date in the
+    background, and fixture_data_status() reports how stale it is.
     """
     try:
-        # Try to load scraped fixture data from fixture_data.json
-        if os.path.exists('fixture_data.json'):
-            with open('fixture_data.json', 'r') as f:
-                fixture_data = json.load(f)
-                if 'fixtures' in fixture_data and fixture_data['fixtures']:
-                    return process_real_fixture_data(fixture_data)
-        
-        # If we don't have fixture data yet, try to scrape it
-        fixtures = scrape_fixture_data()
-        if fixtures and not isinstance(fixtures, dict):
-            # Save for future use
-            with open('fixture_data.json', 'w') as f:
-                json.dump({
-                    "fixtures": fixtures,
-                    "updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }, f, indent=2)
-            return process_real_fixture_data({"fixtures": fixtures})
-            
+        fixture_data, _ = read_cached("fixture")
+        if isinstance(fixture_data, dict) and fixture_data.get('fixtures'):
+            return process_real_fixture_data(fixture_data)
     except Exception as e:
         print(f"Error getting fixture data: {e}")
     
-    # Fallback to sample data if we couldn't get real data
+    # Fallback to sample data until the prefetcher has fetched the fixture
     return get_sample_fixture_data()
 
-def scrape_fixture_data(year=2025):
+def parse_fixture_page(html, year=FIXTURE_YEAR):
+    """
+    Parse the FootyWire match list page
+    
+    Returns:
+        dict: Fixture data with 'fixtures' and 'year', or None if the table is missing
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    
+    table = soup.find("table", {"class": "data"})
+    if not table:
+        return None
+        
+    rows = table.find_all("tr")[1:]  # skip header
+    
+    fixtures = []
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) >= 6:
+            fixtures.append({
+                "round": cols[0].text.strip(),
+                "date": cols[1].text.strip(),
+                "home": cols[2].text.strip(),
+                "away": cols[4].text.strip(),
+                "venue": cols[5].text.strip()
+            })
+    
+    return {"fixtures": fixtures, "year": year} if fixtures else None
+
+def scrape_fixture_data(year=FIXTURE_YEAR):
     """
     Scrape fixture data directly from the FootyWire website
     
+    Not used on the request path; see data_prefetcher.
+    
     Args:
         year (int, optional): Year to scrape fixtures for. Defaults to 2025.
         
@@ -65,34 +122,11 @@ def scrape_fixture_data(year=2025):
     """
     try:
         base_url = f"https://www.footywire.com/afl/footy/ft_match_list?year={year}"
-        response = requests.get(base_url)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        table = soup.find("table", {"class": "data"})
-        if not table:
+        response = requests.get(base_url, timeout=REQUEST_TIMEOUT)
+        fixture_data = parse_fixture_page(response.text, year)
+        if not fixture_data:
             return {"error": "Could not find fixture table on the page"}
-            
-        rows = table.find_all("tr")[1:]  # skip header
-
-        fixtures = []
-        for row in rows:
-            cols = row.find_all("td")
-            if len(cols) >= 6:
-                round_text = cols[0].text.strip()
-                date = cols[1].text.strip()
-                home_team = cols[2].text.strip()
-                away_team = cols[4].text.strip()
-                venue = cols[5].text.strip()
-
-                fixtures.append({
-                    "round": round_text,
-                    "date": date,
-                    "home": home_team,
-                    "away": away_team,
-                    "venue": venue
-                })
-        
-        return fixtures
+        return fixture_data["fixtures"]
     except Exception as e:
         print(f"Error scraping fixture data: {e}")
         return {"error": str(e)}
@@ -208,6 +242,25 @@ def get_team_strength_ratings():
         "West Coast", "Western Bulldogs"
     ]
     
+    # Use saved ratings when available
+    if os.path.exists(TEAM_RATINGS_PATH):
+        try:
+            with open(TEAM_RATINGS_PATH, 'r') as f:
+                saved = json.load(f)
+            team_ratings = {}
+            for team, rating in saved.items():
+                offense = float(rating.get("offense", 85))
+                defense = float(rating.get("defense", 85))
+                team_ratings[normalize_team(team)] = {
+                    "offense": offense,
+                    "defense": defense,
+                    "overall": float(rating.get("overall", (offense + defense) / 2))
+                }
+            if all(team in team_ratings for team in teams):
+                return team_ratings
+        except Exception as e:
+            print(f"Error loading team ratings: {e}")
+    
     team_ratings = {}
     
     for team in teams:
@@ -233,45 +286,223 @@ def get_team_strength_ratings():
     
     return team_ratings
 
+def _fixture_matches():
+    """
+    All matches as (round, home, away, venue, date, kickoff) tuples, from the
+    fixture schedule when one is saved, otherwise from get_fixture_data()
+    """
+    schedule = load_fixture_schedule()
+    if schedule:
+        return [
+            (m["round"], m["home"], m["away"], m["venue"] or "Unknown",
+             m["kickoff"].strftime("%Y-%m-%d"), m["kickoff"])
+            for m in schedule
+        ]
+    
+    matches = []
+    for round_data in get_fixture_data():
+        for match in round_data["matches"]:
+            date = match.get("date", "TBD")
+            matches.append((
+                round_data["round"], normalize_team(match["home_team"]), normalize_team(match["away_team"]),
+                match.get("venue", "Unknown"), date, parse_kickoff(date)
+            ))
+    return matches
+
+def _build_fixture_index():
+    """
+    Build team x round matrices of opponent, home/away, venue, date, difficulty
+    and travel (round-trip km and rolling travel load)
+    
+    Byes (and teams missing from a round) have opponent -1 and NaN difficulty.
+    """
+    matches = [m for m in _fixture_matches() if m[1] in TEAMS and m[2] in TEAMS]
+    team_ratings = get_team_strength_ratings()
+    
+    rounds = sorted({m[0] for m in matches})
+    team_pos = {team: i for i, team in enumerate(TEAMS)}
+    round_pos = {r: j for j, r in enumerate(rounds)}
+    shape = (len(TEAMS), len(rounds))
+    
+    opponent = np.full(shape, -1, dtype=np.int64)
+    is_home = np.zeros(shape, dtype=bool)
+    venue = np.full(shape, "", dtype=object)
+    date = np.full(shape, "", dtype=object)
+    kickoff = np.full(shape, None, dtype=object)
+    
+    for round_num, home, away, match_venue, match_date, match_kickoff in matches:
+        j = round_pos[round_num]
+        for team, other, home_flag in ((home, away, True), (away, home, False)):
+            i = team_pos[team]
+            opponent[i, j] = team_pos[other]
+            is_home[i, j] = home_flag
+            venue[i, j] = match_venue
+            date[i, j] = match_date
+            kickoff[i, j] = match_kickoff
+    
+    # Difficulty from the opponent's strength, adjusted for home/away,
+    # scaled to a 1-10 range and rounded to 1 decimal
+    overall = np.array([team_ratings.get(team, {"overall": 85})["overall"] for team in TEAMS], dtype=np.float64)
+    plays = opponent >= 0
+    opponent_rating = np.where(plays, overall[np.maximum(opponent, 0)], np.nan)
+    adjusted = opponent_rating * np.where(is_home, 0.9, 1.1)
+    difficulty = np.round(((adjusted - 70) / 30) * 9 + 1, 1)
+    
+    # Travel: round trip from home base to the venue, 0 at home grounds and on byes
+    # (fixtures without a known venue are assumed to be at the home team's ground)
+    venues = get_venue_data()
+    home_ground = [venue_index(venues["home_venues"].get(team), venues) for team in TEAMS]
+    venue_idx = np.full(shape, -1, dtype=np.int64)
+    for i, j in zip(*np.nonzero(opponent >= 0)):
+        v = venue_index(venue[i, j], venues)
+        venue_idx[i, j] = v if v >= 0 else home_ground[i if is_home[i, j] else opponent[i, j]]
+    home_km = home_distance_matrix(TEAMS, venues)
+    one_way = np.where(
+        venue_idx >= 0,
+        np.take_along_axis(home_km, np.maximum(venue_idx, 0), axis=1),
+        np.nan
+    )
+    travel_km = np.where(np.nan_to_num(one_way) >= TRAVEL_MIN_KM, 2 * one_way, 0.0)
+    
+    # Rolling travel load over the last TRAVEL_LOAD_WINDOW rounds, for every team at once
+    cumulative = np.concatenate([np.zeros((shape[0], 1)), np.cumsum(travel_km, axis=1)], axis=1)
+    lagged = np.arange(shape[1]) + 1 - TRAVEL_LOAD_WINDOW
+    travel_load = cumulative[:, 1:] - cumulative[:, np.maximum(lagged, 0)]
+    
+    # When each round's last game finishes (None without kickoff times);
+    # the current round is worked out from these per call
+    round_finish = [
+        max((k + GAME_LENGTH for k in kickoff[:, j] if k is not None), default=None)
+        for j in range(len(rounds))
+    ]
+    
+    return {
+        "teams": list(TEAMS),
+        "team_pos": team_pos,
+        "rounds": rounds,
+        "round_pos": round_pos,
+        "round_finish": round_finish,
+        "opponent": opponent,
+        "is_home": is_home,
+        "venue": venue,
+        "date": date,
+        "kickoff": kickoff,
+        "difficulty": difficulty,
+        "team_ratings": team_ratings,
+        "venue_idx": venue_idx,
+        "venue_names": venues["names"],
+        "one_way_km": one_way,
+        "travel_km": travel_km,
+        "travel_load": travel_load
+    }
+
+def get_fixture_index():
+    """
+    Get the fixture index, rebuilding it only when the fixture or team
+    ratings files change
+    
+    Returns:
+        dict: Team x round matrices and lookup maps
+    """
+    paths = FIXTURE_SCHEDULE_PATHS + (TEAM_RATINGS_PATH, VENUES_PATH)
+    generation = data_generation(*paths)
+    with _index_lock:
+        if _index_cache.get("generation") == generation:
+            return _index_cache["index"]
+    
+    index = _build_fixture_index()
+    
+    with _index_lock:
+        # Cached under the generation read before the build: a file saved
+        # while building changes the generation and triggers another build
+        _index_cache["generation"] = generation
+        _index_cache["index"] = index
+    return index
+
+def fixture_current_round(index, now=None):
+    """
+    Current round of the fixture index: the first round with a game still to finish
+    
+    Args:
+        index (dict): get_fixture_index() result
+        now (datetime, optional): Time to check against (defaults to now)
+    
+    Returns:
+        int: Round number (the last round once every game is over), or None without rounds
+    """
+    now = now or datetime.now()
+    rounds = index["rounds"]
+    for round_num, finish in zip(rounds, index["round_finish"]):
+        if finish is None or finish > now:
+            return round_num
+    return rounds[-1] if rounds else None
+
+def upcoming_rounds(index, count=UPCOMING_ROUNDS, now=None):
+    """Column slice of the index covering the next `count` rounds"""
+    rounds = index["rounds"]
+    if not rounds:
+        return slice(0, 0)
+    start = index["round_pos"].get(fixture_current_round(index, now), 0)
+    return slice(start, start + count)
+
 def get_team_position_dvp():
     """
-    Get team DVP (Defense vs Position) data from scraped data if available,
-    or use sample data as fallback
+    Get team DVP (Defense vs Position) data from the prefetched cache if
+    available, or use sample data as fallback
+    
+    Never scrapes: data_prefetcher keeps dvp_matrix.json up to date.
     """
     try:
-        # Try to load scraped DVP data from dvp_matrix.json
-        if os.path.exists('dvp_matrix.json'):
-            with open('dvp_matrix.json', 'r') as f:
-                dvp_data = json.load(f)
-                if dvp_data and all(pos in dvp_data for pos in ["DEF", "MID", "RUC", "FWD"]):
-                    return process_real_dvp_data(dvp_data)
-        
-        # Try to scrape DVP data directly
-        dvp_data = scrape_dvp_data()
-        if dvp_data and all(pos in dvp_data for pos in ["DEF", "MID", "RUC", "FWD"]):
-            # Save for future use
-            with open('dvp_matrix.json', 'w') as f:
-                json.dump(dvp_data, f, indent=2)
+        dvp_data, _ = read_cached("dvp")
+        if dvp_data and all(pos in dvp_data for pos in POSITIONS):
             return process_real_dvp_data(dvp_data)
-            
     except Exception as e:
         print(f"Error getting DVP data: {e}")
     
     # Fallback to sample data
     return get_sample_dvp_data()
 
-def scrape_dvp_data():
+def get_dvp_matrix():
     """
-    Scrape DVP data from DFS Australia
+    Get DVP as a team x position matrix, rebuilt only when dvp_matrix.json changes
+    
+    Returns:
+        dict: 'values' [team, position] array with 'team_pos' and 'position_pos' maps
+    """
+    generation = data_generation(DVP_MATRIX_PATH)
+    with _dvp_lock:
+        if _dvp_cache.get("generation") == generation:
+            return _dvp_cache["matrix"]
+    
+    team_dvp = get_team_position_dvp()
+    values = np.array(
+        [[team_dvp.get(team, {}).get(position, DVP_NEUTRAL) for position in POSITIONS] for team in TEAMS],
+        dtype=np.float64
+    )
+    matrix = {
+        "teams": list(TEAMS),
+        "positions": list(POSITIONS),
+        "team_pos": {team: i for i, team in enumerate(TEAMS)},
+        "position_pos": {position: k for k, position in enumerate(POSITIONS)},
+        "values": values
+    }
+    
+    with _dvp_lock:
+        # The generation read before the build, as for the fixture index
+        _dvp_cache["generation"] = generation
+        _dvp_cache["matrix"] = matrix
+    return matrix
+
+def parse_dvp_page(html):
+    """
+    Parse the DFS Australia DVP page into {position: [{"Team", "DVP"}]}
     """
     try:
-        url = "https://dfsaustralia.com/afl-dvp/"
-        response = requests.get(url)
-        
         # Use pandas to read HTML tables (if possible)
         try:
             import pandas as pd
-            tables = pd.read_html(response.text)
+            from io import StringIO
+            tables = pd.read_html(StringIO(html))
             
             positions = ["DEF", "MID", "RUC", "FWD"]
             dvp_data = {}
@@ -285,11 +516,11 @@ def scrape_dvp_data():
                 else:
                     dvp_data[pos] = []
                     
-            return dvp_data
+            return dvp_data if any(dvp_data.values()) else None
             
         except ImportError:
             # If pandas is not available, use BeautifulSoup parsing
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = BeautifulSoup(html, "html.parser")
             tables = soup.find_all("table")
             
             positions = ["DEF", "MID", "RUC", "FWD"]
@@ -312,8 +543,21 @@ def scrape_dvp_data():
                             except:
                                 pass
             
-            return dvp_data
+            return dvp_data if any(dvp_data.values()) else None
             
+    except Exception as e:
+        print(f"Error parsing DVP data: {e}")
+        return None
+
+def scrape_dvp_data():
+    """
+    Scrape DVP data from DFS Australia
+    
+    Not used on the request path; see data_prefetcher.
+    """
+    try:
+        response = requests.get(DVP_URL, timeout=REQUEST_TIMEOUT)
+        return parse_dvp_page(response.text)
     except Exception as e:
         print(f"Error scraping DVP data: {e}")
         return None
@@ -364,6 +608,21 @@ def process_real_dvp_data(dvp_data):
     
     return team_dvp
 
+# Scraped inputs are fetched in the background by data_prefetcher
+register_dataset("fixture", FIXTURE_DATA_PATH, FIXTURE_URL, parse_fixture_page,
+                 interval=12 * 3600, max_age=7 * 24 * 3600)
+register_dataset("dvp", DVP_MATRIX_PATH, DVP_URL, parse_dvp_page,
+                 interval=24 * 3600, max_age=7 * 24 * 3600)
+
+def fixture_data_status():
+    """
+    Reports how stale the cached fixture and DVP data are
+    
+    Returns:
+        dict: Version, fetch time, age and stale flag for each dataset
+    """
+    return {"fixture": dataset_status("fixture"), "dvp": dataset_status("dvp")}
+
 def get_sample_dvp_data():
     """
     Generate sample DVP data as a fallback
@@ -396,39 +655,29 @@ def get_sample_dvp_data():
     
     return team_dvp
 
-def get_venue_weather_data():
+def get_venue_weather_data(date=None):
     """
-    Get historical weather data for venues
-    In a real implementation, this would come from a weather API
-    For this prototype, we'll create some dummy weather data
+    Get weather for every known venue on a date (today by default)
+    
+    Weather comes from the weather provider through the on-disk weather
+    cache, so repeated calls return the same data until the cache changes.
+    
+    Returns:
+        dict: Venue -> rain_chance, wind_chance and weather_risk
     """
-    venues = [
-        "MCG", "Adelaide Oval", "Optus Stadium", "SCG", "Gabba",
-        "Marvel Stadium", "GMHBA Stadium", "Metricon Stadium", "UTAS Stadium"
-    ]
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    names = get_venue_data()["names"]
+    weather = get_weather([(venue, date) for venue in names])
     
     weather_data = {}
-    
-    for venue in venues:
-        # Indoor stadiums have no weather risk
-        if venue == "Marvel Stadium":
-            rain_chance = 0
-            wind_chance = 0
-        else:
-            # Generate random weather probabilities
-            rain_chance = random.randint(5, 40)
-            wind_chance = random.randint(10, 50)
-            
-            # Adjust based on location
-            if venue in ["Gabba", "Metricon Stadium"]:
-                rain_chance = random.randint(20, 60)  # More rain in QLD
-            elif venue in ["MCG", "GMHBA Stadium"]:
-                wind_chance = random.randint(30, 70)  # More wind in VIC
-        
+    for venue in names:
+        forecast = weather.get((venue, date))
+        if not forecast:
+            continue
         weather_data[venue] = {
-            "rain_chance": rain_chance,
-            "wind_chance": wind_chance,
-            "weather_risk": (rain_chance + wind_chance) / 2
+            "rain_chance": forecast["rain_chance"],
+            "wind_chance": forecast["wind_chance"],
+            "weather_risk": (forecast["rain_chance"] + forecast["wind_chance"]) / 2
         }
     
     return weather_data
@@ -440,72 +689,31 @@ def fixture_difficulty_scanner():
     Returns:
         list: Teams with fixture difficulty ratings for next 5 rounds
     """
-    fixture = get_fixture_data()
-    team_ratings = get_team_strength_ratings()
+    index = get_fixture_index()
+    window = upcoming_rounds(index)
+    rounds = index["rounds"][window]
+    teams = index["teams"]
+    opponent = index["opponent"][:, window]
+    is_home = index["is_home"][:, window]
+    difficulty = index["difficulty"][:, window]
     
-    # Calculate difficulty for each team's upcoming fixtures
-    teams = list(team_ratings.keys())
-    team_fixtures = {team: [] for team in teams}
+    # Average difficulty per team over the rounds it plays (byes are NaN)
+    plays = opponent >= 0
+    counts = plays.sum(axis=1)
+    totals = np.where(plays, difficulty, 0).sum(axis=1)
     
-    # Process fixture data to get each team's opponents
-    for round_data in fixture:
-        round_num = round_data["round"]
-        
-        for match in round_data["matches"]:
-            home_team = match["home_team"]
-            away_team = match["away_team"]
-            venue = match["venue"]
-            
-            # Add opponent to home team's fixtures
-            team_fixtures[home_team].append({
-                "round": round_num,
-                "opponent": away_team,
-                "is_home": True,
-                "venue": venue
-            })
-            
-            # Add opponent to away team's fixtures
-            team_fixtures[away_team].append({
-                "round": round_num,
-                "opponent": home_team,
-                "is_home": False,
-                "venue": venue
-            })
-    
-    # Calculate difficulty ratings for each team's fixtures
     team_difficulty = []
-    
-    for team, fixtures in team_fixtures.items():
-        # Sort fixtures by round
-        fixtures.sort(key=lambda x: x["round"])
-        
-        # Calculate difficulty for each fixture
-        difficulty_ratings = []
-        for fixture in fixtures:
-            opponent = fixture["opponent"]
-            is_home = fixture["is_home"]
-            
-            # Base difficulty on opponent's strength
-            opponent_rating = team_ratings[opponent]["overall"]
-            
-            # Adjust for home/away advantage
-            difficulty = opponent_rating * (0.9 if is_home else 1.1)
-            
-            # Scale to 1-10 range and round to 1 decimal
-            difficulty = round(((difficulty - 70) / 30) * 9 + 1, 1)
-            
-            difficulty_ratings.append({
-                "round": fixture["round"],
-                "opponent": opponent,
-                "is_home": is_home,
-                "difficulty": difficulty
-            })
-        
-        # Calculate average difficulty
-        if difficulty_ratings:
-            avg_difficulty = round(sum(f["difficulty"] for f in difficulty_ratings) / len(difficulty_ratings), 1)
-        else:
-            avg_difficulty = 5.0
+    for i, team in enumerate(teams):
+        difficulty_ratings = [
+            {
+                "round": rounds[j],
+                "opponent": teams[opponent[i, j]],
+                "is_home": bool(is_home[i, j]),
+                "difficulty": float(difficulty[i, j])
+            }
+            for j in np.flatnonzero(plays[i])
+        ]
+        avg_difficulty = round(float(totals[i] / counts[i]), 1) if counts[i] else 5.0
         
         team_difficulty.append({
             "team": team,
@@ -518,72 +726,115 @@ def fixture_difficulty_scanner():
     
     return team_difficulty
 
-def matchup_dvp_analyzer():
+def matchup_dvp_analyzer(top=10):
     """
     Analyzes Defense vs Position (DVP) matchups for upcoming rounds
     
+    Args:
+        top (int): Matchups to return per position
+    
     Returns:
         list: Favorable matchups by position for upcoming rounds
     """
-    fixture = get_fixture_data()
-    team_dvp = get_team_position_dvp()
+    index = get_fixture_index()
+    dvp = get_dvp_matrix()
+    window = upcoming_rounds(index)
+    rounds = index["rounds"][window]
+    teams = index["teams"]
+    opponent = index["opponent"][:, window]
+    is_home = index["is_home"][:, window]
     
-    # Find favorable matchups for each position
-    positions = ["DEF", "MID", "RUC", "FWD"]
-    favorable_matchups = {position: [] for position in positions}
+    # DVP each team's opponent concedes, for every team x round x position
+    opponent_dvp = np.where(
+        (opponent >= 0)[:, :, None],
+        dvp["values"][np.maximum(opponent, 0)],
+        np.nan
+    )
+    quality = np.round((opponent_dvp - DVP_NEUTRAL) * 2.5, 1)  # Scale to 1-5
     
-    # Process fixture data to find favorable matchups
-    for round_data in fixture:
-        round_num = round_data["round"]
-        
-        for match in round_data["matches"]:
-            home_team = match["home_team"]
-            away_team = match["away_team"]
-            
-            # Check for favorable matchups for home team players
-            for position in positions:
-                opponent_dvp = team_dvp[away_team][position]
-                
-                # If opponent has high DVP (gives up points to this position)
-                if opponent_dvp >= 3.5:
-                    favorable_matchups[position].append({
-                        "round": round_num,
-                        "team": home_team,
-                        "opponent": away_team,
-                        "is_home": True,
-                        "dvp_rating": opponent_dvp,
-                        "matchup_quality": round((opponent_dvp - 3) * 2.5, 1)  # Scale to 1-5
-                    })
-            
-            # Check for favorable matchups for away team players
-            for position in positions:
-                opponent_dvp = team_dvp[home_team][position]
-                
-                # If opponent has high DVP (gives up points to this position)
-                if opponent_dvp >= 3.5:
-                    favorable_matchups[position].append({
-                        "round": round_num,
-                        "team": away_team,
-                        "opponent": home_team,
-                        "is_home": False,
-                        "dvp_rating": opponent_dvp,
-                        "matchup_quality": round((opponent_dvp - 3) * 2.5, 1)  # Scale to 1-5
-                    })
-    
-    # Sort each position's matchups by quality and round
-    for position in positions:
-        favorable_matchups[position].sort(key=lambda x: (x["round"], -x["matchup_quality"]))
+    # Earliest rounds first, best matchups first within a round
+    round_idx = np.broadcast_to(np.arange(len(rounds))[None, :], opponent.shape)
     
-    # Restructure data for frontend
     result = []
-    for position, matchups in favorable_matchups.items():
+    for k, position in enumerate(dvp["positions"]):
+        # If opponent has high DVP (gives up points to this position)
+        team_i, round_j = np.nonzero(opponent_dvp[:, :, k] >= DVP_FAVORABLE)
+        sort_key = round_idx[team_i, round_j] * 100.0 - quality[team_i, round_j, k]
+        if len(sort_key) > top:
+            chosen = np.argpartition(sort_key, top - 1)[:top]
+        else:
+            chosen = np.arange(len(sort_key))
+        chosen = chosen[np.argsort(sort_key[chosen], kind="stable")]
+        
         result.append({
             "position": position,
-            "matchups": matchups[:10]  # Limit to top 10 matchups per position
+            "matchups": [
+                {
+                    "round": rounds[round_j[c]],
+                    "team": teams[team_i[c]],
+                    "opponent": teams[opponent[team_i[c], round_j[c]]],
+                    "is_home": bool(is_home[team_i[c], round_j[c]]),
+                    "dvp_rating": float(opponent_dvp[team_i[c], round_j[c], k]),
+                    "matchup_quality": float(quality[team_i[c], round_j[c], k])
+                }
+                for c in chosen
+            ]
         })
     
     return result
 
+def dvp_adjusted_projections(round_number=None):
+    """
+    Adjusts every player's projected score for their opponent's DVP in a round
+    
+    Args:
+        round_number (int, optional): Round to project (defaults to the current round)
+    
+    Returns:
+        list: Players with base and DVP-adjusted projections, best first
+    """
+    index = get_fixture_index()
+    dvp = get_dvp_matrix()
+    round_number = fixture_current_round(index) if round_number is None else round_number
+    j = index["round_pos"].get(round_number)
+    
+    records = get_repository().records()
+    team_idx = np.array([index["team_pos"].get(normalize_team(r.team), -1) for r in records], dtype=np.int64)
+    position_idx = np.array(
+        [next((dvp["position_pos"][p] for p in r.positions if p in dvp["position_pos"]), -1) for r in records],
+        dtype=np.int64
+    )
+    base = np.array([projected_points(r.data) or 0.0 for r in records], dtype=np.float64)
+    
+    # Opponent for every player this round (-1 on a bye or unknown team)
+    opponent = np.full(len(records), -1, dtype=np.int64)
+    if j is not None:
+        known = team_idx >= 0
+        opponent[known] = index["opponent"][team_idx[known], j]
+    
+    matched = (opponent >= 0) & (position_idx >= 0)
+    opponent_dvp = np.full(len(records), np.nan)
+    opponent_dvp[matched] = dvp["values"][opponent[matched], position_idx[matched]]
+    multiplier = np.where(matched, 1 + (np.nan_to_num(opponent_dvp, nan=DVP_NEUTRAL) - DVP_NEUTRAL) * DVP_PROJECTION_STEP, 1.0)
+    adjusted = base * multiplier
+    
+    result = []
+    for i in np.argsort(-adjusted, kind="stable"):
+        record = records[i]
+        result.append({
+            "player_id": record.id,
+            "player": record.name,
+            "team": record.team,
+            "position": record.position,
+            "opponent": index["teams"][opponent[i]] if opponent[i] >= 0 else None,
+            "dvp_rating": float(opponent_dvp[i]) if matched[i] else None,
+            "base_projection": round(float(base[i]), 1),
+            "dvp_adjusted_projection": round(float(adjusted[i]), 1)
+        })
+    
+    return result
+
+
 def fixture_swing_radar():
     """
     Identifies teams with significant changes in fixture difficulty
@@ -634,206 +885,144 @@ def travel_impact_estimator():
     """
     Estimates the impact of travel on team performance
     
+    Travel is the great-circle round trip from each team's home base to the
+    venue, with a rolling travel load over TRAVEL_LOAD_WINDOW rounds. Both
+    come precomputed with the fixture index, so this is a lookup.
+    
     Returns:
         list: Teams with travel impact ratings for upcoming fixtures
     """
-    fixture = get_fixture_data()
-    
-    # Define team home states
-    team_states = {
-        "Adelaide": "SA",
-        "Brisbane": "QLD",
-        "Carlton": "VIC",
-        "Collingwood": "VIC",
-        "Essendon": "VIC",
-        "Fremantle": "WA",
-        "Geelong": "VIC",
-        "Gold Coast": "QLD",
-        "GWS": "NSW",
-        "Hawthorn": "VIC",
-        "Melbourne": "VIC",
-        "North Melbourne": "VIC",
-        "Port Adelaide": "SA",
-        "Richmond": "VIC",
-        "St Kilda": "VIC",
-        "Sydney": "NSW",
-        "West Coast": "WA",
-        "Western Bulldogs": "VIC"
-    }
-    
-    # Define venue states
-    venue_states = {
-        "MCG": "VIC",
-        "Marvel Stadium": "VIC",
-        "GMHBA Stadium": "VIC",
-        "Adelaide Oval": "SA",
-        "Optus Stadium": "WA",
-        "SCG": "NSW",
-        "Gabba": "QLD",
-        "Metricon Stadium": "QLD",
-        "UTAS Stadium": "TAS",
-        "Giants Stadium": "NSW",
-        "Blundstone Arena": "TAS"
-    }
-    
-    # Define travel fatigue by distance between states
-    # Higher value means more fatigue
-    travel_fatigue = {
-        ("VIC", "VIC"): 0,
-        ("NSW", "NSW"): 0,
-        ("QLD", "QLD"): 0,
-        ("SA", "SA"): 0,
-        ("WA", "WA"): 0,
-        ("TAS", "TAS"): 0,
-        
-        ("VIC", "NSW"): 2,
-        ("VIC", "SA"): 2,
-        ("VIC", "TAS"): 1,
-        ("NSW", "QLD"): 2,
-        ("SA", "WA"): 3,
-        
-        ("VIC", "QLD"): 3,
-        ("VIC", "WA"): 4,
-        ("NSW", "SA"): 3,
-        ("NSW", "WA"): 5,
-        ("NSW", "TAS"): 2,
-        ("QLD", "SA"): 4,
-        ("QLD", "WA"): 5,
-        ("QLD", "TAS"): 4,
-        ("SA", "TAS"): 3,
-        ("WA", "TAS"): 5
-    }
-    
-    # Ensure all state combinations are covered
-    for state1 in ["VIC", "NSW", "QLD", "SA", "WA", "TAS"]:
-        for state2 in ["VIC", "NSW", "QLD", "SA", "WA", "TAS"]:
-            if (state1, state2) not in travel_fatigue and (state2, state1) in travel_fatigue:
-                travel_fatigue[(state1, state2)] = travel_fatigue[(state2, state1)]
-    
-    # Calculate travel impact for each team's upcoming fixtures
-    teams = list(team_states.keys())
-    team_travel = {team: [] for team in teams}
-    
-    # Process fixture data to calculate travel impact
-    for round_data in fixture:
-        round_num = round_data["round"]
-        
-        for match in round_data["matches"]:
-            home_team = match["home_team"]
-            away_team = match["away_team"]
-            venue = match["venue"]
-            
-            # Skip matches at unknown venues
-            if venue not in venue_states:
-                continue
-                
-            venue_state = venue_states[venue]
-            
-            # Calculate travel impact for away team
-            away_team_state = team_states[away_team]
-            away_fatigue = travel_fatigue.get((away_team_state, venue_state), 3)  # Default to 3 if not specified
-            
-            team_travel[away_team].append({
-                "round": round_num,
-                "opponent": home_team,
-                "is_home": False,
-                "venue": venue,
-                "travel_distance": away_fatigue,
-                "travel_impact": round(away_fatigue * 0.2, 1)  # Scale to 0-1 range
-            })
+    index = get_fixture_index()
+    with _index_lock:
+        if "travel_report" not in index:
+            index["travel_report"] = _travel_report(index)
+    return copy.deepcopy(index["travel_report"])
+
+def _travel_report(index):
+    """Build the travel impact report from the index's travel matrices"""
+    window = upcoming_rounds(index)
+    rounds = index["rounds"][window]
+    teams = index["teams"]
+    opponent = index["opponent"][:, window]
+    is_home = index["is_home"][:, window]
+    venue_idx = index["venue_idx"][:, window]
+    one_way = index["one_way_km"][:, window]
+    travel_km = index["travel_km"][:, window]
+    travel_load = index["travel_load"][:, window]
+    impact = np.round(np.minimum(np.nan_to_num(one_way) / TRAVEL_MAX_IMPACT_KM, 1.0), 1)
     
-    # Calculate average travel impact for each team
     result = []
-    for team, travels in team_travel.items():
-        if not travels:
-            continue
-            
-        # Only include non-zero travel impacts
-        travels = [t for t in travels if t["travel_distance"] > 0]
-        if not travels:
+    for i, team in enumerate(teams):
+        # Only include games that involve travel to a known venue
+        trips = np.flatnonzero((opponent[i] >= 0) & (venue_idx[i] >= 0) & (travel_km[i] > 0))
+        if not len(trips):
             continue
-            
-        avg_impact = round(sum(t["travel_impact"] for t in travels) / len(travels), 1)
+        
+        travels = [
+            {
+                "round": rounds[j],
+                "opponent": teams[opponent[i, j]],
+                "is_home": bool(is_home[i, j]),
+                "venue": index["venue_names"][venue_idx[i, j]],
+                "travel_distance": int(round(one_way[i, j])),
+                "travel_km": int(round(travel_km[i, j])),
+                "travel_load": int(round(travel_load[i, j])),
+                "travel_impact": float(impact[i, j])
+            }
+            for j in trips
+        ]
         
         result.append({
             "team": team,
-            "avg_travel_impact": avg_impact,
+            "avg_travel_impact": round(float(impact[i, trips].mean()), 1),
+            "total_travel_km": int(round(travel_km[i, trips].sum())),
+            "peak_travel_load": int(round(travel_load[i, trips].max())),
             "travel_fixtures": travels,
             "interstate_games": len(travels)
         })
     
     # Sort by average travel impact (highest first)
-    result.sort(key=lambda x: x["avg_travel_impact"], reverse=True)
+    result.sort(key=lambda x: (x["avg_travel_impact"], x["total_travel_km"]), reverse=True)
     
     return result
 
+def _fixture_weather(index):
+    """
+    Rain and wind chance for every match in the fixture, fetched in one batch
+    
+    Returns:
+        tuple: (rain_chance, wind_chance) team x round arrays, NaN where
+               there is no home game or no weather for the venue
+    """
+    with _index_lock:
+        if "weather_keys" not in index:
+            # Games at venues not in venues.json have no coordinates to look weather up for
+            home_games = (index["opponent"] >= 0) & index["is_home"] & (index["venue_idx"] >= 0)
+            keys = {}
+            for i, j in zip(*np.nonzero(home_games)):
+                kickoff = index["kickoff"][i, j]
+                keys[(i, j)] = (index["venue_names"][index["venue_idx"][i, j]], kickoff or index["date"][i, j])
+            index["weather_keys"] = keys
+        keys = index["weather_keys"]
+
+    weather = get_weather(keys.values())
+    rain = np.full(index["opponent"].shape, np.nan)
+    wind = np.full(index["opponent"].shape, np.nan)
+    for (i, j), key in keys.items():
+        forecast = weather.get(key)
+        if forecast:
+            rain[i, j] = forecast["rain_chance"]
+            wind[i, j] = forecast["wind_chance"]
+    return rain, wind
+
 def weather_forecast_risk_model():
     """
     Analyzes weather risks for upcoming fixtures
     
+    Weather for the whole fixture is read from the weather cache in one
+    batch and scored with array operations. The output only depends on the
+    cache contents, so identical cache states give identical responses.
+    
     Returns:
         list: Fixtures with weather risk ratings
     """
-    fixture = get_fixture_data()
-    venue_weather = get_venue_weather_data()
+    index = get_fixture_index()
+    rain_all, wind_all = _fixture_weather(index)
+    window = upcoming_rounds(index)
+    rounds = index["rounds"][window]
+    teams = index["teams"]
+    opponent = index["opponent"][:, window]
+    venue_idx = index["venue_idx"][:, window]
+    dates = index["date"][:, window]
     
-    # Calculate weather risk for each fixture
-    weather_risks = []
+    # Cap at 100% and scale to a 0-10 risk
+    rain = np.minimum(rain_all[:, window], 100)
+    wind = np.minimum(wind_all[:, window], 100)
+    risk = np.round((rain + wind) / 20, 1)
     
-    # Process fixture data to calculate weather risk
-    for round_data in fixture:
-        round_num = round_data["round"]
-        
-        for match in round_data["matches"]:
-            home_team = match["home_team"]
-            away_team = match["away_team"]
-            venue = match["venue"]
-            date = match["date"]
-            
-            # Skip matches at unknown venues
-            if venue not in venue_weather:
-                continue
-                
-            venue_data = venue_weather[venue]
-            
-            # Basic weather risk from venue
-            rain_chance = venue_data["rain_chance"]
-            wind_chance = venue_data["wind_chance"]
-            
-            # Adjust based on time of year (dummy algorithm)
-            month = datetime.strptime(date, "%Y-%m-%d").month
-            if month in [6, 7, 8]:  # Winter months
-                rain_chance += random.randint(5, 15)
-                wind_chance += random.randint(5, 15)
-            
-            # Cap at 100%
-            rain_chance = min(rain_chance, 100)
-            wind_chance = min(wind_chance, 100)
-            
-            # Calculate overall weather risk
-            weather_risk = round((rain_chance + wind_chance) / 20, 1)  # Scale to 0-10
-            
-            # Determine impact on scoring
-            if weather_risk >= 7:
-                score_impact = "High (15-30% lower scoring)"
-            elif weather_risk >= 4:
-                score_impact = "Medium (5-15% lower scoring)"
-            else:
-                score_impact = "Low (minimal impact)"
-            
-            weather_risks.append({
-                "round": round_num,
-                "home_team": home_team,
-                "away_team": away_team,
-                "venue": venue,
-                "date": date,
-                "rain_chance": rain_chance,
-                "wind_chance": wind_chance,
-                "weather_risk": weather_risk,
-                "score_impact": score_impact
-            })
+    # Determine impact on scoring
+    score_impact = np.select(
+        [risk >= 7, risk >= 4],
+        ["High (15-30% lower scoring)", "Medium (5-15% lower scoring)"],
+        "Low (minimal impact)"
+    )
+    
+    # One row per match with weather: the home team's entry in the fixture index
+    weather_risks = []
+    for j, i in zip(*np.nonzero((~np.isnan(risk)).T)):
+        weather_risks.append({
+            "round": rounds[j],
+            "home_team": teams[i],
+            "away_team": teams[opponent[i, j]],
+            "venue": index["venue_names"][venue_idx[i, j]],
+            "date": dates[i, j],
+            "rain_chance": int(rain[i, j]),
+            "wind_chance": int(wind[i, j]),
+            "weather_risk": float(risk[i, j]),
+            "score_impact": str(score_impact[i, j])
+        })
     
-    # Sort by weather risk (highest first)
-    weather_risks.sort(key=lambda x: x["weather_risk"], reverse=True)
+    # Sort by weather risk (highest first), then by round for a stable order
+    weather_risks.sort(key=lambda x: (-x["weather_risk"], x["round"]))
     
-    return weather_risks
\ No newline at end of file
+    return weather_risks
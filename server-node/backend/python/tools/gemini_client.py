@@ -0,0 +1,360 @@
+"""
+AFL Fantasy Gemini Client
+
+This module sends generation requests for the Gemini tools. Responses are
+stored in a content-addressed cache (hash of model, prompt and generation
+config) kept in memory and on disk with a TTL; identical requests already
+in flight share one backend call; and requests go through one pooled
+async HTTP session running on a background event loop, so synchronous
+callers on any thread reuse the same connections.
+
+Set GEMINI_BACKEND=stub to use a local stub backend that answers with a
+canned response after a configurable delay. Run this module directly to
+benchmark latency, cache hits and coalescing against the stub offline.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    import requests
+
+from data_prefetcher import atomic_write_json
+
+BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+# Seconds a cached response is reused
+CACHE_TTL = int(os.getenv('GEMINI_CACHE_TTL', 6 * 3600))
+CACHE_DIR = os.getenv('GEMINI_CACHE_DIR', 'gemini_cache')
+
+# Connection pool size and per-request timeout (seconds)
+POOL_SIZE = 8
+REQUEST_TIMEOUT = 30
+
+# Simulated latency of the stub backend (seconds)
+STUB_LATENCY = float(os.getenv('GEMINI_STUB_LATENCY', 0.2))
+
+
+class GeminiAPIError(Exception):
+    """Custom exception for Gemini API related errors"""
+    pass
+
+
+def cache_key(model, prompt, config):
+    """Content address of a request: hash of model, prompt and generation config"""
+    body = json.dumps({'model': model, 'prompt': prompt, 'config': config}, sort_keys=True)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Response cache in memory and on disk (one JSON file per key), with a TTL"""
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key, now=None):
+        """Cached entry for a key, or None if missing or expired"""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.directory:
+            try:
+                with open(self._path(key), 'r') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+        if entry is None or entry.get('expires_at', 0) <= now:
+            return None
+        return entry
+
+    def put(self, key, text, model, now=None):
+        """Store a response and return its cache entry"""
+        now = time.time() if now is None else now
+        entry = {
+            'response': text,
+            'model': model,
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
+            'expires_at': now + self.ttl
+        }
+        with self._lock:
+            self._entries[key] = entry
+        if self.directory:
+            try:
+                atomic_write_json(self._path(key), entry)
+            except OSError as e:
+                print(f"Error writing Gemini cache entry: {e}")
+        return entry
+
+    def clear(self):
+        """Drop the in-memory copy (disk entries are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+
+class HTTPBackend:
+    """Gemini generateContent over a pooled HTTP session"""
+
+    name = 'http'
+
+    def __init__(self, api_key, base_url=BASE_URL, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Content-Type": "application/json"}
+            )
+        return self._session
+
+    async def generate(self, model, prompt, config):
+        """
+        Send one generation request
+
+        Returns:
+            str: Response text
+
+        Raises:
+            GeminiAPIError: If the call fails or the response has no text
+        """
+        url = f"{self.base_url}/models/{model}:generateContent"
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": config
+        }
+        try:
+            if AIOHTTP_AVAILABLE:
+                session = await self._get_session()
+                async with session.post(url, params={'key': self.api_key}, json=payload) as response:
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+            else:
+                response = await asyncio.to_thread(
+                    requests.post, url, params={'key': self.api_key}, json=payload, timeout=self.timeout
+                )
+                response.raise_for_status()
+                data = response.json()
+        except asyncio.TimeoutError:
+            raise GeminiAPIError(f"Request timed out after {self.timeout}s")
+        except Exception as e:
+            raise GeminiAPIError(f"Request failed: {str(e)}")
+
+        if not data.get('candidates'):
+            raise GeminiAPIError("No response generated from Gemini API")
+        try:
+            return data['candidates'][0]['content']['parts'][0]['text']
+        except (KeyError, IndexError, TypeError) as e:
+            raise GeminiAPIError(f"Invalid response format from Gemini API: {str(e)}")
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class StubBackend:
+    """Local stand-in for the Gemini API: a canned JSON answer after a fixed delay"""
+
+    name = 'stub'
+
+    def __init__(self, latency=STUB_LATENCY):
+        self.latency = latency
+        self.calls = 0
+
+    async def generate(self, model, prompt, config):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+        return json.dumps({"analysis": f"Stub response {digest}", "format": "stub"})
+
+    async def close(self):
+        pass
+
+
+class GeminiClient:
+    """
+    Cached, coalescing Gemini client
+
+    Use generate() from synchronous code (it runs on the client's event
+    loop thread) or generate_async() from code already on that loop.
+    """
+
+    def __init__(self, backend, model=DEFAULT_MODEL, cache=None):
+        self.backend = backend
+        self.model = model
+        self.cache = cache if cache is not None else ResponseCache()
+        self.stats = {'requests': 0, 'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+        self._inflight = {}
+        self._loop = None
+        self._thread = None
+        self._loop_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='gemini-client', daemon=True)
+                self._thread.start()
+        return self._loop
+
+    async def generate_async(self, prompt, config):
+        """
+        Generate a response, from the cache when possible
+
+        Returns:
+            dict: response, model, timestamp (when it was generated) and cached flag
+        """
+        self.stats['requests'] += 1
+        key = cache_key(self.model, prompt, config)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            return dict(entry, cached=True)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+            entry = await asyncio.shield(pending)
+            return dict(entry, cached=True)
+
+        self.stats['misses'] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self.backend.generate(self.model, prompt, config)
+            entry = self.cache.put(key, text, self.model)
+            future.set_result(entry)
+            return dict(entry, cached=False)
+        except Exception as e:
+            self.stats['errors'] += 1
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    def generate(self, prompt, config, timeout=REQUEST_TIMEOUT + 5):
+        """Synchronous generate_async on the client's background event loop"""
+        future = asyncio.run_coroutine_threadsafe(self.generate_async(prompt, config), self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise GeminiAPIError(f"Request timed out after {timeout}s")
+
+    def hit_rate(self):
+        """Share of requests answered without a new backend call"""
+        served = self.stats['hits'] + self.stats['coalesced']
+        return served / self.stats['requests'] if self.stats['requests'] else 0.0
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key=None, model=DEFAULT_MODEL, backend=None):
+    """
+    Shared client per (backend, model), so calls reuse one pool and cache
+
+    Args:
+        api_key (str, optional): Gemini API key (not needed for the stub backend)
+        model (str): Gemini model name
+        backend (str, optional): 'http' or 'stub' (default from GEMINI_BACKEND, else 'http')
+
+    Returns:
+        GeminiClient: Shared client
+    """
+    backend = backend or os.getenv('GEMINI_BACKEND', 'http')
+    key = (backend, model, api_key)
+    with _clients_lock:
+        if key not in _clients:
+            if backend == 'stub':
+                impl = StubBackend()
+            elif backend == 'http':
+                if not api_key:
+                    raise GeminiAPIError("Gemini API key not provided. Set GEMINI_API_KEY environment variable.")
+                impl = HTTPBackend(api_key)
+            else:
+                raise GeminiAPIError(f"Unknown Gemini backend: {backend}")
+            _clients[key] = GeminiClient(impl, model=model)
+        return _clients[key]
+
+
+def benchmark(requests_total=200, distinct_prompts=20, concurrency=20, latency=STUB_LATENCY, cache_dir=None):
+    """
+    Benchmark the client against the stub backend
+
+    Requests cycle through a fixed set of prompts with the given number in
+    flight at once, so repeats are answered by coalescing or the cache.
+
+    Returns:
+        dict: Backend calls, hit rate, coalesced count and latency percentiles (ms)
+    """
+    client = GeminiClient(StubBackend(latency), cache=ResponseCache(directory=cache_dir))
+    config = {"temperature": 0.6, "maxOutputTokens": 1000}
+    latencies = []
+
+    async def one(i):
+        started = time.perf_counter()
+        await client.generate_async(f"Benchmark prompt {i % distinct_prompts}", config)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(i):
+            async with semaphore:
+                await one(i)
+
+        await asyncio.gather(*(limited(i) for i in range(requests_total)))
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': requests_total,
+        'backend_calls': client.backend.calls,
+        'hit_rate': round(client.hit_rate(), 3),
+        'coalesced': client.stats['coalesced'],
+        'cache_hits': client.stats['hits'],
+        'p50_ms': round(latencies[len(latencies) // 2], 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        'elapsed_s': round(elapsed, 3)
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the Gemini client against the local stub backend')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--prompts', type=int, default=20, help='Distinct prompts')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=STUB_LATENCY, help='Stub latency in seconds')
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.requests, args.prompts, args.concurrency, args.latency), indent=2))
@@ -4,18 +4,17 @@ AFL Fantasy Google Gemini Tools
 This module provides Google Gemini AI-powered analysis tools for AFL Fantasy.
 It handles API calls to Google's Gemini API endpoints and provides intelligent
 recommendations for trades, captaincy, team structure, and player analysis.
+Requests go through gemini_client, which caches responses, coalesces
+identical calls in flight and pools connections.
 """
 
 import json
 import os
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
-
-class GeminiAPIError(Exception):
-    """Custom exception for Gemini API related errors"""
-    pass
+from gemini_client import DEFAULT_MODEL, GeminiAPIError, get_client
+from prompt_builder import build_prompt, compact_json, prompt_metrics
 
 
 class GeminiTools:
@@ -23,27 +22,26 @@ class GeminiTools:
     Google Gemini API integration class for AFL Fantasy analysis
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, backend: Optional[str] = None):
         """
         Initialize Gemini Tools with API key
         
         Args:
             api_key (str, optional): Gemini API key. If not provided, will try to get from environment
+            backend (str, optional): 'http' or 'stub'. Defaults to GEMINI_BACKEND, else 'http'
         """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
-            raise GeminiAPIError("Gemini API key not provided. Set GEMINI_API_KEY environment variable.")
-        
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
-        self.model_name = "gemini-1.5-flash"
-        self.headers = {
-            "Content-Type": "application/json"
-        }
+        self.model_name = DEFAULT_MODEL
+        # Shared per process: one connection pool, response cache and in-flight map
+        self.client = get_client(self.api_key, self.model_name, backend)
     
     def _make_request(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.7) -> Dict[str, Any]:
         """
         Make a request to the Gemini API
         
+        Identical requests (same model, prompt and generation config) are
+        answered from the response cache or share a call already in flight.
+        
         Args:
             prompt (str): The prompt to send to Gemini
             max_tokens (int): Maximum tokens in response
@@ -55,56 +53,27 @@ class GeminiTools:
         Raises:
             GeminiAPIError: If API call fails
         """
-        url = f"{self.base_url}/models/{self.model_name}:generateContent"
-        
-        payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": temperature,
-                "topK": 40,
-                "topP": 0.95,
-                "maxOutputTokens": max_tokens
-            }
+        config = {
+            "temperature": temperature,
+            "topK": 40,
+            "topP": 0.95,
+            "maxOutputTokens": max_tokens
         }
         
         try:
-            response = requests.post(
-                f"{url}?key={self.api_key}",
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if 'candidates' not in data or not data['candidates']:
-                raise GeminiAPIError("No response generated from Gemini API")
-            
-            # Extract text from the response
-            candidate = data['candidates'][0]
-            if 'content' not in candidate or 'parts' not in candidate['content']:
-                raise GeminiAPIError("Invalid response format from Gemini API")
-            
-            text_response = candidate['content']['parts'][0]['text']
-            
-            return {
-                "status": "success",
-                "response": text_response,
-                "model": self.model_name,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-        except requests.exceptions.RequestException as e:
-            raise GeminiAPIError(f"Request failed: {str(e)}")
-        except KeyError as e:
-            raise GeminiAPIError(f"Unexpected response format: {str(e)}")
+            result = self.client.generate(prompt, config)
+        except GeminiAPIError:
+            raise
         except Exception as e:
             raise GeminiAPIError(f"Unexpected error: {str(e)}")
+        
+        return {
+            "status": "success",
+            "response": result["response"],
+            "model": result["model"],
+            "timestamp": result["timestamp"],
+            "cached": result["cached"]
+        }
     
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """
@@ -147,19 +116,15 @@ class GeminiTools:
         Returns:
             dict: Trade recommendations from Gemini AI
         """
-        prompt = f"""
-        As an AFL Fantasy expert, analyze the following player data and provide trade recommendations.
-        
-        Player Data:
-        {json.dumps(player_data[:10], indent=2)}
-        
-        Current Team (if provided):
-        {json.dumps(current_team, indent=2) if current_team else "Not provided"}
-        
-        Please provide a JSON response with the following structure:
-        {{
+        prompt, prompt_stats = build_prompt(
+            "As an AFL Fantasy expert, analyze the following player data and provide trade recommendations.\nFocus on value, form, fixtures, and injury risks. Limit to top 5 recommendations.",
+            players=player_data,
+            limit=10,
+            sections=[("Current Team", ", ".join(map(str, current_team)) if current_team else "Not provided")],
+            response_format="""
+        {
             "trade_recommendations": [
-                {{
+                {
                     "trade_in": "Player Name",
                     "trade_out": "Player Name",
                     "confidence": 85,
@@ -167,14 +132,13 @@ class GeminiTools:
                     "projected_gain": 12.5,
                     "risk_level": "Medium",
                     "priority": "High"
-                }}
+                }
             ],
             "market_insights": "Overall market analysis",
             "timing_advice": "When to make these trades"
-        }}
-        
-        Focus on value, form, fixtures, and injury risks. Limit to top 5 recommendations.
-        """
+        }
+            """
+        )
         
         try:
             response = self._make_request(prompt, max_tokens=1500, temperature=0.6)
@@ -184,7 +148,9 @@ class GeminiTools:
                 "status": "success",
                 "data": parsed_data,
                 "generated_at": response['timestamp'],
-                "model": response['model']
+                "model": response['model'],
+                "cached": response['cached'],
+                "prompt": prompt_stats
             }
         except GeminiAPIError as e:
             return {
@@ -204,19 +170,15 @@ class GeminiTools:
         Returns:
             dict: Captain recommendations from Gemini AI
         """
-        prompt = f"""
-        As an AFL Fantasy expert, analyze these potential captain options for this round.
-        
-        Potential Captains:
-        {json.dumps(available_players[:12], indent=2)}
-        
-        Round Information:
-        {json.dumps(round_info, indent=2) if round_info else "Standard round"}
-        
-        Please provide a JSON response with this structure:
-        {{
+        prompt, prompt_stats = build_prompt(
+            "As an AFL Fantasy expert, analyze these potential captain options for this round.\nConsider matchups, form, weather, venue, and tactical situations. Rank by confidence.",
+            players=available_players,
+            limit=12,
+            sections=[("Round Information", compact_json(round_info) if round_info else "Standard round")],
+            response_format="""
+        {
             "captain_recommendations": [
-                {{
+                {
                     "player": "Player Name",
                     "team": "Team",
                     "confidence": 92,
@@ -226,14 +188,13 @@ class GeminiTools:
                     "risk_level": "Low",
                     "ceiling": 150,
                     "floor": 90
-                }}
+                }
             ],
             "captaincy_strategy": "Overall strategy for this round",
             "differential_options": "Lower ownership high-upside options"
-        }}
-        
-        Consider matchups, form, weather, venue, and tactical situations. Rank by confidence.
-        """
+        }
+            """
+        )
         
         try:
             response = self._make_request(prompt, max_tokens=1200, temperature=0.5)
@@ -243,7 +204,9 @@ class GeminiTools:
                 "status": "success",
                 "data": parsed_data,
                 "generated_at": response['timestamp'],
-                "model": response['model']
+                "model": response['model'],
+                "cached": response['cached'],
+                "prompt": prompt_stats
             }
         except GeminiAPIError as e:
             return {
@@ -263,46 +226,42 @@ class GeminiTools:
         Returns:
             dict: Team structure analysis from Gemini AI
         """
-        prompt = f"""
-        As an AFL Fantasy expert, analyze this team structure and provide optimization advice.
-        
-        Current Team:
-        {json.dumps(current_team, indent=2)}
-        
-        Available Budget: ${budget:,.0f}" if budget else "Not specified"
-        
-        Please provide a JSON response with this structure:
-        {{
-            "structure_analysis": {{
-                "defense": {{
+        prompt, prompt_stats = build_prompt(
+            "As an AFL Fantasy expert, analyze this team structure and provide optimization advice.\nFocus on balance, value, and upgrade paths.",
+            players=current_team,
+            limit=None,
+            sections=[("Available Budget", f"${budget:,.0f}" if budget else "Not specified")],
+            response_format="""
+        {
+            "structure_analysis": {
+                "defense": {
                     "strength": "Strong/Average/Weak",
                     "recommendations": "Specific advice",
                     "player_count": 6
-                }},
-                "midfield": {{
+                },
+                "midfield": {
                     "strength": "Strong/Average/Weak", 
                     "recommendations": "Specific advice",
                     "player_count": 8
-                }},
-                "forward": {{
+                },
+                "forward": {
                     "strength": "Strong/Average/Weak",
                     "recommendations": "Specific advice", 
                     "player_count": 6
-                }},
-                "rucks": {{
+                },
+                "rucks": {
                     "strength": "Strong/Average/Weak",
                     "recommendations": "Specific advice",
                     "player_count": 2
-                }}
-            }},
+                }
+            },
             "overall_score": 8.2,
             "key_weaknesses": ["Weakness 1", "Weakness 2"],
             "improvement_priority": "Defense needs premium upgrade",
             "budget_allocation": "How to best use available budget"
-        }}
-        
-        Focus on balance, value, and upgrade paths.
-        """
+        }
+            """
+        )
         
         try:
             response = self._make_request(prompt, max_tokens=1500, temperature=0.6)
@@ -312,7 +271,9 @@ class GeminiTools:
                 "status": "success",
                 "data": parsed_data,
                 "generated_at": response['timestamp'],
-                "model": response['model']
+                "model": response['model'],
+                "cached": response['cached'],
+                "prompt": prompt_stats
             }
         except GeminiAPIError as e:
             return {
@@ -332,19 +293,15 @@ class GeminiTools:
         Returns:
             dict: Breakout predictions from Gemini AI
         """
-        prompt = f"""
-        As an AFL Fantasy expert, identify potential breakout players from this data.
-        
-        Player Data:
-        {json.dumps(player_data[:20], indent=2)}
-        
-        Season Context:
-        {json.dumps(season_context, indent=2) if season_context else "Standard season analysis"}
-        
-        Please provide a JSON response with this structure:
-        {{
+        prompt, prompt_stats = build_prompt(
+            "As an AFL Fantasy expert, identify potential breakout players from this data.\nFocus on role changes, opportunity, value, and upside potential.",
+            players=player_data,
+            limit=20,
+            sections=[("Season Context", compact_json(season_context) if season_context else "Standard season analysis")],
+            response_format="""
+        {
             "breakout_candidates": [
-                {{
+                {
                     "player": "Player Name",
                     "team": "Team",
                     "current_price": 450000,
@@ -355,14 +312,13 @@ class GeminiTools:
                     "risk_factors": ["What could go wrong"],
                     "timeline": "When breakout expected",
                     "value_rating": 8.5
-                }}
+                }
             ],
             "market_opportunities": "Overall breakout trends",
             "timing_strategy": "When to target these players"
-        }}
-        
-        Focus on role changes, opportunity, value, and upside potential.
-        """
+        }
+            """
+        )
         
         try:
             response = self._make_request(prompt, max_tokens=1500, temperature=0.7)
@@ -372,7 +328,9 @@ class GeminiTools:
                 "status": "success",
                 "data": parsed_data,
                 "generated_at": response['timestamp'],
-                "model": response['model']
+                "model": response['model'],
+                "cached": response['cached'],
+                "prompt": prompt_stats
             }
         except GeminiAPIError as e:
             return {
@@ -522,6 +480,16 @@ def get_gemini_injury_analysis(injury_reports: List[Dict], affected_players: Lis
         }
 
 
+def get_gemini_prompt_metrics() -> Dict[str, Any]:
+    """
+    Prompt size and build time metrics for this process
+    """
+    return {
+        "status": "success",
+        "metrics": prompt_metrics()
+    }
+
+
 # Test function to verify API connectivity
 def test_gemini_connection() -> Dict[str, Any]:
     """
@@ -0,0 +1,287 @@
+"""
+AFL Fantasy Loophole Optimizer
+
+This module plans the vice-captain loophole for a squad using the real
+fixture schedule. The vice-captain (VC) plays first; once their score is
+final the coach either keeps the captain (C) or moves the C onto a bench
+emergency (E) whose game has not locked, so the VC's score is doubled.
+
+The coach loopholes when the VC score beats the captain's expected score
+plus the emergency cover given up, so for each (VC, C, E) combination
+
+    expected captain points = E[max(2 * VC - cover(E), 2 * E[C])]
+
+which is evaluated exactly over each VC's empirical score distribution.
+All combinations in the squad are evaluated together as one array.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+from price_simulator import (
+    PLAYER_DATA_PATH,
+    GAME_LOGS_PATH,
+    extract_score_history,
+    load_player_index,
+    player_average,
+    _load_json,
+    _to_float
+)
+from fixture_schedule import GAME_LENGTH, current_round, load_fixture_schedule, normalize_team, round_kickoffs
+
+USER_TEAM_PATH = 'user_team.json'
+
+FIELD_LINES = ('defenders', 'midfielders', 'rucks', 'forwards')
+
+# Players with fewer real games get a synthetic distribution around their average
+MIN_GAMES = 3
+DEFAULT_CV = 0.25
+SYNTHETIC_POINTS = 20
+
+POSITION_CODES = {
+    'DEFENDER': 'DEF', 'MIDFIELDER': 'MID', 'RUCK': 'RUC', 'FORWARD': 'FWD',
+    'DEF': 'DEF', 'MID': 'MID', 'RUC': 'RUC', 'FWD': 'FWD'
+}
+
+
+def load_squad(team_path=USER_TEAM_PATH):
+    """
+    Flatten the saved user team into a list of squad entries
+
+    Returns:
+        list: Player dicts with an added 'bench' flag
+    """
+    team = _load_json(team_path, {})
+    squad = []
+    for line in FIELD_LINES:
+        for player in team.get(line, []):
+            squad.append(dict(player, bench=bool(player.get('isOnBench', False))))
+    bench = team.get('bench', {})
+    for players in bench.values() if isinstance(bench, dict) else [bench]:
+        for player in players if isinstance(players, list) else []:
+            squad.append(dict(player, bench=True))
+    return squad
+
+
+def _find_player(index, entry):
+    """Find a squad entry in the player index by id, full name or 'F Surname'"""
+    for key in ('id', 'player_id', 'playerId'):
+        if entry.get(key) not in (None, '') and str(entry[key]) in index:
+            return index[str(entry[key])]
+    name = str(entry.get('name', '')).strip()
+    first, _, surname = name.partition(' ')
+    for candidate in (name.lower(), f"{first[:1]} {surname}".lower()):
+        if candidate in index:
+            return index[candidate]
+    return None, None
+
+
+def _score_distribution(entry, player, game_logs):
+    """
+    Empirical score distribution for a player
+
+    Uses real scores where there are at least MIN_GAMES of them, otherwise
+    evenly spaced quantiles of a normal with DEFAULT_CV around the average.
+    """
+    scores = extract_score_history(player, game_logs) if player else []
+    if len(scores) >= MIN_GAMES:
+        return np.asarray(scores, dtype=np.float64)
+
+    average = None
+    for source in (entry, player or {}):
+        average = _to_float(source.get('last3_avg')) or player_average(source, scores)
+        if average:
+            break
+    if not average:
+        return None
+    quantiles = (np.arange(SYNTHETIC_POINTS) + 0.5) / SYNTHETIC_POINTS
+    normal = NormalDist(average, DEFAULT_CV * average)
+    return np.maximum([normal.inv_cdf(q) for q in quantiles], 0)
+
+
+def _availability(profiles, index):
+    """
+    Share of league rounds each matched player was available for
+
+    League rounds are the most games played by anyone in the player data;
+    squad entries that are not in the player data count as always available.
+
+    Returns:
+        ndarray: Availability between 0 and 1 per profile
+    """
+    rounds = max((_to_float(player.get('games')) or 0 for player, _ in index.values()), default=0)
+    availability = np.ones(len(profiles))
+    for i, profile in enumerate(profiles):
+        games = _to_float(profile['record'].get('games')) if profile['matched'] else None
+        if rounds and games:
+            availability[i] = min(1.0, games / rounds)
+    return availability
+
+
+def _build_profiles(squad, index):
+    """Resolve squad entries to teams, positions and padded score matrix"""
+    profiles = []
+    for entry in squad:
+        player, game_logs = _find_player(index, entry)
+        distribution = _score_distribution(entry, player, game_logs)
+        if distribution is None:
+            continue
+        team = entry.get('team') or (player or {}).get('team', '')
+        position = str(entry.get('position') or (player or {}).get('position', '')).upper()
+        profiles.append({
+            'name': entry.get('name') or (player or {}).get('name', ''),
+            'team': normalize_team(team) if team and team != 'Unknown' else '',
+            'position': POSITION_CODES.get(position.split('/')[0], 'UTIL'),
+            'bench': bool(entry.get('bench')),
+            'record': player or entry,
+            'matched': player is not None,
+            'scores': distribution
+        })
+
+    width = max((len(p['scores']) for p in profiles), default=0)
+    scores = np.full((len(profiles), width), np.nan)
+    for i, profile in enumerate(profiles):
+        scores[i, :len(profile['scores'])] = profile['scores']
+    return profiles, scores
+
+
+def _cover_values(profiles, means, index):
+    """
+    Expected emergency points given up by using each player as the loophole
+
+    An emergency only scores when a field player in their line misses, so
+    the cover is that probability (from availability) times their average.
+    """
+    availability = _availability(profiles, index)
+    cover = np.zeros(len(profiles))
+    for i, profile in enumerate(profiles):
+        if not profile['bench']:
+            continue
+        line = [availability[j] for j, p in enumerate(profiles)
+                if not p['bench'] and (profile['position'] == 'UTIL' or p['position'] == profile['position'])]
+        miss = 1 - float(np.prod(line)) if line else 0.0
+        cover[i] = miss * means[i]
+    return cover
+
+
+def _describe(profile, match):
+    return {
+        'name': profile['name'],
+        'team': profile['team'],
+        'position': profile['position'],
+        'kickoff': match['kickoff'].isoformat() if match else None
+    }
+
+
+def _plan_round(round_number, profiles, scores, means, cover, schedule, top):
+    """Evaluate every (VC, C, E) combination for one round"""
+    kickoffs = round_kickoffs(round_number, schedule)
+    matches = [kickoffs.get(p['team']) for p in profiles]
+    playing = np.array([m is not None for m in matches])
+    field = np.array([not p['bench'] for p in profiles])
+    bench = ~field
+
+    if not playing.any():
+        return {'round': round_number, 'has_loophole': False, 'message': 'No squad players have a fixture this round'}
+    # Minutes since the first kickoff; teams on a bye never lock
+    first = min(m['kickoff'] for m in matches if m)
+    start = np.array([(m['kickoff'] - first).total_seconds() / 60 if m else np.inf for m in matches])
+    finish = start + GAME_LENGTH.total_seconds() / 60
+
+    vc_idx = np.flatnonzero(field & playing)
+    c_idx = np.flatnonzero(field & playing)
+    e_idx = np.flatnonzero(bench & np.array([bool(p['team']) for p in profiles]))
+
+    best_captain = c_idx[np.argmax(means[c_idx])] if len(c_idx) else None
+    baseline = 2 * means[best_captain] if best_captain is not None else 0.0
+    result = {
+        'round': round_number,
+        'baseline': {
+            'captain': _describe(profiles[best_captain], matches[best_captain]) if best_captain is not None else None,
+            'expected_captain_points': round(float(baseline), 1)
+        }
+    }
+
+    # Feasible when C and E are both still unlocked once the VC's game is over
+    feasible = (
+        (start[None, c_idx, None] >= finish[vc_idx, None, None]) &
+        (start[None, None, e_idx] >= finish[vc_idx, None, None])
+    )
+    if not feasible.any():
+        result.update(has_loophole=False, message='No VC/C/E combination fits the fixture this round')
+        return result
+
+    vc_scores = scores[vc_idx][:, None, None, :]
+    loophole = 2 * vc_scores - cover[e_idx][None, None, :, None]
+    keep = 2 * means[c_idx][None, :, None, None]
+    expected = np.nanmean(np.maximum(loophole, keep), axis=3)
+    probability = np.nanmean(np.where(np.isnan(vc_scores), np.nan, loophole > keep), axis=3)
+    expected = np.where(feasible, expected, -np.inf)
+
+    order = np.argsort(expected, axis=None)[::-1][:top]
+    plans = []
+    for flat in order:
+        v, c, e = np.unravel_index(flat, expected.shape)
+        if not np.isfinite(expected[v, c, e]):
+            break
+        vi, ci, ei = vc_idx[v], c_idx[c], e_idx[e]
+        plans.append({
+            'vice_captain': _describe(profiles[vi], matches[vi]),
+            'captain': _describe(profiles[ci], matches[ci]),
+            'emergency': _describe(profiles[ei], matches[ei]),
+            'loophole_threshold': round(float(means[ci] + cover[ei] / 2), 1),
+            'loophole_probability': round(float(probability[v, c, e]), 3),
+            'expected_captain_points': round(float(expected[v, c, e]), 1),
+            'uplift': round(float(expected[v, c, e] - baseline), 1)
+        })
+
+    result.update(
+        has_loophole=bool(plans) and plans[0]['uplift'] > 0,
+        plan=plans[0] if plans else None,
+        alternatives=plans[1:]
+    )
+    return result
+
+
+def best_loophole_plans(rounds=None, squad=None, top=5, team_path=USER_TEAM_PATH,
+                        player_path=PLAYER_DATA_PATH, logs_path=GAME_LOGS_PATH, schedule=None):
+    """
+    Best VC/C/E loophole plan for a squad in each requested round
+
+    Args:
+        rounds (list, optional): Round numbers (defaults to the current round)
+        squad (list, optional): Squad entries with name/id, team and 'bench' flag
+                                (defaults to the saved user team)
+        top (int): Number of plans to return per round (best plus alternatives)
+        schedule (list, optional): Pre-loaded fixture schedule
+
+    Returns:
+        dict: Per-round plans with expected captain points and the straight captain baseline
+    """
+    schedule = load_fixture_schedule() if schedule is None else schedule
+    if not schedule:
+        return {"status": "error", "message": "No fixture schedule available"}
+
+    if rounds is None:
+        rounds = [current_round(schedule)]
+    squad = load_squad(team_path) if squad is None else squad
+    index = load_player_index(player_path, logs_path)
+    profiles, scores = _build_profiles(squad, index)
+    if not profiles:
+        return {"status": "error", "message": "No squad players with scoring data"}
+
+    means = np.nanmean(scores, axis=1)
+    cover = _cover_values(profiles, means, index)
+
+    return {
+        "status": "ok",
+        "rounds": [_plan_round(int(r), profiles, scores, means, cover, schedule, top) for r in rounds],
+        "players_without_team": sorted({p['name'] for p in profiles if not p['team']})
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(best_loophole_plans(), indent=2))
@@ -0,0 +1,217 @@
+"""
+AFL Fantasy Player Repository
+
+This module provides one in-process store for player_data.json shared by
+all tool modules. The file is parsed once into typed records indexed by
+id, name, team and position, and is only reloaded when its modification
+time or size changes, so a dashboard render that calls many tools parses
+the file once instead of once per tool.
+
+Each load builds a new immutable snapshot and publishes it with a single
+assignment, so a reader sees either the old data or the new data, never a
+mix of both. A file that cannot be parsed is logged and the last good
+snapshot is kept.
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+PLAYER_DATA_PATH = 'player_data.json'
+
+
+def _number(value, default=0.0):
+    """Convert a scraped value to float, returning default if not numeric"""
+    try:
+        if value is None or value == '':
+            return default
+        return float(str(value).replace('$', '').replace(',', ''))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class PlayerRecord:
+    """Typed view of one player in player_data.json"""
+    id: str
+    name: str
+    team: str
+    position: str
+    positions: tuple
+    price: float
+    average: float
+    breakeven: float
+    games: int
+    data: dict = field(repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, player):
+        position = str(player.get('position') or '')
+        player_id = next((player[k] for k in ('id', 'player_id', 'playerId') if player.get(k) not in (None, '')),
+                         player.get('name', ''))
+        return cls(
+            id=str(player_id),
+            name=str(player.get('name') or ''),
+            team=str(player.get('team') or 'Unknown'),
+            position=position,
+            positions=tuple(p.strip().upper() for p in position.replace('-', '/').replace(',', '/').split('/') if p.strip()),
+            price=_number(player.get('price')),
+            average=_number(player.get('avg', player.get('averageScore', player.get('average')))),
+            breakeven=_number(player.get('breakeven', player.get('breakEven'))),
+            games=int(_number(player.get('games'))),
+            data=player
+        )
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """One parsed version of the player data file and its indexes"""
+    version: tuple
+    players: tuple
+    records: tuple
+    by_id: MappingProxyType
+    by_name: MappingProxyType
+    by_team: MappingProxyType
+    by_position: MappingProxyType
+    error: str = None
+
+    @classmethod
+    def build(cls, version, players):
+        records = tuple(PlayerRecord.from_dict(p) for p in players)
+        by_id, by_name, by_team, by_position = {}, {}, {}, {}
+        for record in records:
+            by_id.setdefault(record.id, record)
+            by_name.setdefault(record.name.lower(), record)
+            by_team.setdefault(record.team, []).append(record)
+            for position in record.positions:
+                by_position.setdefault(position, []).append(record)
+        return cls(
+            version=version,
+            players=tuple(players),
+            records=records,
+            by_id=MappingProxyType(by_id),
+            by_name=MappingProxyType(by_name),
+            by_team=MappingProxyType({team: tuple(rs) for team, rs in by_team.items()}),
+            by_position=MappingProxyType({pos: tuple(rs) for pos, rs in by_position.items()})
+        )
+
+
+class PlayerRepository:
+    """
+    Player data loaded once and reloaded only when the file changes
+
+    The raw dicts handed out by players() are shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(self, path=PLAYER_DATA_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot.build(None, [])
+
+    def _file_version(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _load(self, version):
+        """Parse the file into a new snapshot"""
+        if version is None:
+            return _Snapshot.build(None, [])
+        try:
+            with open(self.path, 'r') as f:
+                players = json.load(f)
+            if not isinstance(players, list):
+                raise ValueError(f"expected a list of players, got {type(players).__name__}")
+        except (OSError, ValueError) as e:
+            # Keep serving the last good data (e.g. while the file is being rewritten)
+            logger.error(f"Error loading player data from {self.path}: {e}")
+            return replace(self._snapshot, version=version, error=str(e))
+        return _Snapshot.build(version, [p for p in players if isinstance(p, dict)])
+
+    def snapshot(self):
+        """The current snapshot, reloading the file first if it changed"""
+        version = self._file_version()
+        snapshot = self._snapshot
+        if version != snapshot.version:
+            with self._lock:
+                snapshot = self._snapshot
+                if version != snapshot.version:
+                    snapshot = self._load(version)
+                    self._snapshot = snapshot
+        return snapshot
+
+    def refresh(self):
+        """Reload the file if it changed since the last load"""
+        self.snapshot()
+        return self
+
+    @property
+    def error(self):
+        """Why the last load failed, or None if the current data loaded cleanly"""
+        return self._snapshot.error
+
+    def players(self):
+        """
+        All player dicts as stored in player_data.json
+
+        Returns:
+            list: New list of the shared (read-only) player dicts
+        """
+        return list(self.snapshot().players)
+
+    def records(self):
+        """
+        All players as typed records
+
+        Returns:
+            list: PlayerRecord for every player
+        """
+        return list(self.snapshot().records)
+
+    def get(self, player_id):
+        """Look a player up by id, falling back to a case-insensitive name"""
+        snapshot = self.snapshot()
+        key = str(player_id)
+        return snapshot.by_id.get(key) or snapshot.by_name.get(key.lower())
+
+    def by_team(self, team):
+        """Players in a team"""
+        return list(self.snapshot().by_team.get(team, ()))
+
+    def by_position(self, position):
+        """Players eligible for a position code (dual position players are listed under both)"""
+        return list(self.snapshot().by_position.get(str(position).upper(), ()))
+
+
+_repositories = {}
+_repositories_lock = threading.Lock()
+
+
+def get_repository(path=PLAYER_DATA_PATH):
+    """
+    Shared repository for a player data file
+
+    Args:
+        path (str): Path to the player data file
+
+    Returns:
+        PlayerRepository: One instance per absolute path per process
+    """
+    key = os.path.abspath(path)
+    with _repositories_lock:
+        if key not in _repositories:
+            _repositories[key] = PlayerRepository(key)
+        return _repositories[key]
+
+
+def get_player_data():
+    """Get player data from the shared repository"""
+    return get_repository().players()
@@ -0,0 +1,422 @@
+"""
+AFL Fantasy Price Simulator
+
+This module runs Monte Carlo simulations of upcoming player scores and
+pushes every simulated round through the magic number price formula to
+produce percentile bands of price and breakeven for each future round.
+
+Score distributions are drawn from each player's game logs (smoothed
+bootstrap), and all requested players are simulated together as one
+vectorized batch. Results are cached per data generation, so repeated
+requests for the same players are served without re-simulating.
+"""
+
+import json
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from player_repository import get_repository
+
+PLAYER_DATA_PATH = 'player_data.json'
+GAME_LOGS_PATH = os.path.join('dfs_player_summary', 'afl_players_api_data.json')
+
+DEFAULT_ROUNDS = 5
+# A home-and-away season has 24 rounds; nothing useful lies beyond it
+MAX_ROUNDS = 24
+DEFAULT_SIMULATIONS = 5000
+MAX_SIMULATIONS = 20000
+# Player x round x simulation values per simulated batch (about 32 MB of
+# float32 paths); larger requests are simulated a chunk of players at a time
+MAX_BATCH_VALUES = 4_000_000
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Prices are based on a rolling three game window
+PRICE_WINDOW = 3
+MIN_PRICE = 102000
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def magic_number_for(price):
+    """
+    Magic number used by the price formula, adjusted for price band
+
+    Args:
+        price (float or ndarray): Current player price(s)
+
+    Returns:
+        float or ndarray: Magic number for each price
+    """
+    price = np.asarray(price, dtype=np.float64)
+    magic = np.where(price > 1000000, 9850.0, np.where(price < 300000, 9650.0, 9750.0))
+    return magic if magic.ndim else float(magic)
+
+
+def breakeven_from_window(price, prior_scores):
+    """
+    Score needed next round to hold the current price
+
+    The breakeven is the score that keeps the rolling window average
+    worth exactly the current price:
+        BE = window * price / magic_number - sum(previous window - 1 scores)
+
+    Args:
+        price (float or ndarray): Current price(s)
+        prior_scores (ndarray): Most recent PRICE_WINDOW - 1 scores, last axis
+
+    Returns:
+        float or ndarray: Breakeven score(s)
+    """
+    price = np.asarray(price, dtype=np.float64)
+    prior_scores = np.asarray(prior_scores, dtype=np.float64)
+    return PRICE_WINDOW * price / magic_number_for(price) - prior_scores.sum(axis=-1)
+
+
+def price_change_for(score, breakeven, price):
+    """
+    Price change for a round: (score - breakeven) * magic number / 100
+
+    Args:
+        score (float or ndarray): Round score(s)
+        breakeven (float or ndarray): Breakeven(s) for the round
+        price (float or ndarray): Price(s) going into the round
+
+    Returns:
+        float or ndarray: Price change(s) in dollars
+    """
+    return (np.asarray(score) - np.asarray(breakeven)) * (magic_number_for(price) / 100)
+
+
+def _to_float(value):
+    """Convert a scraped value to float, returning None if not numeric"""
+    try:
+        if value is None or value == '':
+            return None
+        result = float(str(value).replace('$', '').replace(',', ''))
+        return result if np.isfinite(result) else None
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_score_history(player, game_logs=None):
+    """
+    Extract a chronological (oldest first) list of fantasy scores for a player
+
+    Args:
+        player (dict): Player record from player_data.json
+        game_logs (list, optional): DFS game log rows (newest first, 'FP' column)
+
+    Returns:
+        list: Fantasy scores, oldest first
+    """
+    if game_logs:
+        scores = [_to_float(row.get('FP')) for row in game_logs if isinstance(row, dict)]
+        scores = [s for s in scores if s is not None and s > 0]
+        if scores:
+            return scores[::-1]
+
+    for key in ('scores', 'recentForm', 'recent_form', 'form', 'last_scores'):
+        values = player.get(key)
+        if isinstance(values, list) and values:
+            scores = [_to_float(v.get('FP') if isinstance(v, dict) else v) for v in values]
+            scores = [s for s in scores if s is not None and s > 0]
+            if scores:
+                return scores
+
+    # DFS Australia records carry last1 (most recent) .. last5
+    scores = [_to_float(player.get(f'last{i}')) for i in range(5, 0, -1)]
+    return [s for s in scores if s is not None and s > 0]
+
+
+def player_average(player, scores):
+    """Best available season average for a player"""
+    for key in ('avg', 'averageScore', 'average_score', 'average', 'l5Average', 'last_5_avg'):
+        value = _to_float(player.get(key))
+        if value:
+            return value
+    return float(np.mean(scores)) if scores else None
+
+
+def projected_points(player, game_logs=None):
+    """Projected score for a player, falling back to their average"""
+    for key in ('projectedScore', 'projected_score', 'proj_score'):
+        value = _to_float(player.get(key))
+        if value:
+            return value
+    return player_average(player, extract_score_history(player, game_logs))
+
+
+def player_key(player):
+    """Identifier used to look a player up from an API request"""
+    for key in ('id', 'player_id', 'playerId'):
+        if player.get(key) not in (None, ''):
+            return str(player[key])
+    return str(player.get('name', ''))
+
+
+def data_generation(*paths):
+    """
+    Token identifying the current version of the input data files
+
+    Args:
+        *paths: Data file paths
+
+    Returns:
+        tuple: (path, mtime_ns, size) for each existing path
+    """
+    generation = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            generation.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            generation.append((path, None, None))
+    return tuple(generation)
+
+
+def _load_json(path, default):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading {path}: {e}")
+        return default
+
+
+def load_player_index(player_path=PLAYER_DATA_PATH, logs_path=GAME_LOGS_PATH):
+    """
+    Load player records and attach scraped game logs where available
+
+    Returns:
+        dict: (player, game_logs) keyed by player id and lower-case name
+    """
+    players = get_repository(player_path).players()
+    logs = _load_json(logs_path, {}) if os.path.exists(logs_path) else {}
+
+    index = {}
+    for player in players if isinstance(players, list) else []:
+        if not isinstance(player, dict):
+            continue
+        key = player_key(player)
+        entry = logs.get(key, {}) if isinstance(logs, dict) else {}
+        game_logs = entry.get('data', {}).get('game_logs') if isinstance(entry, dict) else None
+        index[key] = (player, game_logs)
+        if player.get('name'):
+            index.setdefault(str(player['name']).lower(), (player, game_logs))
+    return index
+
+
+def _build_score_matrix(profiles):
+    """
+    Pad per-player score histories into a matrix for vectorized sampling
+
+    Returns:
+        tuple: (scores [n, max_games], counts [n], bandwidth [n])
+    """
+    max_games = max(len(p['scores']) for p in profiles)
+    scores = np.zeros((len(profiles), max_games), dtype=np.float64)
+    counts = np.zeros(len(profiles), dtype=np.int64)
+    bandwidth = np.zeros(len(profiles), dtype=np.float64)
+
+    for i, profile in enumerate(profiles):
+        history = np.asarray(profile['scores'], dtype=np.float64)
+        scores[i, :len(history)] = history
+        counts[i] = len(history)
+
+        if len(history) >= 2:
+            # Silverman's rule of thumb for the kernel bandwidth
+            spread = history.std(ddof=1)
+            bandwidth[i] = 1.06 * spread * len(history) ** -0.2
+        if len(history) < 2 or bandwidth[i] <= 0:
+            # No spread to learn from: assume a 25% coefficient of variation
+            bandwidth[i] = 0.25 * history.mean()
+
+    return scores, counts, bandwidth
+
+
+def _simulate_batch(profiles, rounds, simulations, seed):
+    """
+    Run vectorized price rollouts for a batch of players
+
+    Args:
+        profiles (list): Player profiles with 'scores', 'price' and 'average'
+        rounds (int): Number of future rounds to simulate
+        simulations (int): Number of rollouts per player
+        seed (int): Random seed for reproducible results
+
+    Returns:
+        dict: 'price' and 'breakeven' arrays shaped [n, rounds, simulations]
+    """
+    rng = np.random.default_rng(seed)
+    scores, counts, bandwidth = _build_score_matrix(profiles)
+    n = len(profiles)
+    rows = np.arange(n)[:, None]
+
+    price = np.repeat(np.array([p['price'] for p in profiles], dtype=np.float64)[:, None], simulations, axis=1)
+
+    # Seed the rolling window with the most recent real scores
+    window = np.empty((n, PRICE_WINDOW - 1), dtype=np.float64)
+    for i, profile in enumerate(profiles):
+        recent = list(profile['scores'][-(PRICE_WINDOW - 1):])
+        recent = [profile['average']] * (PRICE_WINDOW - 1 - len(recent)) + recent
+        window[i] = recent
+    window = np.repeat(window[:, None, :], simulations, axis=1)
+
+    price_paths = np.empty((n, rounds, simulations), dtype=np.float32)
+    breakeven_paths = np.empty((n, rounds, simulations), dtype=np.float32)
+
+    for r in range(rounds):
+        breakeven = breakeven_from_window(price, window)
+
+        picks = (rng.random((n, simulations)) * counts[:, None]).astype(np.int64)
+        round_scores = scores[rows, picks] + rng.normal(size=(n, simulations)) * bandwidth[:, None]
+        np.clip(round_scores, 0, None, out=round_scores)
+
+        price = np.maximum(price + price_change_for(round_scores, breakeven, price), MIN_PRICE)
+        window = np.concatenate([window[:, :, 1:], round_scores[:, :, None]], axis=2)
+
+        breakeven_paths[:, r] = breakeven
+        price_paths[:, r] = price
+
+    return {'price': price_paths, 'breakeven': breakeven_paths}
+
+
+def _summarise(profiles, paths):
+    """
+    Reduce a batch of rollouts into per-player percentile bands
+
+    Args:
+        profiles (list): Player profiles in batch order
+        paths (dict): Output of _simulate_batch
+
+    Returns:
+        list: Projection dict for each profile
+    """
+    price_bands = np.percentile(paths['price'], PERCENTILES, axis=2)
+    be_bands = np.percentile(paths['breakeven'], PERCENTILES, axis=2)
+    current = np.array([p['price'] for p in profiles], dtype=np.float64)
+    rise_probability = np.mean(paths['price'][:, -1] > current[:, None], axis=1)
+    median = price_bands[PERCENTILES.index(50)]
+    changes = np.diff(np.concatenate([current[:, None], median], axis=1), axis=1)
+
+    summaries = []
+    for i, profile in enumerate(profiles):
+        summaries.append({
+            'player_id': profile['key'],
+            'name': profile['name'],
+            'current_price': int(current[i]),
+            'projected_prices': {f'week_{r + 1}': int(round(p)) for r, p in enumerate(median[i])},
+            'price_changes': [int(round(c)) for c in changes[i]],
+            'total_change': int(round(median[i, -1] - current[i])),
+            'confidence': round(float(rise_probability[i]), 3),
+            'bands': {
+                'price': {f'p{q}': [int(round(v)) for v in price_bands[j, i]] for j, q in enumerate(PERCENTILES)},
+                'breakeven': {f'p{q}': [int(round(v)) for v in be_bands[j, i]] for j, q in enumerate(PERCENTILES)}
+            },
+            'games_sampled': len(profile['scores']),
+            'average': round(profile['average'], 1)
+        })
+    return summaries
+
+
+def simulate_price_projections(player_ids, rounds=DEFAULT_ROUNDS, simulations=DEFAULT_SIMULATIONS,
+                               player_path=PLAYER_DATA_PATH, logs_path=GAME_LOGS_PATH):
+    """
+    Simulate price and breakeven bands for a batch of players
+
+    Args:
+        player_ids (list): Player ids (or names) to project
+        rounds (int): Number of future rounds to project
+        simulations (int): Number of Monte Carlo rollouts per player
+        player_path (str): Path to player_data.json
+        logs_path (str): Path to scraped game logs keyed by player id
+
+    Returns:
+        dict: 'projections' for every known player and 'missing' ids
+    """
+    rounds = max(1, min(int(rounds), MAX_ROUNDS))
+    simulations = max(100, min(int(simulations), MAX_SIMULATIONS))
+    generation = data_generation(player_path, logs_path)
+
+    # The lock only guards the cache; simulations run outside it so requests don't queue
+    with _cache_lock:
+        if _cache.get('generation') != generation:
+            _cache.clear()
+            _cache['generation'] = generation
+            _cache['players'] = load_player_index(player_path, logs_path)
+            _cache['results'] = {}
+        index = _cache['players']
+        results = _cache['results']
+        cached = {key: summary for key, summary in results.items() if key[1:] == (rounds, simulations)}
+
+    profiles, missing, keys = [], [], []
+    pending = set()
+    for requested in player_ids:
+        entry = index.get(str(requested)) or index.get(str(requested).lower())
+        if entry is None:
+            missing.append(requested)
+            continue
+
+        player, game_logs = entry
+        key = player_key(player)
+        if (key, rounds, simulations) in cached or key in pending:
+            keys.append(key)
+            continue
+
+        scores = extract_score_history(player, game_logs)
+        average = player_average(player, scores)
+        price = _to_float(player.get('price'))
+        if not price or not average:
+            missing.append(requested)
+            continue
+
+        keys.append(key)
+        pending.add(key)
+        profiles.append({
+            'key': key,
+            'name': player.get('name', key),
+            'price': price,
+            'average': average,
+            'scores': scores or [average]
+        })
+
+    # A whole roster at the maximums would need several GB at once
+    chunk_size = max(1, MAX_BATCH_VALUES // (rounds * simulations))
+    for start in range(0, len(profiles), chunk_size):
+        chunk = profiles[start:start + chunk_size]
+        seed = zlib.crc32(repr((generation, rounds, simulations, [p['key'] for p in chunk])).encode())
+        paths = _simulate_batch(chunk, rounds, simulations, seed)
+        for profile, summary in zip(chunk, _summarise(chunk, paths)):
+            cached[(profile['key'], rounds, simulations)] = summary
+
+    if profiles:
+        with _cache_lock:
+            # Only store results for the data they were simulated from
+            if _cache.get('generation') == generation:
+                for profile in profiles:
+                    key = (profile['key'], rounds, simulations)
+                    _cache['results'][key] = cached[key]
+
+    projections = [cached[(key, rounds, simulations)] for key in keys]
+
+    return {
+        'projections': projections,
+        'missing': missing,
+        'rounds': rounds,
+        'simulations': simulations
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    ids = sys.argv[1:] or ['1', '2', '3']
+    start = time.perf_counter()
+    output = simulate_price_projections(ids)
+    print(f"Simulated {len(output['projections'])} players in {time.perf_counter() - start:.3f}s")
+    print(json.dumps(output, indent=2))
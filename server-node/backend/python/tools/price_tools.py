@@ -5,20 +5,13 @@ This module provides price analysis tools to help Fantasy coaches
 monitor player price changes and make strategic decisions on trades.
 """
 
-import json
 import os
 from datetime import datetime
 import random
 import copy
 
-def get_player_data():
-    """Get player data from the JSON file"""
-    try:
-        with open('player_data.json', 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading player data: {e}")
-        return []
+from breakeven_engine import breakeven_trends
+from player_repository import get_player_data
 
 def price_projection_calculator():
     """
@@ -72,55 +65,14 @@ def breakeven_trend_analyzer():
     """
     Analyzes trends in player breakevens over recent rounds
     
+    Breakeven series come from the breakeven engine, which derives them
+    from each player's actual rolling score window and price history.
+    
     Returns:
         list: Players with their breakeven trends over past rounds
     """
-    player_data = get_player_data()
-    trends = []
-    
-    # Dummy BE history data (in a real implementation, this would come from historical data)
-    rounds_completed = 7  # Example: we're in round 8
-    
-    for player in player_data:
-        # Only include premium players (price > 800k)
-        if player.get('price', 0) < 800000:
-            continue
-            
-        # Generate historical BE data (in a real implementation, we'd use actual historical data)
-        # For this example, we'll create trends based on current BE with some random variation
-        current_be = player.get('breakeven', 0)
-        
-        # Create a trend - either consistently rising, falling, or fluctuating
-        be_trend = []
-        trend_type = random.choice(['rising', 'falling', 'fluctuating'])
-        
-        if trend_type == 'rising':
-            for i in range(rounds_completed, max(rounds_completed-4, 0), -1):
-                be_trend.append(int(current_be - (i * random.uniform(5, 15))))
-                
-        elif trend_type == 'falling':
-            for i in range(rounds_completed, max(rounds_completed-4, 0), -1):
-                be_trend.append(int(current_be + (i * random.uniform(5, 15))))
-                
-        else:  # fluctuating
-            for i in range(rounds_completed, max(rounds_completed-4, 0), -1):
-                variation = random.uniform(-15, 15)
-                be_trend.append(int(current_be + variation))
-        
-        # Append current BE
-        be_trend.append(current_be)
-        
-        # Determine trend direction (looking at last 2 data points)
-        direction = "Rising" if be_trend[-1] > be_trend[-2] else "Falling"
-        
-        trends.append({
-            'player': player.get('name', 'Unknown'),
-            'team': player.get('team', 'Unknown'),
-            'position': player.get('position', 'Unknown'),
-            'current_be': current_be,
-            'BE_trend': be_trend,
-            'direction': direction
-        })
+    # Only include premium players (price > 800k), last 4 rounds plus next round
+    trends = breakeven_trends(min_price=800000, rounds=4)
     
     # Sort by trend direction (falling first) and then by current BE
     trends.sort(key=lambda x: (0 if x['direction'] == 'Falling' else 1, x['current_be']))
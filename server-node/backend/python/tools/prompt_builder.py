@@ -0,0 +1,237 @@
+"""
+AFL Fantasy Prompt Builder
+
+This module assembles compact prompts for the Gemini tools. Each player is
+rendered once into a one-line context fragment (name, team, position,
+price, average, L3/L5, breakeven, ownership, projection and recent form)
+that is cached until the player data changes, and prompts are assembled
+from those fragments under a token budget instead of serializing whole
+player dicts. Prompt size and build time are recorded for every prompt.
+"""
+
+import json
+import textwrap
+import threading
+import time
+
+from player_repository import PLAYER_DATA_PATH, get_repository
+from price_simulator import (
+    data_generation,
+    extract_score_history,
+    player_average,
+    player_key,
+    projected_points,
+    _to_float
+)
+
+# Default token budget for a whole prompt, and the rough characters per token
+PROMPT_TOKEN_BUDGET = 3000
+CHARS_PER_TOKEN = 4
+
+# Recent scores shown per player
+FORM_GAMES = 5
+
+PLAYER_LEGEND = "Players: name|team|pos|price|avg|L3|L5|BE|own%|proj|last scores (oldest first)"
+
+_cache = {}
+_cache_lock = threading.Lock()
+_metrics = {
+    'prompts': 0,
+    'chars': 0,
+    'tokens': 0,
+    'build_ms': 0.0,
+    'max_tokens': 0,
+    'players_included': 0,
+    'players_dropped': 0,
+    'fragment_hits': 0,
+    'fragment_misses': 0
+}
+_metrics_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """Rough token count for a piece of text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _number(value, scale=1, digits=1):
+    value = _to_float(value)
+    if value is None:
+        return '-'
+    value = round(value / scale, digits)
+    return str(int(value)) if value == int(value) else str(value)
+
+
+def _mean_last(scores, games):
+    return sum(scores[-games:]) / len(scores[-games:]) if scores else None
+
+
+def render_player(player):
+    """
+    Compact one-line context for a player
+
+    Args:
+        player (dict): Player record
+
+    Returns:
+        str: Pipe separated fields matching PLAYER_LEGEND
+    """
+    scores = extract_score_history(player)
+    average = player_average(player, scores)
+    price = _to_float(player.get('price'))
+    return '|'.join([
+        str(player.get('name') or player.get('player') or 'Unknown'),
+        str(player.get('team') or '-'),
+        str(player.get('position') or '-'),
+        f"${_number(price, 1000000, 2)}M" if price else '-',
+        _number(average),
+        _number(_mean_last(scores, 3)),
+        _number(player.get('l5Average') or _mean_last(scores, 5)),
+        _number(player.get('breakeven', player.get('breakEven')), digits=0),
+        _number(player.get('ownership', player.get('selected'))),
+        _number(projected_points(player)),
+        ','.join(_number(s, digits=0) for s in scores[-FORM_GAMES:]) or '-'
+    ])
+
+
+def player_context(player, player_path=PLAYER_DATA_PATH):
+    """
+    Cached compact context for a player
+
+    Fragments are cached by player id and player data generation. A dict
+    supplied by a caller hits the cache when it equals the repository's
+    record for that player (callers usually pass their own copies); one
+    that differs, e.g. with live fields added, is rendered without caching.
+
+    Returns:
+        str: The player's context line
+    """
+    key = player_key(player)
+    record = get_repository(player_path).get(key)
+    if record is None or (record.data is not player and record.data != player):
+        _record(fragment_misses=1)
+        return render_player(player)
+
+    generation = data_generation(player_path)
+    with _cache_lock:
+        if _cache.get('generation') != generation:
+            _cache.clear()
+            _cache['generation'] = generation
+            _cache['fragments'] = {}
+        fragment = _cache['fragments'].get(key)
+    if fragment is not None:
+        _record(fragment_hits=1)
+        return fragment
+
+    _record(fragment_misses=1)
+    fragment = render_player(record.data)
+    with _cache_lock:
+        if _cache.get('generation') == generation:
+            _cache['fragments'][key] = fragment
+    return fragment
+
+
+def compact_json(value):
+    """Serialize context data without whitespace"""
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def _record(**values):
+    with _metrics_lock:
+        for name, value in values.items():
+            if name == 'max_tokens':
+                _metrics[name] = max(_metrics[name], value)
+            else:
+                _metrics[name] += value
+
+
+def _resolve(players, player_path=PLAYER_DATA_PATH):
+    """Player dicts for a list of dicts and/or player ids and names (unknown names are skipped)"""
+    repository = get_repository(player_path)
+    resolved = []
+    for player in players or []:
+        if isinstance(player, dict):
+            resolved.append(player)
+        else:
+            record = repository.get(player)
+            if record is not None:
+                resolved.append(record.data)
+    return resolved
+
+
+def build_prompt(instructions, players=None, sections=None, response_format=None,
+                 limit=None, budget=PROMPT_TOKEN_BUDGET):
+    """
+    Assemble a prompt from instructions, player fragments and context sections
+
+    Players are added in the order given until the limit or the token
+    budget is reached; the fixed parts (instructions, sections and response
+    format) are always included.
+
+    Args:
+        instructions (str): Task description
+        players (list, optional): Player dicts or player ids/names, most relevant first
+        sections (list, optional): (title, text) pairs of extra context
+        response_format (str, optional): Expected JSON response structure
+        limit (int, optional): Maximum number of players
+        budget (int): Token budget for the whole prompt
+
+    Returns:
+        tuple: (prompt text, stats dict with tokens, chars, players included/dropped, build_ms)
+    """
+    started = time.perf_counter()
+    head = [textwrap.dedent(instructions).strip()]
+    for title, text in sections or []:
+        head.append(f"{title}: {text}")
+    tail = []
+    if response_format:
+        response_format = textwrap.dedent(response_format).strip()
+        try:
+            response_format = compact_json(json.loads(response_format))
+        except ValueError:
+            pass
+        tail.append("Respond with JSON in this structure:\n" + response_format)
+
+    fixed = '\n\n'.join(head + tail)
+    remaining = budget - estimate_tokens(fixed) - estimate_tokens(PLAYER_LEGEND) - 2
+    candidates = _resolve(players)
+    candidates = candidates[:limit] if limit else candidates
+    lines = []
+    for player in candidates:
+        line = player_context(player)
+        cost = estimate_tokens(line) + 1
+        if cost > remaining:
+            break
+        lines.append(line)
+        remaining -= cost
+
+    body = head + ([PLAYER_LEGEND + '\n' + '\n'.join(lines)] if lines else []) + tail
+    prompt = '\n\n'.join(body)
+
+    stats = {
+        'tokens': estimate_tokens(prompt),
+        'chars': len(prompt),
+        'players_included': len(lines),
+        'players_dropped': len(candidates) - len(lines),
+        'build_ms': round((time.perf_counter() - started) * 1000, 3)
+    }
+    _record(prompts=1, chars=stats['chars'], tokens=stats['tokens'], build_ms=stats['build_ms'],
+            max_tokens=stats['tokens'], players_included=stats['players_included'],
+            players_dropped=stats['players_dropped'])
+    return prompt, stats
+
+
+def prompt_metrics():
+    """
+    Prompt size and build time totals for this process
+
+    Returns:
+        dict: Counters plus average tokens and build time per prompt
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    prompts = metrics['prompts'] or 1
+    metrics['avg_tokens'] = round(metrics['tokens'] / prompts, 1)
+    metrics['avg_build_ms'] = round(metrics['build_ms'] / prompts, 3)
+    metrics['build_ms'] = round(metrics['build_ms'], 3)
+    return metrics
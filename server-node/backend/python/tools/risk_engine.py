@@ -0,0 +1,163 @@
+"""
+AFL Fantasy Risk Engine
+
+This module loads every player's game-log scores into one padded NumPy
+matrix and computes the risk metrics used by the risk tools for the whole
+roster in a single pass: rolling and season standard deviation,
+coefficient of variation, floor/median/ceiling quantiles, hit-rate above a
+score threshold, suppressed and partial game counts, and games missed.
+The table is rebuilt only when the player data or game logs change.
+"""
+
+import threading
+import warnings
+
+import numpy as np
+
+from price_simulator import (
+    PLAYER_DATA_PATH,
+    GAME_LOGS_PATH,
+    data_generation,
+    extract_score_history,
+    load_player_index,
+    player_key,
+    _to_float
+)
+
+# Players need this many scores before their risk metrics are reported
+MIN_GAMES = 3
+# Games in the rolling standard deviation window
+ROLLING_WINDOW = 5
+# Score counted as a "hit" for the hit-rate
+HIT_THRESHOLD = 100
+# Floor and ceiling quantiles (percent)
+FLOOR_QUANTILE = 10
+CEILING_QUANTILE = 90
+# A game below this share of the player's average was suppressed (e.g. tagged)
+SUPPRESSED_RATIO = 0.75
+# A game below this share of the player's average was cut short (injury, sub or late change)
+PARTIAL_RATIO = 0.4
+
+_state = {}
+_state_lock = threading.Lock()
+
+
+def _build_table(player_path, logs_path):
+    """
+    Build roster-wide score matrix and risk metrics
+
+    Rows are players, columns are games aligned to the right so the last
+    column is every player's most recent game. Games before a player's
+    first game are NaN.
+
+    Returns:
+        dict: Score matrix, per-player metric arrays and lookup maps
+    """
+    index = load_player_index(player_path, logs_path)
+
+    players, histories = [], []
+    for key, (player, game_logs) in index.items():
+        if key != player_key(player):
+            continue  # name alias of a player already listed
+        scores = extract_score_history(player, game_logs)
+        if len(scores) < MIN_GAMES:
+            continue
+        players.append(player)
+        histories.append(scores)
+
+    n = len(players)
+    rounds = max((len(h) for h in histories), default=0)
+    scores = np.full((n, rounds), np.nan)
+    for i, history in enumerate(histories):
+        scores[i, rounds - len(history):] = history
+    played = ~np.isnan(scores)
+
+    with warnings.catch_warnings():
+        # Empty rows (no players) produce all-NaN slices
+        warnings.simplefilter('ignore', RuntimeWarning)
+        games = played.sum(axis=1)
+        mean = np.nanmean(scores, axis=1)
+        std = np.nanstd(scores, axis=1, ddof=1)
+        if n:
+            floor, median, ceiling = np.nanpercentile(scores, [FLOOR_QUANTILE, 50, CEILING_QUANTILE], axis=1)
+        else:
+            # No player has enough games: nanpercentile of a (0, 0) matrix has no rows to unpack
+            floor = median = ceiling = np.empty(0)
+
+        # Rolling standard deviation over complete windows; a window that
+        # reaches back before a player's first game is NaN
+        if rounds >= ROLLING_WINDOW:
+            windows = np.lib.stride_tricks.sliding_window_view(scores, ROLLING_WINDOW, axis=1)
+            rolling_std = windows.std(axis=2, ddof=1)
+        else:
+            rolling_std = np.full((n, 0), np.nan)
+        latest_std = rolling_std[:, -1] if rolling_std.shape[1] else np.full(n, np.nan)
+        latest_std = np.where(np.isnan(latest_std), std, latest_std)
+
+    cv = np.divide(std, mean, out=np.zeros(n), where=mean > 0)
+    hit_rate = (scores >= HIT_THRESHOLD).sum(axis=1) / np.maximum(games, 1)
+    partial = played & (scores < PARTIAL_RATIO * mean[:, None])
+    suppressed = played & (scores < SUPPRESSED_RATIO * mean[:, None]) & ~partial
+
+    # Games missed this season, from the games played recorded with the
+    # player against the most games played by anyone
+    recorded = np.array([_to_float(p.get('games')) or 0 for p in players], dtype=np.float64)
+    recorded = np.maximum(recorded, games)
+    missed = (recorded.max() if n else 0) - recorded
+
+    keys = [player_key(p) for p in players]
+    lookup = {key: i for i, key in enumerate(keys)}
+    for i, player in enumerate(players):
+        if player.get('name'):
+            lookup.setdefault(str(player['name']).lower(), i)
+
+    return {
+        'players': players,
+        'keys': keys,
+        'lookup': lookup,
+        'positions': [str(p.get('position') or '').upper() for p in players],
+        'scores': scores,
+        'games': games,
+        'mean': mean,
+        'std': std,
+        'rolling_std': rolling_std,
+        'latest_std': latest_std,
+        'cv': cv,
+        'floor': floor,
+        'median': median,
+        'ceiling': ceiling,
+        'hit_rate': hit_rate,
+        'suppressed': suppressed,
+        'partial': partial,
+        'missed': missed
+    }
+
+
+def get_risk_table(player_path=PLAYER_DATA_PATH, logs_path=GAME_LOGS_PATH):
+    """
+    Get the roster risk table, rebuilding it when the data changes
+
+    Returns:
+        dict: Risk table arrays and lookup maps
+    """
+    generation = data_generation(player_path, logs_path)
+    with _state_lock:
+        if _state.get('generation') != generation:
+            _state.clear()
+            _state['table'] = _build_table(player_path, logs_path)
+            _state['generation'] = generation
+        return _state['table']
+
+
+def recent_count(mask, games):
+    """
+    Count flagged games among each player's last N games
+
+    Args:
+        mask (ndarray): [player, game] boolean matrix from the risk table
+        games (int): Number of most recent games to look at
+
+    Returns:
+        ndarray: Count per player
+    """
+    return mask[:, -games:].sum(axis=1) if mask.shape[1] else np.zeros(mask.shape[0], dtype=np.int64)
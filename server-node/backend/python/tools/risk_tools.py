@@ -4,266 +4,302 @@ AFL Fantasy Risk Tools
 This module provides tools for analyzing risk factors in AFL Fantasy.
 These tools help assess various types of risk including tags, injuries,
 volatility, and consistency to make informed player selection decisions.
+
+All tools read the cached roster risk table from risk_engine, which holds
+every player's real game-log scores in one padded matrix, so each tool is
+a selection and sort over precomputed arrays.
 """
 
 import json
-import random
-from scraper import get_player_data
-
-def get_sample_players(count=10):
-    """Get a sample of players from the player data"""
-    try:
-        players = get_player_data()
-        # Ensure we don't exceed available players
-        count = min(count, len(players))
-        return random.sample(players, count)
-    except Exception as e:
-        print(f"Error getting player data: {e}")
-        # Return some fallback data if we can't get real player data
-        return [
-            {"name": f"Player {i}", "team": f"Team {i}", "position": "MID"} 
-            for i in range(1, count+1)
-        ]
-
-def tag_watch_monitor():
+
+import numpy as np
+
+from risk_engine import HIT_THRESHOLD, get_risk_table, recent_count
+
+# Recent games looked at for tags and late outs
+RECENT_GAMES = 5
+# Season average from which a midfielder becomes a tagging target
+TAG_HIGH_AVERAGE = 110
+TAG_MEDIUM_AVERAGE = 95
+
+RISK_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+
+def _player_fields(table, i):
+    """Name and team of a row in the risk table"""
+    player = table["players"][i]
+    return {
+        "player": player.get("name", "Unknown"),
+        "team": player.get("team", "Unknown")
+    }
+
+def _top(values, limit, descending=True):
+    """Row indices ordered by value (NaN rows excluded), limited to the top N"""
+    rows = np.flatnonzero(~np.isnan(values))
+    order = np.argsort(-values[rows] if descending else values[rows], kind="stable")
+    return rows[order][:limit] if limit else rows[order]
+
+def _level(values, high, medium):
+    """Map values to High/Medium/Low risk levels"""
+    return np.select([values >= high, values >= medium], ["High", "Medium"], "Low")
+
+def _midfielders(table):
+    return np.array(["MID" in position for position in table["positions"]], dtype=bool)
+
+def tag_watch_monitor(limit=15):
     """
     Monitor players at risk of being tagged by opponents
-    
+
+    Premium midfielders are the usual tagging targets, so risk is based on
+    position and season average.
+
     Returns:
         dict: Dictionary with list of players and their tag risk
     """
-    players = get_sample_players(15)
-    
-    # Generate tag risk data
-    tag_risk_levels = ["High", "Medium", "Low"]
+    table = get_risk_table()
+    mids = _midfielders(table)
+    mean = table["mean"]
+    tag_risk = np.where(
+        mids,
+        _level(mean, TAG_HIGH_AVERAGE, TAG_MEDIUM_AVERAGE),
+        np.where(mean >= TAG_HIGH_AVERAGE, "Medium", "Low")
+    )
+
+    # Highest risk first, then highest average
+    rows = _top(mean, None)
+    rows = sorted(rows, key=lambda i: RISK_ORDER[tag_risk[i]])[:limit]
     tag_watch_data = [
-        {
-            "player": player["name"],
-            "team": player["team"],
-            "tag_risk": random.choice(tag_risk_levels)
-        }
-        for player in players
+        dict(_player_fields(table, i), tag_risk=str(tag_risk[i]), avg_score=round(float(mean[i]), 1))
+        for i in rows
     ]
-    
-    # Sort by tag risk (High first)
-    tag_watch_data.sort(key=lambda x: 0 if x["tag_risk"] == "High" else (1 if x["tag_risk"] == "Medium" else 2))
-    
+
     return {"players": tag_watch_data}
 
-def tag_history_impact_tracker():
+def tag_history_impact_tracker(limit=12):
     """
     Track the historical impact of tags on player performance
-    
+
+    Tag data is not scraped, so suppressed games (well below the player's
+    average but not cut short) stand in for games where they were tagged.
+
     Returns:
         dict: Dictionary with list of players and their tag impact history
     """
-    players = get_sample_players(12)
-    
-    # Generate tag history impact data
+    table = get_risk_table()
+    scores = table["scores"]
+    suppressed = table["suppressed"]
+    counts = suppressed.sum(axis=1)
+    tagged_avg = np.divide(
+        np.where(suppressed, scores, 0).sum(axis=1), counts,
+        out=np.full(len(counts), np.nan), where=counts > 0
+    )
+    difference = tagged_avg - table["mean"]
+
+    # Sort by biggest negative impact (most impacted first)
     tag_history_data = [
-        {
-            "player": player["name"],
-            "team": player["team"],
-            "avg_score": round(random.uniform(70, 120), 1),
-            "avg_score_when_tagged": round(random.uniform(50, 100), 1),
-            "score_difference": round(random.uniform(-5, -30), 1)
-        }
-        for player in players
+        dict(
+            _player_fields(table, i),
+            avg_score=round(float(table["mean"][i]), 1),
+            avg_score_when_tagged=round(float(tagged_avg[i]), 1),
+            score_difference=round(float(difference[i]), 1),
+            tagged_games=int(counts[i])
+        )
+        for i in _top(difference, limit, descending=False)
     ]
-    
-    # Calculate score difference if not provided
-    for player in tag_history_data:
-        if "score_difference" not in player:
-            player["score_difference"] = round(player["avg_score_when_tagged"] - player["avg_score"], 1)
-    
-    # Sort by biggest negative impact (most impacted first)
-    tag_history_data.sort(key=lambda x: x["score_difference"])
-    
+
     return {"players": tag_history_data}
 
-def tag_target_priority_ranker():
+def tag_target_priority_ranker(limit=10):
     """
     Rank players based on their likelihood of being targeted for tags
-    
+
+    Priority is the player's average ranked against all midfielders on a
+    1-10 scale; recent tags are suppressed games in their last few games.
+
     Returns:
         dict: Dictionary with list of players and their tag target priority
     """
-    players = get_sample_players(10)
-    
-    # Generate tag target priority data
+    table = get_risk_table()
+    mids = _midfielders(table)
+    mean = table["mean"]
+    mid_means = np.sort(mean[mids])
+    percentile = np.searchsorted(mid_means, mean, side="right") / max(len(mid_means), 1)
+    priority = np.where(mids, np.round(1 + 9 * percentile, 1), np.nan)
+    recent_tags = recent_count(table["suppressed"], RECENT_GAMES)
+
+    # Sort by priority score (highest first)
     tag_priority_data = [
-        {
-            "player": player["name"],
-            "team": player["team"],
-            "priority_score": round(random.uniform(1, 10), 1),
-            "recent_tags": random.randint(0, 5)
-        }
-        for player in players
+        dict(_player_fields(table, i), priority_score=float(priority[i]), recent_tags=int(recent_tags[i]))
+        for i in _top(priority, limit)
     ]
-    
-    # Sort by priority score (highest first)
-    tag_priority_data.sort(key=lambda x: x["priority_score"], reverse=True)
-    
+
     return {"players": tag_priority_data}
 
-def tag_breaker_score_estimator():
+def tag_breaker_score_estimator(limit=10):
     """
     Estimate player's ability to overcome or break tags
-    
+
+    Players who are rarely suppressed and still reach big scores often
+    break tags; the score scales the share of unsuppressed games by the
+    ceiling relative to the hit threshold.
+
     Returns:
         dict: Dictionary with list of players and their tag breaker scores
     """
-    players = get_sample_players(10)
-    
-    # Generate tag breaker score data
+    table = get_risk_table()
+    unsuppressed = 1 - table["suppressed"].sum(axis=1) / np.maximum(table["games"], 1)
+    breaker = np.round(np.clip(10 * unsuppressed * table["ceiling"] / HIT_THRESHOLD, 1, 10), 1)
+    breakaway = _level(table["hit_rate"], 0.5, 0.2)
+
+    # Sort by breaker score (highest first)
     tag_breaker_data = [
-        {
-            "player": player["name"],
-            "team": player["team"],
-            "breaker_score": round(random.uniform(1, 10), 1),
-            "breakaway_potential": random.choice(["High", "Medium", "Low"])
-        }
-        for player in players
+        dict(
+            _player_fields(table, i),
+            breaker_score=float(breaker[i]),
+            breakaway_potential=str(breakaway[i]),
+            hit_rate=round(float(table["hit_rate"][i]), 2)
+        )
+        for i in _top(breaker, limit)
     ]
-    
-    # Sort by breaker score (highest first)
-    tag_breaker_data.sort(key=lambda x: x["breaker_score"], reverse=True)
-    
+
     return {"players": tag_breaker_data}
 
-def injury_risk_model():
+def injury_risk_model(limit=12):
     """
     Model injury risk for players based on history and current status
-    
+
+    Risk comes from games missed this season and games cut short.
+
     Returns:
         dict: Dictionary with list of players and their injury risk
     """
-    players = get_sample_players(12)
-    
-    # Generate injury risk data
-    risk_levels = ["High", "Medium", "Low"]
+    table = get_risk_table()
+    missed = table["missed"]
+    partial = table["partial"].sum(axis=1)
+    season = np.maximum(missed + table["games"], 1)
+    risk = (missed + partial) / season
+    injury_risk = _level(risk, 0.25, 0.1)
+
+    # Sort by injury risk (highest first)
     injury_data = [
-        {
-            "player": player["name"],
-            "team": player["team"],
-            "injury_risk": random.choice(risk_levels),
-            "injury_history": random.randint(0, 5)
-        }
-        for player in players
+        dict(
+            _player_fields(table, i),
+            injury_risk=str(injury_risk[i]),
+            injury_history=int(missed[i] + partial[i]),
+            games_missed=int(missed[i]),
+            games_cut_short=int(partial[i])
+        )
+        for i in _top(risk, limit)
     ]
-    
-    # Sort by injury risk (highest first)
-    injury_data.sort(key=lambda x: 0 if x["injury_risk"] == "High" else (1 if x["injury_risk"] == "Medium" else 2))
-    
+
     return {"players": injury_data}
 
-def volatility_index_calculator():
+def volatility_index_calculator(limit=15):
     """
     Calculate player score volatility to identify consistent performers
-    
+
+    The volatility score is the standard deviation of the player's last
+    few games (their whole season when they have fewer).
+
     Returns:
         dict: Dictionary with list of players and their volatility scores
     """
-    players = get_sample_players(15)
-    
-    # Generate volatility index data
+    table = get_risk_table()
+    volatility = table["latest_std"]
+
+    # Sort by volatility score (highest first = most volatile)
     volatility_data = [
-        {
-            "player": player["name"],
-            "volatility_score": round(random.uniform(5, 35), 1)
-        }
-        for player in players
+        dict(
+            _player_fields(table, i),
+            volatility_score=round(float(volatility[i]), 1),
+            season_std=round(float(table["std"][i]), 1),
+            coefficient_of_variation=round(float(table["cv"][i]), 3),
+            games=int(table["games"][i])
+        )
+        for i in _top(volatility, limit)
     ]
-    
-    # Sort by volatility score (highest first = most volatile)
-    volatility_data.sort(key=lambda x: x["volatility_score"], reverse=True)
-    
+
     return {"players": volatility_data}
 
-def consistency_score_generator():
+def consistency_score_generator(limit=12):
     """
     Generate consistency scores for players
-    
+
+    The consistency score maps the coefficient of variation onto 1-10
+    (a CV of 0.05 or less scores 10, 0.5 or more scores 1).
+
     Returns:
         dict: Dictionary with list of players and their consistency scores
     """
-    players = get_sample_players(12)
-    
-    # Generate consistency score data
+    table = get_risk_table()
+    consistency = np.round(np.clip(10 - (table["cv"] - 0.05) * 20, 1, 10), 1)
+
+    # Sort by consistency score (highest first = most consistent), then by floor
+    rows = _top(table["floor"], None)
+    rows = rows[np.argsort(-consistency[rows], kind="stable")][:limit]
     consistency_data = [
-        {
-            "player": player["name"],
-            "team": player["team"],
-            "consistency_score": round(random.uniform(1, 10), 1),
-            "floor_score": random.randint(40, 80)
-        }
-        for player in players
+        dict(
+            _player_fields(table, i),
+            consistency_score=float(consistency[i]),
+            floor_score=int(round(table["floor"][i])),
+            hit_rate=round(float(table["hit_rate"][i]), 2)
+        )
+        for i in rows
     ]
-    
-    # Sort by consistency score (highest first = most consistent)
-    consistency_data.sort(key=lambda x: x["consistency_score"], reverse=True)
-    
+
     return {"players": consistency_data}
 
-def scoring_range_predictor():
+def scoring_range_predictor(limit=12):
     """
     Predict likely scoring range for players
-    
+
+    The range is the player's floor to ceiling quantile with the median as
+    the most likely score.
+
     Returns:
         dict: Dictionary with list of players and their projected scoring ranges
     """
-    players = get_sample_players(12)
-    
-    # Generate scoring range data
+    table = get_risk_table()
+
+    # Sort by most_likely score (highest first)
     scoring_range_data = [
-        {
-            "player": player["name"],
-            "team": player["team"],
-            "low_range": random.randint(40, 80),
-            "high_range": random.randint(85, 150),
-            "most_likely": random.randint(75, 110)
-        }
-        for player in players
+        dict(
+            _player_fields(table, i),
+            low_range=int(round(table["floor"][i])),
+            high_range=int(round(table["ceiling"][i])),
+            most_likely=int(round(table["median"][i]))
+        )
+        for i in _top(table["median"], limit)
     ]
-    
-    # Ensure high range is higher than low range and most_likely is in between
-    for player in scoring_range_data:
-        if player["high_range"] <= player["low_range"]:
-            player["high_range"] = player["low_range"] + random.randint(20, 40)
-        if player["most_likely"] < player["low_range"] or player["most_likely"] > player["high_range"]:
-            player["most_likely"] = round((player["low_range"] + player["high_range"]) / 2)
-    
-    # Sort by most_likely score (highest first)
-    scoring_range_data.sort(key=lambda x: x["most_likely"], reverse=True)
-    
+
     return {"players": scoring_range_data}
 
-def late_out_risk_estimator():
+def late_out_risk_estimator(limit=10):
     """
     Estimate risk of players being late withdrawals
-    
+
+    Recent games cut short (well under the player's average) are the
+    signal: two or more in the last few games is high risk.
+
     Returns:
         dict: Dictionary with list of players and their late out risk
     """
-    players = get_sample_players(10)
-    
-    # Generate late out risk data
-    risk_levels = ["High", "Medium", "Low"]
+    table = get_risk_table()
+    recent = recent_count(table["partial"], RECENT_GAMES)
+    late_out_risk = _level(recent, 2, 1)
+
+    # Sort by late out risk (highest first), then by games missed
+    order = recent.astype(np.float64) + table["missed"] / max(float(table["missed"].max(initial=0)) + 1, 1)
     late_out_data = [
-        {
-            "player": player["name"],
-            "team": player["team"],
-            "late_out_risk": random.choice(risk_levels),
-            "recent_late_outs": random.randint(0, 3)
-        }
-        for player in players
+        dict(
+            _player_fields(table, i),
+            late_out_risk=str(late_out_risk[i]),
+            recent_late_outs=int(recent[i])
+        )
+        for i in _top(order, limit)
     ]
-    
-    # Sort by late out risk (highest first)
-    late_out_data.sort(key=lambda x: 0 if x["late_out_risk"] == "High" else (1 if x["late_out_risk"] == "Medium" else 2))
-    
+
     return {"players": late_out_data}
 
 if __name__ == "__main__":
     # Test one of the tools
-    print(json.dumps(volatility_index_calculator(), indent=2))
\ No newline at end of file
+    print(json.dumps(volatility_index_calculator(), indent=2))
@@ -6,18 +6,20 @@ positional impact on scoring, and player possession profiles. These insights hel
 fantasy managers understand how a player's role affects their fantasy output.
 """
 
-import json
 import os
 from datetime import datetime
 import random  # For sample data generation
+import numpy as np
+from player_repository import get_player_data
+from change_point import METRICS, get_role_changes
 
-def get_player_data():
-    """Get player data from the JSON file"""
-    try:
-        with open('player_data.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
+# Only changes that started within this many games are reported
+RECENT_CHANGE_GAMES = 4
+MIN_CHANGE_CONFIDENCE = 0.9
+
+# Size of a level shift per metric for a Medium / High fantasy impact
+IMPACT_THRESHOLDS = {"cba": (12, 25), "tog": (5, 10), "fp": (8, 15)}
+METRIC_LABELS = {"cba": "CBA share", "tog": "Time on ground", "fp": "Scoring"}
 
 def get_sample_players(count=10):
     """Get a sample of players from the player data"""
@@ -26,42 +28,81 @@ def get_sample_players(count=10):
         return []
     return random.sample(players, min(count, len(players)))
 
+def _role_label(player, cba):
+    """Describe a player's role from their CBA share, falling back to their position"""
+    position = str(player.get("position") or "")
+    if cba is not None and not np.isnan(cba) and ("MID" in position or "RUC" in position):
+        if "RUC" in position:
+            return "Ruck" if cba >= 50 else "Forward Ruck"
+        if cba >= 60:
+            return "Inside Mid"
+        return "Rotating Mid" if cba >= 25 else "Wing"
+    return {"DEF": "Defense", "MID": "Midfield", "RUC": "Ruck", "FWD": "Forward"}.get(position.split("/")[0], position or "Unknown")
+
+def _last_update():
+    """Date of the player data the detector last ran on"""
+    try:
+        return datetime.fromtimestamp(os.path.getmtime("player_data.json")).strftime("%Y-%m-%d")
+    except OSError:
+        return datetime.now().strftime("%Y-%m-%d")
+
 def role_change_detector():
     """
     Detect significant changes in player roles based on recent games
     
+    Change points in each player's CBA share, time on ground and fantasy
+    points come from the league-wide CUSUM detector in change_point. For
+    each player the most recent confident change that started within the
+    last few games is reported, role metrics (CBA, TOG) before scoring.
+    
     Returns:
         dict: Dictionary with list of players and their role changes
     """
-    players = get_sample_players(15)
+    state = get_role_changes()
+    detector = state["detector"]
+    games_ago = detector.seen - detector.change_index
+    recent = (
+        (detector.change_index >= 0)
+        & (games_ago <= RECENT_CHANGE_GAMES)
+        & (detector.change_confidence >= MIN_CHANGE_CONFIDENCE)
+    )
+    cba = METRICS.index("cba")
+    last_update = _last_update()
     results = []
     
-    role_changes = [
-        "Forward to Midfield",
-        "Midfield to Forward",
-        "Defense to Midfield",
-        "Midfield to Defense",
-        "Wing to Inside Mid",
-        "Inside Mid to Wing",
-        "Deep Forward to High Forward"
-    ]
-    
-    impact_levels = ["High", "Medium", "Low"]
+    for i in np.flatnonzero(recent.any(axis=1)):
+        player = state["players"][i]
+        m = int(np.flatnonzero(recent[i])[0])
+        metric = METRICS[m]
+        before = detector.change_before[i, m]
+        after = detector.change_after[i, m]
+        shift = after - before
+        medium, high = IMPACT_THRESHOLDS[metric]
+        
+        old_cba = detector.change_before[i, cba] if recent[i, cba] else detector.mean[i, cba]
+        new_cba = detector.mean[i, cba] if detector.seen[i, cba] else np.nan
+        old_role = _role_label(player, old_cba if detector.seen[i, cba] else None)
+        new_role = _role_label(player, new_cba)
+        
+        results.append({
+            "player": player.get("name", "Unknown"),
+            "team": player.get("team", "Unknown"),
+            "old_role": old_role,
+            "new_role": new_role,
+            "role_change": f"{old_role} to {new_role}" if old_role != new_role else
+                           f"{METRIC_LABELS[metric]} {'up' if shift > 0 else 'down'}",
+            "metric": metric,
+            "before": round(float(before), 1),
+            "after": round(float(after), 1),
+            "games_ago": int(games_ago[i, m]),
+            "confidence": round(float(detector.change_confidence[i, m]), 3),
+            "fantasy_impact": "High" if abs(shift) >= high else "Medium" if abs(shift) >= medium else "Low",
+            "last_update": last_update
+        })
     
-    for player in players:
-        if random.random() > 0.7:  # Only show role changes for some players
-            results.append({
-                "player": player.get("name", "Unknown"),
-                "team": player.get("team", "Unknown"),
-                "old_role": random.choice(["Forward", "Midfield", "Defense", "Wing", "Inside Mid", "Deep Forward"]),
-                "new_role": random.choice(["Forward", "Midfield", "Defense", "Wing", "Inside Mid", "High Forward"]),
-                "role_change": random.choice(role_changes),
-                "fantasy_impact": random.choice(impact_levels),
-                "last_update": (datetime.now()).strftime("%Y-%m-%d")
-            })
-    
-    # Sort by fantasy impact
-    results.sort(key=lambda x: {"High": 3, "Medium": 2, "Low": 1}.get(x["fantasy_impact"], 0), reverse=True)
+    # Sort by fantasy impact, then confidence
+    results.sort(key=lambda x: ({"High": 3, "Medium": 2, "Low": 1}.get(x["fantasy_impact"], 0), x["confidence"]),
+                 reverse=True)
     
     return {
         "status": "ok",
@@ -72,27 +113,45 @@ def cba_trend_analyzer():
     """
     Analyze Centre Bounce Attendance (CBA) trends for players
     
+    The recent CBA share is the mean of the player's current regime from the
+    change-point detector; the previous share is the regime before the last
+    change (or the earlier games when no change was found).
+    
     Returns:
         dict: Dictionary with CBA trends for players
     """
-    players = get_sample_players(20)
+    state = get_role_changes()
+    detector = state["detector"]
+    series = state["series"]
+    m = METRICS.index("cba")
     results = []
     
-    for player in players:
-        if player.get("position") in ["MID", "RUC"] or random.random() > 0.8:
-            recent_cba = random.randint(0, 100)
-            previous_cba = random.randint(0, 100)
-            cba_change = recent_cba - previous_cba
-            
-            results.append({
-                "player": player.get("name", "Unknown"),
-                "team": player.get("team", "Unknown"),
-                "recent_cba_percentage": recent_cba,
-                "previous_cba_percentage": previous_cba,
-                "cba_change": cba_change,
-                "trend_direction": "up" if cba_change > 0 else "down" if cba_change < 0 else "stable",
-                "fantasy_relevance": "High" if abs(cba_change) > 15 else "Medium" if abs(cba_change) > 5 else "Low"
-            })
+    for i in np.flatnonzero(detector.seen[:, m] > 0):
+        player = state["players"][i]
+        values = series[i, m, :state["lengths"][i, m]]
+        values = values[~np.isnan(values)]
+        changed = detector.change_index[i, m] >= 0
+        recent_cba = detector.mean[i, m]
+        if changed:
+            previous_cba = detector.change_before[i, m]
+        elif len(values) > RECENT_CHANGE_GAMES:
+            previous_cba = values[:-RECENT_CHANGE_GAMES].mean()
+        else:
+            previous_cba = recent_cba
+        cba_change = int(round(recent_cba - previous_cba))
+        
+        results.append({
+            "player": player.get("name", "Unknown"),
+            "team": player.get("team", "Unknown"),
+            "recent_cba_percentage": int(round(recent_cba)),
+            "previous_cba_percentage": int(round(previous_cba)),
+            "cba_change": cba_change,
+            "trend_direction": "up" if cba_change > 0 else "down" if cba_change < 0 else "stable",
+            "fantasy_relevance": "High" if abs(cba_change) > 15 else "Medium" if abs(cba_change) > 5 else "Low",
+            "change_point": bool(changed),
+            "games_since_change": int(detector.seen[i, m] - detector.change_index[i, m]) if changed else None,
+            "confidence": round(float(detector.change_confidence[i, m]), 3) if changed else None
+        })
     
     # Sort by CBA change magnitude
     results.sort(key=lambda x: abs(x["cba_change"]), reverse=True)
@@ -0,0 +1,226 @@
+"""
+AFL Fantasy Player Similarity Index
+
+This module answers "the k players most like X that are cheaper than X in
+position P" for downgrade and replacement searches. Every player becomes a
+normalised, weighted feature vector (price, average, L3/L5, breakeven,
+ownership, volatility and position). For each position the vectors are
+stored sorted by price, so a price cap is a binary search and the
+remaining candidates are ranked with one vectorized distance computation.
+A full roster is a few hundred rows per position, where exact brute force
+is faster than a tree. The index is rebuilt when the player data, game
+logs or risk table change.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from price_simulator import (
+    PLAYER_DATA_PATH,
+    GAME_LOGS_PATH,
+    data_generation,
+    extract_score_history,
+    load_player_index,
+    player_average,
+    player_key,
+    _to_float
+)
+from player_repository import PlayerRecord
+from risk_engine import get_risk_table
+
+POSITIONS = ('DEF', 'MID', 'RUC', 'FWD')
+
+# Numeric features and their weight in the distance
+FEATURES = ('price', 'average', 'l3', 'l5', 'breakeven', 'ownership', 'volatility')
+FEATURE_WEIGHTS = np.array([1.5, 2.0, 1.0, 1.0, 1.0, 0.5, 0.5])
+# Weight of the position one-hot block (matters for dual position players)
+POSITION_WEIGHT = 1.0
+
+DEFAULT_NEIGHBOURS = 10
+
+_state = {}
+_state_lock = threading.Lock()
+
+
+def _recent_average(scores, games, fallback):
+    return float(np.mean(scores[-games:])) if scores else fallback
+
+
+def _risk_volatility(risk):
+    """Risk table lookup and rolling standard deviations (empty for a missing table)"""
+    if not risk or not len(risk.get('latest_std', ())):
+        return {}, None
+    return risk['lookup'], risk['latest_std']
+
+
+def _build_index(player_path, logs_path):
+    """
+    Build the weighted feature matrix and per-position price-sorted views
+
+    Returns:
+        dict: Players, raw features, weighted vectors and per-position rows
+    """
+    index = load_player_index(player_path, logs_path)
+    try:
+        risk_lookup, latest_std = _risk_volatility(get_risk_table(player_path, logs_path))
+    except Exception as e:
+        # Volatility is one feature of several; the index works without it
+        print(f"Error building risk table for the similarity index: {e}")
+        risk_lookup, latest_std = {}, None
+
+    players, rows = [], []
+    for key, (player, game_logs) in index.items():
+        if key != player_key(player):
+            continue  # name alias of a player already listed
+        price = _to_float(player.get('price'))
+        if not price:
+            continue
+        scores = extract_score_history(player, game_logs)
+        average = player_average(player, scores) or 0.0
+        risk_row = risk_lookup.get(key)
+        rows.append([
+            price,
+            average,
+            _recent_average(scores, 3, average),
+            _to_float(player.get('l5Average')) or _recent_average(scores, 5, average),
+            _to_float(player.get('breakeven', player.get('breakEven'))),
+            _to_float(player.get('ownership', player.get('selected'))),
+            latest_std[risk_row] if risk_row is not None else None
+        ])
+        players.append(player)
+
+    raw = np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURES))
+
+    # Z-score each feature; missing values sit at the mean (features no
+    # player has, e.g. ownership before it is scraped, are all zero)
+    count = (~np.isnan(raw)).sum(axis=0)
+    mean = np.divide(np.nansum(raw, axis=0), count, out=np.zeros(len(FEATURES)), where=count > 0)
+    variance = np.divide(np.nansum((raw - mean) ** 2, axis=0), count, out=np.zeros(len(FEATURES)), where=count > 0)
+    std = np.where(variance > 0, np.sqrt(variance), 1.0)
+    scaled = np.nan_to_num((raw - mean) / std) * FEATURE_WEIGHTS
+
+    positions = [PlayerRecord.from_dict(p).positions for p in players]
+    one_hot = np.array([[pos in eligible for pos in POSITIONS] for eligible in positions],
+                       dtype=np.float64).reshape(len(players), len(POSITIONS))
+    vectors = np.hstack([scaled, one_hot * POSITION_WEIGHT])
+
+    by_position = {}
+    price = raw[:, 0]
+    for p, position in enumerate(POSITIONS):
+        members = np.flatnonzero(one_hot[:, p] > 0)
+        members = members[np.argsort(price[members], kind='stable')]
+        by_position[position] = {
+            'rows': members,
+            'prices': price[members],
+            'vectors': np.ascontiguousarray(vectors[members])
+        }
+
+    keys = [player_key(p) for p in players]
+    lookup = {key: i for i, key in enumerate(keys)}
+    for i, player in enumerate(players):
+        if player.get('name'):
+            lookup.setdefault(str(player['name']).lower(), i)
+
+    return {
+        'players': players,
+        'keys': keys,
+        'lookup': lookup,
+        'positions': positions,
+        'raw': raw,
+        'vectors': vectors,
+        'by_position': by_position
+    }
+
+
+def get_similarity_index(player_path=PLAYER_DATA_PATH, logs_path=GAME_LOGS_PATH):
+    """
+    Get the similarity index, rebuilding it when the data changes
+
+    Returns:
+        dict: Similarity index arrays and lookup maps
+    """
+    generation = data_generation(player_path, logs_path)
+    with _state_lock:
+        if _state.get('generation') != generation:
+            _state.clear()
+            _state['index'] = _build_index(player_path, logs_path)
+            _state['generation'] = generation
+        return _state['index']
+
+
+def _nearest(group, target, max_price, k, exclude):
+    """k nearest rows of a position group priced at or below max_price"""
+    end = np.searchsorted(group['prices'], max_price, side='right') if max_price is not None else len(group['rows'])
+    if end == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    diff = group['vectors'][:end] - target
+    distances = np.einsum('ij,ij->i', diff, diff)
+    rows = group['rows'][:end]
+    if exclude is not None:
+        distances = np.where(rows == exclude, np.inf, distances)
+    take = min(k, end)
+    nearest = np.argpartition(distances, take - 1)[:take]
+    nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+    keep = np.isfinite(distances[nearest])
+    return rows[nearest[keep]], np.sqrt(distances[nearest[keep]])
+
+
+def similar_players(player_id, k=DEFAULT_NEIGHBOURS, max_price=None, position=None, cheaper=True):
+    """
+    Find the players most similar to a player
+
+    Args:
+        player_id (str): Player id or name to compare against
+        k (int): Number of players to return
+        max_price (int, optional): Price cap (defaults to the player's price when cheaper is set)
+        position (str, optional): Position to search (defaults to the player's first position)
+        cheaper (bool): Only return players priced below the player
+
+    Returns:
+        dict: Query details and the nearest players, or None if the player is unknown
+    """
+    started = time.perf_counter()
+    index = get_similarity_index()
+    i = index['lookup'].get(str(player_id), index['lookup'].get(str(player_id).lower()))
+    if i is None:
+        return None
+
+    position = str(position or (index['positions'][i] or ('MID',))[0]).upper()
+    if position not in POSITIONS:
+        raise ValueError(f"Unknown position {position}")
+    price = index['raw'][i, 0]
+    if max_price is None and cheaper:
+        max_price = np.nextafter(price, 0)
+
+    rows, distances = _nearest(index['by_position'][position], index['vectors'][i], max_price, max(int(k), 1), i)
+
+    raw = index['raw']
+    results = []
+    for row, distance in zip(rows, distances):
+        player = index['players'][row]
+        features = {name: (None if np.isnan(raw[row, f]) else round(float(raw[row, f]), 1))
+                    for f, name in enumerate(FEATURES)}
+        results.append({
+            'player_id': index['keys'][row],
+            'player': player.get('name', 'Unknown'),
+            'team': player.get('team', 'Unknown'),
+            'position': player.get('position', 'Unknown'),
+            **features,
+            'price': int(raw[row, 0]),
+            'price_saving': int(price - raw[row, 0]),
+            'distance': round(float(distance), 3),
+            'similarity': round(1 / (1 + float(distance)), 3)
+        })
+
+    player = index['players'][i]
+    return {
+        'player_id': index['keys'][i],
+        'player': player.get('name', 'Unknown'),
+        'price': int(price),
+        'position': position,
+        'max_price': int(max_price) if max_price is not None else None,
+        'similar': results,
+        'query_ms': round((time.perf_counter() - started) * 1000, 3)
+    }
@@ -0,0 +1,282 @@
+"""
+AFL Fantasy Squad Optimizer
+
+This module builds (or rebalances) a full 30-man squad from the player
+pool as a mixed integer program: position line-ups on field and bench,
+a salary cap, locked and excluded players and an optional trade limit
+against a current team. The objective is projected points, or a blend of
+points and value (points per dollar).
+
+The program is solved with the HiGHS branch-and-bound solver shipped in
+scipy, which handles the full player pool in well under a second.
+"""
+
+import time
+
+import numpy as np
+
+from price_simulator import (
+    PLAYER_DATA_PATH,
+    GAME_LOGS_PATH,
+    load_player_index,
+    player_key,
+    projected_points,
+    _to_float
+)
+
+try:
+    from scipy.optimize import milp, LinearConstraint, Bounds
+    from scipy.sparse import coo_matrix
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+SALARY_CAP = 13000000
+
+# On-field and bench spots per position, plus one utility bench spot
+SQUAD_STRUCTURE = {
+    'DEF': {'field': 6, 'bench': 2},
+    'MID': {'field': 8, 'bench': 2},
+    'RUC': {'field': 2, 'bench': 1},
+    'FWD': {'field': 6, 'bench': 2}
+}
+UTILITY_SLOTS = 1
+
+# Bench players only score as emergencies, so they count for a fraction
+BENCH_WEIGHT = 0.1
+
+POSITION_ALIASES = {
+    'RUCK': 'RUC',
+    'DEFENDER': 'DEF',
+    'MIDFIELDER': 'MID',
+    'FORWARD': 'FWD'
+}
+
+
+def player_positions(player):
+    """
+    Positions a player is eligible for (dual position players have two)
+
+    Args:
+        player (dict): Player record
+
+    Returns:
+        list: Position codes such as ['DEF', 'MID']
+    """
+    raw = str(player.get('position') or '').upper().replace('-', '/').replace(',', '/')
+    positions = []
+    for part in raw.split('/'):
+        code = POSITION_ALIASES.get(part.strip(), part.strip())
+        if code in SQUAD_STRUCTURE and code not in positions:
+            positions.append(code)
+    return positions
+
+
+def load_player_pool(player_path=PLAYER_DATA_PATH, logs_path=GAME_LOGS_PATH):
+    """
+    Load players that can be selected: priced, positioned and projected
+
+    Returns:
+        list: Pool entries with key, name, team, positions, price and points
+    """
+    pool = []
+    for key, (player, game_logs) in load_player_index(player_path, logs_path).items():
+        if key != player_key(player):
+            continue  # name alias of a player already listed
+        price = _to_float(player.get('price'))
+        positions = player_positions(player)
+        points = projected_points(player, game_logs)
+        if not price or not positions or points is None:
+            continue
+        pool.append({
+            'key': key,
+            'name': player.get('name', key),
+            'team': player.get('team', 'Unknown'),
+            'positions': positions,
+            'price': price,
+            'points': points
+        })
+    return pool
+
+
+def _slots(structure, utility_slots):
+    """List of (slot name, position or None for utility, spots, is_bench)"""
+    slots = []
+    for position, counts in structure.items():
+        slots.append((f'{position}', position, counts['field'], False))
+        slots.append((f'{position}_BENCH', position, counts['bench'], True))
+    if utility_slots:
+        slots.append(('UTIL', None, utility_slots, True))
+    return slots
+
+
+def _match(pool, identifiers):
+    """Indices of pool entries matching player ids or names"""
+    wanted = {str(i).lower() for i in identifiers or []}
+    return {i for i, p in enumerate(pool) if p['key'].lower() in wanted or str(p['name']).lower() in wanted}
+
+
+def _unmatched(pool, identifiers):
+    """Player ids/names that match no pool entry"""
+    known = {p['key'].lower() for p in pool} | {str(p['name']).lower() for p in pool}
+    return [i for i in identifiers or [] if str(i).lower() not in known]
+
+
+def optimize_squad(salary_cap=SALARY_CAP, locked=None, excluded=None, objective='points',
+                   value_weight=0.5, current_team=None, max_trades=None,
+                   structure=None, utility_slots=UTILITY_SLOTS, bench_weight=BENCH_WEIGHT,
+                   time_limit=10.0, pool=None):
+    """
+    Pick the best legal squad under the salary cap
+
+    Args:
+        salary_cap (int): Total salary available
+        locked (list, optional): Player ids/names that must be selected
+        excluded (list, optional): Player ids/names that must not be selected
+        objective (str): 'points' for projected points, 'blend' for points/value blend
+        value_weight (float): Weight of value (points per dollar) in 'blend' mode, 0-1
+        current_team (list, optional): Current squad ids/names, used with max_trades
+        max_trades (int, optional): Maximum players to change from current_team
+        structure (dict, optional): Override of SQUAD_STRUCTURE
+        utility_slots (int): Utility bench spots open to any position
+        bench_weight (float): Fraction of projected points credited for bench spots
+        time_limit (float): Solver time limit in seconds
+        pool (list, optional): Pre-loaded player pool
+
+    Returns:
+        dict: Selected squad by line with totals, or an error message
+    """
+    if not SCIPY_AVAILABLE:
+        return {"status": "error", "message": "Missing required package (scipy) for squad optimization"}
+    if objective not in ('points', 'blend'):
+        return {"status": "error", "message": f"Unknown objective '{objective}'"}
+
+    start = time.perf_counter()
+    pool = pool if pool is not None else load_player_pool()
+    slots = _slots(structure or SQUAD_STRUCTURE, utility_slots)
+    squad_size = sum(spots for _, _, spots, _ in slots)
+
+    unknown_locked = _unmatched(pool, locked)
+    if unknown_locked:
+        return {
+            "status": "error",
+            "message": "Locked players not found in the player pool",
+            "unknown_locked": unknown_locked
+        }
+
+    locked_idx = _match(pool, locked)
+    excluded_idx = _match(pool, excluded)
+    if locked_idx & excluded_idx:
+        return {"status": "error", "message": "A player cannot be both locked and excluded"}
+
+    points = np.array([p['points'] for p in pool], dtype=np.float64)
+    prices = np.array([p['price'] for p in pool], dtype=np.float64)
+    if objective == 'blend':
+        # Points per dollar rescaled to the points range so the blend is balanced
+        value = points / prices * prices.mean()
+        weight = (1 - value_weight) * points + value_weight * value
+    else:
+        weight = points
+
+    # One binary variable per eligible (player, slot) pair
+    var_player, var_slot, var_weight = [], [], []
+    for i, player in enumerate(pool):
+        if i in excluded_idx:
+            continue
+        for s, (_, position, _, is_bench) in enumerate(slots):
+            if position is None or position in player['positions']:
+                var_player.append(i)
+                var_slot.append(s)
+                var_weight.append(weight[i] * (bench_weight if is_bench else 1.0))
+
+    if not var_player:
+        # No priced, positioned players to choose from (e.g. player data without prices)
+        return {
+            "status": "error",
+            "message": "No eligible players to build a squad from",
+            "pool_size": len(pool)
+        }
+
+    var_player = np.array(var_player, dtype=np.int64)
+    var_slot = np.array(var_slot, dtype=np.int64)
+    n_vars = len(var_player)
+    columns = np.arange(n_vars)
+
+    constraints = []
+
+    # Each slot is filled exactly
+    spots = np.array([s[2] for s in slots], dtype=np.float64)
+    slot_matrix = coo_matrix((np.ones(n_vars), (var_slot, columns)), shape=(len(slots), n_vars))
+    constraints.append(LinearConstraint(slot_matrix, spots, spots))
+
+    # Each player fills at most one slot, locked players exactly one
+    player_matrix = coo_matrix((np.ones(n_vars), (var_player, columns)), shape=(len(pool), n_vars))
+    lower = np.zeros(len(pool))
+    lower[list(locked_idx)] = 1
+    constraints.append(LinearConstraint(player_matrix, lower, np.ones(len(pool))))
+
+    # Salary cap
+    constraints.append(LinearConstraint(prices[var_player][None, :], -np.inf, salary_cap))
+
+    # Trade limit: keep at least squad_size - max_trades of the current team
+    if current_team and max_trades is not None:
+        current_idx = _match(pool, current_team)
+        keep = np.isin(var_player, list(current_idx)).astype(np.float64)
+        constraints.append(LinearConstraint(keep[None, :], max(0, len(current_idx) - int(max_trades)), np.inf))
+
+    result = milp(
+        c=-np.array(var_weight),
+        constraints=constraints,
+        integrality=np.ones(n_vars),
+        bounds=Bounds(0, 1),
+        options={'time_limit': time_limit}
+    )
+    solve_time = time.perf_counter() - start
+
+    if result.x is None:
+        return {
+            "status": "error",
+            "message": f"No legal squad found: {result.message}",
+            "solve_time": round(solve_time, 3)
+        }
+
+    chosen = np.flatnonzero(result.x > 0.5)
+    lines = {name: [] for name, _, _, _ in slots}
+    total_price = 0
+    field_points = 0.0
+    for v in chosen:
+        player = pool[var_player[v]]
+        name, _, _, is_bench = slots[var_slot[v]]
+        lines[name].append({
+            'player_id': player['key'],
+            'name': player['name'],
+            'team': player['team'],
+            'positions': player['positions'],
+            'price': int(player['price']),
+            'projected_points': round(player['points'], 1)
+        })
+        total_price += player['price']
+        if not is_bench:
+            field_points += player['points']
+
+    for line in lines.values():
+        line.sort(key=lambda p: p['projected_points'], reverse=True)
+
+    return {
+        "status": "ok",
+        "optimal": bool(result.status == 0),
+        "objective": objective,
+        "squad": lines,
+        "squad_size": squad_size,
+        "total_price": int(total_price),
+        "remaining_salary": int(salary_cap - total_price),
+        "projected_points": round(field_points, 1),
+        "pool_size": len(pool),
+        "solve_time": round(solve_time, 3)
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(optimize_squad(), indent=2))
@@ -0,0 +1,100 @@
+"""
+AFL Fantasy Venue Data
+
+This module loads venue coordinates and team home bases from venues.json
+and precomputes great-circle distances between every pair of venues, so
+travel tools can look distances up instead of estimating them state by
+state.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from price_simulator import data_generation
+
+VENUES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'venues.json')
+
+EARTH_RADIUS_KM = 6371.0
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def great_circle_km(lat1, lon1, lat2, lon2):
+    """
+    Haversine distance in kilometres (works element-wise on arrays)
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _build(path):
+    with open(path, 'r') as f:
+        raw = json.load(f)
+
+    names = list(raw.get('venues', {}))
+    lat = np.array([raw['venues'][n]['lat'] for n in names], dtype=np.float64)
+    lon = np.array([raw['venues'][n]['lon'] for n in names], dtype=np.float64)
+
+    lookup = {n.lower(): i for i, n in enumerate(names)}
+    for alias, name in raw.get('aliases', {}).items():
+        if name.lower() in lookup:
+            lookup[alias.lower()] = lookup[name.lower()]
+
+    return {
+        'names': names,
+        'info': raw['venues'],
+        'lookup': lookup,
+        'home_venues': raw.get('home_venues', {}),
+        'distance_km': great_circle_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    }
+
+
+def get_venue_data(path=VENUES_PATH):
+    """
+    Venue names, coordinates, home bases and the venue x venue distance matrix
+
+    Returns:
+        dict: 'names', 'info', 'lookup', 'home_venues' and 'distance_km' [venue, venue]
+    """
+    generation = data_generation(path)
+    with _cache_lock:
+        if _cache.get('generation') != generation:
+            _cache['data'] = _build(path)
+            _cache['generation'] = generation
+        return _cache['data']
+
+
+def venue_index(name, venues=None):
+    """Row of a venue in the distance matrix, or -1 if the venue is unknown"""
+    venues = venues or get_venue_data()
+    return venues['lookup'].get(str(name or '').strip().lower(), -1)
+
+
+def canonical_venue(name, venues=None):
+    """Canonical venue name for a fixture venue, or the name unchanged if unknown"""
+    venues = venues or get_venue_data()
+    i = venue_index(name, venues)
+    return venues['names'][i] if i >= 0 else name
+
+
+def home_distance_matrix(teams, venues=None):
+    """
+    Distance from each team's home base to every venue
+
+    Args:
+        teams (list): Team names
+
+    Returns:
+        ndarray: [team, venue] distances in km (NaN for teams without a home base)
+    """
+    venues = venues or get_venue_data()
+    rows = np.array([venue_index(venues['home_venues'].get(t), venues) for t in teams], dtype=np.int64)
+    distances = np.full((len(teams), len(venues['names'])), np.nan)
+    known = rows >= 0
+    distances[known] = venues['distance_km'][rows[known]]
+    return distances
@@ -0,0 +1,259 @@
+"""
+AFL Fantasy Weather Provider
+
+This module provides the weather used by the fixture tools. Providers
+implement forecast(venue, date); FileWeatherProvider reads forecasts saved
+to weather_forecasts.json and falls back to long-term monthly averages for
+the venue from weather_climate.json. WeatherCache keeps provider results on
+disk keyed by (venue, date) with a per-venue TTL, so a batch of fixtures
+only asks the provider for entries that are missing or expired, and the
+same cache state always produces the same weather.
+"""
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import date as date_type, datetime
+
+from data_prefetcher import atomic_write_json
+from price_simulator import data_generation
+from venues import get_venue_data, venue_index
+
+CLIMATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'weather_climate.json')
+FORECASTS_PATH = 'weather_forecasts.json'
+WEATHER_CACHE_PATH = 'weather_cache.json'
+
+# Seconds before a cached forecast is asked for again; conditions under a
+# roof never change, so roofed venues are cached indefinitely
+WEATHER_TTL = 6 * 3600
+ROOFED_TTL = None
+
+
+def _read_json(path, default=None):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _iso_date(value):
+    """ISO date string for a datetime, date or date-like string (None if unparseable)"""
+    if isinstance(value, (datetime, date_type)):
+        return value.strftime('%Y-%m-%d')
+    text = str(value or '').strip()
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            return datetime.strptime(text[:19], fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+class WeatherProvider(ABC):
+    """Interface for weather sources"""
+
+    name = 'base'
+
+    @abstractmethod
+    def forecast(self, venue, date):
+        """
+        Weather for a venue on a date
+
+        Args:
+            venue (str): Canonical venue name
+            date (str): ISO date (YYYY-MM-DD)
+
+        Returns:
+            dict: rain_chance and wind_chance (0-100) and source, or None if unknown
+        """
+
+    def forecast_many(self, keys):
+        """
+        Weather for many (venue, date) pairs; sources with batch requests
+        should override this
+
+        Returns:
+            dict: (venue, date) -> forecast dict or None
+        """
+        return {key: self.forecast(*key) for key in keys}
+
+
+class FileWeatherProvider(WeatherProvider):
+    """
+    Weather from local files: saved forecasts first, then monthly climate averages
+
+    The forecasts file maps venue -> ISO date -> {rain_chance, wind_chance}.
+    """
+
+    name = 'file'
+
+    def __init__(self, forecasts_path=FORECASTS_PATH, climate_path=CLIMATE_PATH):
+        self.forecasts_path = forecasts_path
+        self.climate_path = climate_path
+        self._lock = threading.Lock()
+        self._generation = None
+        self._forecasts = {}
+        self._climate = {}
+
+    def _refresh(self):
+        generation = data_generation(self.forecasts_path, self.climate_path)
+        with self._lock:
+            if generation != self._generation:
+                self._forecasts = _read_json(self.forecasts_path, {}) or {}
+                self._climate = _read_json(self.climate_path, {}) or {}
+                self._generation = generation
+
+    def _climate_for(self, venue, info, month):
+        climate = self._climate.get('venues', {}).get(venue)
+        if climate is None:
+            climate = self._climate.get('states', {}).get(info.get('state'))
+        if climate is None:
+            return None
+        return {
+            'rain_chance': int(climate['rain_chance'][month - 1]),
+            'wind_chance': int(climate['wind_chance'][month - 1]),
+            'source': 'climate'
+        }
+
+    def forecast(self, venue, date):
+        self._refresh()
+        venues = get_venue_data()
+        info = venues['info'].get(venue, {})
+        if info.get('roof'):
+            return {'rain_chance': 0, 'wind_chance': 0, 'source': 'roof'}
+
+        saved = self._forecasts.get(venue, {}).get(date)
+        if saved:
+            return {
+                'rain_chance': int(saved.get('rain_chance', 0)),
+                'wind_chance': int(saved.get('wind_chance', 0)),
+                'source': 'forecast'
+            }
+
+        try:
+            month = int(date[5:7])
+        except (TypeError, ValueError):
+            return None
+        return self._climate_for(venue, info, month)
+
+
+class WeatherCache:
+    """On-disk weather cache keyed by (venue, date) with a TTL per venue"""
+
+    def __init__(self, path=WEATHER_CACHE_PATH, ttl=WEATHER_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._generation = None
+        self._entries = {}
+
+    @staticmethod
+    def _key(venue, date):
+        return f"{venue}|{date}"
+
+    def ttl_for(self, venue):
+        """Seconds a venue's weather stays fresh (None means it never expires)"""
+        info = get_venue_data()['info'].get(venue, {})
+        return ROOFED_TTL if info.get('roof') else self.ttl
+
+    def _refresh(self):
+        generation = data_generation(self.path)
+        if generation != self._generation:
+            self._entries = (_read_json(self.path, {}) or {}).get('entries', {})
+            self._generation = generation
+
+    def get_many(self, keys, provider, now=None):
+        """
+        Cached weather for (venue, date) pairs, asking the provider in one
+        batch for entries that are missing or expired
+
+        Args:
+            keys (iterable): (venue, ISO date) pairs
+            provider (WeatherProvider): Source for missing entries
+            now (float): Current time (epoch seconds)
+
+        Returns:
+            dict: (venue, date) -> weather dict or None
+        """
+        now = time.time() if now is None else now
+        keys = sorted(set(keys))
+        with self._lock:
+            self._refresh()
+            stale = []
+            for venue, date in keys:
+                entry = self._entries.get(self._key(venue, date))
+                if entry is None or (entry.get('expires_at') is not None and entry['expires_at'] <= now):
+                    stale.append((venue, date))
+
+            if stale:
+                fetched = provider.forecast_many(stale)
+                for venue, date in stale:
+                    ttl = self.ttl_for(venue)
+                    self._entries[self._key(venue, date)] = {
+                        'weather': fetched.get((venue, date)),
+                        'provider': provider.name,
+                        'fetched_at': round(now),
+                        'expires_at': round(now + ttl) if ttl is not None else None
+                    }
+                atomic_write_json(self.path, {'entries': self._entries})
+                self._generation = data_generation(self.path)
+
+            return {key: self._entries[self._key(*key)]['weather'] for key in keys}
+
+
+_provider = None
+_provider_lock = threading.Lock()
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_provider():
+    """The process-wide weather provider"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = FileWeatherProvider()
+        return _provider
+
+
+def set_provider(provider):
+    """Replace the weather provider (e.g. with one backed by a forecast API)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+def get_cache(path=WEATHER_CACHE_PATH):
+    """Shared weather cache for a cache file (one instance per absolute path)"""
+    key = os.path.abspath(path)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = WeatherCache(key)
+        return _caches[key]
+
+
+def get_weather(keys, provider=None, cache=None):
+    """
+    Weather for many fixtures in one batch
+
+    Args:
+        keys (iterable): (venue, date) pairs; venues may be aliases and dates
+                         datetimes or date strings
+
+    Returns:
+        dict: Original (venue, date) key -> weather dict or None
+    """
+    keys = list(keys)
+    venues = get_venue_data()
+    normalized = {}
+    for venue, date in keys:
+        i = venue_index(venue, venues)
+        iso = _iso_date(date)
+        if i >= 0 and iso:
+            normalized[(venue, date)] = (venues['names'][i], iso)
+
+    weather = (cache or get_cache()).get_many(normalized.values(), provider or get_provider())
+    return {key: weather.get(normalized[key]) if key in normalized else None for key in keys}
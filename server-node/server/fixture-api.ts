@@ -1,9 +1,12 @@
 import express from "express";
 import { exec } from "child_process";
+import { createHash } from "crypto";
 
 const fixtureApi = express.Router();
 
-function runTool(tool: string, res: express.Response) {
+// Pass req for tools whose output is fixed for a given cache state: the response
+// gets a strong ETag and a matching If-None-Match is answered with a 304
+function runTool(tool: string, res: express.Response, req?: express.Request) {
   const cmd = `python3 -c "import sys; sys.path.append('backend/python/tools'); from fixture_tools import ${tool}; import json; print(json.dumps(${tool}()))"`;
   
   exec(cmd, (err, stdout) => {
@@ -17,6 +20,15 @@ function runTool(tool: string, res: express.Response) {
     
     try {
       const data = JSON.parse(stdout);
+      if (req) {
+        const body = JSON.stringify({ status: "ok", data });
+        res.setHeader("ETag", `"${createHash("sha256").update(body).digest("base64url")}"`);
+        res.setHeader("Cache-Control", "no-cache");
+        if (req.fresh) {
+          return res.status(304).end();
+        }
+        return res.type("json").send(body);
+      }
       res.json({ 
         status: "ok", 
         data 
@@ -96,6 +108,6 @@ fixtureApi.get("/matchup-dvp", async (_, res) => {
 
 fixtureApi.get("/fixture-swing", (_, res) => runTool("fixture_swing_radar", res));
 fixtureApi.get("/travel-impact", (_, res) => runTool("travel_impact_estimator", res));
-fixtureApi.get("/weather-risk", (_, res) => runTool("weather_forecast_risk_model", res));
+fixtureApi.get("/weather-risk", (req, res) => runTool("weather_forecast_risk_model", res, req));
 
 export default fixtureApi;
\ No newline at end of file
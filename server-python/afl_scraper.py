@@ -1,14 +1,21 @@
 import os
-import time
+import sys
+from pathlib import Path
 import pandas as pd
-from io import StringIO
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 
+# Scraping modules shared with server-node
+sys.path.append(str(Path(__file__).resolve().parent.parent / "server-node" / "backend" / "python" / "scrapers"))
+from table_extract import DFS_TABLE_IDS, extract_tables_by_id
+import replay
+
+# --record / --replay [--fixtures DIR]
+replay.configure_from_argv()
+
 # Load player list
 df = pd.read_excel("AFL_Fantasy_Player_URLs.xlsx")
 
@@ -18,19 +25,16 @@ options.add_argument("--headless")
 options.add_argument("--disable-gpu")
 options.add_argument("--no-sandbox")
 options.add_argument("--disable-dev-shm-usage")
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=options)
+driver = replay.driver(
+    lambda: webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+)
 
 # Output folder - use centralized data directory
 output_folder = "../data/dfs_player_summary"
 os.makedirs(output_folder, exist_ok=True)
 
 # Table IDs to extract
-TABLE_IDS = {
-    "Career Averages": "fantasyPlayerCareer",
-    "Opponent Splits": "vsOpponentCareer",
-    "Game Logs": "playerGames"
-}
+TABLE_IDS = DFS_TABLE_IDS
 
 # Scrape loop
 for index, row in df.iterrows():
@@ -50,17 +54,15 @@ for index, row in df.iterrows():
 
     try:
         driver.get(url)
-        time.sleep(3)  # Let page fully load
+        replay.pause(3)  # Let page fully load
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        tables = extract_tables_by_id(driver.page_source, TABLE_IDS)
         writer = pd.ExcelWriter(output_path, engine="openpyxl")
         found_any = False
 
-        for sheet_name, table_id in TABLE_IDS.items():
-            table = soup.select_one(f"table#{table_id}")
-            if table:
-                df_table = pd.read_html(StringIO(str(table)))[0]
-                df_table.to_excel(writer, sheet_name=sheet_name, index=False)
+        for sheet_name in TABLE_IDS:
+            if sheet_name in tables:
+                tables[sheet_name].to_excel(writer, sheet_name=sheet_name, index=False)
                 found_any = True
             else:
                 print(f"⚠️ Table '{sheet_name}' not found for {player_id}")
@@ -76,3 +78,5 @@ for index, row in df.iterrows():
 
 driver.quit()
 print("✅ Scraping complete.")
+if replay.mode():
+    print(replay.report())
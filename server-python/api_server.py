@@ -9,6 +9,7 @@ from flask_cors import CORS
 import pandas as pd
 import glob
 import os
+import sys
 from datetime import datetime
 import traceback
 import json
@@ -20,6 +21,10 @@ import random
 import time
 import hashlib
 
+# Scraping modules shared with server-node
+sys.path.append(str(Path(__file__).resolve().parent.parent / "server-node" / "backend" / "python" / "scrapers"))
+from table_sink import PYARROW_AVAILABLE, load_manifests, load_player_tables, table_slug
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for iOS app
 
@@ -28,6 +33,9 @@ players_cache = {}
 last_cache_update = None
 CACHE_TTL = 3600  # 1 hour cache
 
+# Prices follow a rolling three game window
+PRICE_WINDOW = 3
+
 # WebSocket connections
 websocket_clients = set()
 
@@ -64,7 +72,7 @@ def load_players_data():
         log_info(f"Using cached data ({len(players_cache)} players)")
         return
     
-    log_info("Loading player data from Excel files...")
+    log_info("Loading player data...")
     players_cache = {}
     
     data_folder = Path("../data/dfs_player_summary")
@@ -72,6 +80,11 @@ def load_players_data():
         log_error(f"Data folder not found: {data_folder}")
         return
     
+    # The scrapers' columnar datasets load in one pass; per-player workbooks are the fallback
+    if load_players_from_dataset(data_folder / "tables"):
+        last_cache_update = datetime.now()
+        return
+    
     excel_files = list(data_folder.glob("*.xlsx"))
     log_info(f"Found {len(excel_files)} Excel files")
     
@@ -93,6 +106,44 @@ def load_players_data():
     last_cache_update = datetime.now()
     log_info(f"Successfully loaded {successful_loads}/{len(excel_files)} players into cache")
 
+# Scraped table names and the keys they are served under
+SHEET_MAPPING = {
+    "Season_Summary": "career_stats",
+    "vs_Opposition": "opponent_splits", 
+    "Recent_Games": "recent_form",
+    "All_Games": "game_history",
+    "vs_Venues": "venue_stats",
+    "vs_Specific_Opposition": "head_to_head"
+}
+
+def load_players_from_dataset(dataset_root):
+    """Load all players from the scraped table datasets into the cache
+    
+    Returns:
+        bool: False if there is no committed dataset to load
+    """
+    if not PYARROW_AVAILABLE or not load_manifests(str(dataset_root)):
+        return False
+    
+    try:
+        tables = load_player_tables(str(dataset_root))
+    except Exception as e:
+        log_error(f"Failed to load table datasets from {dataset_root}: {e}")
+        return False
+    
+    mapping = {table_slug(name): mapped for name, mapped in SHEET_MAPPING.items()}
+    for player_id, player_tables in tables.items():
+        player_data = {"player_id": player_id}
+        for slug, records in player_tables.items():
+            # Same cleaning as the workbooks: missing values become 0
+            player_data[mapping.get(slug, slug)] = [
+                {key: (0 if value is None else value) for key, value in row.items()} for row in records
+            ]
+        players_cache[player_id] = player_data
+    
+    log_info(f"Successfully loaded {len(players_cache)} players from {dataset_root}")
+    return True
+
 def parse_player_excel(file_path):
     """Convert Excel sheets to JSON-ready format"""
     try:
@@ -102,15 +153,6 @@ def parse_player_excel(file_path):
             "file_name": file_path.name
         }
         
-        sheet_mapping = {
-            "Season_Summary": "career_stats",
-            "vs_Opposition": "opponent_splits", 
-            "Recent_Games": "recent_form",
-            "All_Games": "game_history",
-            "vs_Venues": "venue_stats",
-            "vs_Specific_Opposition": "head_to_head"
-        }
-        
         for sheet_name in xl_file.sheet_names:
             try:
                 df = pd.read_excel(file_path, sheet_name=sheet_name)
@@ -120,7 +162,7 @@ def parse_player_excel(file_path):
                 df = df.replace([float('inf'), float('-inf')], 0)  # Replace infinity
                 
                 # Map sheet names to expected format
-                mapped_name = sheet_mapping.get(sheet_name, sheet_name.lower().replace(" ", "_"))
+                mapped_name = SHEET_MAPPING.get(sheet_name, sheet_name.lower().replace(" ", "_"))
                 player_data[mapped_name] = df.to_dict('records')
                 
             except Exception as e:
@@ -210,26 +252,75 @@ def calculate_projected_score(player_data):
         log_error(f"Error calculating projected score: {e}")
         return 0.0
 
+def magic_number_for(price):
+    """Magic number used by the AFL Fantasy price formula for a price band"""
+    if price > 1000000:
+        return 9850
+    elif price < 300000:
+        return 9650
+    return 9750
+
+FINALS_ROUNDS = ("EF", "QF", "SF", "PF", "GF")
+
+def parse_number(value, default=None):
+    """Parse a scraped number such as 650000, "650000", "$650,000" or "87.5"; default if not numeric"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value or "").strip().replace("$", "").replace(",", "")
+    try:
+        return float(text)
+    except ValueError:
+        return default
+
+def parse_round(value):
+    """
+    Sort key for a round label: 5, "5", "R5" or "Round 5" -> 5.
+    Finals (EF, QF, SF, PF, GF) sort after every numbered round.
+    """
+    text = str(value or "").strip().upper()
+    if text in FINALS_ROUNDS:
+        return 100 + FINALS_ROUNDS.index(text)
+    digits = "".join(ch for ch in text if ch.isdigit())
+    return int(digits) if digits else 0
+
+def get_game_scores(player_data):
+    """Fantasy scores from the player's game logs, oldest first"""
+    games = (player_data.get("game_logs") or player_data.get("game_history")
+             or player_data.get("recent_form") or [])
+    games = [g for g in games if (parse_number(g.get("FP")) or 0) > 0]
+    
+    # DFS game logs are listed newest first; order by season and round when available
+    if games and "RD" in games[0]:
+        games = sorted(games, key=lambda g: (parse_round(g.get("YR")), parse_round(g.get("RD"))))
+    
+    return [parse_number(g["FP"]) for g in games]
+
 def calculate_breakeven(player_data):
-    """Calculate breakeven score (simplified)"""
+    """
+    Calculate next round breakeven from the rolling score window.
+    
+    The breakeven is the score that keeps the rolling three game average
+    worth the current price: 3 * price / magic_number - (last two scores).
+    """
     try:
         career_stats = player_data.get("career_stats", [])
         if not career_stats:
             return 0
             
-        latest = career_stats[-1]
-        avg_score = float(latest.get("FP", 0))
-        
-        # Simplified breakeven calculation
-        # Real AFL Fantasy uses magic number, but this gives a reasonable estimate
-        if avg_score > 80:
-            return -15  # Premium players
-        elif avg_score > 60:
-            return -10  # Mid-tier players  
-        else:
-            return -5   # Rookies/cheaper players
+        price = parse_number(career_stats[-1].get("Price")) or 200000
+        scores = get_game_scores(player_data)
+        if not scores:
+            return 0
+        
+        # Pad short histories with the player's average
+        prior = scores[-(PRICE_WINDOW - 1):]
+        average = sum(scores) / len(scores)
+        prior = [average] * (PRICE_WINDOW - 1 - len(prior)) + prior
+        
+        return int(round(PRICE_WINDOW * price / magic_number_for(price) - sum(prior)))
             
     except Exception as e:
+        log_error(f"Error calculating breakeven: {e}")
         return 0
 
 def analyze_cash_cow_potential(player_data):
@@ -5,8 +5,9 @@ Scrapes general fantasy data from AFL.com.au
 """
 
 import os
-import time
+import sys
 import pandas as pd
+from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
@@ -16,6 +17,10 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 
+# Scraping modules shared with server-node
+sys.path.append(str(Path(__file__).resolve().parent.parent / "server-node" / "backend" / "python" / "scrapers"))
+import replay
+
 def setup_driver():
     """Set up Chrome driver with appropriate options"""
     options = Options()
@@ -25,8 +30,9 @@ def setup_driver():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    driver = replay.driver(
+        lambda: webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    )
     return driver
 
 def scrape_afl_fantasy_basic():
@@ -42,7 +48,7 @@ def scrape_afl_fantasy_basic():
         driver.get(url)
         
         # Wait for page to load
-        time.sleep(5)
+        replay.pause(5)
         
         # Get page source
         soup = BeautifulSoup(driver.page_source, 'html.parser')
@@ -95,4 +101,7 @@ def scrape_afl_fantasy_basic():
         print("✅ Browser closed")
 
 if __name__ == "__main__":
+    replay.configure_from_argv()
     scrape_afl_fantasy_basic()
+    if replay.mode():
+        print(replay.report())
@@ -5,8 +5,10 @@ Specialized scraper for dfsaustralia.com player data
 """
 
 import os
+import sys
 import time
 import pandas as pd
+from pathlib import Path
 from io import StringIO
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -17,6 +19,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+# Scraping modules shared with server-node
+sys.path.append(str(Path(__file__).resolve().parent.parent / "server-node" / "backend" / "python" / "scrapers"))
+import replay
+
 def setup_driver():
     """Set up Chrome driver with options for DFS Australia"""
     options = Options()
@@ -29,8 +35,9 @@ def setup_driver():
     options.add_experimental_option('useAutomationExtension', False)
     options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    driver = replay.driver(
+        lambda: webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    )
     
     # Execute script to hide webdriver property
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -43,7 +50,7 @@ def wait_for_page_load(driver, url, timeout=45):
     driver.get(url)
     
     # Wait for initial load
-    time.sleep(8)
+    replay.pause(8)
     
     # Check for verification/loading screens
     verification_texts = [
@@ -68,7 +75,7 @@ def wait_for_page_load(driver, url, timeout=45):
         
         if is_loading:
             print("⏳ Still on verification/loading screen, waiting...")
-            time.sleep(5)
+            replay.pause(5)
             check_count += 1
             continue
             
@@ -85,7 +92,7 @@ def wait_for_page_load(driver, url, timeout=45):
             return True
         
         print(f"⏳ Waiting for content... (attempt {check_count + 1})")
-        time.sleep(5)
+        replay.pause(5)
         check_count += 1
     
     print(f"⚠️ Page load completed with {len(driver.page_source)} characters")
@@ -232,7 +239,7 @@ def scrape_dfs_australia():
                     failed_scrapes += 1
                 
                 # Be respectful - wait between requests
-                time.sleep(5)
+                replay.pause(5)
                 
             except Exception as e:
                 print(f"❌ Error processing {player_name}: {e}")
@@ -250,4 +257,7 @@ def scrape_dfs_australia():
         print("✅ Browser closed")
 
 if __name__ == "__main__":
+    replay.configure_from_argv()
     scrape_dfs_australia()
+    if replay.mode():
+        print(replay.report())
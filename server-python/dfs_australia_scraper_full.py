@@ -5,15 +5,24 @@ Scrapes all AFL Fantasy player data from dfsaustralia.com
 """
 
 import os
+import sys
 import time
+from datetime import datetime
 import pandas as pd
 from io import StringIO
+from pathlib import Path
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
+# Scraping modules shared with server-node
+sys.path.append(str(Path(__file__).resolve().parent.parent / "server-node" / "backend" / "python" / "scrapers"))
+from table_sink import TableSink, latest_scrapes
+from run_journal import RunJournal, frames_hash, parse_shard
+import replay
+
 def setup_driver():
     """Set up Chrome driver with options for DFS Australia"""
     options = Options()
@@ -26,8 +35,9 @@ def setup_driver():
     options.add_experimental_option('useAutomationExtension', False)
     options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    driver = replay.driver(
+        lambda: webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    )
     
     # Execute script to hide webdriver property
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -37,7 +47,7 @@ def setup_driver():
 def wait_for_page_load(driver, url, timeout=45):
     """Wait for the page to fully load and pass any verification screens"""
     driver.get(url)
-    time.sleep(8)  # Initial wait
+    replay.pause(8)  # Initial wait
     
     verification_texts = [
         "please wait while your request is being verified",
@@ -58,7 +68,7 @@ def wait_for_page_load(driver, url, timeout=45):
         is_loading = any(text in page_text for text in verification_texts)
         
         if is_loading:
-            time.sleep(5)
+            replay.pause(5)
             check_count += 1
             continue
             
@@ -71,7 +81,7 @@ def wait_for_page_load(driver, url, timeout=45):
         if has_content:
             return True
         
-        time.sleep(5)
+        replay.pause(5)
         check_count += 1
     
     return True  # Continue anyway
@@ -134,8 +144,16 @@ def extract_player_data(driver, player_id, player_name, save_debug=False):
     
     return table_data
 
-def scrape_all_players():
-    """Scrape all players from the Excel file"""
+def scrape_all_players(write_excel=False, resume=False, only_failed=False, shard=None):
+    """Scrape all players from the Excel file
+    
+    Tables are written to columnar datasets under dfs_player_summary/tables;
+    write_excel also writes one workbook per player. Each player's status is
+    journaled in dfs_player_summary/scrape_journal.sqlite and marked done once
+    its batch is committed, so resume continues an interrupted run,
+    only_failed retries the last run's failures and shard=(index, count)
+    scrapes one deterministic share of the list.
+    """
     print("🚀 Starting DFS Australia AFL Fantasy scraper - FULL VERSION")
     
     # Load player URLs
@@ -157,8 +175,21 @@ def scrape_all_players():
         except:
             pass
     
+    journal = RunJournal(os.path.join(output_folder, "scrape_journal.sqlite"))
+    names = {str(row["playerId"]): row["Player"] for _, row in df.iterrows()}
+    players = journal.start(
+        [(str(row["playerId"]), row["url"]) for _, row in df.iterrows()],
+        resume=resume, only_failed=only_failed, shard=shard, source="AFL_Fantasy_Player_URLs.xlsx"
+    )
+    
     print(f"📁 Output folder: {output_folder}")
-    print(f"🎯 Target: Process all {len(df)} players")
+    print(f"🎯 Target: Process {len(players)} of {len(df)} players (run {journal.run_id})")
+    
+    dataset_root = os.path.join(output_folder, "tables")
+    last_scraped = latest_scrapes(dataset_root)
+    sink = TableSink(dataset_root, excel_folder=output_folder if write_excel else None)
+    # Scraped players waiting for their batch to be committed
+    uncommitted = []
     
     # Setup driver
     driver = setup_driver()
@@ -167,30 +198,21 @@ def scrape_all_players():
     skipped_scrapes = 0
     
     try:
-        for index, row in df.iterrows():
-            player_id = row["playerId"]
-            player_name = row["Player"]
-            url = row["url"]
-            
-            print(f"\n🏃 [{index+1}/{len(df)}] Processing {player_name} ({player_id})")
+        for index, (player_id, url) in enumerate(players):
+            player_name = names.get(player_id, player_id)
             
-            output_path = os.path.join(output_folder, f"{player_id}.xlsx")
+            print(f"\n🏃 [{index+1}/{len(players)}] Processing {player_name} ({player_id})")
             
-            # Skip if file already exists and is recent
-            if os.path.exists(output_path):
-                file_age = time.time() - os.path.getmtime(output_path)
-                if file_age < 3600:  # Less than 1 hour old
-                    print(f"⏭️ Skipping - recent file exists ({file_age/60:.1f}m old)")
+            # Skip if the player was committed recently (replays always scrape)
+            if str(player_id) in last_scraped and not replay.replaying():
+                age = (datetime.now() - datetime.fromisoformat(last_scraped[str(player_id)])).total_seconds()
+                if age < 3600:  # Less than 1 hour old
+                    print(f"⏭️ Skipping - scraped recently ({age/60:.1f}m ago)")
+                    journal.mark_skipped(player_id, "scraped recently")
                     skipped_scrapes += 1
                     continue
-                else:
-                    try:
-                        os.remove(output_path)
-                    except PermissionError:
-                        print(f"❌ File in use: {output_path}")
-                        failed_scrapes += 1
-                        continue
             
+            journal.mark_running(player_id)
             try:
                 # Load the page
                 wait_for_page_load(driver, url, timeout=60)
@@ -200,41 +222,36 @@ def scrape_all_players():
                 player_data = extract_player_data(driver, player_id, player_name, save_debug)
                 
                 if player_data:
-                    # Save to Excel with multiple sheets
-                    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-                        for sheet_name, table_df in player_data.items():
-                            # Clean sheet name for Excel (max 31 chars)
-                            clean_sheet_name = sheet_name.replace("/", "-").replace(":", "")[:31]
-                            table_df.to_excel(writer, sheet_name=clean_sheet_name, index=False)
-                    
-                    print(f"✅ Saved {len(player_data)} data sheets")
+                    uncommitted.append((player_id, frames_hash(player_data)))
+                    if sink.add(player_id, player_data):
+                        journal.mark_done(uncommitted)
+                        uncommitted = []
+                    print(f"✅ Saved {len(player_data)} data tables")
                     successful_scrapes += 1
                 else:
                     print(f"⚠️ No tabular data extracted")
-                    # Create basic info file
-                    info_df = pd.DataFrame({
-                        'Player': [player_name],
-                        'PlayerID': [player_id], 
-                        'URL': [url],
-                        'Status': ['No data tables found']
-                    })
-                    info_df.to_excel(output_path, index=False)
+                    journal.mark_failed(player_id, "no tabular data")
                     failed_scrapes += 1
                 
                 # Progress summary every 10 players
                 if (index + 1) % 10 == 0:
-                    print(f"\n📊 Progress: {index+1}/{len(df)} | ✅ {successful_scrapes} | ❌ {failed_scrapes} | ⏭️ {skipped_scrapes}")
+                    print(f"\n📊 Progress: {index+1}/{len(players)} | ✅ {successful_scrapes} | ❌ {failed_scrapes} | ⏭️ {skipped_scrapes}")
                 
                 # Be respectful - wait between requests
-                time.sleep(4)
+                replay.pause(4)
                 
             except Exception as e:
                 print(f"❌ Error processing {player_name}: {e}")
+                journal.mark_failed(player_id, str(e))
                 failed_scrapes += 1
                 continue
     
     finally:
         driver.quit()
+        sink.close()
+        journal.mark_done(uncommitted)
+        summary = journal.finish()
+        journal.close()
         
         print("\n" + "="*80)
         print("📊 FINAL SCRAPING SUMMARY")
@@ -244,6 +261,8 @@ def scrape_all_players():
         print(f"⏭️ Skipped: {skipped_scrapes}")
         print(f"🎯 Total processed: {successful_scrapes + failed_scrapes + skipped_scrapes}")
         print(f"📁 Output folder: {output_folder}")
+        print(f"📒 Run {summary['run_id']}: {summary['done']} done, {summary['failed']} failed, "
+              f"{summary['pending'] + summary['running']} not reached (--resume to continue)")
         
         # Show success rate
         if successful_scrapes + failed_scrapes > 0:
@@ -253,4 +272,17 @@ def scrape_all_players():
         print("✅ Browser closed")
 
 if __name__ == "__main__":
-    scrape_all_players()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="DFS Australia AFL Fantasy scraper")
+    parser.add_argument("--xlsx", action="store_true", help="Also write one Excel workbook per player")
+    parser.add_argument("--resume", action="store_true", help="Continue the last run where it stopped")
+    parser.add_argument("--only-failed", action="store_true", help="Retry the last run's failed players")
+    parser.add_argument("--shard", type=parse_shard, help="Scrape one share of the list, e.g. 0/4")
+    replay.add_arguments(parser)
+    args = parser.parse_args()
+    replay.configure(args)
+    
+    scrape_all_players(write_excel=args.xlsx, resume=args.resume, only_failed=args.only_failed, shard=args.shard)
+    if replay.mode():
+        print(replay.report())